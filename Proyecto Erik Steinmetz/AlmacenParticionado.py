@@ -0,0 +1,329 @@
+import gzip
+import json
+import os
+from contextlib import contextmanager
+from datetime import date
+
+from Serializador import JsonCompacto, serializador_de_ruta, serializador_registrado
+
+
+class AlmacenParticionado:
+    """
+    Almacenamiento de experimentos y resultados particionado por mes.
+
+    Cada colección se guarda en un archivo por mes ("YYYY-MM") y un manifiesto pequeño indica
+    qué particiones existen y cuántos elementos tiene cada una. Al cargar solo se leen las
+    particiones del rango pedido, y al guardar solo se reescriben las particiones modificadas.
+    Las particiones antiguas se guardan comprimidas con gzip. El manifiesto registra el formato
+    de cada partición y el último elegido, así que cambiar de formato no obliga a reescribirlas
+    y el formato se conserva entre sesiones.
+    """
+
+    COLECCIONES = ("experimentos", "resultados")
+    SIN_FECHA = "sin-fecha"
+    VERSION = 1
+
+    def __init__(self, carpeta="datos", meses_sin_comprimir=6, serializador=None):
+        """
+        Inicializa el almacenamiento y lee el manifiesto, si existe.
+
+        :param carpeta: Carpeta donde se guardan el manifiesto y las particiones.
+        :param meses_sin_comprimir: Cantidad de meses recientes que se guardan sin comprimir.
+        :param serializador: Formato de las particiones que se escriben (por defecto, JSON compacto).
+        """
+        self.carpeta = carpeta
+        self.meses_sin_comprimir = meses_sin_comprimir
+        self.serializador = serializador or JsonCompacto()
+        self.ruta_manifiesto = os.path.join(carpeta, "manifiesto.json")
+        self.manifiesto = {"version": self.VERSION, "ids": {}, "particiones": {c: {} for c in self.COLECCIONES}}
+        self.sucias = {c: set() for c in self.COLECCIONES}  # Meses con cambios sin guardar
+        self.cargadas = {c: set() for c in self.COLECCIONES}  # Meses leídos completos en memoria
+        self.particion_de = {c: {} for c in self.COLECCIONES}  # {ID: mes} de los elementos en memoria
+        self.quitados = {c: set() for c in self.COLECCIONES}  # IDs eliminados que pueden seguir en disco
+        self.leer_manifiesto()
+
+    def leer_manifiesto(self):
+        """
+        Lee el manifiesto desde el disco.
+        """
+        if os.path.exists(self.ruta_manifiesto):
+            with open(self.ruta_manifiesto, "r", encoding="utf-8") as f:
+                self.manifiesto = json.load(f)
+            for coleccion in self.COLECCIONES:
+                self.manifiesto["particiones"].setdefault(coleccion, {})
+
+    def existe(self):
+        """
+        Indica si hay datos particionados guardados.
+        """
+        return os.path.exists(self.ruta_manifiesto)
+
+    @classmethod
+    def particion(cls, fecha):
+        """
+        Calcula la partición a la que pertenece una fecha.
+
+        :param fecha: Fecha "YYYY-MM-DD".
+        :return: Mes "YYYY-MM", o `SIN_FECHA` si la fecha no es válida.
+        """
+        try:
+            return date.fromisoformat(str(fecha)[:10]).isoformat()[:7]
+        except ValueError:
+            return cls.SIN_FECHA
+
+    def marcar(self, coleccion, id, fecha):
+        """
+        Registra que un elemento fue creado o modificado.
+
+        :param coleccion: "experimentos" o "resultados".
+        :param id: ID del elemento.
+        :param fecha: Fecha del elemento (la del experimento en el caso de los resultados).
+        """
+        mes = self.particion(fecha)
+        anterior = self.particion_de[coleccion].get(id)
+        if anterior is not None and anterior != mes:
+            # El elemento cambió de mes: también hay que reescribir la partición de la que sale
+            self.sucias[coleccion].add(anterior)
+            self.quitados[coleccion].add(id)
+        self.particion_de[coleccion][id] = mes
+        self.sucias[coleccion].add(mes)
+
+    def ubicar(self, coleccion, id, fecha):
+        """
+        Registra la partición de un elemento en memoria sin marcarlo como modificado.
+
+        Se usa con elementos que no pasan por `marcar` al cargarlos (ej. los restaurados de un snapshot),
+        para que si después cambian de mes también se reescriba la partición de la que salen.
+
+        :param coleccion: "experimentos" o "resultados".
+        :param id: ID del elemento.
+        :param fecha: Fecha del elemento (la del experimento en el caso de los resultados).
+        """
+        self.particion_de[coleccion][id] = self.particion(fecha)
+
+    @contextmanager
+    def conservar_cambios(self):
+        """
+        Descarta las marcas hechas dentro del bloque y conserva las anteriores.
+
+        Se usa al registrar elementos leídos de otro archivo (ej. al materializar el JSON): quedan
+        ubicados en su partición, pero leerlos no es un cambio que haya que guardar.
+        """
+        sucias = {coleccion: set(meses) for coleccion, meses in self.sucias.items()}
+        quitados = {coleccion: set(ids) for coleccion, ids in self.quitados.items()}
+        try:
+            yield
+        finally:
+            self.sucias = sucias
+            self.quitados = quitados
+
+    def quitar(self, coleccion, id):
+        """
+        Registra que un elemento fue eliminado.
+
+        :param coleccion: "experimentos" o "resultados".
+        :param id: ID del elemento.
+        """
+        mes = self.particion_de[coleccion].pop(id, None)
+        if mes is not None:
+            self.sucias[coleccion].add(mes)
+            self.quitados[coleccion].add(id)
+
+    def marcar_todo(self, coleccion, meses):
+        """
+        Marca como cargadas y modificadas todas las particiones de una colección.
+
+        Se usa cuando los datos en memoria están completos (ej. cargados desde JSON o desde la API),
+        para que al guardar se reescriban todas las particiones y se eliminen las que quedaron vacías.
+
+        :param coleccion: "experimentos" o "resultados".
+        :param meses: Meses de los elementos en memoria.
+        """
+        todos = set(self.manifiesto["particiones"][coleccion]) | set(meses)
+        self.cargadas[coleccion] = set(todos)
+        self.sucias[coleccion] = set(todos)
+
+    def completo(self):
+        """
+        Indica si todas las particiones guardadas están cargadas en memoria.
+
+        :return: False si solo se cargaron algunos meses (las eliminaciones del catálogo no verían el resto).
+        """
+        return all(set(self.manifiesto["particiones"][c]) <= self.cargadas[c] for c in self.COLECCIONES)
+
+    def limpiar_cambios(self):
+        """
+        Descarta los cambios pendientes (ej. después de cargar los datos).
+        """
+        for coleccion in self.COLECCIONES:
+            self.sucias[coleccion].clear()
+            self.quitados[coleccion].clear()
+
+    def meses(self, coleccion, desde=None, hasta=None):
+        """
+        Obtiene las particiones existentes de una colección dentro de un rango de meses.
+
+        :param coleccion: "experimentos" o "resultados".
+        :param desde: Mes inicial "YYYY-MM" (inclusive), o None.
+        :param hasta: Mes final "YYYY-MM" (inclusive), o None.
+        :return: Lista ordenada de meses. La partición sin fecha solo se incluye sin rango.
+        """
+        meses = []
+        for mes in sorted(self.manifiesto["particiones"][coleccion]):
+            if mes == self.SIN_FECHA:
+                if desde is None and hasta is None:
+                    meses.append(mes)
+            elif (desde is None or mes >= desde) and (hasta is None or mes <= hasta):
+                meses.append(mes)
+        return meses
+
+    def ruta_particion(self, coleccion, mes, comprimida):
+        """
+        Calcula la ruta del archivo de una partición.
+        """
+        return os.path.join(self.carpeta, coleccion, mes + self.serializador.extension + (".gz" if comprimida else ""))
+
+    def leer_particion(self, coleccion, mes):
+        """
+        Lee los elementos de una partición.
+
+        :param coleccion: "experimentos" o "resultados".
+        :param mes: Mes de la partición.
+        :return: Lista de diccionarios (vacía si la partición no existe).
+        """
+        datos = self.manifiesto["particiones"][coleccion].get(mes)
+        if datos is None:
+            return []
+        ruta = os.path.join(self.carpeta, datos["archivo"])
+        # Las particiones de manifiestos anteriores no registran el formato y se leen según su extensión
+        serializador = serializador_registrado(datos.get("formato")) or serializador_de_ruta(ruta)
+        if serializador is None:
+            raise ValueError(f"No se puede leer la partición '{ruta}': su formato no está disponible.")
+        return serializador.cargar(ruta)
+
+    def cargar(self, desde=None, hasta=None):
+        """
+        Lee las particiones de experimentos y resultados dentro de un rango de meses.
+
+        :param desde: Mes inicial "YYYY-MM" (inclusive), o None.
+        :param hasta: Mes final "YYYY-MM" (inclusive), o None.
+        :return: Tupla (lista de experimentos, lista de resultados) como diccionarios.
+        """
+        elementos = {}
+        for coleccion in self.COLECCIONES:
+            self.cargadas[coleccion].clear()
+            self.particion_de[coleccion].clear()
+            elementos[coleccion] = []
+            for mes in self.meses(coleccion, desde, hasta):
+                particion = self.leer_particion(coleccion, mes)
+                elementos[coleccion].extend(particion)
+                self.cargadas[coleccion].add(mes)
+                for elemento in particion:
+                    self.particion_de[coleccion][elemento["id"]] = mes
+        self.limpiar_cambios()
+        return elementos["experimentos"], elementos["resultados"]
+
+    def comprimir(self, mes):
+        """
+        Indica si una partición debe guardarse comprimida.
+
+        :param mes: Mes de la partición.
+        :return: True si el mes es anterior a los `meses_sin_comprimir` más recientes.
+        """
+        if mes == self.SIN_FECHA:
+            return True
+        hoy = date.today()
+        limite = hoy.year * 12 + hoy.month - 1 - self.meses_sin_comprimir
+        anio, numero = map(int, mes.split("-"))
+        return anio * 12 + numero - 1 <= limite
+
+    def guardar(self, coleccion, elementos_por_mes, ids=None):
+        """
+        Reescribe las particiones modificadas de una colección y actualiza el manifiesto.
+
+        Si una partición modificada no estaba cargada, sus elementos en disco se conservan,
+        salvo los que están en memoria (se reemplazan) o fueron eliminados.
+
+        Cada partición se escribe primero en su archivo nuevo (de forma atómica), después se
+        actualiza el manifiesto y recién entonces se borra el archivo anterior, si era otro. Así,
+        si el proceso se interrumpe, el manifiesto siempre apunta a archivos completos.
+
+        :param coleccion: "experimentos" o "resultados".
+        :param elementos_por_mes: Función que recibe un mes y retorna la lista de diccionarios en memoria de ese mes.
+        :param ids: Diccionario de últimos IDs entregados para guardar en el manifiesto.
+        :return: Cantidad de particiones reescritas.
+        """
+        os.makedirs(os.path.join(self.carpeta, coleccion), exist_ok=True)
+        particiones = self.manifiesto["particiones"][coleccion]
+        en_memoria = self.particion_de[coleccion]
+        reescritas = 0
+
+        for mes in sorted(self.sucias[coleccion]):
+            elementos = elementos_por_mes(mes)
+            if mes not in self.cargadas[coleccion]:
+                # Partición parcial: se combinan los elementos en disco que no están en memoria
+                elementos = [
+                    e for e in self.leer_particion(coleccion, mes)
+                    if e["id"] not in en_memoria and e["id"] not in self.quitados[coleccion]
+                ] + elementos
+
+            anterior = particiones.get(mes)
+            if elementos:
+                comprimida = self.comprimir(mes)
+                ruta = self.ruta_particion(coleccion, mes, comprimida)
+                self.serializador.guardar(ruta, elementos)
+                particiones[mes] = {
+                    "archivo": os.path.relpath(ruta, self.carpeta),
+                    "cantidad": len(elementos),
+                    "comprimida": comprimida,
+                    "formato": self.serializador.nombre
+                }
+            else:
+                particiones.pop(mes, None)
+
+            if anterior is not None:
+                self.escribir_manifiesto()
+                if anterior["archivo"] != particiones.get(mes, {}).get("archivo"):
+                    os.remove(os.path.join(self.carpeta, anterior["archivo"]))
+            self.cargadas[coleccion].add(mes)
+            reescritas += 1
+
+        self.sucias[coleccion].clear()
+        self.quitados[coleccion].clear()
+        self.manifiesto["formato"] = self.serializador.nombre
+        if ids is not None:
+            self.manifiesto["ids"] = ids
+        self.escribir_manifiesto()
+        return reescritas
+
+    def escribir_manifiesto(self):
+        """
+        Escribe el manifiesto de forma atómica.
+        """
+        os.makedirs(self.carpeta, exist_ok=True)
+        with open(self.ruta_manifiesto + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.manifiesto, f, indent=4, ensure_ascii=False)
+        os.replace(self.ruta_manifiesto + ".tmp", self.ruta_manifiesto)
+
+    def comprimir_antiguas(self):
+        """
+        Comprime las particiones que quedaron antiguas desde que se guardaron.
+
+        :return: Cantidad de particiones comprimidas.
+        """
+        comprimidas = 0
+        for coleccion in self.COLECCIONES:
+            for mes, datos in self.manifiesto["particiones"][coleccion].items():
+                if datos["comprimida"] or not self.comprimir(mes):
+                    continue
+                origen = os.path.join(self.carpeta, datos["archivo"])
+                destino = origen + ".gz"  # Se conserva el formato en que se escribió
+                with open(origen, "rb") as entrada, gzip.open(destino + ".tmp", "wb") as salida:
+                    salida.write(entrada.read())
+                os.replace(destino + ".tmp", destino)
+                os.remove(origen)
+                datos["archivo"] = os.path.relpath(destino, self.carpeta)
+                datos["comprimida"] = True
+                comprimidas += 1
+        self.escribir_manifiesto()
+        return comprimidas
@@ -1,8 +1,11 @@
 import requests
-import random
 import json
 import os
-from datetime import datetime
+import itertools
+import heapq
+import uuid
+import numpy as np
+from datetime import datetime, date, timedelta
 import matplotlib.pyplot as plt
 from Reactivo import Reactivo
 from Conversion import Conversion
@@ -10,6 +13,33 @@ from Receta import Receta
 from Medicion import Medicion
 from Experimento import Experimento
 from Resultado import Resultado
+from Metricas import Metricas, instrumentar
+from IndiceTexto import IndiceTexto
+from IndiceSecundario import IndiceSecundario
+from VistaPaginada import VistaPaginada
+from Dependencias import Dependencias
+from GeneradorIds import GeneradorIds
+from Formula import CompiladorFormulas
+from Importador import ImportadorLecturas
+from Exportador import Exportador
+from Snapshot import Snapshot
+from ArchivoResultados import ArchivoResultados, VistaArchivo
+from SerieTemporal import SerieTemporal
+from TasasFallo import TasasFallo
+from Pronostico import PronosticoAgotamiento
+from LibroConsumos import LibroConsumos
+from RegistroFallos import RegistroFallos
+from AlmacenParticionado import AlmacenParticionado
+from ColeccionDiferida import ColeccionDiferida
+from GeneradorReporte import GeneradorReporte
+from ColaExperimentos import ColaExperimentos, consumo_con_error, simular_medicion
+from HistorialCambios import HistorialCambios
+from Consulta import Consulta, MotorConsultas
+from ValidadorCarga import ValidadorCarga
+from Serializador import JsonLegible, disponibles, elegir_serializador, buscar_archivo, serializador_registrado
+from CacheDerivados import CacheDerivados
+from BusEventos import BusEventos, Evento, Creado, Modificado, Eliminado, Cargado, Vaciado, notificar_carga
+from ControlEstadistico import ControlEstadistico
 
 class App:
     """
@@ -24,6 +54,120 @@ class App:
         self.recetas = []  # Almacena los objetos Receta
         self.experimentos = []  # Almacena los objetos Experimento
         self.resultados = []  # Almacena los objetos Resultado
+        self.metricas = Metricas()  # Contadores y latencias de las operaciones
+        self.eventos = BusEventos()  # Cambios de las colecciones, para quienes necesiten seguirlos
+        self.reactivos_por_id = {}  # {id: Reactivo} para búsquedas directas
+        self.recetas_por_id = {}  # {id: Receta} para búsquedas directas
+        self.indice_reactivos = IndiceTexto()  # Búsqueda por nombre, descripción y categoría
+        self.indice_recetas = IndiceTexto()  # Búsqueda por nombre y objetivo
+        self.experimentos_por_id = {}  # {id: Experimento}
+        self.resultados_por_id = {}  # {id: Resultado}
+
+        # Índices secundarios para filtrar los listados paginados
+        self.indices_reactivos = {
+            "categoria": IndiceSecundario(lambda r: r.categoria)
+        }
+        self.indices_recetas = {
+            "reactivo": IndiceSecundario(lambda r: [item["reactivo"].id for item in r.reactivos], multiple=True)
+        }
+        self.indices_experimentos = {
+            "receta": IndiceSecundario(lambda e: e.receta.id),
+            "responsable": IndiceSecundario(lambda e: e.responsables, multiple=True),
+            "fecha": IndiceSecundario(lambda e: e.fecha, rango=True)
+        }
+        self.indices_resultados = {
+            "experimento": IndiceSecundario(lambda r: r.experimento.id),
+            "receta": IndiceSecundario(lambda r: r.experimento.receta.id),
+            "responsable": IndiceSecundario(lambda r: r.experimento.responsables, multiple=True),
+            "fecha": IndiceSecundario(lambda r: r.experimento.fecha, rango=True),
+            "valido": IndiceSecundario(lambda r: r.valido)
+        }
+
+        # Formato de los archivos de datos; al cargar se adopta el de los archivos encontrados
+        self.serializador = elegir_serializador("json")
+        self.formato_elegido = False  # True si el usuario eligió el formato y no debe adoptarse el de los archivos
+
+        # Índices y agregados guardados junto a los archivos de datos, para no recalcularlos al cargar
+        self.derivados = CacheDerivados()
+        self.derivados_restaurados = False  # True si los índices y series vienen de la caché y no de los objetos
+
+        # Validación de los registros leídos de archivos y de la API; los inválidos van a cuarentena
+        self.validador = ValidadorCarga()
+
+        # Consultas por atributos sobre las colecciones, usando los índices anteriores cuando existen
+        self.consultas = MotorConsultas()
+        self.consultas.registrar("reactivos", self.reactivos_por_id, self.indices_reactivos, {
+            "id": lambda r: r.id, "nombre": lambda r: r.nombre, "categoria": lambda r: r.categoria,
+            "costo": lambda r: r.costo, "inventario": lambda r: r.inventario, "minimo": lambda r: r.minimo,
+            "fecha_caducidad": lambda r: r.fecha_caducidad
+        })
+        self.consultas.registrar("recetas", self.recetas_por_id, self.indices_recetas, {
+            "id": lambda r: r.id, "nombre": lambda r: r.nombre,
+            "reactivo": lambda r: [item["reactivo"].id for item in r.reactivos]
+        }, multiples={"reactivo"})
+        self.consultas.registrar("experimentos", self.experimentos_por_id, self.indices_experimentos, {
+            "id": lambda e: e.id, "receta": lambda e: e.receta.id, "receta_nombre": lambda e: e.receta.nombre,
+            "responsable": lambda e: e.responsables, "fecha": lambda e: e.fecha, "mes": lambda e: str(e.fecha)[:7],
+            "costo": lambda e: e.costo
+        }, multiples={"responsable"})
+        self.consultas.registrar("resultados", self.resultados_por_id, self.indices_resultados, {
+            "id": lambda r: r.id, "experimento": lambda r: r.experimento.id, "receta": lambda r: r.experimento.receta.id,
+            "responsable": lambda r: r.experimento.responsables, "fecha": lambda r: r.experimento.fecha,
+            "mes": lambda r: str(r.experimento.fecha)[:7], "valido": lambda r: r.valido
+        }, multiples={"responsable"})
+
+        # Generadores de IDs que no se reutilizan al eliminar elementos
+        self.ids_reactivos = GeneradorIds()
+        self.ids_experimentos = GeneradorIds()
+        self.ids_resultados = GeneradorIds()
+
+        self.formulas = CompiladorFormulas()  # Caché de fórmulas de mediciones compiladas
+
+        # Agregados por día para las estadísticas por período
+        self.series_experimentos = SerieTemporal()  # Experimentos, costo y consumo de reactivos
+        self.series_resultados = SerieTemporal()  # Resultados y resultados dentro de parámetros
+        self.tasas_fallo = TasasFallo()  # Mediciones fuera de rango por receta (incluye el histórico archivado)
+
+        # Registro de cada descuento de inventario (planificado y real)
+        self.consumos = LibroConsumos("consumos.jsonl")
+        self.fallos = RegistroFallos("fallos.jsonl")  # Intentos rechazados de crear o realizar experimentos
+
+        # Resultados antiguos guardados en disco fuera de `self.resultados`
+        self.archivo_resultados = ArchivoResultados("historico")
+        self.ids_resultados.observar(self.archivo_resultados.ultimo_id)
+
+        # Los índices anteriores también sirven como índices inversos de dependencias (junto con el histórico)
+        self.dependencias = Dependencias(
+            self.indices_recetas["reactivo"], self.indices_experimentos["receta"], self.indices_resultados["experimento"],
+            self.archivo_resultados
+        )
+
+        # Experimentos y resultados guardados por mes
+        self.almacen = AlmacenParticionado("datos")
+        self.origen_datos = None  # "api", "json", "snapshot" o "particiones"
+
+        # Marca de la versión de los datos, guardada con el JSON, el snapshot y las particiones: los
+        # archivos con la misma marca tienen los mismos datos. Se renueva al guardar si hubo cambios.
+        self.sincronizacion = None
+        self.sin_guardar = set()  # Colecciones modificadas desde la carga
+
+        # Ediciones de reactivos y experimentos, para deshacer, rehacer y simular
+        self.historial = HistorialCambios()
+
+        # Experimentos encolados para ser realizados por procesos trabajadores; la base de datos
+        # se abre (y se crea) recién al entrar al menú de la cola
+        self.cola = None
+
+        # Colecciones leídas del JSON que se materializan recién al usarlas
+        self.diferidas = {}  # {nombre: ColeccionDiferida}
+
+        # Control estadístico de las mediciones, actualizado con cada resultado creado
+        self.control = ControlEstadistico()
+        self.control_vigente = True  # False después de cargar o vaciar los resultados; se recalcula al usarlo
+        self.eventos.suscribir(Creado, self.controlar_resultado, coleccion="resultados")
+        self.eventos.suscribir(Cargado, self.invalidar_control, coleccion="resultados")
+        self.eventos.suscribir(Vaciado, self.invalidar_control, coleccion="resultados")
+        self.eventos.suscribir(Evento, self.marcar_sin_guardar)
 
     def obtener_reactivo_por_id(self, id):
         """
@@ -32,11 +176,46 @@ class App:
         :param id: Identificador del reactivo.
         :return: Objeto Reactivo si se encuentra, de lo contrario None.
         """
-        for reactivo in self.reactivos:
-            if reactivo.id == id:
-                return reactivo
-        return None  # Retorna None si no se encuentra el reactivo
+        return self.reactivos_por_id.get(id)  # Retorna None si no se encuentra el reactivo
+
+    def registrar_reactivo(self, reactivo):
+        """
+        Agrega un reactivo a la lista y a los índices de búsqueda.
+
+        :param reactivo: Objeto Reactivo a registrar.
+        """
+        self.reactivos.append(reactivo)
+        self.reactivos_por_id[reactivo.id] = reactivo
+        self.ids_reactivos.observar(reactivo.id)
+        self.indexar_reactivo(reactivo)
+        self.eventos.emitir(Creado, "reactivos", reactivo, despues=reactivo)
+
+    def indexar_reactivo(self, reactivo):
+        """
+        Actualiza el índice de texto de un reactivo después de crearlo o editarlo.
+
+        :param reactivo: Objeto Reactivo a indexar.
+        """
+        self.indice_reactivos.agregar(reactivo.id, [
+            (reactivo.nombre, 3), (reactivo.categoria, 2), (reactivo.descripcion, 1)
+        ])
+        for indice in self.indices_reactivos.values():
+            indice.agregar(reactivo.id, reactivo)
 
+    def quitar_reactivo(self, reactivo):
+        """
+        Elimina un reactivo de la lista y de los índices de búsqueda.
+
+        :param reactivo: Objeto Reactivo a eliminar.
+        """
+        self.reactivos.remove(reactivo)
+        self.reactivos_por_id.pop(reactivo.id, None)
+        self.indice_reactivos.eliminar(reactivo.id)
+        for indice in self.indices_reactivos.values():
+            indice.eliminar(reactivo.id)
+        self.eventos.emitir(Eliminado, "reactivos", reactivo, antes=reactivo)
+
+    @instrumentar("cargar_reactivos_api", elementos=lambda app, _: len(app.reactivos))
     def cargar_reactivos_api(self):
         """
         Carga los reactivos desde una API y los almacena en la lista de reactivos.
@@ -45,7 +224,7 @@ class App:
         response = requests.get(url)
 
         if response.status_code == 200:
-            datos = response.json()
+            datos = self.validador.validar_lote("reactivo_api", response.json(), url)
             for dato in datos:
                 # Extraer datos del reactivo
                 id_reactivo = dato["id"]
@@ -72,12 +251,13 @@ class App:
                     inventario_disponible, unidad_medida, fecha_caducidad,
                     minimo_sugerido, conversiones
                 )
-                self.reactivos.append(reactivo)
+                self.registrar_reactivo(reactivo)
 
             print("Reactivos cargados correctamente desde la API.")
         else:
             print("Error: No se pudo conectar con la API de reactivos.")
 
+    @instrumentar("cargar_recetas_api", elementos=lambda app, _: len(app.recetas))
     def cargar_recetas_api(self):
         """
         Carga las recetas desde una API y las almacena en la lista de recetas.
@@ -86,7 +266,7 @@ class App:
         response = requests.get(url)
 
         if response.status_code == 200:
-            datos = response.json()
+            datos = self.validador.validar_lote("receta_api", response.json(), url)
             for dato in datos:
                 # Extraer datos de la receta
                 id_receta = dato["id"]
@@ -118,7 +298,7 @@ class App:
 
                 # Crear y agregar la receta a la lista
                 receta = Receta(id_receta, nombre, objetivo, reactivos_necesarios, procedimiento, mediciones)
-                self.recetas.append(receta)
+                self.registrar_receta(receta)
 
             print("Recetas cargadas correctamente desde la API.")
         else:
@@ -126,12 +306,279 @@ class App:
 
 
     def obtener_receta_por_id(self, id):
-        for receta in self.recetas:
-            if receta.id == id:
-                return receta
-        return None  # Retorna None si no encuentra la receta
+        return self.recetas_por_id.get(id)  # Retorna None si no encuentra la receta
+
+    def registrar_receta(self, receta):
+        """
+        Agrega una receta a la lista y a los índices de búsqueda.
+
+        :param receta: Objeto Receta a registrar.
+        """
+        self.recetas.append(receta)
+        self.recetas_por_id[receta.id] = receta
+        self.indice_recetas.agregar(receta.id, [(receta.nombre, 3), (receta.objetivo, 1)])
+        for indice in self.indices_recetas.values():
+            indice.agregar(receta.id, receta)
+        self.eventos.emitir(Creado, "recetas", receta, despues=receta)
+
+    def registrar_experimento(self, experimento, indexar=True):
+        """
+        Agrega un experimento a la lista y a sus índices.
+
+        :param experimento: Objeto Experimento a registrar.
+        :param indexar: False si los índices y series ya lo incluyen (restaurados de la caché de derivados).
+        """
+        self.experimentos.append(experimento)
+        self.experimentos_por_id[experimento.id] = experimento
+        self.ids_experimentos.observar(experimento.id)
+        if indexar:
+            self.indexar_experimento(experimento)
+        else:
+            self.almacen.ubicar("experimentos", experimento.id, experimento.fecha)
+        self.eventos.emitir(Creado, "experimentos", experimento, despues=experimento)
+
+    def indexar_experimento(self, experimento):
+        """
+        Actualiza los índices de un experimento y de sus resultados después de crearlo o editarlo.
+
+        :param experimento: Objeto Experimento a indexar.
+        """
+        for indice in self.indices_experimentos.values():
+            indice.agregar(experimento.id, experimento)
+        self.series_experimentos.agregar(experimento.id, experimento.fecha, *self.aporte_experimento(experimento))
+        self.almacen.marcar("experimentos", experimento.id, experimento.fecha)
+
+        # Los resultados se filtran por la receta, fecha y responsables de su experimento
+        for id_resultado in list(self.indices_resultados["experimento"].claves_con_valor(experimento.id)):
+            self.indexar_resultado(self.resultados_por_id[id_resultado])
+
+    def quitar_experimento(self, experimento, de_lista=True):
+        """
+        Elimina un experimento de la lista y de sus índices.
+
+        :param experimento: Objeto Experimento a eliminar.
+        :param de_lista: False si quien lo llama quita varios de la lista en una sola pasada (ver `depurar_lista`).
+        """
+        if de_lista:
+            self.experimentos.remove(experimento)
+        self.experimentos_por_id.pop(experimento.id, None)
+        for indice in self.indices_experimentos.values():
+            indice.eliminar(experimento.id)
+        self.series_experimentos.eliminar(experimento.id)
+        self.almacen.quitar("experimentos", experimento.id)
+        self.eventos.emitir(Eliminado, "experimentos", experimento, antes=experimento)
+
+    @staticmethod
+    def aporte_experimento(experimento):
+        """
+        Calcula lo que un experimento suma a las estadísticas por período.
+
+        :param experimento: Objeto Experimento.
+        :return: Tupla (métricas, grupos por investigador, receta y reactivo) para `SerieTemporal.agregar`.
+        """
+        metricas = {"experimentos": 1, "costo": experimento.costo}
+
+        # Si el experimento ya se realizó se usa lo descontado realmente; si no, lo que indica la receta
+        consumo = {}
+        if experimento.consumo_real:
+            for reactivo, cantidad in experimento.consumo_real.items():
+                consumo[reactivo] = {"experimentos": 1, "consumo": cantidad}
+        else:
+            for item in experimento.receta.reactivos:
+                reactivo = item["reactivo"].id
+                consumo[reactivo] = {"experimentos": 1, "consumo": consumo.get(reactivo, {}).get("consumo", 0) + item["cantidad"]}
+        metricas["consumo"] = sum(c["consumo"] for c in consumo.values())
+
+        grupos = {
+            "investigador": {responsable: metricas for responsable in experimento.responsables},
+            "receta": {experimento.receta.id: metricas},
+            "reactivo": consumo
+        }
+        return metricas, grupos
+
+    @staticmethod
+    def aporte_resultado(experimento, valido):
+        """
+        Calcula lo que un resultado suma a las estadísticas por período.
+
+        :param experimento: Objeto Experimento del resultado.
+        :param valido: True si el resultado está dentro de parámetros.
+        :return: Tupla (métricas, grupos por investigador, receta y reactivo) para `SerieTemporal.agregar`.
+        """
+        metricas = {"resultados": 1, "validos": 1 if valido else 0}
+        grupos = {
+            "investigador": {responsable: metricas for responsable in experimento.responsables},
+            "receta": {experimento.receta.id: metricas},
+            "reactivo": {item["reactivo"].id: metricas for item in experimento.receta.reactivos}
+        }
+        return metricas, grupos
+
+    def registrar_resultado(self, resultado, indexar=True):
+        """
+        Agrega un resultado a la lista y a sus índices, asignándole un ID si no tiene.
+
+        :param resultado: Objeto Resultado a registrar.
+        :param indexar: False si los índices y series ya lo incluyen (restaurados de la caché de derivados).
+        """
+        if resultado.id is None:
+            resultado.id = self.ids_resultados.siguiente()
+        else:
+            self.ids_resultados.observar(resultado.id)
+        self.resultados.append(resultado)
+        self.resultados_por_id[resultado.id] = resultado
+        if indexar:
+            self.indexar_resultado(resultado)
+        else:
+            self.almacen.ubicar("resultados", resultado.id, resultado.experimento.fecha)
+        self.eventos.emitir(Creado, "resultados", resultado, despues=resultado)
+
+    def quitar_resultado(self, resultado, de_lista=True):
+        """
+        Elimina un resultado de la lista y de sus índices.
+
+        :param resultado: Objeto Resultado a eliminar.
+        :param de_lista: False si quien lo llama quita varios de la lista en una sola pasada (ver `depurar_lista`).
+        """
+        if de_lista:
+            self.resultados.remove(resultado)
+        self.resultados_por_id.pop(resultado.id, None)
+        for indice in self.indices_resultados.values():
+            indice.eliminar(resultado.id)
+        self.series_resultados.eliminar(resultado.id)
+        self.tasas_fallo.eliminar(resultado.id)
+        self.almacen.quitar("resultados", resultado.id)
+        self.eventos.emitir(Eliminado, "resultados", resultado, antes=resultado)
+
+    def quitar_resultados(self, resultados):
+        """
+        Elimina muchos resultados a la vez, reconstruyendo los índices una sola vez.
+
+        Se usa al archivarlos, por lo que siguen contando en las estadísticas por período.
+
+        :param resultados: Lista de objetos Resultado a eliminar.
+        """
+        ids = {resultado.id for resultado in resultados}
+        self.resultados[:] = [resultado for resultado in self.resultados if resultado.id not in ids]
+        for id in ids:
+            self.resultados_por_id.pop(id, None)
+            self.almacen.quitar("resultados", id)
+        for indice in self.indices_resultados.values():
+            indice.limpiar()
+        for resultado in self.resultados:
+            self.indexar_resultado(resultado)
+        if self.eventos.escuchando(Eliminado, "resultados"):
+            for resultado in resultados:
+                self.eventos.emitir(Eliminado, "resultados", resultado, antes=resultado)
+
+    def quitar_receta(self, receta, de_lista=True):
+        """
+        Elimina una receta de la lista y de los índices de búsqueda.
+
+        :param receta: Objeto Receta a eliminar.
+        :param de_lista: False si quien lo llama quita varias de la lista en una sola pasada (ver `depurar_lista`).
+        """
+        if de_lista:
+            self.recetas.remove(receta)
+        self.recetas_por_id.pop(receta.id, None)
+        self.indice_recetas.eliminar(receta.id)
+        for indice in self.indices_recetas.values():
+            indice.eliminar(receta.id)
+        self.eventos.emitir(Eliminado, "recetas", receta, antes=receta)
+
+    def elegir_politica(self, descripcion, dependientes):
+        """
+        Pregunta qué hacer cuando otros elementos dependen del que se quiere eliminar.
+
+        :param descripcion: Descripción del elemento a eliminar (ej. "El reactivo 'Agua'").
+        :param dependientes: Diccionario retornado por `Dependencias.dependientes_de_*`.
+        :return: Dependencias.CASCADA o Dependencias.DENEGAR.
+        """
+        resumen = Dependencias.describir(dependientes)
+        if not resumen:
+            return Dependencias.CASCADA  # No hay nada que dependa del elemento
+
+        print(f"\nAdvertencia: {descripcion} tiene elementos que dependen de él ({resumen}).")
+        opcion = input("¿Desea eliminarlos también (C) o cancelar la eliminación (D)?: ").strip().lower()
+        while opcion not in ["c", "d"]:
+            print("Error: Ingrese 'C' para eliminar en cascada o 'D' para cancelar.")
+            opcion = input("¿Desea eliminarlos también (C) o cancelar la eliminación (D)?: ").strip().lower()
+
+        return Dependencias.CASCADA if opcion == "c" else Dependencias.DENEGAR
+
+    def eliminar_dependientes(self, dependientes):
+        """
+        Elimina en cascada los resultados, experimentos y recetas dependientes.
+
+        Cada lista se recorre una sola vez al final, en lugar de una vez por elemento eliminado.
+
+        :param dependientes: Diccionario retornado por `Dependencias.dependientes_de_*`.
+        """
+        for id_resultado in dependientes["resultados"]:
+            self.quitar_resultado(self.resultados_por_id[id_resultado], de_lista=False)
+        for id_experimento in dependientes["experimentos"]:
+            self.quitar_experimento(self.experimentos_por_id[id_experimento], de_lista=False)
+        self.quitar_archivados(dependientes["experimentos"])
+        for id_receta in dependientes["recetas"]:
+            self.quitar_receta(self.recetas_por_id[id_receta], de_lista=False)
+
+        self.depurar_lista(self.resultados, self.resultados_por_id)
+        self.depurar_lista(self.experimentos, self.experimentos_por_id)
+        self.depurar_lista(self.recetas, self.recetas_por_id)
+
+    @staticmethod
+    def depurar_lista(lista, por_id):
+        """
+        Quita de una lista, en una sola pasada, los elementos que ya no están en su diccionario por ID.
+
+        :param lista: Lista de la colección (se modifica en su lugar, ya que otros objetos la referencian).
+        :param por_id: Diccionario {ID: objeto} de la colección.
+        """
+        if len(lista) != len(por_id):
+            lista[:] = [elemento for elemento in lista if por_id.get(elemento.id) is elemento]
+
+    def quitar_archivados(self, ids_experimentos):
+        """
+        Marca como borrados los resultados archivados de varios experimentos y los descuenta de las estadísticas.
+
+        :param ids_experimentos: IDs de los experimentos eliminados.
+        """
+        for id_resultado in self.archivo_resultados.marcar_borrados(ids_experimentos):
+            self.series_resultados.eliminar(id_resultado)
+            self.tasas_fallo.eliminar(id_resultado)
+
+    def recalcular_costos_pendientes(self, reactivo):
+        """
+        Recalcula el costo de los experimentos aún no realizados que usan un reactivo.
+
+        :param reactivo: Objeto Reactivo cuyo costo cambió.
+        """
+        self.asegurar("experimentos", "resultados")
+        for id_receta in self.dependencias.recetas_de_reactivo(reactivo.id):
+            for id_experimento in self.dependencias.experimentos_de_receta(id_receta):
+                if not self.dependencias.tiene_resultados(id_experimento):
+                    experimento = self.experimentos_por_id[id_experimento]
+                    costo_anterior = experimento.costo
+                    experimento.costo = experimento.calcular_costo()
+                    self.indexar_experimento(experimento)
+                    if experimento.costo != costo_anterior:
+                        self.eventos.emitir(Modificado, "experimentos", experimento,
+                                            {"costo": costo_anterior}, {"costo": experimento.costo})
+
+    def indexar_resultado(self, resultado):
+        """
+        Actualiza los índices de un resultado.
+
+        :param resultado: Objeto Resultado a indexar.
+        """
+        for indice in self.indices_resultados.values():
+            indice.agregar(resultado.id, resultado)
+        self.series_resultados.agregar(resultado.id, resultado.experimento.fecha,
+                                       *self.aporte_resultado(resultado.experimento, resultado.valido))
+        self.tasas_fallo.agregar(resultado.id, resultado.experimento.receta.id, tuple(resultado.valores_obtenidos), resultado.fallos)
+        self.almacen.marcar("resultados", resultado.id, resultado.experimento.fecha)
      
 
+    @instrumentar("cargar_experimentos_api", elementos=lambda app, _: len(app.experimentos))
     def cargar_experimentos_api(self):
         """
         Carga los experimentos desde una API y los almacena en la lista de experimentos.
@@ -140,7 +587,7 @@ class App:
         response = requests.get(url)
 
         if response.status_code == 200:
-            datos = response.json()
+            datos = self.validador.validar_lote("experimento_api", response.json(), url)
             for dato in datos:
                 # Extraer datos del experimento
                 id_experimento = dato["id"]
@@ -153,12 +600,13 @@ class App:
                 if receta:
                     experimento = Experimento(id_experimento, receta, responsables, fecha)
                     experimento.resultado = resultado  # Asignar resultado si está presente
-                    self.experimentos.append(experimento)
+                    self.registrar_experimento(experimento)
 
             print("Experimentos cargados correctamente desde la API.")
         else:
             print("Error: No se pudo conectar con la API de experimentos.") 
 
+    @notificar_carga("api", "reactivos", "recetas", "experimentos")
     def inicializar_datos(self):
         """
         Carga los datos de reactivos, recetas y experimentos desde la API.
@@ -167,17 +615,368 @@ class App:
         self.cargar_reactivos_api()
         self.cargar_recetas_api()
         self.cargar_experimentos_api()
+        self.integrar_historico_en_series()
         print("Datos cargados correctamente.")
+        self.informar_validacion()
 
     def borrar_datos(self):
         """
         Elimina todos los datos almacenados en la aplicación.
         """
-        self.reactivos.clear()  # Vacía la lista de reactivos
-        self.recetas.clear()  # Vacía la lista de recetas
-        self.experimentos.clear()  # Vacía la lista de experimentos
+        cantidades = {"reactivos": len(self.reactivos), "recetas": len(self.recetas),
+                      "experimentos": len(self.experimentos), "resultados": len(self.resultados)}
+        self.vaciar_coleccion(self.reactivos, self.reactivos_por_id, self.indice_reactivos, *self.indices_reactivos.values())
+        self.vaciar_coleccion(self.recetas, self.recetas_por_id, self.indice_recetas, *self.indices_recetas.values())
+        self.vaciar_coleccion(self.experimentos, self.experimentos_por_id, self.series_experimentos, *self.indices_experimentos.values())
+        self.vaciar_coleccion(self.resultados, self.resultados_por_id, self.series_resultados, self.tasas_fallo, *self.indices_resultados.values())
+        self.diferidas.clear()
+        for coleccion, cantidad in cantidades.items():
+            self.eventos.emitir(Vaciado, coleccion, antes=cantidad)
+        self.derivados_restaurados = False
+        self.sincronizacion = None
+        self.sin_guardar.clear()
         print("\nTodos los datos han sido eliminados.\n")
 
+    def vaciar_coleccion(self, coleccion, por_id, *indices):
+        """
+        Vacía una colección junto con su diccionario por ID y sus índices.
+
+        :param coleccion: Lista de objetos.
+        :param por_id: Diccionario {id: objeto}.
+        :param indices: Índices (IndiceTexto o IndiceSecundario), series (SerieTemporal) o contadores (TasasFallo) de la colección.
+        """
+        coleccion.clear()
+        por_id.clear()
+        for indice in indices:
+            indice.limpiar()
+
+    def navegar(self, vista, titulo, formato):
+        """
+        Muestra una colección por páginas, permite filtrarla y seleccionar un elemento.
+
+        :param vista: Objeto VistaPaginada de la colección.
+        :param titulo: Título del listado.
+        :param formato: Función que convierte un objeto en la línea a mostrar.
+        :return: Objeto seleccionado, o None si el usuario sale sin seleccionar.
+        """
+        cursores = [None]  # Cursor de inicio de cada página visitada, para poder retroceder
+        while True:
+            elementos, siguiente = vista.pagina(cursores[-1])
+
+            print(f"\n===== {titulo} (página {len(cursores)}) =====")
+            if vista.descripcion_filtros():
+                print(f"Filtros: {vista.descripcion_filtros()}")
+            if not elementos:
+                print("No hay elementos que coincidan.")
+            for i, elemento in enumerate(elementos, start=1):
+                print(f"{i}. {formato(elemento)}")
+
+            print("\nS: Siguiente | A: Anterior | F: Filtrar | L: Limpiar filtros | 0: Salir")
+            opcion = input("Seleccione un número o una opción: ").strip().lower()
+
+            if opcion == "0":
+                return None
+            elif opcion == "s":
+                if siguiente is None:
+                    print("No hay más páginas.")
+                else:
+                    cursores.append(siguiente)
+            elif opcion == "a":
+                if len(cursores) > 1:
+                    cursores.pop()
+            elif opcion == "f":
+                self.pedir_filtro(vista)
+                cursores = [None]
+            elif opcion == "l":
+                vista.limpiar_filtros()
+                cursores = [None]
+            elif opcion.isnumeric() and int(opcion) in range(1, len(elementos) + 1):
+                return elementos[int(opcion) - 1]
+            else:
+                print("Error: Ingrese un número válido de la lista o una opción.")
+
+    def pedir_filtro(self, vista):
+        """
+        Solicita al usuario un filtro para un listado paginado.
+
+        :param vista: Objeto VistaPaginada al que se agregará el filtro.
+        """
+        nombres = list(vista.indices.keys())
+        print("\n===== FILTRAR POR =====")
+        for i, nombre in enumerate(nombres, start=1):
+            print(f"{i}. {nombre.capitalize()}")
+
+        seleccion = input("\nSeleccione el número del filtro: ")
+        while not seleccion.isnumeric() or int(seleccion) not in range(1, len(nombres) + 1):
+            print("Error: Ingrese un número válido de la lista.")
+            seleccion = input("\nSeleccione el número del filtro: ")
+        nombre = nombres[int(seleccion) - 1]
+
+        if nombre == "fecha":
+            desde = input("Fecha inicial (YYYY-MM-DD) o vacío: ").strip() or None
+            hasta = input("Fecha final (YYYY-MM-DD) o vacío: ").strip() or None
+            vista.filtrar_rango(nombre, desde, hasta)
+        elif nombre == "valido":
+            valido = input("¿Mostrar solo los que están dentro de parámetros? (S/N): ").strip().lower()
+            vista.filtrar(nombre, valido == "s")
+        elif nombre == "receta":
+            vista.filtrar(nombre, self.seleccionar_receta("filtrar").id)
+        elif nombre == "reactivo":
+            vista.filtrar(nombre, self.seleccionar_reactivo("filtrar").id)
+        elif nombre == "experimento":
+            id = input("Ingrese el ID del experimento: ").strip()
+            while not id.isnumeric():
+                print("Error: Ingrese un número entero.")
+                id = input("Ingrese el ID del experimento: ").strip()
+            vista.filtrar(nombre, int(id))
+        else:
+            vista.filtrar(nombre, input(f"Ingrese el valor de {nombre}: ").strip())
+
+    def seleccionar_experimento(self, accion):
+        """
+        Muestra los experimentos por páginas con filtros y permite seleccionar uno.
+
+        :param accion: Acción que se realizará con el experimento (ej. 'editar').
+        :return: Objeto Experimento seleccionado, o None si el usuario sale.
+        """
+        vista = VistaPaginada(self.experimentos_por_id, self.indices_experimentos, "receta")
+        return self.navegar(
+            vista, f"SELECCIONE EL EXPERIMENTO A {accion.upper()}",
+            lambda e: f"ID:{e.id} - {e.receta.nombre} - {e.fecha} - {', '.join(e.responsables)}"
+        )
+
+    def seleccionar_resultado(self, accion):
+        """
+        Muestra los resultados por páginas con filtros y permite seleccionar uno.
+
+        :param accion: Acción que se realizará con el resultado (ej. 'graficar').
+        :return: Objeto Resultado seleccionado, o None si el usuario sale.
+        """
+        vista = VistaPaginada(self.resultados_por_id, self.indices_resultados, "experimento")
+        return self.navegar(
+            vista, f"SELECCIONE EL RESULTADO A {accion.upper()}",
+            lambda r: f"{r.experimento.receta.nombre} - Fecha: {r.experimento.fecha} - "
+                      f"Evaluación: {'Dentro de parámetros' if r.valido else 'Fuera de parámetros'}"
+        )
+
+    def seleccionar_por_busqueda(self, indice, por_id, vista, descripcion, formato):
+        """
+        Permite buscar un elemento con el índice de texto y seleccionarlo de los mejores resultados.
+
+        :param indice: Objeto IndiceTexto de la colección.
+        :param por_id: Diccionario {id: objeto} de la colección.
+        :param vista: Objeto VistaPaginada de la colección, usado si la búsqueda se deja vacía.
+        :param descripcion: Descripción del elemento a seleccionar (ej. 'reactivo a editar').
+        :param formato: Función que convierte un objeto en la línea a mostrar.
+        :return: Objeto seleccionado.
+        """
+        while True:
+            consulta = input(f"\nBuscar {descripcion} (deje vacío para ver el listado por páginas): ").strip()
+            if not consulta:
+                elemento = self.navegar(vista, descripcion.upper(), formato)
+                if elemento is not None:
+                    return elemento
+                continue
+
+            encontrados = [por_id[clave] for clave in indice.buscar(consulta)]
+
+            if not encontrados:
+                print("No se encontraron coincidencias, intente con otro texto.")
+                continue
+
+            for i, elemento in enumerate(encontrados, start=1):
+                print(f"{i}. {formato(elemento)}")
+            print("0. Nueva búsqueda")
+
+            seleccion = input("\nSeleccione un número: ")
+            while not seleccion.isnumeric() or int(seleccion) not in range(0, len(encontrados) + 1):
+                print("Error: Ingrese un número válido de la lista.")
+                seleccion = input("\nSeleccione un número: ")
+
+            if int(seleccion) > 0:
+                return encontrados[int(seleccion) - 1]
+
+    def seleccionar_reactivo(self, accion):
+        """
+        Busca y selecciona un reactivo por nombre, descripción o categoría.
+
+        :param accion: Acción que se realizará con el reactivo (ej. 'editar').
+        :return: Objeto Reactivo seleccionado.
+        """
+        return self.seleccionar_por_busqueda(
+            self.indice_reactivos, self.reactivos_por_id,
+            VistaPaginada(self.reactivos_por_id, self.indices_reactivos, "categoria"), f"reactivo a {accion}",
+            lambda r: f"ID:{r.id} {r.nombre} ({r.categoria})"
+        )
+
+    def seleccionar_receta(self, accion):
+        """
+        Busca y selecciona una receta por nombre u objetivo.
+
+        :param accion: Acción que se realizará con la receta (ej. 'usar').
+        :return: Objeto Receta seleccionado.
+        """
+        return self.seleccionar_por_busqueda(
+            self.indice_recetas, self.recetas_por_id,
+            VistaPaginada(self.recetas_por_id, self.indices_recetas, "reactivo"), f"receta a {accion}",
+            lambda r: f"ID:{r.id} {r.nombre}"
+        )
+
+    def menu_historial(self):
+        """
+        Muestra el menú para deshacer y rehacer ediciones y para manejar simulaciones.
+        """
+        while True:
+            print("\n===== HISTORIAL DE CAMBIOS =====")
+            if self.historial.escenario is not None:
+                print(f"(Simulación activa: '{self.historial.escenario}')")
+            print("1. Deshacer")
+            print("2. Rehacer")
+            print("3. Iniciar o reabrir una simulación")
+            print("4. Terminar la simulación")
+            print("5. Ver historial")
+            print("6. Salir")
+
+            opcion = input("Seleccione una opción: ")
+            while not opcion.isnumeric() or not int(opcion) in range(1, 7):
+                print("Error: Ingrese una opción válida.")
+                opcion = input("Seleccione una opción: ")
+
+            if opcion in ("1", "2"):
+                rehacer = opcion == "2"
+                version = self.historial.siguiente(rehacer)
+                conflictos = self.historial.conflictos(version, rehacer) if version is not None else []
+                if version is None:
+                    print(f"\nNo hay ediciones para {'rehacer' if rehacer else 'deshacer'}.")
+                elif conflictos:
+                    cambiados = ", ".join(f"{campo} de {getattr(entidad, 'nombre', None) or f'experimento {entidad.id}'}"
+                                          for entidad, campo in conflictos)
+                    print(f"\nNo se puede {'rehacer' if rehacer else 'deshacer'} '{version.descripcion}': "
+                          f"estos campos cambiaron después ({cambiados}) y se perderían esos cambios.")
+                else:
+                    self.historial.rehacer() if rehacer else self.historial.deshacer()
+                    self.reindexar_version(version, rehacer)
+                    print(f"\n{'Rehecho' if rehacer else 'Deshecho'}: {version.descripcion}")
+            elif opcion == "3":
+                if self.historial.escenario is not None:
+                    print("\nYa hay una simulación activa; termínela antes de iniciar otra.")
+                    continue
+                guardadas = ", ".join(self.historial.escenarios) or "ninguna"
+                nombre = input(f"Nombre de la simulación (guardadas: {guardadas}): ").strip()
+                while not nombre:
+                    nombre = input("Ingrese un nombre: ").strip()
+                self.iniciar_simulacion(nombre)
+            elif opcion == "4":
+                if self.historial.escenario is None:
+                    print("\nNo hay una simulación activa.")
+                    continue
+                conservar = input("¿Conservar los cambios de la simulación? (S/N): ").strip().lower()
+                while conservar not in ["s", "n"]:
+                    conservar = input("Ingrese 'S' para conservarlos o 'N' para descartarlos: ").strip().lower()
+                self.terminar_simulacion(conservar == "s")
+            elif opcion == "5":
+                if not self.historial.deshacer_pila:
+                    print("\nNo hay ediciones registradas.")
+                for version in reversed(self.historial.deshacer_pila[-15:]):
+                    escenario = f" [simulación '{version.escenario}']" if version.escenario else ""
+                    print(f"  - {version.descripcion}{escenario}: {', '.join(sorted(set().union(*(c for _, c in version.entidades()))))}")
+            else:
+                break
+
+    def reindexar_version(self, version, rehacer):
+        """
+        Actualiza índices y valores derivados de las entidades de una versión deshecha o rehecha.
+
+        :param version: Objeto Version.
+        :param rehacer: True si la versión se aplicó (rehecha o registrada); False si se deshizo.
+        """
+        for entidad, campos in version.entidades():
+            if isinstance(entidad, Reactivo):
+                self.indexar_reactivo(entidad)
+                if "costo" in campos:
+                    self.recalcular_costos_pendientes(entidad)
+            elif isinstance(entidad, Experimento):
+                self.indexar_experimento(entidad)
+        self.notificar_version(version, rehacer)
+
+    def notificar_version(self, version, rehacer):
+        """
+        Emite un evento `Modificado` por cada entidad de una versión.
+
+        :param version: Objeto Version.
+        :param rehacer: True si la versión se aplicó; False si se deshizo (se invierten los valores).
+        """
+        for entidad, antes, despues in version.cambios:
+            coleccion = "reactivos" if isinstance(entidad, Reactivo) else "experimentos"
+            if rehacer:
+                self.eventos.emitir(Modificado, coleccion, entidad, antes, despues)
+            else:
+                self.eventos.emitir(Modificado, coleccion, entidad, despues, antes)
+
+    def registrar_edicion(self, descripcion, capturas):
+        """
+        Registra una edición en el historial y notifica los campos modificados.
+
+        :param descripcion: Descripción de la edición.
+        :param capturas: Lista de tuplas (entidad, estado retornado por `HistorialCambios.capturar`).
+        """
+        version = self.historial.registrar(descripcion, capturas)
+        if version is not None:
+            self.notificar_version(version, rehacer=True)
+
+    def iniciar_simulacion(self, nombre):
+        """
+        Inicia (o reabre) una simulación: las ediciones siguientes se pueden descartar juntas al terminarla.
+
+        :param nombre: Nombre de la simulación.
+        """
+        reaplicadas = self.historial.iniciar_escenario(nombre)
+        if reaplicadas is None:
+            print(f"\nNo se puede reabrir la simulación '{nombre}': los datos que edita cambiaron desde que se descartó.")
+            return
+        for version in reaplicadas:
+            self.reindexar_version(version, rehacer=True)
+        print(f"\nSimulación '{nombre}' activa. Las ediciones de reactivos y experimentos se registrarán en ella.")
+
+    def terminar_simulacion(self, conservar):
+        """
+        Termina la simulación activa, conservando o descartando sus cambios.
+
+        :param conservar: True para mantener los cambios; False para deshacerlos (la simulación queda guardada).
+        """
+        nombre = self.historial.escenario
+        deshechas = self.historial.terminar_escenario(conservar)
+        for version in deshechas:
+            self.reindexar_version(version, rehacer=False)
+        if conservar:
+            print(f"\nSimulación '{nombre}' terminada; sus cambios se conservaron.")
+        else:
+            print(f"\nSimulación '{nombre}' descartada ({len(deshechas)} ediciones deshechas); puede reabrirla por su nombre.")
+
+    def bloqueado_en_simulacion(self, accion):
+        """
+        Impide, durante una simulación, las acciones que cambian datos sin pasar por el historial.
+
+        Las simulaciones editan los objetos de la aplicación; lo que no queda registrado como una
+        versión (altas, bajas, experimentos realizados, descuentos de inventario) no se podría
+        descartar al terminarla.
+
+        :param accion: Descripción de la acción (ej. "realizar experimentos").
+        :return: True si hay una simulación activa y la acción no se debe hacer.
+        """
+        if self.historial.escenario is None:
+            return False
+        print(f"\nNo se puede {accion} durante la simulación '{self.historial.escenario}'. Termínela primero.")
+        return True
+
+    def total_objetos(self):
+        """
+        Cuenta la cantidad total de objetos cargados en la aplicación.
+
+        :return: Suma de reactivos, recetas, experimentos y resultados.
+        """
+        return len(self.reactivos) + len(self.recetas) + len(self.experimentos) + len(self.resultados)
+
 
     def mostrar_menu_principal(self):
         """
@@ -190,11 +989,12 @@ class App:
             print("2. Gestionar Experimentos")
             print("3. Gestionar Resultados")
             print("4. Estadísticas")
-            print("5. Salir")
+            print("5. Deshacer, rehacer y simulaciones")
+            print("6. Salir")
 
             # Validación de entrada del usuario
             opcion = input("Seleccione una opción: ")
-            while not opcion.isnumeric() or not int(opcion) in range(1, 6):
+            while not opcion.isnumeric() or not int(opcion) in range(1, 7):
                 print("Error")
                 opcion = input("Ingrese una opción válida: ")
 
@@ -207,8 +1007,13 @@ class App:
                 self.menu_resultados()
             elif opcion == "4":
                 self.menu_estadisticas()
+            elif opcion == "5":
+                self.menu_historial()
             else:
-                self.guardar_datos_json()
+                # Una simulación sin terminar no se guarda
+                if self.historial.escenario is not None:
+                    self.terminar_simulacion(conservar=False)
+                self.guardar_al_salir()
                 self.borrar_datos()  # Limpia los datos antes de salir
                 print("\nGracias por utilizar el Laboratorio.")
                 break  # Sale del bucle y finaliza el programa
@@ -216,178 +1021,782 @@ class App:
 
     import json
 
-    def guardar_datos_json(self):
+    @staticmethod
+    def reactivo_a_dict(r):
         """
-        Guarda los datos de reactivos, recetas, experimentos y resultados en archivos JSON.
-        """
-        # Lista para almacenar los reactivos en formato JSON
-        reactivos_json = []
-        for r in self.reactivos:
-            reactivo_data = {
-                "id": r.id,
-                "nombre": r.nombre,
-                "descripcion": r.descripcion,
-                "costo": r.costo,
-                "categoria": r.categoria,
-                "inventario_disponible": r.inventario,
-                "unidad_medida": r.unidad_medida,
-                "fecha_caducidad": r.fecha_caducidad,
-                "minimo_sugerido": r.minimo,
-                "conversiones": []
-            }
-            for c in r.conversiones:
-                reactivo_data["conversiones"].append({
-                    "unidad": c.unidad,
-                    "factor": c.factor
-                })
-            reactivos_json.append(reactivo_data)
-
-        # Lista para almacenar las recetas en formato JSON
-        recetas_json = []
-        for r in self.recetas:
-            receta_data = {
-                "id": r.id,
-                "nombre": r.nombre,
-                "objetivo": r.objetivo,
-                "procedimiento": r.procedimiento,
-                "reactivos_utilizados": [],
-                "valores_a_medir": []
-            }
-            for item in r.reactivos:
-                receta_data["reactivos_utilizados"].append({
-                    "reactivo_id": item["reactivo"].id,
+        Convierte un reactivo en un diccionario serializable a JSON.
+
+        :param r: Objeto Reactivo.
+        :return: Diccionario con los datos del reactivo.
+        """
+        return {
+            "id": r.id,
+            "nombre": r.nombre,
+            "descripcion": r.descripcion,
+            "costo": r.costo,
+            "categoria": r.categoria,
+            "inventario_disponible": r.inventario,
+            "unidad_medida": r.unidad_medida,
+            "fecha_caducidad": r.fecha_caducidad,
+            "minimo_sugerido": r.minimo,
+            "conversiones": [{"unidad": c.unidad, "factor": c.factor} for c in r.conversiones]
+        }
+
+    @staticmethod
+    def receta_a_dict(r):
+        """
+        Convierte una receta en un diccionario serializable a JSON (los reactivos se guardan por ID).
+
+        :param r: Objeto Receta.
+        :return: Diccionario con los datos de la receta.
+        """
+        return {
+            "id": r.id,
+            "nombre": r.nombre,
+            "objetivo": r.objetivo,
+            "procedimiento": r.procedimiento,
+            "reactivos_utilizados": [
+                {"reactivo_id": item["reactivo"].id, "cantidad": item["cantidad"], "unidad": item["unidad"]}
+                for item in r.reactivos
+            ],
+            "valores_a_medir": [
+                {"nombre": v.nombre, "formula": v.formula, "minimo": v.minimo, "maximo": v.maximo}
+                for v in r.valores_a_medir
+            ]
+        }
+
+    @staticmethod
+    def experimento_a_dict(e):
+        """
+        Convierte un experimento en un diccionario serializable a JSON (la receta se guarda por ID).
+
+        :param e: Objeto Experimento.
+        :return: Diccionario con los datos del experimento.
+        """
+        return {
+            "id": e.id,
+            "receta_id": e.receta.id,
+            "personas_responsables": e.responsables,
+            "fecha": e.fecha,
+            "costo_asociado": e.costo,
+            "resultado": e.resultado if isinstance(e.resultado, str) else None,
+            "consumo_real": e.consumo_real
+        }
+
+    @staticmethod
+    def resultado_a_dict(r):
+        """
+        Convierte un resultado en un diccionario serializable a JSON (el experimento se guarda por ID).
+
+        :param r: Objeto Resultado.
+        :return: Diccionario con los datos del resultado.
+        """
+        return {
+            "id": r.id,
+            "experimento_id": r.experimento.id,
+            "valores_obtenidos": r.valores_obtenidos,
+            "valores_aceptables": r.valores_aceptables,
+            "valido": r.valido
+        }
+
+    @staticmethod
+    def dict_a_reactivo(r):
+        """
+        Crea un reactivo a partir de su diccionario JSON.
+
+        :param r: Diccionario retornado por `reactivo_a_dict`.
+        :return: Objeto Reactivo.
+        """
+        conversiones = [Conversion(c["unidad"], c["factor"]) for c in r["conversiones"]]
+        return Reactivo(
+            r["id"], r["nombre"], r["descripcion"], r["costo"], r["categoria"],
+            r["inventario_disponible"], r["unidad_medida"], r["fecha_caducidad"],
+            r["minimo_sugerido"], conversiones
+        )
+
+    def dict_a_receta(self, r):
+        """
+        Crea una receta a partir de su diccionario JSON, enlazando sus reactivos por ID.
+
+        :param r: Diccionario retornado por `receta_a_dict`.
+        :return: Objeto Receta.
+        """
+        reactivos_necesarios = []
+        for item in r["reactivos_utilizados"]:
+            reactivo = self.obtener_reactivo_por_id(item["reactivo_id"])
+            if reactivo:
+                reactivos_necesarios.append({
+                    "reactivo": reactivo,
                     "cantidad": item["cantidad"],
                     "unidad": item["unidad"]
                 })
-            for v in r.valores_a_medir:
-                receta_data["valores_a_medir"].append({
-                    "nombre": v.nombre,
-                    "formula": v.formula,
-                    "minimo": v.minimo,
-                    "maximo": v.maximo
-                })
-            recetas_json.append(receta_data)
-
-        # Lista para almacenar los experimentos en formato JSON
-        experimentos_json = []
-        for e in self.experimentos:
-            experimento_data = {
-                "id": e.id,
-                "receta_id": e.receta.id,
-                "personas_responsables": e.responsables,
-                "fecha": e.fecha,
-                "costo_asociado": e.costo,
-                "resultado": e.resultado if isinstance(e.resultado, str) else None
-            }
-            experimentos_json.append(experimento_data)
-
-        # Lista para almacenar los resultados en formato JSON
-        resultados_json = []
-        for r in self.resultados:
-            resultado_data = {
-                "experimento_id": r.experimento.id,
-                "valores_obtenidos": r.valores_obtenidos,
-                "valores_aceptables": r.valores_aceptables,
-                "valido": r.valido
-            }
-            resultados_json.append(resultado_data)
-
-        # Guardar cada conjunto de datos en un archivo JSON
-        with open("reactivos.json", "w", encoding="utf-8") as f:
-            json.dump(reactivos_json, f, indent=4, ensure_ascii=False)
-
-        with open("recetas.json", "w", encoding="utf-8") as f:
-            json.dump(recetas_json, f, indent=4, ensure_ascii=False)
-
-        with open("experimentos.json", "w", encoding="utf-8") as f:
-            json.dump(experimentos_json, f, indent=4, ensure_ascii=False)
-
-        with open("resultados.json", "w", encoding="utf-8") as f:
-            json.dump(resultados_json, f, indent=4, ensure_ascii=False)
-
-        print("\nDatos guardados exitosamente en archivos JSON.")
-
-    def cargar_datos_json(self):
-        """
-        Carga los datos de reactivos, recetas, experimentos y resultados desde archivos JSON.
+
+        valores_a_medir = [Medicion(v["nombre"], v["formula"], v["minimo"], v["maximo"]) for v in r["valores_a_medir"]]
+        return Receta(r["id"], r["nombre"], r["objetivo"], reactivos_necesarios, r["procedimiento"], valores_a_medir)
+
+    def dict_a_experimento(self, e):
         """
-        # Verifica si los archivos existen antes de intentar cargarlos
-        archivos = ["reactivos.json", "recetas.json", "experimentos.json", "resultados.json"]
-        for archivo in archivos:
-            if not os.path.exists(archivo):
-                print(f"\nAdvertencia: El archivo {archivo} no existe. No se cargaron datos de este archivo.")
+        Crea un experimento a partir de su diccionario JSON, enlazando su receta por ID.
 
-        # Cargar reactivos desde JSON
-        if os.path.exists("reactivos.json"):
-            with open("reactivos.json", "r", encoding="utf-8") as f:
-                reactivos_json = json.load(f)
+        :param e: Diccionario retornado por `experimento_a_dict`.
+        :return: Objeto Experimento, o None si la receta no existe.
+        """
+        receta = self.obtener_receta_por_id(e["receta_id"])
+        if not receta:
+            return None
+        experimento = Experimento(e["id"], receta, e["personas_responsables"], e["fecha"])
+        experimento.costo = e["costo_asociado"]
+        experimento.resultado = e["resultado"]
+        experimento.consumo_real = {int(id): cantidad for id, cantidad in e.get("consumo_real", {}).items()}
+        return experimento
+
+    def dict_a_resultado(self, r):
+        """
+        Crea un resultado a partir de su diccionario JSON, enlazando su experimento por ID.
 
-            self.reactivos.clear()
-            for r in reactivos_json:
-                conversiones = []
-                for c in r["conversiones"]:
-                    conversiones.append(Conversion(c["unidad"], c["factor"]))
+        :param r: Diccionario retornado por `resultado_a_dict`.
+        :return: Objeto Resultado, o None si el experimento no está cargado.
+        """
+        experimento = self.experimentos_por_id.get(r["experimento_id"])
+        if not experimento:
+            return None
+        # La validez se deriva de la máscara de fallos recalculada, para que `valido == (fallos == 0)`
+        return Resultado(experimento, r["valores_obtenidos"], r["valores_aceptables"], r.get("id"))
 
-                reactivo = Reactivo(
-                    r["id"], r["nombre"], r["descripcion"], r["costo"], r["categoria"],
-                    r["inventario_disponible"], r["unidad_medida"], r["fecha_caducidad"],
-                    r["minimo_sugerido"], conversiones
-                )
-                self.reactivos.append(reactivo)
+    def ruta_datos(self, base):
+        """
+        Calcula la ruta del archivo de datos de una colección en el formato elegido.
+
+        :param base: Nombre de la colección (ej. "reactivos").
+        :return: Ruta con la extensión del formato (ej. "reactivos.json").
+        """
+        return base + self.serializador.extension
 
-        # Cargar recetas desde JSON
-        if os.path.exists("recetas.json"):
-            with open("recetas.json", "r", encoding="utf-8") as f:
-                recetas_json = json.load(f)
+    def guardar_catalogo_json(self):
+        """
+        Guarda los reactivos y las recetas en archivos de datos, en el formato elegido, y el registro de IDs y formato.
+        """
+        self.serializador.guardar(self.ruta_datos("reactivos"), [self.reactivo_a_dict(r) for r in self.reactivos])
+        self.serializador.guardar(self.ruta_datos("recetas"), [self.receta_a_dict(r) for r in self.recetas])
+
+        # El registro siempre es JSON, para saber el formato de los demás archivos sin deducirlo de su extensión
+        JsonLegible().guardar("ids.json", dict(self.ids_entregados(), formato=self.serializador.nombre,
+                                               sincronizacion=self.sincronizacion))
 
-            self.recetas.clear()
+    def leer_registro(self):
+        """
+        Lee el registro de los últimos IDs entregados y del formato de los archivos de datos.
+
+        :return: Diccionario {colección: último ID, "formato": nombre del formato}; sin "formato" si los
+                 datos se guardaron antes de registrarlo, o vacío si no hay registro.
+        """
+        if os.path.exists("ids.json"):
+            return JsonLegible().cargar("ids.json")
+        ruta, serializador = buscar_archivo("ids")  # Registros anteriores, guardados en el formato de los datos
+        return serializador.cargar(ruta) if ruta else {}
+
+    def ids_entregados(self):
+        """
+        Retorna los últimos IDs entregados de cada colección, para no reutilizarlos en la próxima sesión.
+        """
+        return {
+            "reactivos": self.ids_reactivos.ultimo,
+            "experimentos": self.ids_experimentos.ultimo,
+            "resultados": self.ids_resultados.ultimo
+        }
+
+    def observar_ids(self, ids):
+        """
+        Registra los últimos IDs entregados en una sesión anterior.
+
+        :param ids: Diccionario retornado por `ids_entregados`.
+        """
+        self.ids_reactivos.observar(ids.get("reactivos", 0))
+        self.ids_experimentos.observar(ids.get("experimentos", 0))
+        self.ids_resultados.observar(ids.get("resultados", 0))
+
+    @instrumentar("guardar_datos_json", elementos=lambda app, _: app.total_objetos())
+    def guardar_datos_json(self):
+        """
+        Guarda los datos de reactivos, recetas, experimentos y resultados en archivos de datos, en el formato elegido.
+        """
+        self.guardar_catalogo_json()
+
+        # Una colección que sigue pendiente no cambió: su archivo ya está al día si tiene el mismo formato
+        for nombre, a_dict in (("experimentos", self.experimento_a_dict), ("resultados", self.resultado_a_dict)):
+            ruta = self.ruta_datos(nombre)
+            if self.pendiente(nombre) and self.diferidas[nombre].ruta == ruta:
+                continue
+            self.asegurar(nombre)
+            self.serializador.guardar(ruta, [a_dict(elemento) for elemento in getattr(self, nombre)])
+
+        # Sin cambios ni cambio de formato, la caché leída al cargar sigue correspondiendo a los archivos
+        cache_al_dia = self.derivados_restaurados and not self.sin_guardar and all(
+            diferida.ruta == self.ruta_datos(nombre) for nombre, diferida in self.diferidas.items())
+
+        # Los índices y series están completos si las colecciones se materializaron o vienen de la caché
+        if not cache_al_dia and (self.derivados_restaurados or not (self.pendiente("experimentos") or self.pendiente("resultados"))):
+            rutas = [self.ruta_datos(base) for base in ("reactivos", "recetas", "experimentos", "resultados")]
+            self.derivados.guardar(self.derivados.huella(self.rutas_fuente(rutas)), self.estado_derivado())
+
+        print(f"\nDatos guardados exitosamente ({self.serializador.descripcion}).")
+
+    @notificar_carga("json", "reactivos", "recetas")
+    def cargar_catalogo_json(self):
+        """
+        Carga los reactivos y las recetas desde archivos de datos, en el formato registrado al guardarlos.
+
+        Si el usuario no eligió un formato, los próximos guardados usan el registrado.
+        """
+        formato = self.leer_registro().get("formato")
+        if not self.formato_elegido and serializador_registrado(formato) is not None:
+            self.serializador = serializador_registrado(formato)
+
+        # Cargar reactivos
+        ruta, serializador = buscar_archivo("reactivos", formato)
+        if ruta:
+            reactivos_json = self.validador.validar_lote("reactivo", serializador.cargar(ruta), ruta)
+
+            self.vaciar_coleccion(self.reactivos, self.reactivos_por_id, self.indice_reactivos, *self.indices_reactivos.values())
+            for r in reactivos_json:
+                self.registrar_reactivo(self.dict_a_reactivo(r))
+
+        # Cargar recetas
+        ruta, serializador = buscar_archivo("recetas", formato)
+        if ruta:
+            recetas_json = self.validador.validar_lote("receta", serializador.cargar(ruta), ruta)
+
+            self.vaciar_coleccion(self.recetas, self.recetas_por_id, self.indice_recetas, *self.indices_recetas.values())
             for r in recetas_json:
-                reactivos_necesarios = []
-                for item in r["reactivos_utilizados"]:
-                    reactivo = self.obtener_reactivo_por_id(item["reactivo_id"])
-                    if reactivo:
-                        reactivos_necesarios.append({
-                            "reactivo": reactivo,
-                            "cantidad": item["cantidad"],
-                            "unidad": item["unidad"]
-                        })
+                self.registrar_receta(self.dict_a_receta(r))
 
-                valores_a_medir = []
-                for v in r["valores_a_medir"]:
-                    medicion = Medicion(v["nombre"], v["formula"], v["minimo"], v["maximo"])
-                    valores_a_medir.append(medicion)
+    @instrumentar("cargar_datos_json", elementos=lambda app, _: app.total_objetos())
+    @notificar_carga("json", "reactivos", "recetas", "experimentos", "resultados")
+    def cargar_datos_json(self, diferido=False):
+        """
+        Carga los datos de reactivos, recetas, experimentos y resultados desde archivos de datos.
 
-                receta = Receta(r["id"], r["nombre"], r["objetivo"], reactivos_necesarios, r["procedimiento"], valores_a_medir)
-                self.recetas.append(receta)
+        Cada archivo se lee en el formato registrado al guardar (o, en datos anteriores al registro,
+        en el que indica su extensión), y si el usuario no eligió un formato, los próximos guardados
+        usan el registrado.
 
-        # Cargar experimentos desde JSON
-        if os.path.exists("experimentos.json"):
-            with open("experimentos.json", "r", encoding="utf-8") as f:
-                experimentos_json = json.load(f)
+        :param diferido: Si es True, los experimentos y resultados se leen recién la primera vez que se usan.
+        """
+        # Verifica si los archivos existen antes de intentar cargarlos
+        registro = self.leer_registro()
+        archivos = {base: buscar_archivo(base, registro.get("formato")) for base in ("reactivos", "recetas", "experimentos", "resultados")}
+        for base in archivos:
+            if archivos[base][0] is None:
+                print(f"\nAdvertencia: El archivo de {base} no existe. No se cargaron datos de este archivo.")
+        if "formato" not in registro and archivos["reactivos"][1] is not None and not self.formato_elegido:
+            self.serializador = archivos["reactivos"][1]  # Datos anteriores al registro del formato
+
+        # Cargar los últimos IDs entregados, si existen
+        self.observar_ids(registro)
+        self.sincronizacion = registro.get("sincronizacion")
+
+        self.cargar_catalogo_json()
+
+        # Si los archivos no cambiaron desde que se guardaron, los índices y series se leen de la caché
+        rutas = [archivos[base][0] or base for base in ("reactivos", "recetas", "experimentos", "resultados")]
+        derivados = self.derivados.cargar(self.derivados.huella(self.rutas_fuente(rutas)))
+        self.derivados_restaurados = derivados is not None
+        indexar = not self.derivados_restaurados
+
+        # Los experimentos y resultados quedan pendientes hasta que se usen por primera vez
+        self.diferidas.clear()
+        ruta, serializador = archivos["experimentos"]
+        if ruta:
+            self.vaciar_coleccion(self.experimentos, self.experimentos_por_id, self.series_experimentos, *self.indices_experimentos.values())
+            self.diferidas["experimentos"] = ColeccionDiferida(
+                "experimentos", ruta, lambda e: self.hidratar_experimento(e, indexar),
+                validar=lambda datos, ruta: self.validador.validar_lote("experimento", datos, ruta), leer=serializador.cargar
+            )
+        ruta, serializador = archivos["resultados"]
+        if ruta:
+            self.vaciar_coleccion(self.resultados, self.resultados_por_id, self.series_resultados, self.tasas_fallo, *self.indices_resultados.values())
+            # Los resultados enlazan a su experimento por ID, por lo que los experimentos se materializan antes
+            self.diferidas["resultados"] = ColeccionDiferida(
+                "resultados", ruta, lambda r: self.hidratar_resultado(r, indexar), ["experimentos"],
+                validar=lambda datos, ruta: self.validador.validar_lote("resultado", datos, ruta), leer=serializador.cargar
+            )
+        if derivados is not None:
+            self.restaurar_derivado(derivados)
+            print("\nÍndices y estadísticas leídos de la caché (los archivos no cambiaron).")
+
+        if diferido:
+            print("\nReactivos y recetas cargados; los experimentos y resultados se cargarán al usarlos.")
+        else:
+            self.asegurar("experimentos", "resultados")
+            print(f"\nDatos cargados exitosamente ({self.serializador.descripcion}).")
+        self.informar_validacion()
 
-            self.experimentos.clear()
-            for e in experimentos_json:
-                receta = self.obtener_receta_por_id(e["receta_id"])
-                if receta:
-                    experimento = Experimento(e["id"], receta, e["personas_responsables"], e["fecha"])
-                    experimento.costo = e["costo_asociado"]
-                    experimento.resultado = e["resultado"]
-                    self.experimentos.append(experimento)
-
-        # Cargar resultados desde JSON
-        if os.path.exists("resultados.json"):
-            with open("resultados.json", "r", encoding="utf-8") as f:
-                resultados_json = json.load(f)
-
-            self.resultados.clear()
-            for r in resultados_json:
-                experimento = next((e for e in self.experimentos if e.id == r["experimento_id"]), None)
-                if experimento:
-                    resultado = Resultado(experimento, r["valores_obtenidos"], r["valores_aceptables"])
-                    resultado.valido = r["valido"]
-                    self.resultados.append(resultado)
-
-        print("\nDatos cargados exitosamente desde archivos JSON.")
+    def hidratar_experimento(self, e, indexar=True):
+        """
+        Crea y registra un experimento a partir de su diccionario JSON.
+
+        :param e: Diccionario retornado por `experimento_a_dict`.
+        :param indexar: False si los índices y series ya vienen de la caché de derivados.
+        :return: True si se registró, False si su receta no existe.
+        """
+        experimento = self.dict_a_experimento(e)
+        if experimento:
+            self.registrar_experimento(experimento, indexar)
+        return experimento is not None
+
+    def hidratar_resultado(self, r, indexar=True):
+        """
+        Crea y registra un resultado a partir de su diccionario JSON.
+
+        :param r: Diccionario retornado por `resultado_a_dict`.
+        :param indexar: False si los índices y series ya vienen de la caché de derivados.
+        :return: True si se registró, False si su experimento no existe.
+        """
+        resultado = self.dict_a_resultado(r)
+        if resultado:
+            self.registrar_resultado(resultado, indexar)
+        return resultado is not None
+
+    def rutas_fuente(self, rutas_datos):
+        """
+        Obtiene los archivos de los que dependen los índices y las series, para calcular su huella.
+
+        :param rutas_datos: Rutas de los archivos de reactivos, recetas, experimentos y resultados.
+        :return: Lista de rutas, incluidas las del archivo histórico (sus resultados se suman a las series).
+        """
+        return list(rutas_datos) + [self.archivo_resultados.ruta_metadatos, self.archivo_resultados.ruta_registros]
+
+    def estado_derivado(self):
+        """
+        Reúne los índices, series y tasas de fallo de experimentos y resultados, que solo guardan IDs y valores.
+
+        :return: Diccionario con los estados de los índices, las series y las tasas de fallo.
+        """
+        return {
+            "indices": {
+                "experimentos": {nombre: indice.estado() for nombre, indice in self.indices_experimentos.items()},
+                "resultados": {nombre: indice.estado() for nombre, indice in self.indices_resultados.items()}
+            },
+            "series": {
+                "experimentos": self.series_experimentos.estado(),
+                "resultados": self.series_resultados.estado()
+            },
+            "tasas_fallo": self.tasas_fallo.estado()
+        }
+
+    def restaurar_derivado(self, derivados):
+        """
+        Reemplaza los índices, series y tasas de fallo de experimentos y resultados por los de la caché.
+
+        :param derivados: Diccionario retornado por `estado_derivado`.
+        """
+        for indices, nombre in ((self.indices_experimentos, "experimentos"), (self.indices_resultados, "resultados")):
+            for nombre_indice, estado_indice in derivados["indices"][nombre].items():
+                indices[nombre_indice].restaurar(estado_indice)
+        self.series_experimentos.restaurar(derivados["series"]["experimentos"])
+        self.series_resultados.restaurar(derivados["series"]["resultados"])
+        self.tasas_fallo.restaurar(derivados["tasas_fallo"])
+
+    def asegurar(self, *nombres):
+        """
+        Materializa las colecciones pendientes indicadas (y las que estas requieren).
+
+        :param nombres: Nombres de las colecciones ("experimentos", "resultados"); sin nombres, todas.
+        """
+        for nombre in nombres or list(self.diferidas):
+            diferida = self.diferidas.get(nombre)
+            if diferida is None or not diferida.pendiente:
+                continue
+            if diferida.requiere:
+                self.asegurar(*diferida.requiere)
+
+            # Los elementos leídos quedan ubicados en su partición, pero no se marcan para reescribirla
+            with self.metricas.medir(f"materializar_{nombre}") as cronometro, self.eventos.carga("json", nombre), \
+                    self.almacen.conservar_cambios():
+                cronometro.elementos = diferida.materializar()
+            print(f"\nSe materializaron {diferida.materializados} {nombre}.")
+            self.informar_validacion()
+
+            # Los resultados archivados se suman a las estadísticas a través de su experimento
+            # (las series de la caché de derivados ya los incluyen)
+            if nombre == "experimentos" and not self.derivados_restaurados:
+                self.integrar_historico_en_series()
+
+    def pendiente(self, nombre):
+        """
+        Indica si una colección todavía no se materializó.
+        """
+        return nombre in self.diferidas and self.diferidas[nombre].pendiente
+
+    def materializados(self):
+        """
+        Cuenta los objetos creados al materializar las colecciones diferidas.
+
+        :return: Diccionario {nombre: (objetos creados, pendiente)}.
+        """
+        return {nombre: (diferida.materializados, diferida.pendiente) for nombre, diferida in self.diferidas.items()}
+
+    def marcar_sin_guardar(self, evento):
+        """
+        Registra que la colección de un evento cambió desde la carga.
+
+        :param evento: Evento del bus; cargar o vaciar una colección completa no es un cambio a guardar.
+        """
+        if not isinstance(evento, (Cargado, Vaciado)):
+            self.sin_guardar.add(evento.coleccion)
+
+    def elementos_por_mes(self, coleccion, meses):
+        """
+        Agrupa por mes los experimentos o resultados en memoria de los meses indicados.
+
+        :param coleccion: "experimentos" o "resultados".
+        :param meses: Conjunto de meses "YYYY-MM" a agrupar.
+        :return: Diccionario {mes: lista de diccionarios JSON}.
+        """
+        por_mes = {}
+        if coleccion == "experimentos":
+            for e in self.experimentos:
+                mes = self.almacen.particion(e.fecha)
+                if mes in meses:
+                    por_mes.setdefault(mes, []).append(self.experimento_a_dict(e))
+        else:
+            for r in self.resultados:
+                mes = self.almacen.particion(r.experimento.fecha)
+                if mes in meses:
+                    por_mes.setdefault(mes, []).append(self.resultado_a_dict(r))
+        return por_mes
+
+    def particiones_al_dia(self):
+        """
+        Indica si los datos guardados por mes tienen la misma versión que los datos cargados.
+
+        :return: True si el manifiesto tiene la misma marca de sincronización (y entonces basta con
+                 reescribir los meses modificados en la sesión).
+        """
+        return (self.sincronizacion is not None and self.almacen.existe()
+                and self.almacen.manifiesto.get("sincronizacion") == self.sincronizacion)
+
+    @instrumentar("guardar_datos_particionados", elementos=lambda app, escritos: escritos)
+    def guardar_datos_particionados(self, completo=None):
+        """
+        Guarda los experimentos y resultados por mes, reescribiendo solo los meses modificados.
+
+        Si los datos en memoria están completos (no se cargaron por mes) y los guardados por mes no existen
+        o son de otra versión, se reescriben todas las particiones una vez; desde entonces tienen la misma
+        marca de sincronización que los demás archivos y basta con reescribir los meses modificados.
+
+        :param completo: True para reescribir todas las particiones, False para solo las modificadas, o None
+                         para decidirlo según el origen de los datos y la marca del manifiesto.
+        :return: Cantidad de experimentos y resultados en memoria de las particiones reescritas.
+        """
+        if completo is None:
+            completo = self.origen_datos != "particiones" and not self.particiones_al_dia()
+        if completo:
+            self.asegurar()
+        self.guardar_catalogo_json()
+        self.almacen.manifiesto["sincronizacion"] = self.sincronizacion
+
+        reescritas = escritos = 0
+        for coleccion, elementos in (("experimentos", self.experimentos), ("resultados", self.resultados)):
+            if completo:
+                fechas = (e.fecha for e in elementos) if coleccion == "experimentos" else (r.experimento.fecha for r in elementos)
+                self.almacen.marcar_todo(coleccion, {self.almacen.particion(fecha) for fecha in fechas})
+            por_mes = self.elementos_por_mes(coleccion, self.almacen.sucias[coleccion])
+            reescritas += self.almacen.guardar(coleccion, lambda mes: por_mes.get(mes, []), self.ids_entregados())
+            escritos += sum(map(len, por_mes.values()))
+
+        print(f"\nDatos guardados por mes en '{self.almacen.carpeta}' ({reescritas} particiones reescritas).")
+        return escritos
+
+    def guardar_al_salir(self):
+        """
+        Guarda los datos al salir en los formatos que corresponden a su origen.
+
+        Con datos cargados por mes solo se guardan las particiones, ya que los JSON y el snapshot completos
+        quedarían incompletos; si hubo cambios, la marca de sincronización se descarta porque los demás
+        archivos ya no tienen los mismos datos. En los demás casos se guardan el JSON, el snapshot y las
+        particiones, con una marca nueva si hubo cambios o si los datos no tenían marca.
+
+        Sin cambios desde la carga, las colecciones que siguen pendientes no se materializan: sus archivos
+        y el snapshot guardado con la misma marca ya tienen esos datos.
+        """
+        if self.origen_datos == "particiones":
+            if self.sin_guardar:
+                self.sincronizacion = None
+            self.guardar_datos_particionados(completo=False)
+            return
+
+        completo = not self.particiones_al_dia()  # Se decide con la marca de los datos cargados
+        sin_cambios = not self.sin_guardar and self.sincronizacion is not None
+        if not sin_cambios:
+            self.sincronizacion = uuid.uuid4().hex
+        self.guardar_datos_json()
+        if sin_cambios and any(map(self.pendiente, self.diferidas)) and os.path.exists("laboratorio.snap"):
+            print("\nEl snapshot no cambió desde la carga; se conserva el guardado.")
+        else:
+            self.guardar_snapshot()
+        self.guardar_datos_particionados(completo)
+
+    @instrumentar("cargar_datos_particionados", elementos=lambda app, _: app.total_objetos())
+    @notificar_carga("particiones", "reactivos", "recetas", "experimentos", "resultados")
+    def cargar_datos_particionados(self, desde=None, hasta=None):
+        """
+        Carga los reactivos y recetas, y solo los experimentos y resultados de un rango de meses.
+
+        :param desde: Mes inicial "YYYY-MM" (inclusive), o None para no limitar.
+        :param hasta: Mes final "YYYY-MM" (inclusive), o None para no limitar.
+        :return: True si se cargó, False si no hay datos guardados por mes.
+        """
+        if not self.almacen.existe():
+            print(f"\nAdvertencia: No hay datos guardados por mes en '{self.almacen.carpeta}'.")
+            return False
+
+        self.almacen.leer_manifiesto()
+        self.observar_ids(self.almacen.manifiesto.get("ids", {}))
+        self.sincronizacion = self.almacen.manifiesto.get("sincronizacion")
+        formato = serializador_registrado(self.almacen.manifiesto.get("formato"))
+        if not self.formato_elegido and formato is not None:
+            self.almacen.serializador = formato
+        self.cargar_catalogo_json()
+
+        experimentos_json, resultados_json = self.almacen.cargar(desde, hasta)
+        experimentos_json = self.validador.validar_lote("experimento", experimentos_json, self.almacen.carpeta)
+        resultados_json = self.validador.validar_lote("resultado", resultados_json, self.almacen.carpeta)
+        self.vaciar_coleccion(self.experimentos, self.experimentos_por_id, self.series_experimentos, *self.indices_experimentos.values())
+        self.vaciar_coleccion(self.resultados, self.resultados_por_id, self.series_resultados, self.tasas_fallo, *self.indices_resultados.values())
+        for e in experimentos_json:
+            experimento = self.dict_a_experimento(e)
+            if experimento:
+                self.registrar_experimento(experimento)
+        for r in resultados_json:
+            resultado = self.dict_a_resultado(r)
+            if resultado:
+                self.registrar_resultado(resultado)
+
+        # Registrar los elementos recién leídos no es un cambio que haya que guardar
+        self.almacen.limpiar_cambios()
+        self.integrar_historico_en_series()
+        print(f"\nDatos cargados por mes: {len(self.experimentos)} experimentos y {len(self.resultados)} resultados.")
+        self.informar_validacion()
+        return True
+
+    def informar_validacion(self):
+        """
+        Muestra el resumen de los registros descartados en las últimas cargas, si los hubo, y reinicia los contadores.
+        """
+        resumen = self.validador.resumen()
+        if resumen:
+            print("\n" + resumen)
+        self.validador.reiniciar()
+
+    def integrar_historico_en_series(self):
+        """
+        Suma los resultados del archivo histórico a las estadísticas por período y a las tasas de fallo.
+
+        Se llama después de cargar los datos, ya que los resultados archivados no están en `self.resultados`.
+        """
+        nombres = self.archivo_resultados.nombres
+        for bloque in self.archivo_resultados.bloques():
+            columnas = zip(bloque["id"].tolist(), bloque["experimento"].tolist(), bloque["valido"].tolist(),
+                           bloque["medicion"].tolist(), bloque["cantidad"].tolist(),
+                           ArchivoResultados.mascaras_fallos(bloque).tolist())
+            for id_resultado, id_experimento, valido, codigos, cantidad, mascara in columnas:
+                experimento = self.experimentos_por_id.get(id_experimento)
+                if experimento is not None and id_resultado not in self.resultados_por_id:
+                    self.series_resultados.agregar(id_resultado, experimento.fecha, *self.aporte_resultado(experimento, valido))
+                    self.tasas_fallo.agregar(id_resultado, experimento.receta.id,
+                                             tuple(nombres[codigo] for codigo in codigos[:cantidad]), mascara)
+
+    def estado_snapshot(self):
+        """
+        Reúne el estado completo de la aplicación para guardarlo en un snapshot.
+
+        :return: Diccionario con las colecciones, los diccionarios por ID, los índices y los generadores de IDs.
+        """
+        return {
+            "reactivos": self.reactivos,
+            "recetas": self.recetas,
+            "experimentos": self.experimentos,
+            "resultados": self.resultados,
+            "por_id": {
+                "reactivos": self.reactivos_por_id,
+                "recetas": self.recetas_por_id,
+                "experimentos": self.experimentos_por_id,
+                "resultados": self.resultados_por_id
+            },
+            "indices_texto": {
+                "reactivos": self.indice_reactivos.estado(),
+                "recetas": self.indice_recetas.estado()
+            },
+            "indices": {
+                "reactivos": {nombre: indice.estado() for nombre, indice in self.indices_reactivos.items()},
+                "recetas": {nombre: indice.estado() for nombre, indice in self.indices_recetas.items()},
+                "experimentos": {nombre: indice.estado() for nombre, indice in self.indices_experimentos.items()},
+                "resultados": {nombre: indice.estado() for nombre, indice in self.indices_resultados.items()}
+            },
+            "ids": {
+                "reactivos": self.ids_reactivos.ultimo,
+                "experimentos": self.ids_experimentos.ultimo,
+                "resultados": self.ids_resultados.ultimo
+            },
+            "formulas": [texto for texto, formula in self.formulas.cache.items() if not isinstance(formula, ValueError)],
+            "series": {
+                "experimentos": self.series_experimentos.estado(),
+                "resultados": self.series_resultados.estado()
+            },
+            "tasas_fallo": self.tasas_fallo.estado(),
+            "sincronizacion": self.sincronizacion
+        }
+
+    def restaurar_snapshot(self, estado, version=Snapshot.VERSION):
+        """
+        Reemplaza el estado de la aplicación por el de un snapshot.
+
+        Las listas, diccionarios e índices se actualizan en su lugar, ya que otros objetos
+        (como `Dependencias`) mantienen referencias a ellos.
+
+        :param estado: Diccionario retornado por `estado_snapshot`.
+        :param version: Versión del snapshot (ver `Snapshot`); las anteriores a la actual se migran.
+        """
+        self.reactivos[:] = estado["reactivos"]
+        self.recetas[:] = estado["recetas"]
+        self.experimentos[:] = estado["experimentos"]
+        self.resultados[:] = estado["resultados"]
+
+        for por_id, nombre in ((self.reactivos_por_id, "reactivos"), (self.recetas_por_id, "recetas"),
+                               (self.experimentos_por_id, "experimentos"), (self.resultados_por_id, "resultados")):
+            por_id.clear()
+            por_id.update(estado["por_id"][nombre])
+
+        self.indice_reactivos.restaurar(estado["indices_texto"]["reactivos"])
+        self.indice_recetas.restaurar(estado["indices_texto"]["recetas"])
+        for indices, nombre in ((self.indices_reactivos, "reactivos"), (self.indices_recetas, "recetas"),
+                                (self.indices_experimentos, "experimentos"), (self.indices_resultados, "resultados")):
+            for nombre_indice, estado_indice in estado["indices"][nombre].items():
+                indices[nombre_indice].restaurar(estado_indice)
+
+        self.ids_reactivos.observar(estado["ids"]["reactivos"])
+        self.ids_experimentos.observar(estado["ids"]["experimentos"])
+        self.ids_resultados.observar(estado["ids"]["resultados"])
+
+        # Las fórmulas compiladas no se pueden serializar; se vuelven a compilar al cargar
+        for texto in estado["formulas"]:
+            self.formulas.compilar(texto)
+
+        if version >= 2:
+            self.series_experimentos.restaurar(estado["series"]["experimentos"])
+            self.series_resultados.restaurar(estado["series"]["resultados"])
+            self.tasas_fallo.restaurar(estado["tasas_fallo"])
+        self.sincronizacion = estado.get("sincronizacion")
+        if version < Snapshot.VERSION:
+            self.migrar_snapshot(version)
+
+        # Los objetos restaurados no pasan por los índices: se ubican en su partición por si cambian de mes
+        for experimento in self.experimentos:
+            self.almacen.ubicar("experimentos", experimento.id, experimento.fecha)
+        for resultado in self.resultados:
+            self.almacen.ubicar("resultados", resultado.id, resultado.experimento.fecha)
+
+    def migrar_snapshot(self, version):
+        """
+        Completa el estado restaurado de un snapshot de una versión anterior.
+
+        Las versiones 1 y 2 no traen la marca de sincronización: queda vacía y se crea al guardar.
+
+        :param version: Versión del snapshot (ver `Snapshot`).
+        """
+        if version == 1:
+            # Los objetos pueden no tener los atributos agregados después, y las series y tasas
+            # guardadas (si las hay) pueden no corresponder a los objetos: se reconstruye todo
+            for experimento in self.experimentos:
+                if not hasattr(experimento, "consumo_real"):
+                    experimento.consumo_real = {}
+            for resultado in self.resultados:
+                resultado.fallos = resultado.evaluar_mediciones()
+                resultado.valido = resultado.fallos == 0
+
+            self.series_experimentos.limpiar()
+            self.series_resultados.limpiar()
+            self.tasas_fallo.limpiar()
+            for experimento in self.experimentos:
+                self.series_experimentos.agregar(experimento.id, experimento.fecha, *self.aporte_experimento(experimento))
+            for resultado in self.resultados:
+                self.series_resultados.agregar(resultado.id, resultado.experimento.fecha,
+                                               *self.aporte_resultado(resultado.experimento, resultado.valido))
+                self.tasas_fallo.agregar(resultado.id, resultado.experimento.receta.id,
+                                         tuple(resultado.valores_obtenidos), resultado.fallos)
+            self.integrar_historico_en_series()
+
+    @instrumentar("guardar_snapshot", elementos=lambda app, _: app.total_objetos())
+    def guardar_snapshot(self, ruta="laboratorio.snap"):
+        """
+        Guarda el estado completo de la aplicación en un snapshot binario.
+
+        :param ruta: Ruta del archivo.
+        """
+        self.asegurar()
+        tamano = Snapshot.guardar(self.estado_snapshot(), ruta)
+        print(f"\nSnapshot guardado en {ruta} ({tamano / 1024:.1f} KB).")
+
+    @instrumentar("cargar_snapshot", elementos=lambda app, _: app.total_objetos())
+    @notificar_carga("snapshot", "reactivos", "recetas", "experimentos", "resultados")
+    def cargar_snapshot(self, ruta="laboratorio.snap"):
+        """
+        Carga el estado completo de la aplicación desde un snapshot binario.
+
+        :param ruta: Ruta del archivo.
+        :return: True si se cargó, False si no existe o no es válido.
+        """
+        if not os.path.exists(ruta):
+            print(f"\nAdvertencia: El archivo {ruta} no existe.")
+            return False
+        try:
+            estado, version = Snapshot.cargar(ruta)
+        except ValueError as error:
+            print(f"\nError: {error}")
+            return False
+
+        self.restaurar_snapshot(estado, version)
+        print("\nDatos cargados exitosamente desde el snapshot.")
+        if version < Snapshot.VERSION:
+            print(f"El snapshot tenía la versión {version}; se actualizará a la {Snapshot.VERSION} al guardar.")
+        return True
+
+    @staticmethod
+    def pedir_mes(mensaje):
+        """
+        Solicita un mes en formato YYYY-MM.
+
+        :param mensaje: Mensaje a mostrar.
+        :return: Mes ingresado, o "" si se deja vacío.
+        """
+        while True:
+            mes = input(mensaje).strip()
+            if not mes:
+                return ""
+            try:
+                datetime.strptime(mes, "%Y-%m")
+                return mes
+            except ValueError:
+                print("Error: Ingrese el mes en formato YYYY-MM.")
+
+    @staticmethod
+    def pedir_fecha(mensaje):
+        """
+        Solicita una fecha en formato YYYY-MM-DD.
+
+        :param mensaje: Mensaje a mostrar.
+        :return: Fecha ingresada, o "" si se deja vacía.
+        """
+        while True:
+            fecha = input(mensaje).strip()
+            if not fecha:
+                return ""
+            try:
+                datetime.strptime(fecha, "%Y-%m-%d")
+                return fecha
+            except ValueError:
+                print("Error: Ingrese la fecha en formato YYYY-MM-DD.")
 
             
     def mostrar_menu_inicial(self):
@@ -398,26 +1807,73 @@ class App:
             print("\nBienvenido al Sistema del Laboratorio")
             print("1. Cargar datos desde la API")
             print("2. Cargar JSON")
-            print("3. Salir")  # Corrección de numeración
+            print("3. Cargar snapshot binario (inicio rápido)")
+            print("4. Cargar datos por mes")
+            print(f"5. Elegir formato de los archivos de datos (actual: {self.serializador.descripcion})")
+            print("6. Salir")
 
             # Validación de la opción ingresada
             opcion = input("Seleccione una opción: ")
-            while not opcion.isnumeric() or not int(opcion) in range(1, 4):
+            while not opcion.isnumeric() or not int(opcion) in range(1, 7):
                 print("Error")
                 opcion = input("Ingrese una opción válida: ")
 
             # Manejo de opciones
             if opcion == "1":
-                self.inicializar_datos()
+                with self.metricas.medir("tiempo_hasta_menu") as cronometro:
+                    self.inicializar_datos()
+                    cronometro.elementos = self.total_objetos()
+                self.origen_datos = "api"
                 self.mostrar_menu_principal()
             elif opcion == "2":
-                self.cargar_datos_json()
+                with self.metricas.medir("tiempo_hasta_menu") as cronometro:
+                    self.cargar_datos_json(diferido=True)
+                    cronometro.elementos = self.total_objetos()
+                self.origen_datos = "json"
                 self.mostrar_menu_principal()
+            elif opcion == "3":
+                with self.metricas.medir("tiempo_hasta_menu") as cronometro:
+                    cargado = self.cargar_snapshot()
+                    cronometro.elementos = self.total_objetos()
+                if cargado:
+                    self.origen_datos = "snapshot"
+                    self.mostrar_menu_principal()
+            elif opcion == "4":
+                mes_actual = date.today().isoformat()[:7]
+                desde = self.pedir_mes(f"Mes inicial (YYYY-MM, deje vacío para {mes_actual}): ") or mes_actual
+                hasta = self.pedir_mes(f"Mes final (YYYY-MM, deje vacío para {mes_actual}): ") or mes_actual
+                with self.metricas.medir("tiempo_hasta_menu") as cronometro:
+                    cargado = self.cargar_datos_particionados(desde, hasta)
+                    cronometro.elementos = self.total_objetos()
+                if cargado:
+                    self.origen_datos = "particiones"
+                    self.mostrar_menu_principal()
+            elif opcion == "5":
+                self.elegir_formato()
             else:
                 print("\nSaliendo del sistema. Hasta pronto.")
                 break  # Finaliza la ejecución
 
 
+    def elegir_formato(self):
+        """
+        Permite elegir el formato en que se guardan los archivos de datos y las particiones por mes.
+        """
+        formatos = disponibles()
+        print("\n===== FORMATO DE LOS ARCHIVOS DE DATOS =====")
+        for i, formato in enumerate(formatos, start=1):
+            print(f"{i}. {formato.descripcion}")
+
+        opcion = input("Seleccione un formato: ")
+        while not opcion.isnumeric() or int(opcion) not in range(1, len(formatos) + 1):
+            print("Error")
+            opcion = input("Ingrese una opción válida: ")
+
+        self.serializador = formatos[int(opcion) - 1]()
+        self.almacen.serializador = self.serializador
+        self.formato_elegido = True
+        print(f"\nLos datos se guardarán como {self.serializador.descripcion}.")
+
     def menu_reactivos(self):
         """
         Muestra el menú de gestión de reactivos.
@@ -451,10 +1907,12 @@ class App:
         """
         Crea un nuevo reactivo solicitando los datos al usuario.
         """
+        if self.bloqueado_en_simulacion("crear reactivos"):
+            return
         print("\n===== CREAR NUEVO REACTIVO =====")
         
-        # Generar un ID único basado en la cantidad de reactivos existentes
-        id_reactivo = len(self.reactivos) + 1  
+        # Generar un ID único que no se repite aunque se eliminen reactivos
+        id_reactivo = self.ids_reactivos.siguiente()
 
         # Solicitar el nombre del reactivo
         nombre = input("Ingrese el nombre del reactivo: ")
@@ -537,7 +1995,7 @@ class App:
             inventario, unidad_medida, fecha_caducidad, minimo, conversiones
         )
         
-        self.reactivos.append(nuevo_reactivo)
+        self.registrar_reactivo(nuevo_reactivo)
         print("\nReactivo creado exitosamente:")
         print(nuevo_reactivo)
 
@@ -552,19 +2010,9 @@ class App:
                 print("\nNo hay reactivos en el sistema para editar.")
                 break
 
-            # Mostrar lista de reactivos disponibles
+            # Buscar el reactivo a editar
             print("\n===== EDITAR REACTIVO =====")
-            for i, reactivo in enumerate(self.reactivos, start=1):
-                print(f"{i}. ID:{reactivo.id} {reactivo.nombre}")
-
-            # Validar selección del reactivo
-            seleccion = input("\nSeleccione el número del reactivo a editar: ")
-            while not seleccion.isnumeric() or int(seleccion) not in range(1, len(self.reactivos) + 1):
-                print("Error: Ingrese un número válido de la lista.")
-                seleccion = input("\nSeleccione el número del reactivo a editar: ")
-
-            seleccion = int(seleccion) - 1  # Convertir a índice válido
-            reactivo = self.reactivos[seleccion]  # Obtener el reactivo seleccionado
+            reactivo = self.seleccionar_reactivo("editar")
 
             print(f"\nEditando reactivo: {reactivo.nombre} (ID: {reactivo.id})")
 
@@ -589,6 +2037,7 @@ class App:
                     opcion_editar = input("\nIngrese el número de la opción a editar: ")
 
                 opcion_editar = int(opcion_editar)
+                antes = self.historial.capturar(reactivo)
 
                 # Edición del atributo seleccionado
                 if opcion_editar == 1:
@@ -601,6 +2050,7 @@ class App:
                         print("Error: Ingrese un número válido para el costo.")
                         nuevo_costo = input("\nNuevo costo: ")
                     reactivo.costo = float(nuevo_costo)
+                    self.recalcular_costos_pendientes(reactivo)
                 elif opcion_editar == 4:
                     reactivo.categoria = input("\nNueva categoría: ")
                 elif opcion_editar == 5:
@@ -626,6 +2076,9 @@ class App:
                     print("\nSaliendo de la edición del reactivo.")
                     break  # Termina la edición
 
+                self.indexar_reactivo(reactivo)  # Mantener la búsqueda al día con los cambios
+                if opcion_editar != 9:  # Las conversiones registran cada cambio por separado
+                    self.registrar_edicion(f"Editar reactivo '{reactivo.nombre}'", [(reactivo, antes)])
                 print("\nAtributo actualizado correctamente.")
 
             # Preguntar si desea editar otro reactivo
@@ -658,6 +2111,7 @@ class App:
                 opcion = input("\nSeleccione una opción: ")
 
             opcion = int(opcion)
+            antes = self.historial.capturar(reactivo)
 
             if opcion == 1:  # Agregar conversión
                 unidad = input("\nIngrese la nueva unidad de medida: ")
@@ -696,9 +2150,8 @@ class App:
                     nuevo_factor = input("\nNuevo factor de conversión: ")
                 nuevo_factor = float(nuevo_factor)
 
-                # Actualizar conversión
-                conversion.unidad = nueva_unidad
-                conversion.factor = nuevo_factor
+                # Actualizar conversión (se reemplaza el objeto para que el historial conserve el anterior)
+                reactivo.conversiones[seleccion] = Conversion(nueva_unidad, nuevo_factor)
                 print("\nConversión editada correctamente.")
 
             elif opcion == 3:  # Eliminar conversión
@@ -724,30 +2177,37 @@ class App:
                 print("\nSaliendo de la gestión de conversiones.")
                 break
 
+            self.registrar_edicion(f"Conversiones de '{reactivo.nombre}'", [(reactivo, antes)])
+
     def eliminar_reactivos(self):
         """
         Permite eliminar un reactivo de la lista de reactivos.
         """
+        if self.bloqueado_en_simulacion("eliminar reactivos"):
+            return
+        if self.origen_datos == "particiones" and not self.almacen.completo():
+            # La cascada solo alcanzaría a los experimentos de los meses cargados y dejaría huérfanos en el resto
+            print("\nNo se pueden eliminar reactivos con solo algunos meses cargados. Cargue todos los meses para hacerlo.")
+            return
+
         while True:
             if not self.reactivos:
                 print("\nNo hay reactivos en el sistema para eliminar.")
                 break
 
-            # Mostrar lista de reactivos disponibles
+            # Buscar el reactivo a eliminar
             print("\n===== ELIMINAR REACTIVO =====")
-            for i, reactivo in enumerate(self.reactivos, start=1):
-                print(f"{i}. ID:{reactivo.id} {reactivo.nombre}")
+            reactivo_eliminado = self.seleccionar_reactivo("eliminar")
 
-            # Validar selección del reactivo
-            seleccion = input("\nSeleccione el número del reactivo a eliminar: ")
-            while not seleccion.isnumeric() or int(seleccion) not in range(1, len(self.reactivos) + 1):
-                print("Error: Ingrese un número válido de la lista.")
-                seleccion = input("\nSeleccione el número del reactivo a eliminar: ")
-
-            seleccion = int(seleccion) - 1  # Convertir a índice válido
-            reactivo_eliminado = self.reactivos.pop(seleccion)  # Eliminar de la lista
-            
-            print(f"\nReactivo '{reactivo_eliminado.nombre}' eliminado correctamente.")
+            # Verificar recetas, experimentos y resultados que dependen del reactivo
+            self.asegurar("experimentos", "resultados")
+            dependientes = self.dependencias.dependientes_de_reactivo(reactivo_eliminado.id)
+            if self.elegir_politica(f"El reactivo '{reactivo_eliminado.nombre}'", dependientes) == Dependencias.DENEGAR:
+                print("\nEliminación cancelada.")
+            else:
+                self.eliminar_dependientes(dependientes)
+                self.quitar_reactivo(reactivo_eliminado)  # Eliminar de la lista y de los índices
+                print(f"\nReactivo '{reactivo_eliminado.nombre}' eliminado correctamente.")
 
             # Preguntar si desea eliminar otro reactivo
             continuar = input("\n¿Desea eliminar otro reactivo? (S/N): ").lower()
@@ -762,17 +2222,19 @@ class App:
         """
         Muestra el menú de gestión de experimentos y permite realizar acciones relacionadas.
         """
+        self.asegurar("experimentos")
         while True:
             print("\n===== Gestión de Experimentos =====")
             print("1. Crear Experimento")
             print("2. Eliminar Experimento")
             print("3. Editar Experimento")
             print("4. Realizar Experimento")
-            print("5. Salir")
+            print("5. Cola de experimentos (ejecución en paralelo)")
+            print("6. Salir")
 
             # Validar entrada del usuario
             opcion = input("Seleccione una opción: ")
-            while not opcion.isnumeric() or not int(opcion) in range(1, 6):
+            while not opcion.isnumeric() or not int(opcion) in range(1, 7):
                 print("Error: Ingrese una opción válida.")
                 opcion = input("Seleccione una opción: ")
 
@@ -785,42 +2247,35 @@ class App:
                 self.editar_experimento()
             elif opcion == "4":
                 self.realizar_experimento()
+            elif opcion == "5":
+                self.menu_cola()
             else:
                 print("\nHas salido del módulo Gestión de Experimentos.")
                 break  # Regresa al menú principal
 
 
     def crear_experimento(self):
+        if self.bloqueado_en_simulacion("crear experimentos"):
+            return
         if not self.recetas:
             print("\nNo hay recetas registradas. Debe agregar una antes de crear un experimento.")
-            return
-
-        print("\n===== CREAR EXPERIMENTO =====")
-
-        # Listar recetas disponibles
-        for i, receta in enumerate(self.recetas, start=1):
-            print(f"{i}. ID:{receta.id} {receta.nombre}")
-
-        seleccion = input("\nSeleccione el número de la receta a usar para el experimento: ")
+            return
 
-        while not seleccion.isnumeric() or int(seleccion) not in range(1, len(self.recetas) + 1):
-            print("Error: Ingrese un número válido de la lista.")
-            seleccion = input("\nSeleccione el número de la receta a usar para el experimento: ")
+        print("\n===== CREAR EXPERIMENTO =====")
 
-        seleccion = int(seleccion) - 1
-        receta_seleccionada = self.recetas[seleccion]
+        # Buscar la receta a usar
+        receta_seleccionada = self.seleccionar_receta("usar para el experimento")
 
         # Validar disponibilidad de reactivos
-        for reactivo_info in receta_seleccionada.reactivos:
-            reactivo = reactivo_info["reactivo"]
-            cantidad_necesaria = reactivo_info["cantidad"]
-
-            if reactivo.inventario < cantidad_necesaria:
+        bloqueo = self.verificar_reactivos(receta_seleccionada, str(datetime.today().date()))
+        if bloqueo is not None:
+            reactivo, cantidad_necesaria, motivo = bloqueo
+            if motivo == RegistroFallos.FALTA_INVENTARIO:
                 print(f"\nError: No hay suficiente {reactivo.nombre} en inventario para realizar el experimento.")
-                return
-            if reactivo.fecha_caducidad and reactivo.fecha_caducidad < str(datetime.today().date()):
+            else:
                 print(f"\nError: El reactivo {reactivo.nombre} ha caducado y no puede usarse.")
-                return
+            self.fallos.registrar("crear", receta_seleccionada.id, reactivo.id, motivo, reactivo.inventario, cantidad_necesaria)
+            return
 
         # Ingresar responsables del experimento
         responsables = []
@@ -838,8 +2293,8 @@ class App:
         fecha = str(datetime.today().date())
 
         # Crear el experimento y agregarlo a la lista
-        nuevo_experimento = Experimento(len(self.experimentos) + 1, receta_seleccionada, responsables, fecha)
-        self.experimentos.append(nuevo_experimento)
+        nuevo_experimento = Experimento(self.ids_experimentos.siguiente(), receta_seleccionada, responsables, fecha)
+        self.registrar_experimento(nuevo_experimento)
 
         print("\nExperimento creado exitosamente:")
         print(nuevo_experimento)
@@ -852,22 +2307,17 @@ class App:
         if not self.experimentos:
             print("\nNo hay experimentos registrados para editar.")
             return
+        # Los resultados se reindexan (y cambian de partición) con su experimento: deben estar en memoria
+        # antes de editarlo, para que se ubiquen en la partición de la que salen
+        self.asegurar("resultados")
 
         while True:
             print("\n===== EDITAR EXPERIMENTO =====")
 
-            # Mostrar lista de experimentos disponibles
-            for i, experimento in enumerate(self.experimentos, start=1):
-                print(f"{i}. ID:{experimento.id} - {experimento.receta.nombre}")
-
-            # Validar selección del experimento
-            seleccion = input("\nSeleccione el número del experimento a editar: ")
-            while not seleccion.isnumeric() or int(seleccion) not in range(1, len(self.experimentos) + 1):
-                print("Error: Ingrese un número válido de la lista.")
-                seleccion = input("\nSeleccione el número del experimento a editar: ")
-
-            seleccion = int(seleccion) - 1
-            experimento = self.experimentos[seleccion]
+            # Seleccionar el experimento desde el listado paginado
+            experimento = self.seleccionar_experimento("editar")
+            if experimento is None:
+                break
 
             # Menú de edición
             while True:
@@ -879,22 +2329,14 @@ class App:
 
                 # Validar opción ingresada
                 opcion = input("\nSeleccione una opción: ")
-                while not opcion.isnumeric() or int(opcion) in range(1,5):
+                while not opcion.isnumeric() or int(opcion) not in range(1, 5):
                     print("Error: Opción no válida.")
                     opcion = input("Seleccione una opción: ")
+                antes = self.historial.capturar(experimento)
 
                 if opcion == "1":  # Cambiar receta
                     print("\n===== SELECCIONAR NUEVA RECETA =====")
-                    for i, receta in enumerate(self.recetas, start=1):
-                        print(f"{i}. {receta.nombre}")
-
-                    # Validar selección de la nueva receta
-                    nueva_receta_idx = input("\nSeleccione el número de la nueva receta: ")
-                    while not nueva_receta_idx.isnumeric() or int(nueva_receta_idx) not in range(1, len(self.recetas) + 1):
-                        print("Error: Seleccione un número válido.")
-                        nueva_receta_idx = input("Seleccione el número de la nueva receta: ")
-
-                    experimento.receta = self.recetas[int(nueva_receta_idx) - 1]
+                    experimento.receta = self.seleccionar_receta("asignar")
                     print(f"\nReceta cambiada a: {experimento.receta.nombre}")
 
                 elif opcion == "2":  # Editar responsables
@@ -915,6 +2357,9 @@ class App:
                     print("\nSaliendo de la edición del experimento.")
                     break
 
+                self.indexar_experimento(experimento)  # Mantener los filtros al día con los cambios
+                self.registrar_edicion(f"Editar experimento {experimento.id}", [(experimento, antes)])
+
             # Preguntar si desea editar otro experimento
             continuar = input("\n¿Desea editar otro experimento? (s/n): ").strip().lower()
             while continuar not in ["s", "n"]:
@@ -927,6 +2372,8 @@ class App:
         """
         Elimina un experimento registrado en el sistema.
         """
+        if self.bloqueado_en_simulacion("eliminar experimentos"):
+            return
         if not self.experimentos:
             print("\nNo hay experimentos registrados para eliminar.")
             return
@@ -934,20 +2381,21 @@ class App:
         while True:
             print("\n===== ELIMINAR EXPERIMENTO =====")
             
-            # Mostrar lista de experimentos disponibles
-            for i, experimento in enumerate(self.experimentos, start=1):
-                print(f"{i}. ID:{experimento.id} - {experimento.receta.nombre}")
-
-            # Validar selección del experimento
-            seleccion = input("\nSeleccione el número del experimento a eliminar: ")
-            while not seleccion.isnumeric() or int(seleccion) not in range(1, len(self.experimentos) + 1):
-                print("Error: Ingrese un número válido de la lista.")
-                seleccion = input("\nSeleccione el número del experimento a eliminar: ")
-
-            seleccion = int(seleccion) - 1
-            experimento_eliminado = self.experimentos.pop(seleccion)  # Eliminar de la lista
+            # Seleccionar el experimento desde el listado paginado
+            experimento_eliminado = self.seleccionar_experimento("eliminar")
+            if experimento_eliminado is None:
+                break
 
-            print(f"\nExperimento '{experimento_eliminado.receta.nombre}' eliminado correctamente.")
+            # Verificar resultados registrados del experimento
+            self.asegurar("resultados")
+            dependientes = self.dependencias.dependientes_de_experimento(experimento_eliminado.id)
+            if self.elegir_politica(f"El experimento {experimento_eliminado.id}", dependientes) == Dependencias.DENEGAR:
+                print("\nEliminación cancelada.")
+            else:
+                self.eliminar_dependientes(dependientes)
+                self.quitar_archivados([experimento_eliminado.id])  # Sus resultados del histórico
+                self.quitar_experimento(experimento_eliminado)  # Eliminar de la lista y de los índices
+                print(f"\nExperimento '{experimento_eliminado.receta.nombre}' eliminado correctamente.")
 
             # Preguntar si desea eliminar otro experimento
             continuar = input("\n¿Desea eliminar otro experimento? (s/n): ").strip().lower()
@@ -961,6 +2409,8 @@ class App:
         """
         Ejecuta un experimento, validando reactivos, descontando inventario y generando resultados.
         """
+        if self.bloqueado_en_simulacion("realizar experimentos"):
+            return
         print("\n===== REALIZAR EXPERIMENTO =====")
 
         # Listar experimentos disponibles
@@ -968,78 +2418,327 @@ class App:
             print("No hay experimentos disponibles para realizar.")
             return
 
-        print("Seleccione un experimento para ejecutar:")
-        for i, experimento in enumerate(self.experimentos, start=1):
-            print(f"{i}. {experimento.receta.nombre} (ID: {experimento.id})")
+        # Seleccionar el experimento desde el listado paginado
+        experimento_seleccionado = self.seleccionar_experimento("ejecutar")
+        if experimento_seleccionado is None:
+            return
+
+        # Opcionalmente, calcular las mediciones con las lecturas reales del instrumento; no se piden
+        # si faltan reactivos, ya que el experimento no se podrá realizar
+        valores_obtenidos = None
+        if self.verificar_reactivos(experimento_seleccionado.receta, "2024-03-10") is None:
+            usar_lecturas = input("¿Desea ingresar las lecturas del instrumento? (S/N): ").strip().lower()
+            while usar_lecturas not in ["s", "n"]:
+                print("Error: Ingrese 'S' para sí o 'N' para no.")
+                usar_lecturas = input("¿Desea ingresar las lecturas del instrumento? (S/N): ").strip().lower()
+            if usar_lecturas == "s":
+                valores_obtenidos = self.pedir_lecturas(experimento_seleccionado.receta)
 
-        # Validar selección del experimento
-        opcion = input("> Ingrese el número del experimento: ")
-        while not opcion.isnumeric() or int(opcion) not in range(1, len(self.experimentos) + 1):
-            opcion = input("Ingrese una opción válida: ")
+        # Si falta un reactivo, informa el motivo y registra el intento fallido
+        resultado = self.ejecutar_experimento(experimento_seleccionado, valores_obtenidos)
+        if resultado:
+            print("\nExperimento realizado con éxito.")
+            print(resultado.__str__())
 
-        experimento_seleccionado = self.experimentos[int(opcion) - 1]
+    def menu_cola(self):
+        """
+        Muestra el menú de la cola de experimentos.
+        """
+        if self.bloqueado_en_simulacion("usar la cola de experimentos"):
+            return
+        if self.cola is None:
+            self.cola = ColaExperimentos("cola_experimentos.sqlite")
 
-        # Verificar disponibilidad de reactivos
-        for item in experimento_seleccionado.receta.reactivos:
+        while True:
+            print("\n===== COLA DE EXPERIMENTOS =====")
+            print("1. Encolar un experimento")
+            print("2. Encolar todos los experimentos sin resultado")
+            print("3. Procesar la cola")
+            print("4. Ver estado de la cola y rendimiento")
+            print("5. Salir")
+
+            opcion = input("Seleccione una opción: ")
+            while not opcion.isnumeric() or not int(opcion) in range(1, 6):
+                print("Error: Ingrese una opción válida.")
+                opcion = input("Seleccione una opción: ")
+
+            if opcion == "1":
+                if not self.experimentos:
+                    print("\nNo hay experimentos registrados.")
+                    continue
+                experimento = self.seleccionar_experimento("encolar")
+                if experimento is not None:
+                    self.encolar_experimentos([experimento])
+            elif opcion == "2":
+                self.encolar_experimentos(self.experimentos)
+            elif opcion == "3":
+                trabajadores = input(f"Cantidad de procesos trabajadores (Enter para {os.cpu_count()}): ").strip()
+                while trabajadores and (not trabajadores.isnumeric() or int(trabajadores) < 1):
+                    print("Error: Ingrese un número entero positivo.")
+                    trabajadores = input("Cantidad de procesos trabajadores: ").strip()
+                self.procesar_cola(int(trabajadores) if trabajadores else None)
+            elif opcion == "4":
+                self.estado_cola()
+            else:
+                break
+
+    def encolar_experimentos(self, experimentos):
+        """
+        Agrega experimentos a la cola para realizarlos luego en paralelo.
+
+        :param experimentos: Lista de objetos Experimento.
+        """
+        # Un experimento que ya tiene resultado no se vuelve a realizar
+        self.asegurar("resultados")
+        por_realizar = [e for e in experimentos if not self.dependencias.tiene_resultados(e.id)]
+        cantidad = self.cola.encolar(por_realizar, "2024-03-10")  # Misma fecha de caducidad simulada que al realizarlos
+        print(f"\n{cantidad} experimentos agregados a la cola.")
+        if cantidad < len(experimentos):
+            print(f"{len(experimentos) - cantidad} omitidos porque ya tienen un resultado o un trabajo en la cola.")
+
+    @instrumentar("procesar_cola", elementos=lambda app, procesados: procesados)
+    def procesar_cola(self, trabajadores=None):
+        """
+        Procesa la cola de experimentos con varios procesos y agrega los resultados a la aplicación.
+
+        :param trabajadores: Cantidad de procesos; si es None, uno por núcleo.
+        :return: Cantidad de trabajos procesados (realizados y rechazados).
+        """
+        # Incorporar primero lo que haya quedado de una ejecución anterior, para no perder sus descuentos
+        self.aplicar_trabajos_terminados()
+        self.cola.sincronizar_inventario(self.reactivos)
+
+        duracion = self.cola.procesar(trabajadores)
+        hechos, rechazados = self.aplicar_trabajos_terminados()
+        print(f"\nCola procesada en {duracion:.2f} s: {hechos} experimentos realizados, {rechazados} rechazados.")
+        return hechos + rechazados
+
+    def aplicar_trabajos_terminados(self):
+        """
+        Incorpora los trabajos terminados de la cola: descuentos de inventario, consumos, resultados e intentos rechazados.
+
+        :return: Tupla (experimentos realizados, experimentos rechazados).
+        """
+        terminados = self.cola.terminados_sin_aplicar()
+        hechos = rechazados = 0
+        for _, id_experimento, id_receta, estado, datos in terminados:
+            experimento = self.experimentos_por_id.get(id_experimento)
+            if estado == ColaExperimentos.RECHAZADO:
+                self.fallos.registrar("realizar", id_receta, datos["reactivo_id"], datos["motivo"],
+                                      datos["disponible"], datos["requerido"], id_experimento)
+                rechazados += 1
+                continue
+
+            # El inventario compartido ya se descontó; se replica el descuento en la aplicación
+            for id_reactivo, _, real in datos["consumos"]:
+                reactivo = self.reactivos_por_id.get(id_reactivo)
+                if reactivo is not None:
+                    inventario = reactivo.inventario
+                    reactivo.inventario -= real
+                    self.eventos.emitir(Modificado, "reactivos", reactivo, {"inventario": inventario}, {"inventario": reactivo.inventario})
+            self.consumos.registrar(id_experimento, [tuple(consumo) for consumo in datos["consumos"]])
+            hechos += 1
+
+            # El experimento pudo haberse eliminado mientras estaba en la cola
+            if experimento is None:
+                continue
+            antes = self.campos_realizacion(experimento)
+            for id_reactivo, _, real in datos["consumos"]:
+                experimento.consumo_real[id_reactivo] = experimento.consumo_real.get(id_reactivo, 0) + real
+            experimento.costo = experimento.calcular_costo()
+            self.indexar_experimento(experimento)
+            if antes is not None:
+                self.eventos.emitir(Modificado, "experimentos", experimento, antes, self.campos_realizacion(experimento))
+
+            valores_aceptables = {medicion: tuple(rango) for medicion, rango in datos["valores_aceptables"].items()}
+            self.registrar_resultado(Resultado(experimento, datos["valores_obtenidos"], valores_aceptables))
+
+        self.cola.marcar_aplicados([id for id, *_ in terminados])
+        return hechos, rechazados
+
+    def campos_realizacion(self, experimento):
+        """
+        Copia los campos que cambian al realizar un experimento, solo si alguien escucha sus modificaciones.
+
+        :param experimento: Objeto Experimento.
+        :return: Diccionario {campo: valor}, o None si nadie escucha.
+        """
+        if not self.eventos.escuchando(Modificado, "experimentos"):
+            return None
+        return {"costo": experimento.costo, "consumo_real": dict(experimento.consumo_real)}
+
+    def estado_cola(self):
+        """
+        Muestra la cantidad de trabajos por estado, el rendimiento de cada trabajador y los errores.
+        """
+        resumen = self.cola.resumen()
+        print("\n===== ESTADO DE LA COLA =====")
+        if not resumen:
+            print("La cola está vacía.")
+        for estado, cantidad in sorted(resumen.items()):
+            print(f"{estado}: {cantidad}")
+
+        rendimiento = self.cola.rendimiento()
+        if rendimiento:
+            print("\nRendimiento por trabajador:")
+        for datos in rendimiento:
+            print(f"  - {datos['nombre']}: {datos['hechos']} realizados, {datos['rechazados']} rechazados, "
+                  f"{datos['errores']} errores, {datos['por_segundo']:.1f} trabajos/s")
+
+        con_error = self.cola.con_error()
+        if con_error:
+            print("\nTrabajos con errores:")
+        for id, id_experimento, estado, intentos, error in con_error[-10:]:
+            print(f"  - Trabajo {id} (experimento {id_experimento}): {estado}, {intentos} intentos, último error: {error}")
+
+    def leer_numero(self, mensaje):
+        """
+        Solicita un número (positivo, negativo o decimal) al usuario.
+
+        :param mensaje: Mensaje a mostrar.
+        :return: Número ingresado.
+        """
+        while True:
+            valor = input(mensaje).strip().replace(",", ".")
+            try:
+                return float(valor)
+            except ValueError:
+                print("Error: Ingrese un número válido.")
+
+    def pedir_lecturas(self, receta):
+        """
+        Solicita las lecturas del instrumento y calcula cada medición con su fórmula compilada.
+
+        Si una fórmula no se puede interpretar o evaluar, se solicita directamente el valor final de la medición.
+
+        :param receta: Objeto Receta del experimento.
+        :return: Diccionario {medición: valor obtenido}.
+        """
+        lecturas = {}
+        valores_obtenidos = {}
+        for medicion in receta.valores_a_medir:
+            try:
+                formula = self.formulas.compilar(medicion.formula)
+            except ValueError:
+                valores_obtenidos[medicion.nombre] = self.leer_numero(f"Valor obtenido de {medicion.nombre}: ")
+                continue
+
+            for variable in formula.variables:
+                if variable not in lecturas:
+                    lecturas[variable] = self.leer_numero(f"Lectura de '{variable}': ")
+            try:
+                valor = float(formula.evaluar(lecturas))
+            except ValueError as error:
+                print(f"Error: {error}")
+                valores_obtenidos[medicion.nombre] = self.leer_numero(f"Valor obtenido de {medicion.nombre}: ")
+                continue
+            print(f"{medicion.nombre} = {medicion.formula} = {valor:.2f}")
+            valores_obtenidos[medicion.nombre] = round(valor, 2)
+
+        return valores_obtenidos
+
+    def verificar_reactivos(self, receta, fecha_referencia):
+        """
+        Busca el primer reactivo de una receta que impide realizarla.
+
+        :param receta: Objeto Receta a verificar.
+        :param fecha_referencia: Fecha "YYYY-MM-DD"; los reactivos que caducan antes se consideran vencidos.
+        :return: Tupla (reactivo, cantidad necesaria, motivo de RegistroFallos), o None si se puede realizar.
+        """
+        for item in receta.reactivos:
             reactivo = item["reactivo"]
             cantidad_necesaria = item["cantidad"]
 
             if reactivo.inventario < cantidad_necesaria:
+                return reactivo, cantidad_necesaria, RegistroFallos.FALTA_INVENTARIO
+            if reactivo.fecha_caducidad and reactivo.fecha_caducidad < fecha_referencia:
+                return reactivo, cantidad_necesaria, RegistroFallos.CADUCADO
+        return None
+
+    @instrumentar("ejecutar_experimento", elementos=lambda app, _: 1)
+    def ejecutar_experimento(self, experimento_seleccionado, valores_obtenidos=None):
+        """
+        Valida los reactivos de un experimento, descuenta el inventario y genera su resultado.
+
+        :param experimento_seleccionado: Objeto Experimento a ejecutar.
+        :param valores_obtenidos: Diccionario {medición: valor} medido; si es None se simulan los valores.
+        :return: Objeto Resultado generado, o None si el experimento no se pudo realizar.
+        """
+        # Verificar disponibilidad de reactivos (con la fecha de caducidad simulada)
+        bloqueo = self.verificar_reactivos(experimento_seleccionado.receta, "2024-03-10")
+        if bloqueo is not None:
+            reactivo, cantidad_necesaria, motivo = bloqueo
+            if motivo == RegistroFallos.FALTA_INVENTARIO:
                 print(f"Error: No hay suficiente {reactivo.nombre} en inventario ({reactivo.inventario} disponibles, {cantidad_necesaria} requeridos).")
-                return
-            
-            # Verificación de fecha de caducidad simulada
-            if reactivo.fecha_caducidad is not None and reactivo.fecha_caducidad < "2024-03-10":  
+            else:
                 print(f"Error: El reactivo {reactivo.nombre} ha caducado y no puede utilizarse.")
-                return
+            self.fallos.registrar("realizar", experimento_seleccionado.receta.id, reactivo.id, motivo,
+                                  reactivo.inventario, cantidad_necesaria, experimento_seleccionado.id)
+            return None
 
         # Descontar del inventario y aplicar error aleatorio
+        consumos = []  # Tuplas (ID de reactivo, cantidad planificada, cantidad real) para el libro de consumos
+        antes = self.campos_realizacion(experimento_seleccionado)
         for item in experimento_seleccionado.receta.reactivos:
             reactivo = item["reactivo"]
             cantidad_necesaria = item["cantidad"]
-            error_porcentaje = random.uniform(0.001, 0.225)  # Error entre 0.1% y 22.5%
-            cantidad_total = cantidad_necesaria * (1 + error_porcentaje)
+            cantidad_total, error_porcentaje = consumo_con_error(cantidad_necesaria)  # Error entre 0.1% y 22.5%
 
+            inventario = reactivo.inventario
             reactivo.inventario -= cantidad_total
+            self.eventos.emitir(Modificado, "reactivos", reactivo, {"inventario": inventario}, {"inventario": reactivo.inventario})
+            experimento_seleccionado.consumo_real[reactivo.id] = experimento_seleccionado.consumo_real.get(reactivo.id, 0) + cantidad_total
+            consumos.append((reactivo.id, cantidad_necesaria, cantidad_total))
             print(f"Se han descontado {cantidad_total:.2f} {reactivo.unidad_medida} de {reactivo.nombre} (incluye error de {error_porcentaje * 100:.2f}%).")
 
+        self.consumos.registrar(experimento_seleccionado.id, consumos)
+
         # Calcular costo total del experimento
         costo_total = sum(item["reactivo"].costo * item["cantidad"] for item in experimento_seleccionado.receta.reactivos)
         experimento_seleccionado.costo = costo_total
-
-        # Generar valores obtenidos con variación aleatoria
-        valores_obtenidos = {}
+        self.indexar_experimento(experimento_seleccionado)  # Actualiza el costo en las estadísticas por período
+        if antes is not None:
+            self.eventos.emitir(Modificado, "experimentos", experimento_seleccionado,
+                                antes, self.campos_realizacion(experimento_seleccionado))
+
+        # Sin lecturas reales, generar valores obtenidos con variación aleatoria
+        simular = valores_obtenidos is None
+        if simular:
+            valores_obtenidos = {}
         valores_aceptables = {}
 
         for medicion in experimento_seleccionado.receta.valores_a_medir:
             min_valor = medicion.minimo
             max_valor = medicion.maximo
-            error_factor = random.uniform(0.0, 1.0)  # Error aleatorio entre 0% y 100%
-            valor_obtenido = random.uniform(min_valor, max_valor) * (1 + error_factor)
-            valores_obtenidos[medicion.nombre] = round(valor_obtenido, 2)
+            if simular:
+                valores_obtenidos[medicion.nombre] = simular_medicion(min_valor, max_valor)  # Error aleatorio entre 0% y 100%
             valores_aceptables[medicion.nombre] = (min_valor, max_valor)
 
         # Crear resultado del experimento y evaluar si está dentro de los valores aceptables
         resultado = Resultado(experimento_seleccionado, valores_obtenidos, valores_aceptables)
-        self.resultados.append(resultado)
-
-        print("\nExperimento realizado con éxito.")
-        print(resultado.__str__())
+        self.registrar_resultado(resultado)
+        return resultado
 
     
     def menu_resultados(self):
         """
         Muestra el menú de gestión de resultados y permite visualizar o graficar los datos.
         """
+        self.asegurar("experimentos", "resultados")
         while True:
             print("\n===== GESTIÓN DE RESULTADOS =====")
             print("1. Ver Resultados de Experimentos")
             print("2. Graficar Resultados")
-            print("3. Salir")
+            print("3. Importar lecturas de instrumentos (CSV o JSONL)")
+            print("4. Exportar datos para análisis (CSV y formato columnar)")
+            print("5. Archivar resultados antiguos")
+            print("6. Generar reporte completo del laboratorio")
+            print("7. Control estadístico de las mediciones")
+            print("8. Salir")
 
             # Validar la opción ingresada
             opcion = input("\nSeleccione una opción: ")
-            while not opcion.isnumeric() or int(opcion) not in range(1, 4):
+            while not opcion.isnumeric() or int(opcion) not in range(1, 9):
                 print("Error: Ingrese un número válido de la lista.")
                 opcion = input("\nSeleccione una opción: ")
 
@@ -1050,31 +2749,301 @@ class App:
                 self.ver_resultados()
             elif opcion == 2:
                 self.graficar_resultados()
+            elif opcion == 3:
+                self.importar_lecturas()
+            elif opcion == 4:
+                self.exportar_datos()
+            elif opcion == 5:
+                self.archivar_resultados()
+            elif opcion == 6:
+                self.generar_reporte()
+            elif opcion == 7:
+                self.menu_control()
             else:
                 print("\nSaliendo del módulo de resultados.")
                 break  # Regresa al menú principal
     
+    def controlar_resultado(self, evento):
+        """
+        Suma un resultado recién creado al control estadístico y muestra las alertas que genere.
+
+        :param evento: Evento `Creado` de la colección de resultados.
+        """
+        if not self.control_vigente:
+            self.actualizar_control()  # Ya incluye el resultado nuevo
+            return
+        for alerta in self.control.observar(evento.entidad):
+            print(f"\nAlerta de control en {evento.entidad.experimento.receta.nombre}: {ControlEstadistico.describir(alerta)}")
+
+    def invalidar_control(self, evento):
+        """
+        Marca el control estadístico para recalcularlo, ya que los resultados se cargaron o vaciaron en bloque.
+        """
+        self.control_vigente = False
+
+    @instrumentar("actualizar_control", elementos=lambda app, observados: observados)
+    def actualizar_control(self):
+        """
+        Recalcula el control estadístico con los resultados en memoria si quedó desactualizado.
+
+        :return: Cantidad de resultados observados (0 si el control estaba al día).
+        """
+        if self.control_vigente:
+            return 0
+        self.asegurar("experimentos", "resultados")
+        self.control.recalcular(self.resultados)
+        self.control_vigente = True
+        return len(self.resultados)
+
+    def menu_control(self):
+        """
+        Muestra el estado del control estadístico de las mediciones, sus alertas y permite exportar su gráfica.
+        """
+        self.actualizar_control()
+        while True:
+            print("\n===== CONTROL ESTADÍSTICO DE LAS MEDICIONES =====")
+            print("1. Mediciones con mayor desvío")
+            print("2. Alertas recientes")
+            print("3. Exportar la gráfica de control de una receta")
+            print("4. Salir")
+
+            opcion = input("\nSeleccione una opción: ")
+            while not opcion.isnumeric() or int(opcion) not in range(1, 5):
+                print("Error: Ingrese un número válido de la lista.")
+                opcion = input("\nSeleccione una opción: ")
+
+            opcion = int(opcion)
+
+            if opcion == 1:
+                if not self.control.estados:
+                    print("\nNo hay mediciones con rango aceptable en los resultados.")
+                for (id_receta, medicion), estado in self.control.mas_desviadas():
+                    receta = self.recetas_por_id.get(id_receta)
+                    nombre = receta.nombre if receta else f"Receta {id_receta} (eliminada)"
+                    print(f"{nombre} - {medicion}: {estado.n} valores, media {estado.media:.3f} ± {estado.desviacion:.3f}, "
+                          f"EWMA {estado.ewma:.3f} (objetivo {estado.centro:.3f}, "
+                          f"{(estado.ewma - estado.centro) / estado.sigma:+.2f}σ), "
+                          f"CUSUM +{estado.cusum_alto:.2f}σ / -{estado.cusum_bajo:.2f}σ")
+            elif opcion == 2:
+                print(f"\n{self.control.total_alertas} alertas en total; se muestran las más recientes.")
+                for alerta in list(self.control.alertas)[-15:]:
+                    receta = self.recetas_por_id.get(alerta["receta"])
+                    nombre = receta.nombre if receta else f"Receta {alerta['receta']} (eliminada)"
+                    print(f"  - {nombre}: {ControlEstadistico.describir(alerta)}")
+            elif opcion == 3:
+                receta = self.seleccionar_receta("graficar")
+                if receta is not None:
+                    ruta = self.exportar_grafico_control(receta)
+                    print(f"\nGráfica de control guardada en {ruta}." if ruta else "\nLa receta no tiene mediciones controladas.")
+            else:
+                break
+
+    def exportar_grafico_control(self, receta, ruta=None):
+        """
+        Guarda la gráfica de control de las mediciones de una receta: media, EWMA y sus límites junto al rango aceptable.
+
+        :param receta: Objeto Receta.
+        :param ruta: Ruta de la imagen; si es None se usa "control_receta_<ID>.png".
+        :return: Ruta de la imagen, o None si la receta no tiene mediciones controladas.
+        """
+        self.actualizar_control()
+        estados = [(medicion, self.control.estados.get((receta.id, medicion.nombre))) for medicion in receta.valores_a_medir]
+        estados = [(medicion, estado) for medicion, estado in estados if estado is not None]
+        if not estados:
+            return None
+
+        ruta = ruta or f"control_receta_{receta.id}.png"
+        limite = self.control.ancho_ewma
+        self.dibujar_mediciones(f"Control estadístico de {receta.nombre}", [medicion.nombre for medicion, _ in estados], [
+            ([estado.media for _, estado in estados], "purple", "Media"),
+            ([estado.ewma for _, estado in estados], "blue", "EWMA"),
+            ([estado.centro - limite * estado.sigma for _, estado in estados], "orange", "Límite inferior EWMA"),
+            ([estado.centro + limite * estado.sigma for _, estado in estados], "orange", "Límite superior EWMA"),
+            ([medicion.minimo for medicion, _ in estados], "red", "Mínimo"),
+            ([medicion.maximo for medicion, _ in estados], "green", "Máximo")
+        ], ruta)
+        return ruta
+
+    @instrumentar("importar_lecturas", elementos=lambda app, leidas: leidas or 0)
+    def importar_lecturas(self, ruta=None):
+        """
+        Importa resultados reales desde un archivo de lecturas de instrumentos.
+
+        :param ruta: Ruta del archivo; si es None se solicita al usuario.
+        :return: Cantidad de filas leídas, o None si no se importó.
+        """
+        if self.bloqueado_en_simulacion("importar lecturas"):
+            return
+        if ruta is None:
+            ruta = input("\nIngrese la ruta del archivo (.csv o .jsonl): ").strip()
+        if not os.path.exists(ruta):
+            print(f"\nError: El archivo {ruta} no existe.")
+            return
+
+        importador = ImportadorLecturas(self.experimentos_por_id, self.formulas)
+        resumen = importador.importar(ruta, self.registrar_resultado)
+
+        print("\n===== RESUMEN DE IMPORTACIÓN =====")
+        print(f"Filas leídas: {resumen['leidas']}")
+        print(f"Resultados importados: {resumen['importadas']} ({resumen['fuera_de_rango']} fuera de parámetros)")
+        print(f"Filas rechazadas: {resumen['rechazadas']}")
+        for motivo, cantidad in resumen["errores"].items():
+            print(f"  - {motivo}: {cantidad}")
+        return resumen["leidas"]
+
+    @instrumentar("exportar_datos", elementos=lambda app, filas: filas)
+    def exportar_datos(self, carpeta=None, formato=None):
+        """
+        Exporta experimentos, líneas de recetas y mediciones a CSV y a un formato columnar.
+
+        :param carpeta: Carpeta de destino; si es None se solicita al usuario.
+        :param formato: "parquet", "arrow" o "npz"; si es None se solicita al usuario.
+        :return: Cantidad total de filas exportadas.
+        """
+        if carpeta is None:
+            carpeta = input("\nIngrese la carpeta de destino (Enter para 'exportacion'): ").strip() or "exportacion"
+        if formato is None:
+            formato = input("Formato columnar (parquet, arrow o npz; Enter para parquet): ").strip().lower() or "parquet"
+            while formato not in ("parquet", "arrow", "npz"):
+                print("Error: Ingrese parquet, arrow o npz.")
+                formato = input("Formato columnar: ").strip().lower()
+
+        exportador = Exportador(carpeta, formato)
+        resultados = itertools.chain(self.resultados, self.archivo_resultados.iterar(self.experimentos_por_id))
+        totales = exportador.exportar_todo(self.recetas, self.experimentos, resultados)
+
+        print(f"\nDatos exportados en la carpeta '{carpeta}' (formato {exportador.formato}):")
+        for tabla, cantidad in totales.items():
+            print(f"  - {tabla}: {cantidad} filas")
+        return sum(totales.values())
+
+    @instrumentar("generar_reporte", elementos=lambda app, filas: filas)
+    def generar_reporte(self, ruta=None, formato=None):
+        """
+        Genera un reporte completo del laboratorio (incluyendo los resultados archivados) en un archivo.
+
+        :param ruta: Ruta del archivo; si es None se usa 'reporte' con la extensión del formato.
+        :param formato: "texto", "html" o "markdown"; si es None se solicita al usuario.
+        :return: Cantidad total de filas escritas.
+        """
+        if formato is None:
+            formato = input("\nFormato del reporte (texto, html o markdown; Enter para texto): ").strip().lower() or "texto"
+            while formato not in GeneradorReporte.FORMATOS:
+                print("Error: Ingrese texto, html o markdown.")
+                formato = input("Formato del reporte: ").strip().lower()
+        if ruta is None:
+            ruta = "reporte" + GeneradorReporte.EXTENSIONES[formato]
+
+        generador = GeneradorReporte(formato)
+        resultados = itertools.chain(self.resultados, self.archivo_resultados.iterar(self.experimentos_por_id))
+        totales = generador.generar(ruta, self.reactivos, self.recetas, self.experimentos, resultados,
+                                    self.filas_estadisticas_reporte())
+
+        print(f"\nReporte generado en '{ruta}':")
+        for seccion, cantidad in totales.items():
+            print(f"  - {seccion}: {cantidad} filas")
+        return sum(totales.values())
+
+    def filas_estadisticas_reporte(self):
+        """
+        Genera las filas (indicador, valor) de la sección de estadísticas del reporte.
+        """
+        conteo = self.conteo_validez()
+        total = sum(t for t, _ in conteo.values())
+        validos = sum(v for _, v in conteo.values())
+
+        yield ("Reactivos", len(self.reactivos))
+        yield ("Reactivos bajo el mínimo sugerido", sum(1 for r in self.reactivos if r.inventario < r.minimo))
+        yield ("Recetas", len(self.recetas))
+        yield ("Experimentos", len(self.experimentos))
+        yield ("Resultados (incluye archivados)", total)
+        yield ("Resultados dentro de parámetros", f"{validos} ({validos / total * 100:.1f}%)" if total else "0")
+        yield ("Intentos rechazados", self.fallos.total)
+        for medicion, evaluaciones, fuera, _ in self.tasas_fallo.ranking(3):
+            yield (f"Fuera de rango: {medicion}", f"{fuera}/{evaluaciones} ({fuera / evaluaciones * 100:.1f}%)")
+        for id_receta, (total_receta, validos_receta) in sorted(conteo.items()):
+            receta = self.recetas_por_id.get(id_receta)
+            nombre = receta.nombre if receta else f"Receta {id_receta} (eliminada)"
+            yield (f"Dentro de parámetros: {nombre}", f"{validos_receta}/{total_receta} ({validos_receta / total_receta * 100:.1f}%)")
+
+    @instrumentar("archivar_resultados", elementos=lambda app, archivados: archivados or 0)
+    def archivar_resultados(self, fecha_limite=None):
+        """
+        Mueve al archivo histórico en disco los resultados de experimentos realizados hasta una fecha.
+
+        El archivo es de solo agregado y los resultados no se pueden volver a traer a memoria, por lo
+        que la fecha se valida y, si se solicita al usuario, se pide confirmación antes de archivar.
+
+        :param fecha_limite: Fecha "YYYY-MM-DD" (inclusive); si es None se solicita al usuario.
+        :return: Cantidad de resultados archivados, o None si no se archivó nada.
+        """
+        if self.bloqueado_en_simulacion("archivar resultados"):
+            return
+        preguntar = fecha_limite is None
+        if preguntar:
+            fecha_limite = self.pedir_fecha("\nArchivar los resultados de experimentos hasta la fecha (YYYY-MM-DD, vacío para cancelar): ")
+            if not fecha_limite:
+                print("\nArchivo cancelado.")
+                return
+        else:
+            try:
+                datetime.strptime(fecha_limite, "%Y-%m-%d")
+            except ValueError:
+                print(f"\nError: La fecha '{fecha_limite}' no tiene el formato YYYY-MM-DD.")
+                return
+
+        indice_fecha = self.indices_resultados["fecha"]
+        inicio, fin = indice_fecha.rango(None, fecha_limite)
+        resultados = [self.resultados_por_id[clave] for _, clave in indice_fecha.entradas[inicio:fin]]
+        if not resultados:
+            print("\nNo hay resultados en memoria hasta esa fecha.")
+            return
+
+        if preguntar:
+            confirmacion = input(f"Se archivarán {len(resultados)} de {len(self.resultados)} resultados y no podrán "
+                                 f"volver a editarse. ¿Desea continuar? (S/N): ").strip().lower()
+            while confirmacion not in ["s", "n"]:
+                print("Error: Ingrese 'S' para sí o 'N' para no.")
+                confirmacion = input("¿Desea continuar? (S/N): ").strip().lower()
+            if confirmacion == "n":
+                print("\nArchivo cancelado.")
+                return
+
+        archivados = self.archivo_resultados.archivar(resultados)
+        self.quitar_resultados(archivados)
+        print(f"\n{len(archivados)} resultados archivados ({len(self.archivo_resultados)} en el histórico).")
+        if len(archivados) < len(resultados):
+            print(f"{len(resultados) - len(archivados)} resultados con más de "
+                  f"{ArchivoResultados.MAX_MEDICIONES} mediciones se mantienen en memoria.")
+        return len(archivados)
+
     def ver_resultados(self):
         """
         Muestra la lista de resultados registrados y permite visualizar los detalles de un experimento específico.
         """
-        if not self.resultados:
+        if not self.resultados and not len(self.archivo_resultados):
             print("\nNo hay resultados registrados.")
             return
 
-        print("\n===== LISTA DE RESULTADOS =====")
-        for i, resultado in enumerate(self.resultados, start=1):
-            print(f"{i}. {resultado.experimento.receta.nombre} - Fecha: {resultado.experimento.fecha} - "
-                f"Evaluación: {'Dentro de parámetros' if resultado.valido else 'Fuera de parámetros'}")
+        if len(self.archivo_resultados):
+            origen = input("\n¿Ver resultados recientes (R) o del histórico archivado (H)?: ").strip().lower()
+            while origen not in ["r", "h"]:
+                print("Error: Ingrese 'R' o 'H'.")
+                origen = input("¿Ver resultados recientes (R) o del histórico archivado (H)?: ").strip().lower()
+        else:
+            origen = "r"
 
         # Selección de un resultado para ver detalles
-        seleccion = input("\nSeleccione el número del resultado para ver detalles o '0' para salir: ")
-        while not seleccion.isnumeric() or int(seleccion) not in range(0, len(self.resultados) + 1):
-            print("Error: Ingrese un número válido de la lista.")
-            seleccion = input("\nSeleccione el número del resultado para ver detalles o '0' para salir: ")
-
-        if int(seleccion) > 0:
-            print(self.resultados[int(seleccion) - 1])  # Muestra los detalles del resultado seleccionado
+        if origen == "h":
+            resultado = self.navegar(
+                VistaArchivo(self.archivo_resultados, self.experimentos_por_id), "HISTÓRICO DE RESULTADOS",
+                lambda r: f"{r.experimento.receta.nombre} - Fecha: {r.experimento.fecha} - "
+                          f"Evaluación: {'Dentro de parámetros' if r.valido else 'Fuera de parámetros'}"
+            )
+        else:
+            resultado = self.seleccionar_resultado("ver")
+        if resultado is not None:
+            print(resultado)  # Muestra los detalles del resultado seleccionado
 
     def graficar_resultados(self):
         """
@@ -1084,17 +3053,9 @@ class App:
             print("\nNo hay resultados registrados para graficar.")
             return
 
-        print("\n===== SELECCIONAR RESULTADO A GRAFICAR =====")
-        for i, resultado in enumerate(self.resultados, start=1):
-            print(f"{i}. {resultado.experimento.receta.nombre} - Fecha: {resultado.experimento.fecha}")
-
-        # Validar selección del resultado
-        seleccion = input("\nSeleccione el número del resultado a graficar: ")
-        while not seleccion.isnumeric() or int(seleccion) not in range(1, len(self.resultados) + 1):
-            print("Error: Ingrese un número válido de la lista.")
-            seleccion = input("\nSeleccione el número del resultado a graficar: ")
-
-        resultado = self.resultados[int(seleccion) - 1]
+        resultado = self.seleccionar_resultado("graficar")
+        if resultado is None:
+            return
 
         # Extraer datos para la gráfica
         mediciones = list(resultado.valores_obtenidos.keys())
@@ -1102,28 +3063,52 @@ class App:
         valores_minimos = [resultado.valores_aceptables[m][0] for m in mediciones]
         valores_maximos = [resultado.valores_aceptables[m][1] for m in mediciones]
 
+        self.dibujar_mediciones(f"Resultados de {resultado.experimento.receta.nombre}", mediciones, [
+            (valores_obtenidos, "blue", "Obtenido"),
+            (valores_minimos, "red", "Mínimo"),
+            (valores_maximos, "green", "Máximo")
+        ])
+
+    @staticmethod
+    def dibujar_mediciones(titulo, mediciones, series, ruta=None):
+        """
+        Genera una gráfica de dispersión con un valor por medición para cada serie.
+
+        :param titulo: Título de la gráfica.
+        :param mediciones: Nombres de las mediciones (eje X).
+        :param series: Lista de tuplas (valores, color, etiqueta), con un valor por medición.
+        :param ruta: Ruta de la imagen a guardar; si es None la gráfica se muestra en pantalla.
+        """
         x = range(len(mediciones))  # Índices para el eje X
 
         # Configuración de la gráfica
         plt.figure(figsize=(10, 5))
-        plt.scatter(x, valores_obtenidos, color="blue", label="Obtenido", zorder=3)
-        plt.scatter(x, valores_minimos, color="red", label="Mínimo", zorder=3)
-        plt.scatter(x, valores_maximos, color="green", label="Máximo", zorder=3)
+        for valores, color, etiqueta in series:
+            plt.scatter(x, valores, color=color, label=etiqueta, zorder=3)
 
         # Personalización del gráfico
         plt.xticks(ticks=x, labels=mediciones, rotation=45)
         plt.ylabel("Valores")
-        plt.title(f"Resultados de {resultado.experimento.receta.nombre}")
+        plt.title(titulo)
         plt.legend()
         plt.grid(True, linestyle="--", alpha=0.6, zorder=0)
-        
-        # Mostrar la gráfica
-        plt.show()
+
+        # Mostrar o guardar la gráfica
+        if ruta is None:
+            plt.show()
+        else:
+            plt.savefig(ruta, bbox_inches="tight")
+            plt.close()
 
     def menu_estadisticas(self):
         """
         Muestra el menú de estadísticas y permite acceder a diferentes análisis de uso del laboratorio.
+
+        Las estadísticas se calculan con los índices, las series y los registros; si estos vienen de
+        la caché de derivados no hace falta materializar los experimentos ni los resultados.
         """
+        if not self.derivados_restaurados:
+            self.asegurar("experimentos", "resultados")
         while True:
             print("\n===== MENÚ ESTADÍSTICAS =====")
             print("1. Investigadores que más utilizan el laboratorio")
@@ -1132,11 +3117,16 @@ class App:
             print("4. Top 3 reactivos con mayor desperdicio")
             print("5. Reactivos que más se vencen")
             print("6. Veces que no se logró hacer un experimento por falta de reactivos")
-            print("7. Salir")
+            print("7. Porcentaje de resultados dentro de parámetros por receta")
+            print("8. Mediciones que más quedan fuera de rango")
+            print("9. Estadísticas por período (día, semana o mes)")
+            print("10. Pronóstico de agotamiento de reactivos")
+            print("11. Métricas de rendimiento")
+            print("12. Salir")
 
             # Validar la opción ingresada
             opcion = input("\nSeleccione una opción: ")
-            while not opcion.isnumeric() or int(opcion) not in range(1, 8):
+            while not opcion.isnumeric() or int(opcion) not in range(1, 13):
                 print("Error: Ingrese un número válido.")
                 opcion = input("\nSeleccione una opción: ")
 
@@ -1155,90 +3145,122 @@ class App:
                 self.estadistica_reactivos_vencidos()
             elif opcion == 6:
                 self.estadistica_experimentos_fallidos()
+            elif opcion == 7:
+                self.estadistica_resultados_validos()
+            elif opcion == 8:
+                self.estadistica_mediciones_fuera_de_rango()
+            elif opcion == 9:
+                self.estadistica_por_periodo()
+            elif opcion == 10:
+                self.estadistica_agotamiento()
+            elif opcion == 11:
+                self.menu_metricas()
             else:
                 print("\nSaliendo del módulo de estadísticas.")
                 break  # Regresa al menú principal
 
+    def menu_metricas(self):
+        """
+        Muestra las métricas de rendimiento de la sesión y permite exportarlas o perfilar una operación.
+        """
+        while True:
+            print("\n===== MÉTRICAS DE RENDIMIENTO =====")
+            print("1. Ver resumen")
+            print("2. Exportar a JSON")
+            print("3. Exportar en formato Prometheus")
+            print("4. Perfilar la próxima llamada de una operación")
+            print("5. Salir")
+
+            opcion = input("\nSeleccione una opción: ")
+            while not opcion.isnumeric() or int(opcion) not in range(1, 6):
+                print("Error: Ingrese un número válido.")
+                opcion = input("\nSeleccione una opción: ")
+
+            opcion = int(opcion)
+
+            if opcion == 1:
+                resumen = self.metricas.resumen()
+                if not resumen:
+                    print("\nNo hay métricas registradas.")
+                for nombre, datos in sorted(resumen.items(), key=lambda x: x[1]["total"], reverse=True):
+                    print(f"{nombre}: {datos['llamadas']} llamadas, total {datos['total'] * 1000:.2f} ms, "
+                          f"p50 {datos['p50'] * 1000:.3f} ms, p99 {datos['p99'] * 1000:.3f} ms, "
+                          f"{datos['elementos']} elementos")
+                for nombre, (cantidad, pendiente) in self.materializados().items():
+                    print(f"Objetos materializados de {nombre}: {cantidad}{' (pendiente)' if pendiente else ''}")
+                print(f"Caché de índices y estadísticas: {self.derivados.estado}")
+                if self.metricas.perfil:
+                    print("\nÚltimo perfil capturado:")
+                    print(self.metricas.perfil)
+            elif opcion == 2:
+                self.metricas.exportar_json("metricas.json")
+                print("\nMétricas exportadas a metricas.json.")
+            elif opcion == 3:
+                self.metricas.exportar_prometheus("metricas.prom")
+                print("\nMétricas exportadas a metricas.prom.")
+            elif opcion == 4:
+                nombre = input("\nIngrese el nombre de la operación (ej. cargar_datos_json): ").strip()
+                self.metricas.perfilar_siguiente(nombre)
+                print(f"\nLa próxima llamada de '{nombre}' se guardará en {Metricas.ruta_perfil(nombre)}.")
+            else:
+                break
+
+    @instrumentar("estadistica_investigadores")
     def estadistica_investigadores(self):
         """
         Muestra los investigadores que más han realizado experimentos en el laboratorio.
         """
-        investigadores = {}
-
-        # Contar la cantidad de experimentos realizados por cada investigador
-        for experimento in self.experimentos:
-            for responsable in experimento.responsables:
-                if responsable in investigadores:
-                    investigadores[responsable] += 1
-                else:
-                    investigadores[responsable] = 1
+        # Cantidad de experimentos de cada investigador, de mayor a menor (se lee del índice por responsable)
+        top_investigadores = self.consultas.ejecutar(
+            Consulta("experimentos").agrupar("responsable").agregar(cantidad=("contar",)).ordenar("cantidad", descendente=True).limite(5)
+        )
 
-        if not investigadores:
+        if not top_investigadores:
             print("\nNo hay datos de investigadores.")
             return
 
-        # Convertir a lista de tuplas y ordenar por cantidad de experimentos en orden descendente
-        top_investigadores = sorted(investigadores.items(), key=lambda x: x[1], reverse=True)
-
         print("\n===== INVESTIGADORES QUE MÁS USAN EL LABORATORIO =====")
 
         # Mostrar los 5 investigadores con más experimentos
-        for i, (investigador, cantidad) in enumerate(top_investigadores[:5], start=1):
-            print(f"{i}. {investigador}: {cantidad} experimentos realizados")
+        for i, fila in enumerate(top_investigadores, start=1):
+            print(f"{i}. {fila['responsable']}: {fila['cantidad']} experimentos realizados")
 
 
+    @instrumentar("estadistica_experimentos")
     def estadistica_experimentos(self):
         """
         Muestra el experimento más realizado y el menos realizado en el laboratorio.
         """
-        conteo_experimentos = {}
-
-        # Contar la cantidad de veces que se ha realizado cada experimento
-        for experimento in self.experimentos:
-            nombre = experimento.receta.nombre
-            if nombre in conteo_experimentos:
-                conteo_experimentos[nombre] += 1
-            else:
-                conteo_experimentos[nombre] = 1
+        # Cantidad de experimentos por receta (se lee del índice por receta)
+        conteo_experimentos = self.consultas.ejecutar(Consulta("experimentos").agrupar("receta").agregar(cantidad=("contar",)))
 
         if not conteo_experimentos:
             print("\nNo hay datos de experimentos realizados.")
             return
 
-        # Determinar el experimento más y menos realizado
-        max_experimento = None
-        min_experimento = None
-        max_valor = float('-inf')
-        min_valor = float('inf')
-
-        for nombre, cantidad in conteo_experimentos.items():
-            if cantidad > max_valor:
-                max_valor = cantidad
-                max_experimento = nombre
-            if cantidad < min_valor:
-                min_valor = cantidad
-                min_experimento = nombre
+        # Determinar el experimento más y menos realizado (ante empates, el primero que aparece)
+        mas = max(conteo_experimentos, key=lambda fila: fila["cantidad"])
+        menos = min(conteo_experimentos, key=lambda fila: fila["cantidad"])
+        max_experimento, max_valor = self.recetas_por_id[mas["receta"]].nombre, mas["cantidad"]
+        min_experimento, min_valor = self.recetas_por_id[menos["receta"]].nombre, menos["cantidad"]
 
         print("\n===== EXPERIMENTOS MÁS Y MENOS REALIZADOS =====")
         print(f"Más realizado: {max_experimento} ({max_valor} veces)")
         print(f"Menos realizado: {min_experimento} ({min_valor} veces)")
 
 
+    @instrumentar("estadistica_reactivos_mas_usados")
     def estadistica_reactivos_mas_usados(self):
         """
         Muestra los 5 reactivos más utilizados en los experimentos.
         """
         reactivos_usados = {}
 
-        # Contar la cantidad total utilizada de cada reactivo
-        for experimento in self.experimentos:
-            for reactivo_info in experimento.receta.reactivos:
-                reactivo = reactivo_info["reactivo"]
-                cantidad = reactivo_info["cantidad"]
-                if reactivo.nombre in reactivos_usados:
-                    reactivos_usados[reactivo.nombre] += cantidad
-                else:
-                    reactivos_usados[reactivo.nombre] = cantidad
+        # Cada receta aporta sus cantidades tantas veces como experimentos la usan
+        for fila in self.consultas.ejecutar(Consulta("experimentos").agrupar("receta").agregar(cantidad=("contar",))):
+            for reactivo_info in self.recetas_por_id[fila["receta"]].reactivos:
+                nombre = reactivo_info["reactivo"].nombre
+                reactivos_usados[nombre] = reactivos_usados.get(nombre, 0) + reactivo_info["cantidad"] * fila["cantidad"]
 
         if not reactivos_usados:
             print("\nNo hay datos de reactivos utilizados.")
@@ -1253,47 +3275,37 @@ class App:
         for i, (reactivo, cantidad) in enumerate(top_reactivos[:5], start=1):
             print(f"{i}. {reactivo}: {cantidad} unidades utilizadas")
 
+    @instrumentar("estadistica_mayor_desperdicio")
     def estadistica_mayor_desperdicio(self):
         """
         Muestra los 3 reactivos con mayor desperdicio en los experimentos.
-        """
-        desperdicio_reactivos = {}
-
-        # Calcular el desperdicio de cada reactivo en los experimentos
-        for experimento in self.experimentos:
-            for reactivo_info in experimento.receta.reactivos:
-                reactivo = reactivo_info["reactivo"]
-                cantidad = reactivo_info["cantidad"]
-                desperdicio = cantidad * random.uniform(0.01, 0.3)  # Simulación de desperdicio (1% a 30%)
 
-                if reactivo.nombre in desperdicio_reactivos:
-                    desperdicio_reactivos[reactivo.nombre] += desperdicio
-                else:
-                    desperdicio_reactivos[reactivo.nombre] = desperdicio
+        El desperdicio es la diferencia entre lo descontado y lo que indicaba la receta,
+        acumulada en el libro de consumos cada vez que se realiza un experimento.
+        """
+        top_despilfarro = self.consumos.mayor_desperdicio(3)
 
-        if not desperdicio_reactivos:
+        if not top_despilfarro:
             print("\nNo hay datos de desperdicio de reactivos.")
             return
 
-        # Convertir a lista de tuplas y ordenar por mayor desperdicio en orden descendente
-        top_despilfarro = sorted(desperdicio_reactivos.items(), key=lambda x: x[1], reverse=True)
-
         print("\n===== TOP 3 REACTIVOS CON MAYOR DESPERDICIO =====")
 
         # Mostrar los 3 reactivos con más desperdicio
-        for i, (reactivo, cantidad) in enumerate(top_despilfarro[:3], start=1):
-            print(f"{i}. {reactivo}: {cantidad:.2f} unidades desperdiciadas")
+        for i, (id_reactivo, cantidad) in enumerate(top_despilfarro, start=1):
+            reactivo = self.reactivos_por_id.get(id_reactivo)
+            nombre = reactivo.nombre if reactivo else f"Reactivo {id_reactivo} (eliminado)"
+            print(f"{i}. {nombre}: {cantidad:.2f} unidades desperdiciadas")
 
+    @instrumentar("estadistica_reactivos_vencidos")
     def estadistica_reactivos_vencidos(self):
         """
         Muestra los reactivos que han vencido según la fecha de caducidad.
         """
-        vencidos = []
-
         # Buscar reactivos cuya fecha de caducidad haya pasado
-        for reactivo in self.reactivos:
-            if reactivo.fecha_caducidad != "No aplica" and reactivo.fecha_caducidad < str(datetime.today().date()):
-                vencidos.append(reactivo)
+        vencidos = self.consultas.filtrar(
+            Consulta("reactivos").donde("fecha_caducidad", "!=", "No aplica").donde("fecha_caducidad", "<", str(datetime.today().date()))
+        )
 
         if not vencidos:
             print("\nNo hay reactivos vencidos.")
@@ -1304,22 +3316,264 @@ class App:
             print(f"{reactivo.nombre} - Venció el {reactivo.fecha_caducidad}")
 
 
+    @instrumentar("estadistica_experimentos_fallidos")
     def estadistica_experimentos_fallidos(self):
         """
-        Cuenta cuántos experimentos no se pudieron realizar por falta de inventario de reactivos.
+        Cuenta cuántas veces no se pudo crear o realizar un experimento por falta de inventario o reactivos caducados.
+
+        Los intentos rechazados se registran en el momento en que ocurren, por lo que el conteo no cambia con el inventario.
+        """
+        print(f"\n===== EXPERIMENTOS NO REALIZADOS POR FALTA DE REACTIVOS =====")
+        print(f"Total: {self.fallos.total}")
+        for motivo, cantidad in self.fallos.por_motivo.items():
+            print(f"  - Por {motivo}: {cantidad}")
+
+        if self.fallos.total:
+            print("\nRecetas con más intentos rechazados:")
+            for id_receta, cantidad in heapq.nlargest(3, self.fallos.por_receta.items(), key=lambda x: x[1]):
+                receta = self.recetas_por_id.get(id_receta)
+                print(f"  - {receta.nombre if receta else f'Receta {id_receta} (eliminada)'}: {cantidad}")
+
+            print("Reactivos que más impidieron experimentos:")
+            for id_reactivo, cantidad in heapq.nlargest(3, self.fallos.por_reactivo.items(), key=lambda x: x[1]):
+                reactivo = self.reactivos_por_id.get(id_reactivo)
+                print(f"  - {reactivo.nombre if reactivo else f'Reactivo {id_reactivo} (eliminado)'}: {cantidad}")
+
+    def conteo_validez(self, desde=None, hasta=None):
         """
-        fallidos = 0
+        Cuenta los resultados dentro de parámetros por receta, incluyendo el histórico archivado.
 
-        # Contar experimentos fallidos debido a falta de reactivos
-        for experimento in self.experimentos:
-            for reactivo_info in experimento.receta.reactivos:
-                reactivo = reactivo_info["reactivo"]
-                cantidad = reactivo_info["cantidad"]
+        :param desde: Fecha inicial "YYYY-MM-DD" (inclusive), o None.
+        :param hasta: Fecha final "YYYY-MM-DD" (inclusive), o None.
+        :return: Diccionario {ID de receta: (total, dentro de parámetros)}.
+        """
+        # Resultados archivados: solo se leen los registros del rango de fechas
+        conteo = self.archivo_resultados.resumen_validez(desde, hasta)
+
+        # Resultados en memoria, a través del índice por fecha
+        consulta = Consulta("resultados").agrupar("receta").agregar(total=("contar",), validos=("suma", "valido"))
+        if desde is not None or hasta is not None:
+            consulta.donde("fecha", "entre", (desde, hasta))
+        for fila in self.consultas.ejecutar(consulta):
+            total, validos = conteo.get(fila["receta"], (0, 0))
+            conteo[fila["receta"]] = (total + fila["total"], validos + fila["validos"])
+        return conteo
+
+    @instrumentar("estadistica_resultados_validos")
+    def estadistica_resultados_validos(self, desde=None, hasta=None, preguntar=True):
+        """
+        Muestra el porcentaje de resultados dentro de parámetros por receta, incluyendo el histórico archivado.
 
-                if reactivo.inventario < cantidad:
-                    fallidos += 1
-                    break  # Si un reactivo falta, no es necesario revisar los demás
+        :param desde: Fecha inicial "YYYY-MM-DD" (inclusive), o None.
+        :param hasta: Fecha final "YYYY-MM-DD" (inclusive), o None.
+        :param preguntar: True para solicitar el rango de fechas al usuario.
+        """
+        if preguntar:
+            desde = input("\nFecha inicial (YYYY-MM-DD) o vacío: ").strip() or None
+            hasta = input("Fecha final (YYYY-MM-DD) o vacío: ").strip() or None
 
-        print(f"\n===== EXPERIMENTOS NO REALIZADOS POR FALTA DE REACTIVOS =====")
-        print(f"Total: {fallidos}")
+        conteo = self.conteo_validez(desde, hasta)
+        if not conteo:
+            print("\nNo hay resultados en ese período.")
+            return
+
+        print("\n===== RESULTADOS DENTRO DE PARÁMETROS POR RECETA =====")
+        for id_receta, (total, validos) in sorted(conteo.items(), key=lambda x: x[1][1] / x[1][0]):
+            receta = self.recetas_por_id.get(id_receta)
+            nombre = receta.nombre if receta else f"Receta {id_receta} (eliminada)"
+            print(f"{nombre}: {validos}/{total} ({validos / total * 100:.1f}%)")
+
+    @instrumentar("estadistica_mediciones_fuera_de_rango")
+    def estadistica_mediciones_fuera_de_rango(self, cantidad=5):
+        """
+        Muestra las mediciones que más quedan fuera de rango, en total y por receta, incluyendo el histórico archivado.
+
+        Los contadores se mantienen al registrar y quitar resultados, por lo que no se recorren los resultados.
+
+        :param cantidad: Cantidad de mediciones a mostrar en cada ranking.
+        """
+        ranking = self.tasas_fallo.ranking(cantidad)
+        if not ranking:
+            print("\nNo hay mediciones fuera de rango.")
+            return
+
+        print("\n===== MEDICIONES QUE MÁS QUEDAN FUERA DE RANGO =====")
+        for medicion, evaluaciones, fuera, unicas in ranking:
+            print(f"{medicion}: {fuera}/{evaluaciones} fuera de rango ({fuera / evaluaciones * 100:.1f}%), "
+                  f"única causa del fallo en {unicas}")
+
+        print("\nPor receta (porcentaje de los resultados fallidos de la receta en que participa):")
+        tasas = self.tasas_fallo.tasas_por_receta()
+        for (id_receta, medicion), evaluaciones, fuera, unicas in self.tasas_fallo.ranking(cantidad, por_receta=True):
+            receta = self.recetas_por_id.get(id_receta)
+            nombre = receta.nombre if receta else f"Receta {id_receta} (eliminada)"
+            fallidos = tasas[id_receta][1]
+            print(f"{nombre} - {medicion}: {fuera}/{evaluaciones} fuera de rango ({fuera / evaluaciones * 100:.1f}%), "
+                  f"{fuera / fallidos * 100:.1f}% de sus fallos")
+
+    def pronosticar_agotamiento(self, hoy=None, horizonte=365):
+        """
+        Pronostica cuándo se agota cada reactivo según su consumo reciente y los experimentos planificados.
+
+        El consumo pasado se lee del libro de consumos, con la fecha en que se descontó realmente
+        del inventario. Los experimentos planificados son los de fecha futura que aún no se realizaron
+        (se obtienen del índice por fecha) y consumen lo que indica su receta.
+
+        :param hoy: Fecha de referencia (date); si es None se usa la fecha actual.
+        :param horizonte: Cantidad de días futuros de experimentos planificados que se consideran.
+        :return: Tupla (lista de reactivos, arreglo de tasas diarias, arreglo de días hasta el agotamiento).
+        """
+        # Los experimentos planificados se buscan por el índice de fechas, que requiere los objetos
+        self.asegurar("experimentos")
+        hoy = hoy or datetime.today().date()
+        modelo = PronosticoAgotamiento()
+        posicion = {reactivo.id: i for i, reactivo in enumerate(self.reactivos)}
+
+        historial = [], [], []
+        desde = hoy - timedelta(weeks=modelo.semanas) + timedelta(days=1)
+        for dia, id_reactivo, cantidad in self.consumos.consumos_por_dia(str(desde), str(hoy)):
+            if id_reactivo in posicion:
+                historial[0].append(posicion[id_reactivo])
+                historial[1].append((hoy - date.fromisoformat(dia)).days)
+                historial[2].append(cantidad)
+
+        planificados = [], [], []
+        indice_fecha = self.indices_experimentos["fecha"]
+        inicio, fin = indice_fecha.rango(str(hoy + timedelta(days=1)), str(hoy + timedelta(days=horizonte)))
+        for fecha, id_experimento in indice_fecha.entradas[inicio:fin]:
+            experimento = self.experimentos_por_id[id_experimento]
+            if experimento.consumo_real:
+                continue  # Ya se realizó: su consumo está en el libro
+            for item in experimento.receta.reactivos:
+                if item["reactivo"].id in posicion:
+                    planificados[0].append(posicion[item["reactivo"].id])
+                    planificados[1].append((date.fromisoformat(fecha) - hoy).days)
+                    planificados[2].append(item["cantidad"])
+
+        inventario = np.fromiter((reactivo.inventario for reactivo in self.reactivos), dtype=float, count=len(self.reactivos))
+        tasas, dias = modelo.pronosticar(inventario, historial, planificados)
+        return self.reactivos, tasas, dias
+
+    @instrumentar("estadistica_agotamiento", elementos=lambda app, _: len(app.reactivos))
+    def estadistica_agotamiento(self, cantidad=15):
+        """
+        Muestra los reactivos que se agotarán primero según el pronóstico de consumo.
+
+        :param cantidad: Cantidad de reactivos a mostrar.
+        """
+        reactivos, tasas, dias = self.pronosticar_agotamiento()
+        hoy = datetime.today().date()
+
+        proximos = np.argsort(dias)[:cantidad]
+        proximos = [i for i in proximos if np.isfinite(dias[i])]
+        if not proximos:
+            print("\nNingún reactivo se agotará según el consumo actual y los experimentos planificados.")
+            return
+
+        print("\n===== PRÓXIMOS REACTIVOS EN AGOTARSE =====")
+        for i in proximos:
+            reactivo = reactivos[i]
+            fecha = hoy + timedelta(days=int(dias[i]))
+            linea = (f"{reactivo.nombre}: se agota el {fecha} (en {dias[i]:.0f} días, "
+                     f"{reactivo.inventario:.2f} {reactivo.unidad_medida} disponibles, consumo de {tasas[i]:.2f}/día)")
+            if reactivo.fecha_caducidad not in (None, "No aplica") and reactivo.fecha_caducidad < str(fecha):
+                linea += f" - vence antes, el {reactivo.fecha_caducidad}"
+            print(linea)
+
+    def elegir_opcion(self, titulo, opciones):
+        """
+        Muestra una lista de opciones numeradas y retorna la elegida.
+
+        :param titulo: Título de la lista.
+        :param opciones: Lista de textos de las opciones.
+        :return: Posición (desde 0) de la opción elegida.
+        """
+        print(f"\n{titulo}")
+        for i, opcion in enumerate(opciones, start=1):
+            print(f"{i}. {opcion}")
+        seleccion = input("Seleccione una opción: ").strip()
+        while not seleccion.isnumeric() or int(seleccion) not in range(1, len(opciones) + 1):
+            print("Error: Ingrese un número válido de la lista.")
+            seleccion = input("Seleccione una opción: ").strip()
+        return int(seleccion) - 1
+
+    def nombre_de_grupo(self, dimension, grupo):
+        """
+        Obtiene el nombre a mostrar de un grupo de las estadísticas por período.
+
+        :param dimension: "investigador", "receta" o "reactivo".
+        :param grupo: Nombre del investigador o ID de la receta o del reactivo.
+        :return: Nombre del grupo.
+        """
+        if dimension == "receta":
+            receta = self.recetas_por_id.get(grupo)
+            return receta.nombre if receta else f"Receta {grupo} (eliminada)"
+        if dimension == "reactivo":
+            reactivo = self.reactivos_por_id.get(grupo)
+            return reactivo.nombre if reactivo else f"Reactivo {grupo} (eliminado)"
+        return grupo
+
+    @instrumentar("estadistica_por_periodo")
+    def estadistica_por_periodo(self, metrica=None, periodo=None, desde=None, hasta=None, dimension=None, ventana=None):
+        """
+        Muestra una métrica del laboratorio por día, semana o mes, o desglosada por investigador, receta o reactivo.
+
+        Si no se indica la métrica se solicitan todos los parámetros al usuario.
+
+        :param metrica: "experimentos", "costo", "consumo" o "aprobacion".
+        :param periodo: "dia", "semana" o "mes".
+        :param desde: Fecha inicial "YYYY-MM-DD" (inclusive), o None.
+        :param hasta: Fecha final "YYYY-MM-DD" (inclusive), o None.
+        :param dimension: None para la serie total, o "investigador", "receta" o "reactivo" para el desglose.
+        :param ventana: Cantidad de períodos de la ventana móvil, o None.
+        """
+        metricas = {
+            "experimentos": ("Experimentos realizados", self.series_experimentos, "experimentos", None),
+            "costo": ("Costo total", self.series_experimentos, "costo", None),
+            "consumo": ("Consumo de reactivos (unidades)", self.series_experimentos, "consumo", None),
+            "aprobacion": ("Resultados dentro de parámetros (%)", self.series_resultados, "validos", "resultados")
+        }
+        dimensiones = [None, "investigador", "receta", "reactivo"]
+
+        if metrica is None:
+            metrica = list(metricas)[self.elegir_opcion("===== MÉTRICA =====", [m[0] for m in metricas.values()])]
+            periodo = SerieTemporal.PERIODOS[self.elegir_opcion("===== PERÍODO =====", ["Día", "Semana", "Mes"])]
+            desde = input("\nFecha inicial (YYYY-MM-DD) o vacío: ").strip() or None
+            hasta = input("Fecha final (YYYY-MM-DD) o vacío: ").strip() or None
+            dimension = dimensiones[self.elegir_opcion("===== DESGLOSE =====", ["Sin desglose", "Por investigador", "Por receta", "Por reactivo"])]
+            if dimension is None:
+                ventana = input("Períodos de la ventana móvil (vacío para no calcularla): ").strip()
+                ventana = int(ventana) if ventana.isnumeric() and int(ventana) > 0 else None
+
+        titulo, serie_temporal, nombre, denominador = metricas[metrica]
+        escala = 100 if denominador else 1
+
+        def valor(datos):
+            if denominador:
+                return datos.get(nombre, 0) / datos[denominador] * escala if datos.get(denominador) else 0
+            return datos.get(nombre, 0)
+
+        if dimension is not None:
+            desglose = serie_temporal.desglose(dimension, desde, hasta)
+            filas = [(grupo, valor(datos)) for grupo, datos in desglose.items() if any(datos.values())]
+            if not filas:
+                print("\nNo hay datos en ese período.")
+                return
+            print(f"\n===== {titulo.upper()} POR {dimension.upper()} =====")
+            for grupo, total in sorted(filas, key=lambda x: x[1], reverse=True)[:15]:
+                print(f"{self.nombre_de_grupo(dimension, grupo)}: {total:.2f}")
+            return
+
+        serie = serie_temporal.serie(periodo, desde, hasta)
+        if not serie:
+            print("\nNo hay datos en ese período.")
+            return
+
+        moviles = dict(SerieTemporal.ventana_movil(serie, ventana, nombre, denominador)) if ventana else {}
+        print(f"\n===== {titulo.upper()} POR {periodo.upper()} =====")
+        for etiqueta, datos in serie:
+            linea = f"{etiqueta}: {valor(datos):.2f}"
+            if ventana:
+                linea += f" (ventana de {ventana}: {moviles[etiqueta] * escala:.2f})"
+            print(linea)
 
@@ -0,0 +1,382 @@
+import json
+import os
+
+import numpy as np
+
+from Resultado import Resultado
+
+
+class ArchivoResultados:
+    """
+    Archivo histórico de resultados en disco, de solo agregado y con registros de tamaño fijo.
+
+    Los registros se leen a través de `mmap` (numpy.memmap), por lo que solo se cargan en
+    memoria las páginas que se consultan. Se mantienen dos índices persistentes, por ID de
+    experimento y por fecha, guardados como arreglos ordenados de (clave, posición).
+    """
+
+    MAX_MEDICIONES = 4
+    REGISTRO = np.dtype([
+        ("id", "<i8"), ("experimento", "<i8"), ("receta", "<i8"), ("fecha", "<i4"),
+        ("valido", "u1"), ("borrado", "u1"), ("cantidad", "u1"), ("relleno", "u1", (3,)),
+        ("medicion", "<u2", (MAX_MEDICIONES,)), ("valor", "<f8", (MAX_MEDICIONES,)),
+        ("minimo", "<f8", (MAX_MEDICIONES,)), ("maximo", "<f8", (MAX_MEDICIONES,))
+    ])
+    INDICES = ("experimento", "fecha")
+
+    def __init__(self, base="historico"):
+        """
+        Inicializa el archivo y lo abre si ya existe.
+
+        :param base: Ruta base de los archivos (sin extensión).
+        """
+        self.ruta_registros = f"{base}.dat"
+        self.ruta_metadatos = f"{base}_meta.json"
+        self.rutas_indices = {nombre: f"{base}_{nombre}.npy" for nombre in self.INDICES}
+        self.nombres = []  # Nombres de las mediciones; el código de cada una es su posición
+        self.codigos = {}  # {nombre de medición: código}
+        self.ultimo_id = 0  # Mayor ID de resultado archivado
+        self.registros = None  # numpy.memmap de solo lectura con los registros
+        self.indices = {}  # {nombre: arreglo (2, n) con las claves ordenadas y sus posiciones}
+        self.abrir()
+
+    @staticmethod
+    def fecha_a_entero(fecha):
+        """
+        Convierte una fecha "YYYY-MM-DD" en un entero YYYYMMDD que conserva el orden.
+
+        :param fecha: Fecha en texto.
+        :return: Entero, o 0 si la fecha no es válida.
+        """
+        try:
+            return int(str(fecha).replace("-", "")[:8])
+        except ValueError:
+            return 0
+
+    def abrir(self):
+        """
+        Mapea los archivos existentes y completa los índices si quedaron desactualizados.
+        """
+        self.cerrar()
+        if os.path.exists(self.ruta_metadatos):
+            with open(self.ruta_metadatos, "r", encoding="utf-8") as f:
+                metadatos = json.load(f)
+            self.nombres = metadatos["mediciones"]
+            self.ultimo_id = metadatos["ultimo_id"]
+            self.codigos = {nombre: codigo for codigo, nombre in enumerate(self.nombres)}
+
+        if os.path.exists(self.ruta_registros) and os.path.getsize(self.ruta_registros) >= self.REGISTRO.itemsize:
+            self.registros = np.memmap(self.ruta_registros, dtype=self.REGISTRO, mode="r")
+
+        for nombre, ruta in self.rutas_indices.items():
+            if os.path.exists(ruta):
+                self.indices[nombre] = np.load(ruta, mmap_mode="r")
+
+        # Un índice con menos entradas que registros indica una escritura interrumpida
+        if any(self.indices.get(nombre, np.empty((2, 0))).shape[1] != len(self) for nombre in self.INDICES):
+            self.actualizar_indices()
+
+    def cerrar(self):
+        """
+        Libera los mapeos a memoria (necesario antes de reescribir los archivos).
+        """
+        self.registros = None
+        self.indices = {}
+
+    def __len__(self):
+        """
+        Retorna la cantidad de registros archivados (incluidos los marcados como borrados).
+        """
+        return 0 if self.registros is None else len(self.registros)
+
+    def archivar(self, resultados):
+        """
+        Agrega resultados al final del archivo y actualiza los índices.
+
+        :param resultados: Lista de objetos Resultado.
+        :return: Lista de los resultados archivados (los que tienen más de `MAX_MEDICIONES` mediciones se omiten).
+        """
+        resultados = [r for r in resultados if len(r.valores_obtenidos) <= self.MAX_MEDICIONES]
+        if not resultados:
+            return []
+
+        registros = np.zeros(len(resultados), dtype=self.REGISTRO)
+        registros["id"] = [r.id for r in resultados]
+        registros["experimento"] = [r.experimento.id for r in resultados]
+        registros["receta"] = [r.experimento.receta.id for r in resultados]
+        registros["fecha"] = [self.fecha_a_entero(r.experimento.fecha) for r in resultados]
+        registros["valido"] = [bool(r.valido) for r in resultados]
+        registros["cantidad"] = [len(r.valores_obtenidos) for r in resultados]
+        registros["minimo"] = np.nan
+        registros["maximo"] = np.nan
+
+        for i, r in enumerate(resultados):
+            for j, (medicion, valor) in enumerate(r.valores_obtenidos.items()):
+                if medicion not in self.codigos:
+                    self.codigos[medicion] = len(self.nombres)
+                    self.nombres.append(medicion)
+                minimo, maximo = r.valores_aceptables.get(medicion, (None, None))
+                registros["medicion"][i, j] = self.codigos[medicion]
+                registros["valor"][i, j] = valor
+                registros["minimo"][i, j] = np.nan if minimo is None else minimo
+                registros["maximo"][i, j] = np.nan if maximo is None else maximo
+
+        self.cerrar()
+        with open(self.ruta_registros, "ab") as f:
+            f.write(registros.tobytes())
+
+        self.ultimo_id = max(self.ultimo_id, int(registros["id"].max()))
+        temporal = f"{self.ruta_metadatos}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({"mediciones": self.nombres, "ultimo_id": self.ultimo_id}, f, ensure_ascii=False)
+        os.replace(temporal, self.ruta_metadatos)
+
+        self.abrir()  # Vuelve a mapear el archivo y agrega los nuevos registros a los índices
+        return resultados
+
+    def actualizar_indices(self):
+        """
+        Agrega a los índices los registros que todavía no están indexados y los guarda en disco.
+        """
+        for nombre, ruta in self.rutas_indices.items():
+            indice = np.array(self.indices.get(nombre, np.empty((2, 0), dtype=np.int64)))
+            if indice.shape[1] > len(self):
+                indice = np.empty((2, 0), dtype=np.int64)  # Índice inconsistente: se reconstruye completo
+
+            desde = indice.shape[1]
+            if desde == len(self):
+                continue  # Índice al día: no hace falta reescribirlo
+
+            # Solo se ordena el bloque nuevo y se intercala en el índice ya ordenado; con side="right"
+            # los registros nuevos quedan después de los existentes con la misma clave
+            nuevos = np.array(self.registros[nombre][desde:], dtype=np.int64)
+            orden = np.argsort(nuevos, kind="stable")
+            bloque = np.vstack([nuevos[orden], np.arange(desde, len(self), dtype=np.int64)[orden]])
+            indice = np.insert(indice, np.searchsorted(indice[0], bloque[0], side="right"), bloque, axis=1)
+
+            temporal = f"{ruta}.tmp.npy"
+            np.save(temporal, indice)
+            self.indices.pop(nombre, None)
+            os.replace(temporal, ruta)
+            self.indices[nombre] = np.load(ruta, mmap_mode="r")
+
+    def posiciones(self, nombre, desde=None, hasta=None):
+        """
+        Busca en un índice las posiciones de los registros cuya clave está entre dos límites.
+
+        :param nombre: Nombre del índice ("experimento" o "fecha").
+        :param desde: Límite inferior (inclusive), o None. Las fechas se indican como "YYYY-MM-DD".
+        :param hasta: Límite superior (inclusive), o None.
+        :return: Arreglo de posiciones (vista del índice mapeado, sin copiarlo).
+        """
+        indice = self.indices.get(nombre)
+        if indice is None:
+            return np.empty(0, dtype=np.int64)
+        if nombre == "fecha":
+            desde = None if desde is None else self.fecha_a_entero(desde)
+            hasta = None if hasta is None else self.fecha_a_entero(hasta)
+
+        claves = indice[0]
+        inicio = 0 if desde is None else int(np.searchsorted(claves, desde, side="left"))
+        fin = len(claves) if hasta is None else int(np.searchsorted(claves, hasta, side="right"))
+        return indice[1, inicio:fin]
+
+    def ids_de_experimento(self, id_experimento):
+        """
+        Busca los IDs de los resultados archivados (no borrados) de un experimento a través del índice.
+
+        :param id_experimento: ID del experimento.
+        :return: Lista de IDs de resultados.
+        """
+        posiciones = self.posiciones("experimento", id_experimento, id_experimento)
+        if self.registros is None or len(posiciones) == 0:
+            return []
+        registros = self.registros[np.sort(posiciones)][["id", "borrado"]]
+        return registros["id"][registros["borrado"] == 0].tolist()
+
+    def leer(self, posiciones, experimentos_por_id):
+        """
+        Convierte registros del archivo en objetos Resultado.
+
+        :param posiciones: Posiciones de los registros a leer.
+        :param experimentos_por_id: Diccionario {id: Experimento} para enlazar cada resultado.
+        :return: Lista de objetos Resultado (se omiten los borrados y los de experimentos inexistentes).
+        """
+        if self.registros is None or len(posiciones) == 0:
+            return []
+
+        resultados = []
+        for registro in self.registros[np.asarray(posiciones)]:  # Solo se leen las páginas de estos registros
+            experimento = experimentos_por_id.get(int(registro["experimento"]))
+            if registro["borrado"] or experimento is None:
+                continue
+            valores_obtenidos = {}
+            valores_aceptables = {}
+            for j in range(registro["cantidad"]):
+                medicion = self.nombres[registro["medicion"][j]]
+                minimo, maximo = float(registro["minimo"][j]), float(registro["maximo"][j])
+                valores_obtenidos[medicion] = float(registro["valor"][j])
+                valores_aceptables[medicion] = (None if np.isnan(minimo) else minimo, None if np.isnan(maximo) else maximo)
+
+            # La validez se deriva de la máscara de fallos recalculada, no del campo archivado
+            resultados.append(Resultado(experimento, valores_obtenidos, valores_aceptables, int(registro["id"])))
+        return resultados
+
+    def iterar(self, experimentos_por_id, tamano_bloque=10000):
+        """
+        Recorre todos los resultados archivados por bloques.
+
+        :param experimentos_por_id: Diccionario {id: Experimento}.
+        :param tamano_bloque: Cantidad de registros leídos a la vez.
+        :return: Generador de objetos Resultado.
+        """
+        for inicio in range(0, len(self), tamano_bloque):
+            yield from self.leer(np.arange(inicio, min(inicio + tamano_bloque, len(self))), experimentos_por_id)
+
+    def marcar_borrados(self, ids_experimentos):
+        """
+        Marca como borrados los resultados de varios experimentos (el archivo es de solo agregado).
+
+        :param ids_experimentos: IDs de los experimentos eliminados.
+        :return: Lista de IDs de los resultados marcados.
+        """
+        if self.registros is None:
+            return []
+        posiciones = [self.posiciones("experimento", id, id) for id in ids_experimentos]
+        posiciones = np.concatenate(posiciones) if posiciones else np.empty(0, dtype=np.int64)
+        if len(posiciones) == 0:
+            return []
+
+        escritura = np.memmap(self.ruta_registros, dtype=self.REGISTRO, mode="r+")
+        escritura["borrado"][posiciones] = 1
+        escritura.flush()
+        del escritura
+        return self.registros["id"][np.sort(posiciones)].tolist()
+
+    def bloques(self, tamano_bloque=100000):
+        """
+        Recorre los registros vigentes (no borrados) por bloques, sin convertirlos en objetos.
+
+        :param tamano_bloque: Cantidad de registros leídos a la vez.
+        :return: Generador de arreglos estructurados con el formato `REGISTRO`.
+        """
+        for inicio in range(0, len(self), tamano_bloque):
+            bloque = np.array(self.registros[inicio:inicio + tamano_bloque])
+            yield bloque[bloque["borrado"] == 0]
+
+    @staticmethod
+    def mascaras_fallos(bloque):
+        """
+        Calcula la máscara de mediciones fuera de rango de cada registro (como `Resultado.fallos`).
+
+        :param bloque: Arreglo estructurado con el formato `REGISTRO`.
+        :return: Arreglo de enteros; el bit j indica que la medición j del registro está fuera de rango.
+        """
+        valor, minimo, maximo = bloque["valor"], bloque["minimo"], bloque["maximo"]
+        # Como en `Resultado`, solo se evalúan las mediciones usadas que tienen mínimo y máximo
+        evaluadas = (np.arange(ArchivoResultados.MAX_MEDICIONES) < bloque["cantidad"][:, None]) & ~np.isnan(minimo) & ~np.isnan(maximo)
+        fuera = evaluadas & ~((minimo <= valor) & (valor <= maximo))
+        return fuera @ (1 << np.arange(ArchivoResultados.MAX_MEDICIONES))
+
+    def resumen_validez(self, desde=None, hasta=None):
+        """
+        Cuenta los resultados archivados dentro de parámetros por receta.
+
+        Con un rango de fechas solo se leen los registros de ese rango a través del índice.
+
+        :param desde: Fecha inicial "YYYY-MM-DD" (inclusive), o None.
+        :param hasta: Fecha final "YYYY-MM-DD" (inclusive), o None.
+        :return: Diccionario {ID de receta: (total, dentro de parámetros)}.
+        """
+        if self.registros is None:
+            return {}
+        if desde is None and hasta is None:
+            columnas = self.registros[["receta", "valido", "borrado"]]
+        else:
+            columnas = self.registros[np.sort(self.posiciones("fecha", desde, hasta))][["receta", "valido", "borrado"]]
+
+        vigentes = columnas["borrado"] == 0
+        recetas, inversos = np.unique(columnas["receta"][vigentes], return_inverse=True)
+        totales = np.bincount(inversos, minlength=len(recetas))
+        validos = np.bincount(inversos, weights=columnas["valido"][vigentes], minlength=len(recetas))
+        return {int(r): (int(t), int(v)) for r, t, v in zip(recetas, totales, validos)}
+
+
+class VistaArchivo:
+    """
+    Vista por páginas de los resultados archivados, compatible con `App.navegar`.
+
+    Se puede filtrar por experimento y por rango de fechas; cada página lee solo sus registros.
+    """
+
+    def __init__(self, archivo, experimentos_por_id, tamano_pagina=10):
+        """
+        Inicializa la vista.
+
+        :param archivo: Objeto ArchivoResultados.
+        :param experimentos_por_id: Diccionario {id: Experimento}.
+        :param tamano_pagina: Cantidad de resultados por página.
+        """
+        self.archivo = archivo
+        self.experimentos_por_id = experimentos_por_id
+        self.tamano_pagina = tamano_pagina
+        self.indices = {nombre: None for nombre in ArchivoResultados.INDICES}  # Filtros disponibles
+        self.experimento = None
+        self.fechas = None
+
+    def filtrar(self, nombre, valor):
+        """
+        Filtra por ID de experimento.
+        """
+        self.experimento = int(valor)
+
+    def filtrar_rango(self, nombre, desde, hasta):
+        """
+        Filtra por rango de fechas.
+        """
+        self.fechas = (desde, hasta)
+
+    def limpiar_filtros(self):
+        """
+        Elimina todos los filtros.
+        """
+        self.experimento = None
+        self.fechas = None
+
+    def descripcion_filtros(self):
+        """
+        Describe los filtros activos.
+        """
+        partes = []
+        if self.experimento is not None:
+            partes.append(f"experimento = {self.experimento}")
+        if self.fechas is not None:
+            partes.append(f"fecha entre {self.fechas[0] or '...'} y {self.fechas[1] or '...'}")
+        return ", ".join(partes)
+
+    def pagina(self, cursor=None):
+        """
+        Obtiene una página de resultados archivados.
+
+        :param cursor: Posición en el recorrido donde empieza la página, o None para la primera.
+        :return: Tupla (lista de objetos Resultado, cursor de la página siguiente o None).
+        """
+        if self.experimento is not None:
+            secuencia = self.archivo.posiciones("experimento", self.experimento, self.experimento)
+        elif self.fechas is not None:
+            secuencia = self.archivo.posiciones("fecha", *self.fechas)
+        else:
+            secuencia = range(len(self.archivo) - 1, -1, -1)  # Los más recientes primero
+
+        posicion = cursor or 0
+        elementos = []
+        while posicion < len(secuencia) and len(elementos) < self.tamano_pagina:
+            bloque = np.asarray(secuencia[posicion:posicion + self.tamano_pagina - len(elementos)])
+            posicion += len(bloque)
+            for resultado in self.archivo.leer(bloque, self.experimentos_por_id):
+                desde, hasta = self.fechas or (None, None)
+                fecha = resultado.experimento.fecha
+                if (desde is None or desde <= fecha) and (hasta is None or fecha <= hasta):
+                    elementos.append(resultado)
+
+        return elementos, (posicion if posicion < len(secuencia) else None)
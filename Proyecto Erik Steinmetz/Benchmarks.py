@@ -0,0 +1,320 @@
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+from App import App
+from BusEventos import Modificado
+from Consulta import Consulta
+from Serializador import disponibles
+from Reactivo import Reactivo
+from Conversion import Conversion
+from Receta import Receta
+from Medicion import Medicion
+from Experimento import Experimento
+from Resultado import Resultado
+
+
+def generar_laboratorio(reactivos=2000, recetas=300, experimentos=50000, resultados_por_experimento=2, semilla=1):
+    """
+    Genera una aplicación con datos sintéticos para medir el rendimiento.
+
+    :param reactivos: Cantidad de reactivos.
+    :param recetas: Cantidad de recetas (cada una usa 3 reactivos y 2 mediciones).
+    :param experimentos: Cantidad de experimentos.
+    :param resultados_por_experimento: Cantidad de resultados registrados por experimento.
+    :param semilla: Semilla de los números aleatorios, para repetir las mediciones.
+    :return: Objeto App con los datos registrados.
+    """
+    aleatorio = random.Random(semilla)
+    app = App()
+    categorias = ["ácidos", "bases", "sales", "solventes", "indicadores"]
+    investigadores = ["Ana", "Luis", "Eva", "Marta", "Pedro", "Sofía"]
+
+    for i in range(1, reactivos + 1):
+        app.registrar_reactivo(Reactivo(
+            i, f"Reactivo {i}", f"Descripción del reactivo {i}", round(aleatorio.uniform(0.5, 20), 2),
+            aleatorio.choice(categorias), 100000.0, "g", f"202{aleatorio.randint(4, 8)}-0{aleatorio.randint(1, 9)}-15",
+            50, [Conversion("kg", 0.001), Conversion("mg", 1000)]
+        ))
+
+    for j in range(1, recetas + 1):
+        reactivos_receta = [
+            {"reactivo": aleatorio.choice(app.reactivos), "cantidad": round(aleatorio.uniform(1, 10), 1), "unidad": "g"}
+            for _ in range(3)
+        ]
+        mediciones = [
+            Medicion("rendimiento", "(masa_final / masa_inicial) * 100", 50, 100),
+            Medicion("ph", "ph", 6, 8)
+        ]
+        app.registrar_receta(Receta(j, f"Receta {j}", f"Objetivo de síntesis {j}", reactivos_receta,
+                                    ["Mezclar", "Calentar", "Medir"], mediciones))
+
+    for e in range(1, experimentos + 1):
+        experimento = Experimento(
+            e, aleatorio.choice(app.recetas), aleatorio.sample(investigadores, aleatorio.randint(1, 2)),
+            f"202{aleatorio.randint(3, 6)}-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1, 28):02d}"
+        )
+        experimento.costo = round(aleatorio.uniform(5, 500), 2)
+        app.registrar_experimento(experimento)
+
+        for _ in range(resultados_por_experimento):
+            valores_aceptables = {m.nombre: (m.minimo, m.maximo) for m in experimento.receta.valores_a_medir}
+            valores_obtenidos = {
+                "rendimiento": round(aleatorio.uniform(40, 100), 2),
+                "ph": round(aleatorio.uniform(5.5, 8.5), 2)
+            }
+            app.registrar_resultado(Resultado(experimento, valores_obtenidos, valores_aceptables))
+
+    return app
+
+
+def medir(funcion, repeticiones=1):
+    """
+    Mide el menor tiempo de varias ejecuciones de una función, sin mostrar lo que imprime.
+
+    :param funcion: Función sin argumentos a medir.
+    :param repeticiones: Cantidad de ejecuciones.
+    :return: Tupla (menor tiempo en segundos, valor retornado por la última ejecución).
+    """
+    mejor = float("inf")
+    valor = None
+    for _ in range(repeticiones):
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            valor = funcion()
+            mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, valor
+
+
+def comparar_tiempo_hasta_menu(app, repeticiones=3):
+    """
+    Compara el tiempo de carga desde JSON (con y sin la caché de derivados) y desde el snapshot binario.
+
+    Los archivos se escriben en una carpeta temporal, ya que la aplicación usa rutas fijas.
+
+    :param app: Aplicación con los datos a guardar.
+    :param repeticiones: Cantidad de cargas de cada formato (se toma la más rápida).
+    :return: Diccionario {formato: segundos}.
+    """
+    carpeta_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as carpeta:
+        os.chdir(carpeta)
+        try:
+            tiempos = {
+                "guardar_json": medir(app.guardar_datos_json)[0],
+                "guardar_snapshot": medir(app.guardar_snapshot)[0],
+                "cargar_json": medir(lambda: App().cargar_datos_json(), repeticiones)[0],
+                "cargar_snapshot": medir(lambda: App().cargar_snapshot(), repeticiones)[0]
+            }
+            os.remove(app.derivados.ruta)
+            tiempos["cargar_json_sin_derivados"] = medir(lambda: App().cargar_datos_json(), repeticiones)[0]
+        finally:
+            os.chdir(carpeta_original)
+    return tiempos
+
+
+def conteos_con_bucles(app):
+    """
+    Calcula los conteos de las estadísticas recorriendo las listas, como antes de la capa de consultas.
+
+    :param app: Aplicación con los datos.
+    :return: Tupla (experimentos por investigador, experimentos por receta, resultados y válidos por receta).
+    """
+    investigadores = {}
+    por_receta = {}
+    for experimento in app.experimentos:
+        for responsable in experimento.responsables:
+            investigadores[responsable] = investigadores.get(responsable, 0) + 1
+        por_receta[experimento.receta.id] = por_receta.get(experimento.receta.id, 0) + 1
+
+    validez = {}
+    for resultado in app.resultados:
+        total, validos = validez.get(resultado.experimento.receta.id, (0, 0))
+        validez[resultado.experimento.receta.id] = (total + 1, validos + (1 if resultado.valido else 0))
+    return investigadores, por_receta, validez
+
+
+def conteos_con_consultas(app):
+    """
+    Calcula los mismos conteos que `conteos_con_bucles` a través del motor de consultas.
+    """
+    investigadores = app.consultas.ejecutar(Consulta("experimentos").agrupar("responsable").agregar(cantidad=("contar",)))
+    por_receta = app.consultas.ejecutar(Consulta("experimentos").agrupar("receta").agregar(cantidad=("contar",)))
+    validez = app.consultas.ejecutar(
+        Consulta("resultados").agrupar("receta").agregar(total=("contar",), validos=("suma", "valido"))
+    )
+    return (
+        {fila["responsable"]: fila["cantidad"] for fila in investigadores},
+        {fila["receta"]: fila["cantidad"] for fila in por_receta},
+        {fila["receta"]: (fila["total"], fila["validos"]) for fila in validez}
+    )
+
+
+def comparar_consultas(app, repeticiones=3):
+    """
+    Compara las estadísticas calculadas con bucles y con el motor de consultas, y verifica que coincidan.
+
+    :param app: Aplicación con los datos.
+    :param repeticiones: Cantidad de ejecuciones de cada variante (se toma la más rápida).
+    :return: Diccionario {variante: segundos}.
+    """
+    tiempo_bucles, esperado = medir(lambda: conteos_con_bucles(app), repeticiones)
+    tiempo_consultas, obtenido = medir(lambda: conteos_con_consultas(app), repeticiones)
+    if esperado != obtenido:
+        raise AssertionError("El motor de consultas no coincide con los bucles")
+
+    # Un mes de resultados: el índice por fecha evita recorrer la colección completa
+    mes = max(app.experimentos, key=lambda e: e.fecha).fecha[:7]
+    desde, hasta = f"{mes}-01", f"{mes}-31"
+    tiempo_rango_bucle = medir(lambda: sum(
+        1 for r in app.resultados if desde <= r.experimento.fecha <= hasta and r.valido
+    ), repeticiones)[0]
+    tiempo_rango_consulta = medir(lambda: app.consultas.ejecutar(
+        Consulta("resultados").donde("fecha", "entre", (desde, hasta)).donde("valido", "==", True)
+        .agregar(cantidad=("contar",))
+    ), repeticiones)[0]
+
+    return {
+        "bucles": tiempo_bucles, "consultas": tiempo_consultas,
+        "mes_bucle": tiempo_rango_bucle, "mes_consulta": tiempo_rango_consulta
+    }
+
+
+def comparar_serializadores(app, repeticiones=3):
+    """
+    Compara el tiempo de codificación y decodificación y el tamaño de los datos en cada formato disponible.
+
+    :param app: Aplicación con los datos a serializar.
+    :param repeticiones: Cantidad de ejecuciones de cada operación (se toma la más rápida).
+    :return: Diccionario {formato: (segundos al codificar, segundos al decodificar, bytes)}.
+    """
+    datos = {
+        "reactivos": [app.reactivo_a_dict(r) for r in app.reactivos],
+        "recetas": [app.receta_a_dict(r) for r in app.recetas],
+        "experimentos": [app.experimento_a_dict(e) for e in app.experimentos],
+        "resultados": [app.resultado_a_dict(r) for r in app.resultados]
+    }
+
+    tiempos = {}
+    for formato in disponibles():
+        serializador = formato()
+        # Sin el recolector de basura, que recorre los datos ya creados y vuelve ruidosa la medición
+        gc.collect()
+        gc.disable()
+        try:
+            codificar, contenidos = medir(lambda: {n: serializador.codificar(d) for n, d in datos.items()}, repeticiones)
+            decodificar, leidos = medir(lambda: {n: serializador.decodificar(c) for n, c in contenidos.items()}, repeticiones)
+        finally:
+            gc.enable()
+        if leidos["experimentos"][-1]["id"] != datos["experimentos"][-1]["id"]:
+            raise AssertionError(f"El formato {formato.nombre} no recupera los datos")
+        tiempos[formato.nombre] = (codificar, decodificar, sum(len(c) for c in contenidos.values()))
+        del contenidos, leidos
+    return tiempos
+
+
+def ranking_con_bucle(app):
+    """
+    Cuenta las veces que cada medición quedó fuera de rango recorriendo todos los resultados en memoria.
+
+    :return: Diccionario {medición: veces fuera de rango}.
+    """
+    conteo = {}
+    for resultado in app.resultados:
+        for medicion in resultado.mediciones_fuera():
+            conteo[medicion] = conteo.get(medicion, 0) + 1
+    return conteo
+
+
+def comparar_ranking_fallos(app, repeticiones=3):
+    """
+    Compara el ranking de mediciones fuera de rango recorriendo los resultados y con los contadores incrementales.
+
+    :param app: Aplicación con los datos.
+    :param repeticiones: Cantidad de ejecuciones de cada variante (se toma la más rápida).
+    :return: Diccionario {variante: segundos}.
+    """
+    bucle, esperado = medir(lambda: ranking_con_bucle(app), repeticiones)
+    contadores, ranking = medir(lambda: app.tasas_fallo.ranking(5), repeticiones)
+    mayores = sorted(esperado.values(), reverse=True)[:5]
+    if [fuera for _, _, fuera, _ in ranking] != mayores or any(esperado[medicion] != fuera for medicion, _, fuera, _ in ranking):
+        raise AssertionError("El ranking de los contadores no coincide con el de los resultados")
+    return {"bucle": bucle, "contadores": contadores}
+
+
+def costo_eventos(app, emisiones=1000000, repeticiones=3):
+    """
+    Mide cuánto cuesta emitir un evento de modificación, sin suscriptores y con uno que solo los cuenta.
+
+    :param app: Aplicación cuyo bus de eventos se mide (se le quita la suscripción al terminar).
+    :param emisiones: Cantidad de eventos emitidos en cada ejecución.
+    :param repeticiones: Cantidad de ejecuciones (se toma la más rápida).
+    :return: Diccionario {caso: nanosegundos por evento}, incluido el costo del bucle.
+    """
+    reactivo = app.reactivos[0]
+    antes, despues = {"inventario": 10}, {"inventario": 9}
+    emitir = app.eventos.emitir
+
+    def emitir_todos():
+        for _ in range(emisiones):
+            emitir(Modificado, "reactivos", reactivo, antes, despues)
+
+    costos = {}
+    costos["sin_suscriptores"] = medir(emitir_todos, repeticiones)[0] / emisiones * 1e9
+
+    recibidos = []
+    contar = app.eventos.suscribir(Modificado, lambda evento: recibidos.append(evento.entidad), coleccion="reactivos")
+    try:
+        costos["con_suscriptor"] = medir(emitir_todos, repeticiones)[0] / emisiones * 1e9
+    finally:
+        app.eventos.desuscribir(contar)
+    if len(recibidos) != emisiones * repeticiones:
+        raise AssertionError("El suscriptor no recibió todos los eventos")
+    return costos
+
+
+def main():
+    """
+    Ejecuta los benchmarks. Uso: python Benchmarks.py [cantidad de experimentos]
+    """
+    experimentos = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    segundos, app = medir(lambda: generar_laboratorio(experimentos=experimentos))
+    print(f"Laboratorio generado en {segundos:.2f} s ({app.total_objetos()} objetos).")
+
+    print("\n===== TIEMPO HASTA EL MENÚ =====")
+    tiempos = comparar_tiempo_hasta_menu(app)
+    for nombre, segundos in tiempos.items():
+        print(f"{nombre}: {segundos:.3f} s")
+    print(f"Aceleración de la carga: {tiempos['cargar_json'] / tiempos['cargar_snapshot']:.1f}x")
+
+    print("\n===== ESTADÍSTICAS: BUCLES Y CONSULTAS =====")
+    tiempos = comparar_consultas(app)
+    for nombre, segundos in tiempos.items():
+        print(f"{nombre}: {segundos:.4f} s")
+    print(f"Aceleración de las estadísticas: {tiempos['bucles'] / tiempos['consultas']:.1f}x")
+    print(f"Aceleración de un mes de resultados: {tiempos['mes_bucle'] / tiempos['mes_consulta']:.1f}x")
+
+    print("\n===== FORMATOS DE LOS ARCHIVOS DE DATOS =====")
+    print(f"{'formato':<15}{'codificar':>12}{'decodificar':>14}{'tamaño':>12}")
+    for nombre, (codificar, decodificar, tamano) in comparar_serializadores(app).items():
+        print(f"{nombre:<15}{codificar:>10.3f} s{decodificar:>12.3f} s{tamano / 1e6:>9.1f} MB")
+
+    print("\n===== RANKING DE MEDICIONES FUERA DE RANGO =====")
+    tiempos = comparar_ranking_fallos(app)
+    for nombre, segundos in tiempos.items():
+        print(f"{nombre}: {segundos * 1000:.3f} ms")
+    print(f"Aceleración del ranking: {tiempos['bucle'] / tiempos['contadores']:.0f}x")
+
+    print("\n===== COSTO DE EMITIR UN EVENTO =====")
+    for nombre, nanosegundos in costo_eventos(app).items():
+        print(f"{nombre}: {nanosegundos:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+from contextlib import contextmanager
+from functools import wraps
+
+
+class Evento:
+    """
+    Cambio en una colección de la aplicación, con los valores anteriores y los nuevos.
+    """
+
+    __slots__ = ("coleccion", "entidad", "antes", "despues")
+
+    def __init__(self, coleccion, entidad=None, antes=None, despues=None):
+        """
+        :param coleccion: "reactivos", "recetas", "experimentos" o "resultados".
+        :param entidad: Objeto afectado, o None si el evento es de toda la colección.
+        :param antes: Valor anterior (depende del tipo de evento).
+        :param despues: Valor nuevo (depende del tipo de evento).
+        """
+        self.coleccion = coleccion
+        self.entidad = entidad
+        self.antes = antes
+        self.despues = despues
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.coleccion}, {getattr(self.entidad, 'id', None)}, {self.antes!r} -> {self.despues!r})"
+
+
+class Creado(Evento):
+    """
+    Se agregó una entidad: `antes` es None y `despues` es la entidad.
+    """
+
+    __slots__ = ()
+
+
+class Modificado(Evento):
+    """
+    Se modificaron campos de una entidad: `antes` y `despues` son diccionarios {campo: valor}
+    con solo los campos modificados.
+    """
+
+    __slots__ = ()
+
+
+class Eliminado(Evento):
+    """
+    Se quitó una entidad de la memoria: `antes` es la entidad y `despues` es None.
+    """
+
+    __slots__ = ()
+
+
+class Cargado(Evento):
+    """
+    Se cargó o reemplazó la colección completa: `entidad` es None y `despues` es el origen de los datos.
+
+    Durante una carga no se emiten eventos por cada elemento, sino uno de estos al terminar.
+    """
+
+    __slots__ = ()
+
+
+class Vaciado(Evento):
+    """
+    Se vació la colección completa: `antes` es la cantidad de elementos que tenía.
+    """
+
+    __slots__ = ()
+
+
+class BusEventos:
+    """
+    Bus de eventos síncrono para los cambios de las colecciones de la aplicación.
+
+    Los suscriptores (índices, estadísticas, cachés, marcas de datos sin guardar) reciben cada
+    evento en el momento en que ocurre, después de aplicado el cambio, y pueden actualizarse de
+    forma incremental. La lista de suscriptores de cada tipo de evento se calcula una sola vez,
+    por lo que emitir sin suscriptores cuesta una búsqueda en un diccionario y no crea el evento.
+    """
+
+    def __init__(self):
+        """
+        Inicializa el bus sin suscriptores.
+        """
+        self.suscripciones = []  # Tuplas (tipo de evento, colección o None, función)
+        self.oyentes = {}  # {tipo de evento: lista de (colección o None, función)}, incluye las suscripciones a tipos base
+        self.cargas = 0  # Cargas en curso; mientras haya alguna no se emiten eventos por elemento
+        self.cargadas = {}  # {colección cargada: origen} pendientes de notificar al terminar la carga
+
+    def suscribir(self, tipo, funcion, coleccion=None):
+        """
+        Suscribe una función a un tipo de evento (y a sus subtipos).
+
+        :param tipo: Clase del evento (ej. Modificado); `Evento` recibe todos.
+        :param funcion: Función que recibe el evento.
+        :param coleccion: Nombre de la colección a escuchar, o None para todas.
+        :return: La función suscrita (permite usar el método como decorador).
+        """
+        self.suscripciones.append((tipo, coleccion, funcion))
+        self.oyentes.clear()
+        return funcion
+
+    def desuscribir(self, funcion, tipo=None):
+        """
+        Quita las suscripciones de una función.
+
+        :param funcion: Función suscrita.
+        :param tipo: Tipo de evento del que se quita, o None para todos.
+        """
+        self.suscripciones = [
+            (t, coleccion, f) for t, coleccion, f in self.suscripciones
+            if f != funcion or (tipo is not None and t is not tipo)
+        ]
+        self.oyentes.clear()
+
+    def resolver(self, tipo):
+        """
+        Calcula y guarda la lista de suscriptores de un tipo de evento.
+
+        :param tipo: Clase del evento.
+        :return: Lista de tuplas (colección o None, función).
+        """
+        oyentes = [(coleccion, funcion) for t, coleccion, funcion in self.suscripciones if issubclass(tipo, t)]
+        self.oyentes[tipo] = oyentes
+        return oyentes
+
+    def escuchando(self, tipo, coleccion=None):
+        """
+        Indica si alguien recibiría un evento; sirve para evitar capturar valores anteriores costosos.
+
+        :param tipo: Clase del evento.
+        :param coleccion: Nombre de la colección, o None para cualquiera.
+        :return: True si hay algún suscriptor.
+        """
+        oyentes = self.oyentes.get(tipo)
+        if oyentes is None:
+            oyentes = self.resolver(tipo)
+        if not oyentes or self.cargas:
+            return False
+        return coleccion is None or any(filtro is None or filtro == coleccion for filtro, _ in oyentes)
+
+    def emitir(self, tipo, coleccion, entidad=None, antes=None, despues=None):
+        """
+        Crea un evento y lo entrega a sus suscriptores, en el orden en que se suscribieron.
+
+        :param tipo: Clase del evento.
+        :param coleccion: Nombre de la colección.
+        :param entidad: Objeto afectado.
+        :param antes: Valor anterior.
+        :param despues: Valor nuevo.
+        :return: El evento entregado, o None si nadie lo escuchaba.
+        """
+        oyentes = self.oyentes.get(tipo)
+        if oyentes is None:
+            oyentes = self.resolver(tipo)
+        if not oyentes or self.cargas:
+            return None
+
+        evento = tipo(coleccion, entidad, antes, despues)
+        for filtro, funcion in oyentes:
+            if filtro is None or filtro == coleccion:
+                funcion(evento)
+        return evento
+
+    @contextmanager
+    def carga(self, origen, *colecciones):
+        """
+        Agrupa la carga de colecciones completas: no se emiten eventos por elemento y al terminar
+        la carga más externa se emite un `Cargado` por colección.
+
+        :param origen: Origen de los datos (ej. "api", "json", "snapshot").
+        :param colecciones: Nombres de las colecciones que se cargan.
+        """
+        for coleccion in colecciones:
+            self.cargadas.setdefault(coleccion, origen)
+        self.cargas += 1
+        try:
+            yield
+        finally:
+            self.cargas -= 1
+            if not self.cargas:
+                cargadas, self.cargadas = self.cargadas, {}
+                for coleccion, origen_coleccion in cargadas.items():
+                    self.emitir(Cargado, coleccion, despues=origen_coleccion)
+
+
+def notificar_carga(origen, *colecciones):
+    """
+    Decorador para métodos de `App` que cargan colecciones completas a través de `self.eventos`.
+
+    :param origen: Origen de los datos.
+    :param colecciones: Nombres de las colecciones que carga el método.
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            with self.eventos.carga(origen, *colecciones):
+                return metodo(self, *args, **kwargs)
+        return envoltura
+    return decorador
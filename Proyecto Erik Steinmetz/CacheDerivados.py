@@ -0,0 +1,79 @@
+import hashlib
+import os
+
+from Snapshot import Snapshot
+
+
+class CacheDerivados:
+    """
+    Estructuras derivadas de los archivos de datos (índices y agregados por período) guardadas
+    junto a ellos, con la huella del contenido de los archivos de los que se obtuvieron.
+
+    Al cargar, si la huella coincide las estructuras se usan tal cual y no hay que volver a
+    calcularlas elemento por elemento; si algún archivo cambió, la caché se ignora y las
+    estructuras se reconstruyen como siempre. El archivo usa el formato del snapshot, que
+    verifica su integridad.
+    """
+
+    VERSION = 2
+
+    def __init__(self, ruta="derivados.snap"):
+        """
+        Inicializa la caché.
+
+        :param ruta: Ruta del archivo de la caché.
+        """
+        self.ruta = ruta
+        self.estado = "sin cargar"  # "vigente", "desactualizada", "inexistente" o "dañada" después de `cargar`
+
+    @staticmethod
+    def huella(rutas, tamano_bloque=1 << 20):
+        """
+        Calcula la huella del contenido de varios archivos.
+
+        :param rutas: Rutas de los archivos (las que no existen cuentan como vacías).
+        :param tamano_bloque: Cantidad de bytes leídos a la vez.
+        :return: Texto hexadecimal con la huella.
+        """
+        suma = hashlib.blake2b(digest_size=16)
+        for ruta in rutas:
+            suma.update(os.path.basename(ruta).encode("utf-8") + b"\x00")
+            if not os.path.exists(ruta):
+                continue
+            with open(ruta, "rb") as f:
+                while bloque := f.read(tamano_bloque):
+                    suma.update(bloque)
+            suma.update(b"\x00")
+        return suma.hexdigest()
+
+    def guardar(self, huella, derivados):
+        """
+        Guarda las estructuras derivadas junto con la huella de sus archivos de origen.
+
+        :param huella: Huella retornada por `huella`.
+        :param derivados: Diccionario con las estructuras derivadas.
+        :return: Cantidad de bytes escritos.
+        """
+        return Snapshot.guardar({"version": self.VERSION, "huella": huella, "derivados": derivados}, self.ruta)
+
+    def cargar(self, huella):
+        """
+        Lee las estructuras derivadas si corresponden a los archivos actuales.
+
+        :param huella: Huella de los archivos de origen actuales.
+        :return: Diccionario con las estructuras derivadas, o None si no existen o están desactualizadas.
+        """
+        if not os.path.exists(self.ruta):
+            self.estado = "inexistente"
+            return None
+        try:
+            contenido, _ = Snapshot.cargar(self.ruta)  # La caché lleva su propia versión en el contenido
+        except ValueError:
+            self.estado = "dañada"
+            return None
+
+        if contenido.get("version") != self.VERSION or contenido.get("huella") != huella:
+            self.estado = "desactualizada"
+            return None
+        self.estado = "vigente"
+        return contenido["derivados"]
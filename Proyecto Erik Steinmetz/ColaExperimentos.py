@@ -0,0 +1,404 @@
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import time
+
+from RegistroFallos import RegistroFallos
+
+
+def consumo_con_error(cantidad):
+    """
+    Simula la cantidad realmente consumida de un reactivo (entre 0.1% y 22.5% más que la planificada).
+
+    :param cantidad: Cantidad planificada por la receta.
+    :return: Tupla (cantidad consumida, porcentaje de error).
+    """
+    error_porcentaje = random.uniform(0.001, 0.225)
+    return cantidad * (1 + error_porcentaje), error_porcentaje
+
+
+def simular_medicion(minimo, maximo):
+    """
+    Simula el valor obtenido de una medición (con un error aleatorio entre 0% y 100%).
+
+    :param minimo: Valor mínimo aceptable.
+    :param maximo: Valor máximo aceptable.
+    :return: Valor obtenido, redondeado a dos decimales.
+    """
+    error_factor = random.uniform(0.0, 1.0)
+    return round(random.uniform(minimo, maximo) * (1 + error_factor), 2)
+
+
+def trabajar(ruta, nombre, tamano_lote=20):
+    """
+    Bucle de un proceso trabajador: reclama lotes de trabajos y los ejecuta hasta vaciar la cola.
+
+    :param ruta: Ruta de la base de datos de la cola.
+    :param nombre: Nombre del trabajador.
+    :param tamano_lote: Cantidad de trabajos reclamados a la vez.
+    """
+    cola = ColaExperimentos(ruta)
+    conexion = cola.conectar()
+    random.seed()  # Cada proceso con su propia secuencia aleatoria
+    try:
+        while True:
+            lote = cola.reclamar(conexion, nombre, tamano_lote)
+            if not lote:
+                break
+            inicio = time.perf_counter()
+            try:
+                # La simulación se hace fuera de la transacción; solo el descuento de inventario es exclusivo
+                simulados = [(id, datos, cola.simular(datos)) for id, datos in lote]
+                hechos, rechazados = cola.completar(conexion, nombre, simulados)
+                errores = 0
+            except Exception as error:
+                cola.fallar(conexion, [id for id, _ in lote], str(error))
+                hechos, rechazados, errores = 0, 0, len(lote)
+            cola.sumar_rendimiento(conexion, nombre, hechos, rechazados, errores, time.perf_counter() - inicio)
+    finally:
+        conexion.close()
+
+
+class ColaExperimentos:
+    """
+    Cola persistente (SQLite) de experimentos por realizar, procesada por varios procesos trabajadores.
+
+    Los trabajadores descuentan de un inventario compartido guardado en la misma base de datos,
+    con las mismas verificaciones que al realizar un experimento desde el menú (inventario
+    suficiente y reactivos no caducados). Los trabajos que fallan por un error se reintentan
+    hasta `max_intentos` veces. La aplicación luego incorpora los trabajos terminados
+    (resultados, consumos e intentos rechazados) a sus colecciones.
+
+    SQLite admite un solo escritor a la vez, y el trabajo real de cada experimento (verificar y
+    descontar el inventario) se hace dentro de esa transacción; fuera de ella solo queda la
+    simulación, que es mínima. Por eso agregar procesos no aumenta el rendimiento: varios
+    trabajadores solo se turnan para escribir.
+    """
+
+    PENDIENTE = "pendiente"
+    EN_CURSO = "en curso"
+    HECHO = "hecho"
+    RECHAZADO = "rechazado"  # No se pudo realizar (falta de inventario o reactivo caducado)
+    FALLIDO = "fallido"  # Agotó los reintentos por errores
+
+    def __init__(self, ruta="cola_experimentos.sqlite", max_intentos=3):
+        """
+        Inicializa la cola y crea sus tablas si no existen.
+
+        :param ruta: Ruta de la base de datos.
+        :param max_intentos: Cantidad máxima de intentos de un trabajo que falla por un error.
+        """
+        self.ruta = ruta
+        self.max_intentos = max_intentos
+        with self.conectar() as conexion:
+            conexion.executescript("""
+                CREATE TABLE IF NOT EXISTS trabajos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    experimento_id INTEGER NOT NULL,
+                    receta_id INTEGER NOT NULL,
+                    datos TEXT NOT NULL,
+                    estado TEXT NOT NULL,
+                    intentos INTEGER NOT NULL DEFAULT 0,
+                    trabajador TEXT,
+                    resultado TEXT,
+                    error TEXT,
+                    aplicado INTEGER NOT NULL DEFAULT 0,
+                    creado REAL NOT NULL,
+                    actualizado REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS trabajos_estado ON trabajos (estado, id);
+                -- Un experimento tiene a lo sumo un trabajo activo (por realizar, o hecho y todavía sin incorporar);
+                -- en colas creadas antes de esta restricción, los duplicados se descartan antes de crear el índice
+                UPDATE trabajos SET estado = 'fallido', error = 'Trabajo duplicado del mismo experimento'
+                    WHERE estado IN ('pendiente', 'en curso')
+                    AND id NOT IN (SELECT MIN(id) FROM trabajos
+                                   WHERE estado IN ('pendiente', 'en curso') OR (estado = 'hecho' AND aplicado = 0)
+                                   GROUP BY experimento_id);
+                CREATE UNIQUE INDEX IF NOT EXISTS trabajos_activos ON trabajos (experimento_id)
+                    WHERE estado IN ('pendiente', 'en curso') OR (estado = 'hecho' AND aplicado = 0);
+                CREATE TABLE IF NOT EXISTS inventario (
+                    reactivo_id INTEGER PRIMARY KEY,
+                    cantidad REAL NOT NULL,
+                    caducidad TEXT
+                );
+                CREATE TABLE IF NOT EXISTS trabajadores (
+                    nombre TEXT PRIMARY KEY,
+                    hechos INTEGER NOT NULL DEFAULT 0,
+                    rechazados INTEGER NOT NULL DEFAULT 0,
+                    errores INTEGER NOT NULL DEFAULT 0,
+                    segundos REAL NOT NULL DEFAULT 0
+                );
+            """)
+        conexion.close()
+
+    def conectar(self):
+        """
+        Abre una conexión a la base de datos (cada proceso debe abrir la suya).
+
+        :return: Conexión sqlite3 en modo WAL, con las transacciones controladas manualmente.
+        """
+        conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        return conexion
+
+    def encolar(self, experimentos, fecha_referencia):
+        """
+        Agrega experimentos a la cola. Los que ya tienen un trabajo activo (pendiente, en curso,
+        o hecho sin incorporar) se ignoran, para no realizar dos veces el mismo experimento.
+
+        :param experimentos: Lista de objetos Experimento.
+        :param fecha_referencia: Fecha "YYYY-MM-DD"; los reactivos que caducan antes se consideran vencidos.
+        :return: Cantidad de trabajos agregados.
+        """
+        ahora = time.time()
+        filas = []
+        for experimento in experimentos:
+            datos = {
+                "lineas": [[item["reactivo"].id, item["cantidad"]] for item in experimento.receta.reactivos],
+                "mediciones": [[m.nombre, m.minimo, m.maximo] for m in experimento.receta.valores_a_medir],
+                "fecha_referencia": fecha_referencia
+            }
+            filas.append((experimento.id, experimento.receta.id, json.dumps(datos), self.PENDIENTE, ahora, ahora))
+
+        conexion = self.conectar()
+        with conexion:
+            conexion.execute("BEGIN")
+            cursor = conexion.executemany(
+                "INSERT OR IGNORE INTO trabajos (experimento_id, receta_id, datos, estado, creado, actualizado) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                filas
+            )
+        conexion.close()
+        return cursor.rowcount
+
+    def sincronizar_inventario(self, reactivos):
+        """
+        Copia el inventario y la caducidad de los reactivos de la aplicación al inventario compartido.
+
+        :param reactivos: Lista de objetos Reactivo.
+        """
+        conexion = self.conectar()
+        with conexion:
+            conexion.execute("BEGIN")
+            conexion.execute("DELETE FROM inventario")
+            conexion.executemany(
+                "INSERT INTO inventario (reactivo_id, cantidad, caducidad) VALUES (?, ?, ?)",
+                [(r.id, r.inventario, r.fecha_caducidad) for r in reactivos]
+            )
+        conexion.close()
+
+    def recuperar_abandonados(self):
+        """
+        Devuelve a la cola los trabajos que quedaron en curso (ej. si un trabajador terminó abruptamente).
+
+        :return: Cantidad de trabajos recuperados.
+        """
+        conexion = self.conectar()
+        with conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            cursor = conexion.execute(
+                "UPDATE trabajos SET estado = CASE WHEN intentos >= ? THEN ? ELSE ? END, actualizado = ? WHERE estado = ?",
+                (self.max_intentos, self.FALLIDO, self.PENDIENTE, time.time(), self.EN_CURSO)
+            )
+        conexion.close()
+        return cursor.rowcount
+
+    def reclamar(self, conexion, trabajador, cantidad):
+        """
+        Reclama de forma atómica los próximos trabajos pendientes.
+
+        :param conexion: Conexión del trabajador.
+        :param trabajador: Nombre del trabajador.
+        :param cantidad: Cantidad máxima de trabajos a reclamar.
+        :return: Lista de tuplas (ID del trabajo, datos del trabajo).
+        """
+        with conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            filas = conexion.execute(
+                "SELECT id, datos FROM trabajos WHERE estado = ? ORDER BY id LIMIT ?", (self.PENDIENTE, cantidad)
+            ).fetchall()
+            conexion.executemany(
+                "UPDATE trabajos SET estado = ?, intentos = intentos + 1, trabajador = ?, actualizado = ? WHERE id = ?",
+                [(self.EN_CURSO, trabajador, time.time(), id) for id, _ in filas]
+            )
+        return [(id, json.loads(datos)) for id, datos in filas]
+
+    @staticmethod
+    def simular(datos):
+        """
+        Simula los consumos y las mediciones de un trabajo, como al realizar un experimento desde el menú.
+
+        :param datos: Datos del trabajo.
+        :return: Tupla (lista de [ID de reactivo, planificado, real], {medición: valor}, {medición: [mínimo, máximo]}).
+        """
+        consumos = [[reactivo_id, cantidad, consumo_con_error(cantidad)[0]] for reactivo_id, cantidad in datos["lineas"]]
+        valores_obtenidos = {nombre: simular_medicion(minimo, maximo) for nombre, minimo, maximo in datos["mediciones"]}
+        valores_aceptables = {nombre: [minimo, maximo] for nombre, minimo, maximo in datos["mediciones"]}
+        return consumos, valores_obtenidos, valores_aceptables
+
+    def completar(self, conexion, trabajador, simulados):
+        """
+        Verifica y descuenta el inventario compartido de un lote de trabajos en una sola transacción.
+
+        :param conexion: Conexión del trabajador.
+        :param trabajador: Nombre del trabajador.
+        :param simulados: Lista de tuplas (ID del trabajo, datos, resultado de `simular`).
+        :return: Tupla (trabajos hechos, trabajos rechazados).
+        """
+        hechos = rechazados = 0
+        with conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            for id, datos, (consumos, valores_obtenidos, valores_aceptables) in simulados:
+                # Las mismas verificaciones que `App.verificar_reactivos`, en el orden de la receta
+                bloqueo = None
+                for reactivo_id, cantidad in datos["lineas"]:
+                    fila = conexion.execute(
+                        "SELECT cantidad, caducidad FROM inventario WHERE reactivo_id = ?", (reactivo_id,)
+                    ).fetchone()
+                    disponible, caducidad = fila if fila else (0, None)
+                    if disponible < cantidad:
+                        bloqueo = (reactivo_id, RegistroFallos.FALTA_INVENTARIO, disponible, cantidad)
+                    elif caducidad and caducidad < datos["fecha_referencia"]:
+                        bloqueo = (reactivo_id, RegistroFallos.CADUCADO, disponible, cantidad)
+                    if bloqueo:
+                        break
+
+                if bloqueo:
+                    resultado = dict(zip(("reactivo_id", "motivo", "disponible", "requerido"), bloqueo))
+                    estado = self.RECHAZADO
+                    rechazados += 1
+                else:
+                    conexion.executemany(
+                        "UPDATE inventario SET cantidad = cantidad - ? WHERE reactivo_id = ?",
+                        [(real, reactivo_id) for reactivo_id, _, real in consumos]
+                    )
+                    resultado = {"consumos": consumos, "valores_obtenidos": valores_obtenidos,
+                                 "valores_aceptables": valores_aceptables}
+                    estado = self.HECHO
+                    hechos += 1
+
+                conexion.execute(
+                    "UPDATE trabajos SET estado = ?, trabajador = ?, resultado = ?, error = NULL, actualizado = ? WHERE id = ?",
+                    (estado, trabajador, json.dumps(resultado), time.time(), id)
+                )
+        return hechos, rechazados
+
+    def fallar(self, conexion, ids, error):
+        """
+        Registra un error en trabajos reclamados: vuelven a la cola o, sin intentos restantes, quedan fallidos.
+
+        :param conexion: Conexión del trabajador.
+        :param ids: IDs de los trabajos.
+        :param error: Descripción del error.
+        """
+        with conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            conexion.executemany(
+                "UPDATE trabajos SET estado = CASE WHEN intentos >= ? THEN ? ELSE ? END, error = ?, actualizado = ? WHERE id = ?",
+                [(self.max_intentos, self.FALLIDO, self.PENDIENTE, error, time.time(), id) for id in ids]
+            )
+
+    def sumar_rendimiento(self, conexion, trabajador, hechos, rechazados, errores, segundos):
+        """
+        Acumula los trabajos procesados y el tiempo ocupado de un trabajador.
+        """
+        with conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            conexion.execute("INSERT OR IGNORE INTO trabajadores (nombre) VALUES (?)", (trabajador,))
+            conexion.execute(
+                "UPDATE trabajadores SET hechos = hechos + ?, rechazados = rechazados + ?, errores = errores + ?, "
+                "segundos = segundos + ? WHERE nombre = ?",
+                (hechos, rechazados, errores, segundos, trabajador)
+            )
+
+    def procesar(self, trabajadores=None, tamano_lote=20):
+        """
+        Procesa todos los trabajos pendientes con un grupo de procesos trabajadores.
+
+        :param trabajadores: Cantidad de procesos; si es None, uno por núcleo (ver la nota de la clase
+                             sobre el escritor único).
+        :param tamano_lote: Cantidad de trabajos que cada trabajador reclama a la vez.
+        :return: Duración total en segundos.
+        """
+        trabajadores = trabajadores or os.cpu_count() or 1
+        self.recuperar_abandonados()
+
+        inicio = time.perf_counter()
+        procesos = [
+            multiprocessing.Process(target=trabajar, args=(self.ruta, f"trabajador-{os.getpid()}-{i + 1}", tamano_lote))
+            for i in range(trabajadores)
+        ]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join()
+        return time.perf_counter() - inicio
+
+    def terminados_sin_aplicar(self):
+        """
+        Obtiene los trabajos terminados que la aplicación todavía no incorporó.
+
+        :return: Lista de tuplas (ID del trabajo, ID del experimento, ID de la receta, estado, resultado).
+        """
+        conexion = self.conectar()
+        filas = conexion.execute(
+            "SELECT id, experimento_id, receta_id, estado, resultado FROM trabajos "
+            "WHERE aplicado = 0 AND estado IN (?, ?) ORDER BY id",
+            (self.HECHO, self.RECHAZADO)
+        ).fetchall()
+        conexion.close()
+        return [(id, experimento_id, receta_id, estado, json.loads(resultado)) for id, experimento_id, receta_id, estado, resultado in filas]
+
+    def marcar_aplicados(self, ids):
+        """
+        Marca trabajos terminados como incorporados a la aplicación.
+
+        :param ids: IDs de los trabajos.
+        """
+        conexion = self.conectar()
+        with conexion:
+            conexion.execute("BEGIN")
+            conexion.executemany("UPDATE trabajos SET aplicado = 1 WHERE id = ?", [(id,) for id in ids])
+        conexion.close()
+
+    def resumen(self):
+        """
+        Cuenta los trabajos por estado.
+
+        :return: Diccionario {estado: cantidad}.
+        """
+        conexion = self.conectar()
+        filas = conexion.execute("SELECT estado, COUNT(*) FROM trabajos GROUP BY estado").fetchall()
+        conexion.close()
+        return dict(filas)
+
+    def rendimiento(self):
+        """
+        Obtiene los trabajos procesados y el rendimiento de cada trabajador.
+
+        :return: Lista de diccionarios {nombre, hechos, rechazados, errores, segundos, por_segundo}.
+        """
+        conexion = self.conectar()
+        filas = conexion.execute("SELECT nombre, hechos, rechazados, errores, segundos FROM trabajadores ORDER BY nombre").fetchall()
+        conexion.close()
+        return [
+            {"nombre": nombre, "hechos": hechos, "rechazados": rechazados, "errores": errores, "segundos": segundos,
+             "por_segundo": (hechos + rechazados) / segundos if segundos else 0.0}
+            for nombre, hechos, rechazados, errores, segundos in filas
+        ]
+
+    def con_error(self):
+        """
+        Obtiene los trabajos fallidos o que tuvieron errores, con su último error.
+
+        :return: Lista de tuplas (ID del trabajo, ID del experimento, estado, intentos, error).
+        """
+        conexion = self.conectar()
+        filas = conexion.execute(
+            "SELECT id, experimento_id, estado, intentos, error FROM trabajos WHERE error IS NOT NULL ORDER BY id"
+        ).fetchall()
+        conexion.close()
+        return filas
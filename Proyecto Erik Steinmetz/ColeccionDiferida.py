@@ -0,0 +1,60 @@
+import json
+import os
+
+
+class ColeccionDiferida:
+    """
+    Colección cuyos elementos se leen y se crean recién la primera vez que se necesitan.
+
+    Mientras está pendiente solo se conoce la ruta del archivo; al materializarla se lee el
+    archivo y cada diccionario se convierte en objeto con la función `hidratar`, que resuelve
+    los enlaces por ID (por eso una colección puede requerir que otras se materialicen antes).
+    """
+
+    def __init__(self, nombre, ruta, hidratar, requiere=(), validar=None, leer=None):
+        """
+        Inicializa la colección pendiente.
+
+        :param nombre: Nombre de la colección (ej. "experimentos").
+        :param ruta: Ruta del archivo JSON con la lista de diccionarios.
+        :param hidratar: Función que recibe un diccionario, crea y registra el objeto, y retorna si lo registró.
+        :param requiere: Nombres de las colecciones que deben materializarse antes que esta.
+        :param validar: Función que recibe la lista de diccionarios y la ruta, y retorna solo los válidos.
+        :param leer: Función que recibe la ruta y retorna la lista de diccionarios (por defecto, JSON).
+        """
+        self.nombre = nombre
+        self.ruta = ruta
+        self.hidratar = hidratar
+        self.requiere = tuple(requiere)
+        self.validar = validar
+        self.leer = leer
+        self.pendiente = True
+        self.materializados = 0  # Cantidad de objetos creados al materializar
+        self.descartados = 0  # Diccionarios cuyos enlaces no se pudieron resolver
+
+    def materializar(self):
+        """
+        Lee el archivo y crea los objetos de la colección, solo la primera vez.
+
+        :return: Cantidad de objetos creados en esta llamada.
+        """
+        if not self.pendiente:
+            return 0
+        self.pendiente = False
+
+        if not os.path.exists(self.ruta):
+            return 0
+        if self.leer is not None:
+            datos = self.leer(self.ruta)
+        else:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+        if self.validar is not None:
+            datos = self.validar(datos, self.ruta)
+
+        for elemento in datos:
+            if self.hidratar(elemento):
+                self.materializados += 1
+            else:
+                self.descartados += 1
+        return self.materializados
@@ -0,0 +1,319 @@
+import itertools
+import operator
+
+
+class Consulta:
+    """
+    Descripción de una consulta sobre una colección: filtros, agrupación, agregados, orden y límite.
+
+    Los métodos retornan la misma consulta para poder encadenarlos, por ejemplo:
+    `Consulta("experimentos").donde("fecha", "entre", (desde, hasta)).agrupar("responsable", "mes")
+    .agregar(costo=("suma", "costo")).ordenar("costo", descendente=True)`.
+    """
+
+    def __init__(self, coleccion):
+        """
+        :param coleccion: Nombre de la colección registrada en el motor (ej. "experimentos").
+        """
+        self.coleccion = coleccion
+        self.filtros = []  # Lista de tuplas (campo, operador, valor)
+        self.grupos = []  # Campos por los que se agrupa
+        self.agregados = []  # Lista de tuplas (nombre, función, campo)
+        self.orden = []  # Lista de tuplas (nombre, descendente)
+        self.maximo = None
+
+    def donde(self, campo, operador, valor):
+        """
+        Agrega un filtro. Operadores: "==", "!=", "<", "<=", ">", ">=", "entre" (tupla desde, hasta; None no limita) y "en".
+        """
+        self.filtros.append((campo, operador, valor))
+        return self
+
+    def agrupar(self, *campos):
+        """
+        Agrupa por uno o más campos (los campos con varios valores, como los responsables, cuentan en cada grupo).
+        """
+        self.grupos.extend(campos)
+        return self
+
+    def agregar(self, **agregados):
+        """
+        Agrega columnas calculadas por grupo: nombre=(función, campo). Funciones: "contar", "suma",
+        "promedio", "minimo", "maximo" y "proporcion" (fracción de valores verdaderos).
+        """
+        for nombre, (funcion, *campo) in agregados.items():
+            self.agregados.append((nombre, funcion, campo[0] if campo else None))
+        return self
+
+    def ordenar(self, nombre, descendente=False):
+        """
+        Ordena las filas por un campo de grupo o un agregado (se puede llamar varias veces).
+        """
+        self.orden.append((nombre, descendente))
+        return self
+
+    def limite(self, cantidad):
+        """
+        Limita la cantidad de filas retornadas.
+        """
+        self.maximo = cantidad
+        return self
+
+    def firma(self):
+        """
+        Retorna la estructura de la consulta sin los valores de los filtros, que identifica su plan.
+        """
+        return (self.coleccion, tuple((campo, operador) for campo, operador, _ in self.filtros), tuple(self.grupos),
+                tuple(self.agregados), tuple(self.orden), self.maximo)
+
+
+class MotorConsultas:
+    """
+    Ejecuta consultas sobre las colecciones de la aplicación.
+
+    Al planificar una consulta se anotan los filtros que pueden resolverse con un índice secundario
+    (igualdad, pertenencia o rango). Al ejecutarla se estima cuántas claves entrega cada uno, lo que
+    cuesta O(log n), y se recorre solo el más selectivo; los demás filtros se evalúan sobre cada
+    objeto. Si se agrupa por un campo indexado y sin filtros, los grupos se leen directamente del
+    índice. Si todos los campos de la consulta están indexados, los valores se leen de los índices
+    y no de los objetos, por lo que la consulta funciona aunque los objetos no estén cargados.
+    Los planes se guardan por la firma de la consulta, así que repetir una consulta con otros
+    valores no vuelve a planificarla.
+    """
+
+    # Los rangos no incluyen los valores nulos (ej. reactivos sin fecha de caducidad), igual que los índices
+    OPERADORES = {
+        "==": operator.eq, "!=": operator.ne,
+        "<": lambda valor, limite: valor is not None and valor < limite,
+        "<=": lambda valor, limite: valor is not None and valor <= limite,
+        ">": lambda valor, limite: valor is not None and valor > limite,
+        ">=": lambda valor, limite: valor is not None and valor >= limite,
+        "entre": lambda valor, limites: valor is not None and (limites[0] is None or limites[0] <= valor)
+                                        and (limites[1] is None or valor <= limites[1]),
+        "en": lambda valor, valores: valor in valores
+    }
+    RANGOS = {"<", "<=", ">", ">=", "entre"}
+    AGREGADOS = {
+        "suma": sum, "minimo": min, "maximo": max,
+        "promedio": lambda valores: sum(valores) / len(valores), "proporcion": lambda valores: sum(valores) / len(valores)
+    }
+
+    def __init__(self):
+        """
+        Inicializa el motor sin colecciones.
+        """
+        self.colecciones = {}  # {nombre: (por_id, índices, campos, campos con varios valores)}
+        self.planes = {}  # {firma: plan}
+        self.planificadas = 0  # Consultas que necesitaron un plan nuevo
+
+    def registrar(self, nombre, por_id, indices, campos, multiples=()):
+        """
+        Registra una colección consultable.
+
+        :param nombre: Nombre de la colección.
+        :param por_id: Diccionario {id: objeto} de la colección.
+        :param indices: Diccionario {campo: IndiceSecundario}; un índice se usa para el campo de su mismo nombre.
+        :param campos: Diccionario {campo: función que recibe un objeto y retorna el valor}.
+        :param multiples: Campos cuya función retorna una lista de valores.
+        """
+        self.colecciones[nombre] = (por_id, indices, campos, set(multiples))
+        self.planes.clear()
+
+    def planificar(self, consulta):
+        """
+        Obtiene el plan de una consulta, armándolo solo la primera vez que se ve su firma.
+
+        :param consulta: Objeto Consulta.
+        :return: Diccionario con los índices candidatos, los filtros y las funciones de agrupación y agregación.
+        """
+        firma = consulta.firma()
+        plan = self.planes.get(firma)
+        if plan is not None:
+            return plan
+
+        por_id, indices, campos, multiples = self.colecciones[consulta.coleccion]
+        usados = [f[0] for f in consulta.filtros] + consulta.grupos + [a[2] for a in consulta.agregados if a[2]]
+        for campo in usados:
+            if campo not in campos:
+                raise ValueError(f"Campo desconocido en {consulta.coleccion}: {campo}")
+
+        # Consulta cubierta por los índices: los valores se leen de `valores_por_clave` a partir de la clave
+        cubierta = bool(indices) and all(campo in indices for campo in usados)
+        if cubierta:
+            campos = {campo: self.valor_indexado(indices[campo]) for campo in usados}
+            multiples = {campo for campo in usados if indices[campo].multiple}
+        for _, funcion, campo in consulta.agregados:
+            if funcion != "contar" and (funcion not in self.AGREGADOS or campo is None):
+                raise ValueError(f"Agregado inválido: {funcion}")
+
+        # Filtros que un índice puede resolver sin recorrer la colección
+        candidatos = []
+        for posicion, (campo, operador, _) in enumerate(consulta.filtros):
+            indice = indices.get(campo)
+            if indice is None:
+                continue
+            if operador in ("==", "en"):
+                candidatos.append((operador, indice, posicion))
+            elif indice.permite_rango and operador in self.RANGOS:
+                candidatos.append(("rango", indice, posicion))
+
+        # Función que retorna los grupos de un objeto (varios si un campo tiene varios valores)
+        extractores = [(campos[campo], campo in multiples) for campo in consulta.grupos]
+        if any(multiple for _, multiple in extractores):
+            grupos = lambda objeto: itertools.product(*[e(objeto) if m else (e(objeto),) for e, m in extractores])
+        elif len(extractores) == 1:
+            extraer = extractores[0][0]
+            grupos = lambda objeto: ((extraer(objeto),),)
+        else:
+            grupos = lambda objeto: (tuple(e(objeto) for e, _ in extractores),)
+
+        plan = {
+            "cubierta": cubierta,
+            "candidatos": candidatos,
+            "filtros": [(campos[campo], self.OPERADORES[operador], campo in multiples) for campo, operador, _ in consulta.filtros],
+            "grupos": grupos,
+            "agregados": [(nombre, funcion, campos[campo] if campo else None) for nombre, funcion, campo in consulta.agregados],
+            "indice_grupo": indices[consulta.grupos[0]] if not consulta.filtros and len(consulta.grupos) == 1
+                            and consulta.grupos[0] in indices else None
+        }
+        self.planes[firma] = plan
+        self.planificadas += 1
+        return plan
+
+    @staticmethod
+    def valor_indexado(indice):
+        """
+        Crea la función que obtiene el valor de un campo indexado a partir de la clave del objeto.
+
+        :param indice: IndiceSecundario del campo.
+        :return: Función que recibe una clave y retorna el valor (o la tupla de valores si el índice es múltiple).
+        """
+        # Se consulta el diccionario del índice en cada llamada, ya que restaurar un índice lo reemplaza
+        if indice.multiple:
+            return lambda clave: indice.valores_por_clave[clave]
+        return lambda clave: indice.valores_por_clave[clave][0]
+
+    @staticmethod
+    def claves_de_indice(candidato, consulta):
+        """
+        Obtiene las claves que entrega un índice para uno de los filtros de la consulta.
+
+        :param candidato: Tupla (tipo, índice, posición del filtro).
+        :param consulta: Objeto Consulta.
+        :return: Lista de claves.
+        """
+        tipo, indice, posicion = candidato
+        _, operador, valor = consulta.filtros[posicion]
+        if tipo == "==":
+            return indice.claves_con_valor(valor)
+        if tipo == "en":
+            return sorted(set(itertools.chain.from_iterable(indice.claves_con_valor(v) for v in valor)))
+
+        desde, hasta = {"<": (None, valor), "<=": (None, valor), ">": (valor, None), ">=": (valor, None)}.get(operador, valor)
+        inicio, fin = indice.rango(desde, hasta)
+        claves = [clave for valor_indice, clave in indice.entradas[inicio:fin]
+                  if not (operador in ("<", ">") and valor_indice == valor)]
+        return list(dict.fromkeys(claves)) if indice.multiple else claves
+
+    @staticmethod
+    def estimar(candidato, consulta):
+        """
+        Estima cuántas claves entrega un índice para uno de los filtros, sin recorrerlas.
+        """
+        tipo, indice, posicion = candidato
+        _, operador, valor = consulta.filtros[posicion]
+        if tipo == "==":
+            return len(indice.por_valor.get(valor, ()))
+        if tipo == "en":
+            return sum(len(indice.por_valor.get(v, ())) for v in valor)
+        desde, hasta = {"<": (None, valor), "<=": (None, valor), ">": (valor, None), ">=": (valor, None)}.get(operador, valor)
+        inicio, fin = indice.rango(desde, hasta)
+        return fin - inicio
+
+    def filtrar(self, consulta):
+        """
+        Obtiene los objetos que cumplen los filtros de una consulta, recorriendo el índice más selectivo.
+
+        :param consulta: Objeto Consulta.
+        :return: Lista de objetos (en orden de clave si se usó un índice, o de registro si no).
+        """
+        plan = self.planificar(consulta)
+        por_id = self.colecciones[consulta.coleccion][0]
+        elementos = self.recorrer(plan, consulta)
+        return list(map(por_id.__getitem__, elementos)) if plan["cubierta"] else elementos
+
+    def recorrer(self, plan, consulta):
+        """
+        Obtiene los elementos que cumplen los filtros: claves si la consulta está cubierta por los índices, u objetos si no.
+
+        :param plan: Plan de la consulta.
+        :param consulta: Objeto Consulta.
+        :return: Lista de claves u objetos.
+        """
+        por_id, indices, _, _ = self.colecciones[consulta.coleccion]
+
+        elegido = min(plan["candidatos"], key=lambda c: self.estimar(c, consulta), default=None)
+        if plan["cubierta"]:
+            elementos = next(iter(indices.values())).claves if elegido is None else self.claves_de_indice(elegido, consulta)
+        else:
+            elementos = por_id.values() if elegido is None else map(por_id.__getitem__, self.claves_de_indice(elegido, consulta))
+
+        restantes = [
+            (extraer, comparar, multiple, consulta.filtros[posicion][2])
+            for posicion, (extraer, comparar, multiple) in enumerate(plan["filtros"])
+            if elegido is None or posicion != elegido[2]
+        ]
+        if not restantes:
+            return list(elementos)
+        return [
+            elemento for elemento in elementos
+            if all(any(comparar(v, valor) for v in extraer(elemento)) if multiple else comparar(extraer(elemento), valor)
+                   for extraer, comparar, multiple, valor in restantes)
+        ]
+
+    def ejecutar(self, consulta):
+        """
+        Ejecuta una consulta.
+
+        :param consulta: Objeto Consulta.
+        :return: Lista de diccionarios {campo de grupo: valor, ..., agregado: valor, ...}.
+        """
+        plan = self.planificar(consulta)
+        por_id = self.colecciones[consulta.coleccion][0]
+        agregados = plan["agregados"]
+
+        # Reunir los objetos (o sus claves, si la consulta está cubierta) de cada grupo
+        if plan["indice_grupo"] is not None:
+            # Los grupos ya están en el índice; los objetos solo hacen falta para agregar un campo no indexado
+            if plan["cubierta"] or all(extraer is None for _, _, extraer in agregados):
+                miembros = {(valor,): claves for valor, claves in plan["indice_grupo"].por_valor.items()}
+            else:
+                miembros = {(valor,): list(map(por_id.__getitem__, claves))
+                            for valor, claves in plan["indice_grupo"].por_valor.items()}
+        else:
+            miembros = {}
+            grupos = plan["grupos"]
+            for objeto in self.recorrer(plan, consulta):
+                for grupo in grupos(objeto):
+                    lista = miembros.get(grupo)
+                    if lista is None:
+                        miembros[grupo] = [objeto]
+                    else:
+                        lista.append(objeto)
+
+        filas = []
+        for grupo, objetos in miembros.items():
+            fila = dict(zip(consulta.grupos, grupo))
+            for nombre, funcion, extraer in agregados:
+                fila[nombre] = len(objetos) if funcion == "contar" else self.AGREGADOS[funcion](list(map(extraer, objetos)))
+            filas.append(fila)
+        return self.ordenar(filas, consulta)
+
+    @staticmethod
+    def ordenar(filas, consulta):
+        """
+        Ordena y limita las filas de una consulta (el orden es estable: los empates quedan en orden de aparición).
+        """
+        for nombre, descendente in reversed(consulta.orden):
+            filas.sort(key=lambda fila: fila[nombre], reverse=descendente)
+        return filas if consulta.maximo is None else filas[:consulta.maximo]
@@ -0,0 +1,191 @@
+import math
+from collections import deque
+
+
+class EstadoControl:
+    """
+    Estadísticas de control de una medición de una receta. Ocupan memoria constante sin
+    importar cuántos resultados se hayan observado.
+    """
+
+    __slots__ = ("n", "media", "m2", "ewma", "cusum_alto", "cusum_bajo", "ewma_fuera", "centro", "sigma")
+
+    def __init__(self, centro, sigma):
+        """
+        :param centro: Valor objetivo de la medición.
+        :param sigma: Desviación estándar esperada de la medición.
+        """
+        self.n = 0  # Cantidad de valores observados
+        self.media = 0.0  # Media acumulada (Welford)
+        self.m2 = 0.0  # Suma de cuadrados de las diferencias con la media (Welford)
+        self.ewma = centro  # Promedio móvil exponencial; empieza en el valor objetivo
+        self.cusum_alto = 0.0  # Suma acumulada de desvíos hacia arriba, en desviaciones estándar
+        self.cusum_bajo = 0.0  # Suma acumulada de desvíos hacia abajo, en desviaciones estándar
+        self.ewma_fuera = False  # True mientras el EWMA está fuera de sus límites (para alertar solo al cruzarlos)
+        self.centro = centro
+        self.sigma = sigma
+
+    @property
+    def varianza(self):
+        """
+        Varianza muestral de los valores observados.
+        """
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desviacion(self):
+        """
+        Desviación estándar muestral de los valores observados.
+        """
+        return math.sqrt(self.varianza)
+
+
+class ControlEstadistico:
+    """
+    Control estadístico de procesos de las mediciones de cada receta, actualizado con cada resultado.
+
+    Por cada par (receta, medición) se mantienen la media y la varianza (algoritmo de Welford),
+    un promedio móvil exponencial (EWMA) y sumas acumuladas (CUSUM) hacia arriba y hacia abajo,
+    con costo constante por valor. Los límites se derivan del rango aceptable de la medición:
+    el centro es su punto medio y el rango completo equivale a ±3 desviaciones estándar, por lo
+    que una deriva se detecta antes de que los valores empiecen a salir del rango.
+    """
+
+    EWMA = "EWMA"
+    CUSUM = "CUSUM"
+
+    def __init__(self, lambda_ewma=0.2, ancho_ewma=3, k_cusum=0.5, h_cusum=5, max_alertas=200):
+        """
+        Inicializa el control sin estadísticas.
+
+        :param lambda_ewma: Peso del valor nuevo en el EWMA (entre 0 y 1).
+        :param ancho_ewma: Ancho de los límites del EWMA, en desviaciones estándar del EWMA.
+        :param k_cusum: Desvío tolerado por valor en el CUSUM, en desviaciones estándar.
+        :param h_cusum: Umbral de alerta del CUSUM, en desviaciones estándar.
+        :param max_alertas: Cantidad de alertas recientes que se conservan.
+        """
+        self.lambda_ewma = lambda_ewma
+        self.ancho_ewma = ancho_ewma * math.sqrt(lambda_ewma / (2 - lambda_ewma))  # Límite asintótico en σ
+        self.k_cusum = k_cusum
+        self.h_cusum = h_cusum
+        self.estados = {}  # {(ID de receta, medición): EstadoControl}
+        self.alertas = deque(maxlen=max_alertas)  # Diccionarios {receta, medicion, tipo, direccion, valor, limite, resultado, fecha}
+        self.total_alertas = 0
+
+    @staticmethod
+    def limites(medicion):
+        """
+        Deriva el valor objetivo y la desviación esperada del rango aceptable de una medición.
+
+        :param medicion: Objeto Medicion.
+        :return: Tupla (centro, sigma), o None si la medición no tiene un rango válido.
+        """
+        if medicion.minimo is None or medicion.maximo is None or medicion.maximo <= medicion.minimo:
+            return None
+        return (medicion.minimo + medicion.maximo) / 2, (medicion.maximo - medicion.minimo) / 6
+
+    def observar(self, resultado):
+        """
+        Actualiza las estadísticas de las mediciones de un resultado.
+
+        :param resultado: Objeto Resultado recién creado.
+        :return: Lista de las alertas generadas por este resultado.
+        """
+        nuevas = []
+        receta = resultado.experimento.receta
+        for medicion in receta.valores_a_medir:
+            valor = resultado.valores_obtenidos.get(medicion.nombre)
+            limites = self.limites(medicion)
+            if valor is None or limites is None:
+                continue
+
+            clave = (receta.id, medicion.nombre)
+            estado = self.estados.get(clave)
+            if estado is None:
+                estado = self.estados[clave] = EstadoControl(*limites)
+            estado.centro, estado.sigma = limites  # El rango de la receta pudo haberse editado
+
+            # Media y varianza acumuladas (Welford)
+            estado.n += 1
+            delta = valor - estado.media
+            estado.media += delta / estado.n
+            estado.m2 += delta * (valor - estado.media)
+
+            # EWMA: se alerta al cruzar los límites, no mientras se mantiene fuera
+            z = (valor - estado.centro) / estado.sigma
+            estado.ewma += self.lambda_ewma * (valor - estado.ewma)
+            desvio_ewma = (estado.ewma - estado.centro) / estado.sigma
+            fuera = abs(desvio_ewma) > self.ancho_ewma
+            if fuera and not estado.ewma_fuera:
+                nuevas.append(self.alertar(clave, self.EWMA, desvio_ewma, self.ancho_ewma, resultado))
+            estado.ewma_fuera = fuera
+
+            # CUSUM: al superar el umbral se alerta y la suma vuelve a empezar
+            estado.cusum_alto = max(0.0, estado.cusum_alto + z - self.k_cusum)
+            estado.cusum_bajo = max(0.0, estado.cusum_bajo - z - self.k_cusum)
+            if estado.cusum_alto > self.h_cusum:
+                nuevas.append(self.alertar(clave, self.CUSUM, estado.cusum_alto, self.h_cusum, resultado))
+                estado.cusum_alto = 0.0
+            if estado.cusum_bajo > self.h_cusum:
+                nuevas.append(self.alertar(clave, self.CUSUM, -estado.cusum_bajo, self.h_cusum, resultado))
+                estado.cusum_bajo = 0.0
+        return nuevas
+
+    def alertar(self, clave, tipo, valor, limite, resultado):
+        """
+        Registra una alerta.
+
+        :param clave: Tupla (ID de receta, medición).
+        :param tipo: `EWMA` o `CUSUM`.
+        :param valor: Valor del estadístico en desviaciones estándar (negativo si el desvío es hacia abajo).
+        :param limite: Límite superado, en desviaciones estándar.
+        :param resultado: Objeto Resultado que provocó la alerta.
+        :return: Diccionario de la alerta.
+        """
+        alerta = {
+            "receta": clave[0], "medicion": clave[1], "tipo": tipo, "direccion": "alto" if valor > 0 else "bajo",
+            "valor": valor, "limite": limite, "resultado": resultado.id, "fecha": resultado.experimento.fecha
+        }
+        self.alertas.append(alerta)
+        self.total_alertas += 1
+        return alerta
+
+    def reiniciar(self):
+        """
+        Descarta todas las estadísticas y alertas.
+        """
+        self.estados.clear()
+        self.alertas.clear()
+        self.total_alertas = 0
+
+    def recalcular(self, resultados):
+        """
+        Vuelve a calcular las estadísticas observando los resultados en orden de fecha.
+
+        :param resultados: Objetos Resultado.
+        :return: Cantidad de alertas generadas.
+        """
+        self.reiniciar()
+        for resultado in sorted(resultados, key=lambda r: (str(r.experimento.fecha), r.id)):
+            self.observar(resultado)
+        return self.total_alertas
+
+    def mas_desviadas(self, cantidad=10):
+        """
+        Ordena las mediciones por el desvío de su EWMA respecto del valor objetivo.
+
+        :param cantidad: Cantidad de mediciones a retornar.
+        :return: Lista de tuplas ((ID de receta, medición), EstadoControl) de mayor a menor desvío.
+        """
+        return sorted(self.estados.items(), key=lambda x: abs(x[1].ewma - x[1].centro) / x[1].sigma, reverse=True)[:cantidad]
+
+    @staticmethod
+    def describir(alerta):
+        """
+        Retorna una descripción legible de una alerta (sin el nombre de la receta).
+        """
+        if alerta["tipo"] == ControlEstadistico.EWMA:
+            detalle = f"EWMA a {alerta['valor']:+.2f}σ del objetivo (límite ±{alerta['limite']:.2f}σ)"
+        else:
+            detalle = f"CUSUM {alerta['direccion']} de {abs(alerta['valor']):.2f}σ (umbral {alerta['limite']:.2f}σ)"
+        return f"{alerta['medicion']}: {detalle}, resultado {alerta['resultado']} del {alerta['fecha']}"
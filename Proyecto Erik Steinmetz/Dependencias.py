@@ -0,0 +1,121 @@
+class Dependencias:
+    """
+    Consulta las dependencias entre reactivos, recetas, experimentos y resultados
+    usando los índices inversos que la aplicación mantiene en cada cambio.
+
+    Cada consulta cuesta lo proporcional a la cantidad de dependientes, sin recorrer las colecciones.
+    """
+
+    DENEGAR = "denegar"  # No se elimina si hay elementos que dependen
+    CASCADA = "cascada"  # Se eliminan también todos los elementos que dependen
+
+    def __init__(self, reactivo_a_recetas, receta_a_experimentos, experimento_a_resultados, archivo=None):
+        """
+        Inicializa la consulta de dependencias.
+
+        :param reactivo_a_recetas: IndiceSecundario de recetas por ID de reactivo utilizado.
+        :param receta_a_experimentos: IndiceSecundario de experimentos por ID de receta.
+        :param experimento_a_resultados: IndiceSecundario de resultados por ID de experimento.
+        :param archivo: ArchivoResultados con los resultados archivados, o None.
+        """
+        self.reactivo_a_recetas = reactivo_a_recetas
+        self.receta_a_experimentos = receta_a_experimentos
+        self.experimento_a_resultados = experimento_a_resultados
+        self.archivo = archivo
+
+    def recetas_de_reactivo(self, id_reactivo):
+        """
+        Busca las recetas que usan un reactivo.
+
+        :param id_reactivo: ID del reactivo.
+        :return: Lista de IDs de las recetas.
+        """
+        return list(self.reactivo_a_recetas.claves_con_valor(id_reactivo))
+
+    def experimentos_de_receta(self, id_receta):
+        """
+        Busca los experimentos basados en una receta.
+
+        :param id_receta: ID de la receta.
+        :return: Lista de IDs de los experimentos.
+        """
+        return list(self.receta_a_experimentos.claves_con_valor(id_receta))
+
+    def resultados_de_experimento(self, id_experimento):
+        """
+        Busca los resultados registrados de un experimento.
+
+        :param id_experimento: ID del experimento.
+        :return: Lista de IDs de los resultados.
+        """
+        return list(self.experimento_a_resultados.claves_con_valor(id_experimento))
+
+    def archivados_de_experimento(self, id_experimento):
+        """
+        Busca los resultados archivados (no borrados) de un experimento.
+
+        :param id_experimento: ID del experimento.
+        :return: Lista de IDs de los resultados archivados.
+        """
+        if self.archivo is None:
+            return []
+        return self.archivo.ids_de_experimento(id_experimento)
+
+    def tiene_resultados(self, id_experimento):
+        """
+        Indica si un experimento ya se realizó, es decir, si tiene resultados en memoria o archivados.
+
+        :param id_experimento: ID del experimento.
+        """
+        return bool(self.resultados_de_experimento(id_experimento) or self.archivados_de_experimento(id_experimento))
+
+    def dependientes_de_experimento(self, id_experimento):
+        """
+        Calcula todos los elementos que dependen de un experimento.
+
+        :param id_experimento: ID del experimento.
+        :return: Diccionario {"recetas": [], "experimentos": [], "resultados": [IDs], "archivados": [IDs]}.
+        """
+        return {"recetas": [], "experimentos": [], "resultados": self.resultados_de_experimento(id_experimento),
+                "archivados": self.archivados_de_experimento(id_experimento)}
+
+    def dependientes_de_receta(self, id_receta):
+        """
+        Calcula todos los elementos que dependen de una receta.
+
+        :param id_receta: ID de la receta.
+        :return: Diccionario {"recetas": [], "experimentos": [IDs], "resultados": [IDs], "archivados": [IDs]}.
+        """
+        experimentos = self.experimentos_de_receta(id_receta)
+        resultados = []
+        archivados = []
+        for id_experimento in experimentos:
+            resultados.extend(self.resultados_de_experimento(id_experimento))
+            archivados.extend(self.archivados_de_experimento(id_experimento))
+        return {"recetas": [], "experimentos": experimentos, "resultados": resultados, "archivados": archivados}
+
+    def dependientes_de_reactivo(self, id_reactivo):
+        """
+        Calcula todos los elementos que dependen de un reactivo.
+
+        :param id_reactivo: ID del reactivo.
+        :return: Diccionario {"recetas": [IDs], "experimentos": [IDs], "resultados": [IDs], "archivados": [IDs]}.
+        """
+        dependientes = {"recetas": self.recetas_de_reactivo(id_reactivo), "experimentos": [], "resultados": [], "archivados": []}
+        for id_receta in dependientes["recetas"]:
+            de_receta = self.dependientes_de_receta(id_receta)
+            dependientes["experimentos"].extend(de_receta["experimentos"])
+            dependientes["resultados"].extend(de_receta["resultados"])
+            dependientes["archivados"].extend(de_receta["archivados"])
+        return dependientes
+
+    @staticmethod
+    def describir(dependientes):
+        """
+        Describe la cantidad de dependientes encontrados.
+
+        :param dependientes: Diccionario retornado por `dependientes_de_*`.
+        :return: Texto descriptivo, o cadena vacía si no hay dependientes.
+        """
+        partes = [f"{len(ids)} {'resultados archivados' if tipo == 'archivados' else tipo}" for tipo, ids in dependientes.items() if ids]
+        return ", ".join(partes)
@@ -18,6 +18,7 @@ class Experimento:
         self.fecha = fecha  # Fecha de realización
         self.costo = self.calcular_costo()  # Cálculo automático del costo total
         self.resultado = None  # Se inicializa sin resultado hasta que sea registrado
+        self.consumo_real = {}  # {ID de reactivo: cantidad descontada del inventario al realizarlo}
 
     def calcular_costo(self):
         """
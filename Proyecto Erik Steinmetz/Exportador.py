@@ -0,0 +1,199 @@
+import csv
+import os
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional; sin él se exporta a NPZ
+    pa = None
+    pq = None
+
+
+class Exportador:
+    """
+    Exporta experimentos, líneas de recetas y mediciones de resultados en formato tabular,
+    escribiendo por bloques para que la memoria usada no dependa de la cantidad de filas.
+
+    Cada tabla se escribe a CSV y a un formato columnar: Parquet o Arrow IPC si pyarrow
+    está instalado, o un archivo NPZ por bloque si no lo está.
+    """
+
+    TABLAS = {
+        "experimentos": ["experimento_id", "receta_id", "receta", "fecha", "responsables", "costo"],
+        "lineas_receta": ["receta_id", "receta", "reactivo_id", "reactivo", "cantidad", "unidad"],
+        "mediciones": ["resultado_id", "experimento_id", "receta_id", "fecha", "medicion", "valor", "minimo", "maximo", "dentro", "valido"]
+    }
+    # Tipos de las columnas en el formato columnar, fijos para que no dependan de los valores del primer bloque
+    TIPOS = {
+        "experimentos": ["int64", "int64", "string", "string", "string", "float64"],
+        "lineas_receta": ["int64", "string", "int64", "string", "float64", "string"],
+        "mediciones": ["int64", "int64", "int64", "string", "string", "float64", "float64", "float64", "bool", "bool"]
+    }
+
+    def __init__(self, carpeta, formato="parquet", tamano_bloque=50000):
+        """
+        Inicializa el exportador.
+
+        :param carpeta: Carpeta donde se escriben los archivos.
+        :param formato: Formato columnar: "parquet", "arrow" o "npz".
+        :param tamano_bloque: Cantidad de filas por bloque.
+        """
+        if formato in ("parquet", "arrow") and pa is None:
+            print("Aviso: pyarrow no está instalado, se exportará en formato NPZ.")
+            formato = "npz"
+        self.carpeta = carpeta
+        self.formato = formato
+        self.tamano_bloque = tamano_bloque
+
+    @staticmethod
+    def filas_experimentos(experimentos):
+        """
+        Genera una fila por experimento.
+        """
+        for e in experimentos:
+            yield (e.id, e.receta.id, e.receta.nombre, e.fecha, ";".join(e.responsables), float(e.costo))
+
+    @staticmethod
+    def filas_lineas_receta(recetas):
+        """
+        Genera una fila por cada reactivo utilizado en cada receta.
+        """
+        for r in recetas:
+            for item in r.reactivos:
+                yield (r.id, r.nombre, item["reactivo"].id, item["reactivo"].nombre, float(item["cantidad"]), item["unidad"])
+
+    @staticmethod
+    def filas_mediciones(resultados):
+        """
+        Genera una fila por cada medición de cada resultado.
+        """
+        for r in resultados:
+            experimento = r.experimento
+            for medicion, valor in r.valores_obtenidos.items():
+                minimo, maximo = r.valores_aceptables.get(medicion, (None, None))
+                dentro = minimo is None or maximo is None or minimo <= valor <= maximo
+                yield (r.id, experimento.id, experimento.receta.id, experimento.fecha, medicion,
+                       float(valor), minimo, maximo, dentro, r.valido)
+
+    def bloques(self, filas):
+        """
+        Agrupa filas en bloques de tamaño fijo.
+
+        :param filas: Iterable de tuplas.
+        :return: Generador de listas de tuplas.
+        """
+        bloque = []
+        for fila in filas:
+            bloque.append(fila)
+            if len(bloque) >= self.tamano_bloque:
+                yield bloque
+                bloque = []
+        if bloque:
+            yield bloque
+
+    def exportar(self, nombre, filas):
+        """
+        Exporta una tabla a CSV y al formato columnar elegido.
+
+        :param nombre: Nombre de la tabla (clave de `TABLAS`).
+        :param filas: Iterable de tuplas con las columnas de la tabla.
+        :return: Cantidad de filas exportadas.
+        """
+        os.makedirs(self.carpeta, exist_ok=True)
+        columnas = self.TABLAS[nombre]
+        base = os.path.join(self.carpeta, nombre)
+        esquema = self.esquema(nombre) if self.formato != "npz" else None
+        escritor_columnar = None
+        total = 0
+
+        # Borrar los bloques NPZ de una exportación anterior para no mezclarlos con los nuevos
+        for archivo in os.listdir(self.carpeta):
+            if archivo.startswith(f"{nombre}_") and archivo.endswith(".npz"):
+                os.remove(os.path.join(self.carpeta, archivo))
+
+        try:
+            with open(f"{base}.csv", "w", encoding="utf-8", newline="") as f:
+                escritor_csv = csv.writer(f)
+                escritor_csv.writerow(columnas)
+
+                for numero, bloque in enumerate(self.bloques(filas)):
+                    escritor_csv.writerows(bloque)
+                    datos = dict(zip(columnas, zip(*bloque)))  # Filas a columnas
+                    escritor_columnar = self.escribir_bloque(base, numero, datos, escritor_columnar, esquema)
+                    total += len(bloque)
+        finally:
+            # El pie del archivo Parquet o Arrow se escribe al cerrar, aunque la exportación se interrumpa
+            if escritor_columnar is not None:
+                escritor_columnar.close()
+        return total
+
+    @classmethod
+    def esquema(cls, nombre):
+        """
+        Crea el esquema de pyarrow de una tabla.
+
+        :param nombre: Nombre de la tabla (clave de `TABLAS`).
+        :return: Objeto pyarrow.Schema.
+        """
+        return pa.schema([(columna, getattr(pa, tipo)()) for columna, tipo in zip(cls.TABLAS[nombre], cls.TIPOS[nombre])])
+
+    def escribir_bloque(self, base, numero, datos, escritor, esquema=None):
+        """
+        Escribe un bloque de columnas en el formato columnar.
+
+        :param base: Ruta base del archivo, sin extensión.
+        :param numero: Número del bloque.
+        :param datos: Diccionario {columna: tupla de valores}.
+        :param escritor: Escritor de pyarrow abierto por el bloque anterior, o None.
+        :param esquema: Esquema de pyarrow de la tabla (no se usa con NPZ).
+        :return: Escritor de pyarrow a reutilizar en el siguiente bloque, o None.
+        """
+        if self.formato == "npz":
+            columnas = {columna: self.a_arreglo(valores) for columna, valores in datos.items()}
+            np.savez(f"{base}_{numero:05d}.npz", **columnas)
+            return None
+
+        tabla = pa.Table.from_pydict({columna: list(valores) for columna, valores in datos.items()}, schema=esquema)
+        if escritor is None:
+            if self.formato == "parquet":
+                escritor = pq.ParquetWriter(f"{base}.parquet", esquema)
+            else:
+                escritor = pa.ipc.new_file(f"{base}.arrow", esquema)
+        if self.formato == "parquet":
+            escritor.write_table(tabla)
+        else:
+            escritor.write(tabla)
+        return escritor
+
+    @staticmethod
+    def a_arreglo(valores):
+        """
+        Convierte una columna a un arreglo de numpy con un tipo fijo.
+
+        :param valores: Tupla de valores de la columna.
+        :return: Arreglo numérico si todos los valores son números o booleanos, o de texto en otro caso.
+        """
+        if all(isinstance(v, bool) for v in valores):
+            return np.asarray(valores, dtype=bool)
+        if all(isinstance(v, int) and not isinstance(v, bool) for v in valores):
+            return np.asarray(valores, dtype=np.int64)
+        if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in valores):
+            return np.asarray(valores, dtype=float)
+        return np.asarray([str(v) for v in valores])
+
+    def exportar_todo(self, recetas, experimentos, resultados):
+        """
+        Exporta las tres tablas del laboratorio.
+
+        :param recetas: Iterable de objetos Receta.
+        :param experimentos: Iterable de objetos Experimento.
+        :param resultados: Iterable de objetos Resultado.
+        :return: Diccionario {tabla: cantidad de filas exportadas}.
+        """
+        return {
+            "experimentos": self.exportar("experimentos", self.filas_experimentos(experimentos)),
+            "lineas_receta": self.exportar("lineas_receta", self.filas_lineas_receta(recetas)),
+            "mediciones": self.exportar("mediciones", self.filas_mediciones(resultados))
+        }
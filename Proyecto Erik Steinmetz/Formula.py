@@ -0,0 +1,173 @@
+import ast
+import math
+
+import numpy as np
+
+
+class FormulaCompilada:
+    """
+    Fórmula de una medición ya validada y compilada, lista para evaluarse sobre lotes de lecturas.
+    """
+
+    # Funciones y constantes que se pueden usar dentro de una fórmula
+    FUNCIONES = {
+        "sqrt": np.sqrt, "raiz": np.sqrt, "log": np.log, "ln": np.log, "log10": np.log10,
+        "exp": np.exp, "abs": np.abs, "sin": np.sin, "cos": np.cos, "tan": np.tan,
+        "min": np.minimum, "max": np.maximum
+    }
+    CONSTANTES = {"pi": math.pi, "e": math.e}
+
+    def __init__(self, texto, codigo, variables):
+        """
+        Inicializa la fórmula compilada.
+
+        :param texto: Texto original de la fórmula.
+        :param codigo: Objeto de código compilado a partir del árbol validado.
+        :param variables: Tupla con los nombres de las lecturas que usa la fórmula.
+        """
+        self.texto = texto
+        self.codigo = codigo
+        self.variables = variables
+
+    def evaluar(self, lecturas):
+        """
+        Evalúa la fórmula sobre uno o varios juegos de lecturas a la vez.
+
+        :param lecturas: Diccionario {variable: número o arreglo de números}.
+        :return: Arreglo de numpy con un valor por juego de lecturas (NaN si la operación no es válida).
+        """
+        entorno = {"__builtins__": {}}
+        entorno.update(self.FUNCIONES)
+        entorno.update(self.CONSTANTES)
+        for variable in self.variables:
+            if variable not in lecturas:
+                raise ValueError(f"Falta la lectura '{variable}' para la fórmula '{self.texto}'.")
+            entorno[variable] = np.asarray(lecturas[variable], dtype=float)
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            try:
+                return np.asarray(eval(self.codigo, entorno), dtype=float)
+            except ArithmeticError:
+                # Solo ocurre en fórmulas sin lecturas (operaciones entre constantes de Python)
+                return np.asarray(np.nan)
+            except TypeError:
+                # Una función llamada con una cantidad de argumentos que no admite (ej. "max(a)")
+                raise ValueError(f"La fórmula '{self.texto}' llama a una función con argumentos inválidos.")
+
+    def evaluar_y_validar(self, medicion, lecturas):
+        """
+        Evalúa la fórmula y verifica cada valor contra el rango de la medición.
+
+        :param medicion: Objeto Medicion con `minimo` y `maximo`.
+        :param lecturas: Diccionario {variable: número o arreglo de números}.
+        :return: Tupla (valores, arreglo booleano con True donde el valor está dentro del rango).
+        """
+        valores = self.evaluar(lecturas)
+        dentro = (valores >= medicion.minimo) & (valores <= medicion.maximo)  # NaN queda fuera de rango
+        return valores, dentro
+
+
+class CompiladorFormulas:
+    """
+    Compila las fórmulas de las mediciones a un subconjunto seguro de expresiones aritméticas
+    y guarda el resultado para que cada fórmula se analice una sola vez.
+    """
+
+    NODOS_PERMITIDOS = (
+        ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load, ast.Call,
+        ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub
+    )
+    REEMPLAZOS = {"×": "*", "·": "*", "÷": "/", "−": "-", "^": "**"}
+
+    def __init__(self):
+        """
+        Inicializa el compilador con la caché vacía.
+        """
+        self.cache = {}  # {texto de la fórmula: FormulaCompilada o ValueError}
+
+    def compilar(self, texto):
+        """
+        Compila una fórmula, o la obtiene de la caché si ya fue compilada.
+
+        :param texto: Texto de la fórmula (ej. "(masa_final / masa_inicial) * 100").
+        :return: Objeto FormulaCompilada.
+        :raises ValueError: Si la fórmula no es una expresión aritmética permitida.
+        """
+        compilada = self.cache.get(texto)
+        if compilada is None:
+            try:
+                compilada = self.analizar(texto)
+            except ValueError as error:
+                compilada = error  # También se guardan los errores para no volver a analizar
+            self.cache[texto] = compilada
+
+        if isinstance(compilada, ValueError):
+            raise compilada
+        return compilada
+
+    def analizar(self, texto):
+        """
+        Analiza y valida una fórmula sin usar la caché.
+
+        :param texto: Texto de la fórmula.
+        :return: Objeto FormulaCompilada.
+        :raises ValueError: Si la fórmula no es una expresión aritmética permitida.
+        """
+        expresion = str(texto)
+        for original, reemplazo in self.REEMPLAZOS.items():
+            expresion = expresion.replace(original, reemplazo)
+
+        try:
+            arbol = ast.parse(expresion.strip(), mode="eval")
+        except SyntaxError:
+            raise ValueError(f"La fórmula '{texto}' no es una expresión válida.")
+
+        # Los nombres de funciones solo pueden aparecer llamados, no como valores (ej. "sqrt + 1")
+        llamadas = {id(nodo.func) for nodo in ast.walk(arbol) if isinstance(nodo, ast.Call)}
+
+        variables = []
+        for nodo in ast.walk(arbol):
+            if not isinstance(nodo, self.NODOS_PERMITIDOS):
+                raise ValueError(f"La fórmula '{texto}' usa una operación no permitida ({type(nodo).__name__}).")
+            if isinstance(nodo, ast.Constant):
+                if isinstance(nodo.value, bool) or not isinstance(nodo.value, (int, float)):
+                    raise ValueError(f"La fórmula '{texto}' contiene un valor no numérico.")
+                nodo.value = float(nodo.value)  # Evita potencias enteras gigantes entre constantes
+            if isinstance(nodo, ast.Call):
+                if not isinstance(nodo.func, ast.Name) or nodo.func.id not in FormulaCompilada.FUNCIONES or nodo.keywords:
+                    raise ValueError(f"La fórmula '{texto}' llama a una función no permitida.")
+            if isinstance(nodo, ast.Name) and isinstance(nodo.ctx, ast.Load):
+                nombre = nodo.id
+                es_funcion = nombre in FormulaCompilada.FUNCIONES
+                if es_funcion and id(nodo) not in llamadas:
+                    raise ValueError(f"La fórmula '{texto}' usa la función '{nombre}' como un valor.")
+                if not es_funcion and nombre not in FormulaCompilada.CONSTANTES and nombre not in variables:
+                    variables.append(nombre)
+
+        codigo = compile(arbol, f"<formula {texto}>", "eval")
+        return FormulaCompilada(texto, codigo, tuple(variables))
+
+    def evaluar_receta(self, receta, lecturas):
+        """
+        Calcula todas las mediciones de una receta para un lote de lecturas.
+
+        Si las lecturas ya incluyen el valor final de una medición (con su mismo nombre),
+        se usa directamente; si no, se calcula con su fórmula.
+
+        :param receta: Objeto Receta con `valores_a_medir`.
+        :param lecturas: Diccionario {variable o nombre de medición: arreglo de números}.
+        :return: Tupla ({nombre de medición: arreglo de valores}, arreglo booleano de filas válidas).
+        """
+        valores = {}
+        validos = None
+        for medicion in receta.valores_a_medir:
+            if medicion.nombre in lecturas:
+                valores_medicion = np.asarray(lecturas[medicion.nombre], dtype=float)
+                dentro = (valores_medicion >= medicion.minimo) & (valores_medicion <= medicion.maximo)
+            else:
+                valores_medicion, dentro = self.compilar(medicion.formula).evaluar_y_validar(medicion, lecturas)
+
+            valores[medicion.nombre] = valores_medicion
+            validos = dentro if validos is None else validos & dentro
+
+        return valores, validos
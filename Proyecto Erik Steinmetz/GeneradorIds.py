@@ -0,0 +1,32 @@
+class GeneradorIds:
+    """
+    Genera identificadores enteros crecientes que nunca se reutilizan,
+    aunque se eliminen elementos de la colección.
+    """
+
+    def __init__(self, ultimo=0):
+        """
+        Inicializa el generador.
+
+        :param ultimo: Último identificador entregado o conocido.
+        """
+        self.ultimo = ultimo
+
+    def siguiente(self):
+        """
+        Entrega un nuevo identificador.
+
+        :return: Identificador mayor a todos los anteriores.
+        """
+        self.ultimo += 1
+        return self.ultimo
+
+    def observar(self, id):
+        """
+        Registra un identificador existente (ej. cargado desde la API o un archivo)
+        para que los siguientes no lo repitan.
+
+        :param id: Identificador existente.
+        """
+        if isinstance(id, int) and id > self.ultimo:
+            self.ultimo = id
@@ -0,0 +1,239 @@
+import html
+from datetime import datetime
+from functools import lru_cache
+
+
+class TextosEscapados(dict):
+    """
+    Diccionario {texto: texto escapado} que escapa cada texto la primera vez que se consulta.
+    """
+
+    def __init__(self, escapar):
+        super().__init__()
+        self.escapar = escapar
+
+    def __missing__(self, texto):
+        escapado = self[texto] = self.escapar(texto)
+        return escapado
+
+
+class GeneradorReporte:
+    """
+    Genera un reporte completo del laboratorio (inventario, recetas, experimentos, resultados
+    y estadísticas) en texto, HTML o Markdown.
+
+    Cada sección es una tabla cuyas filas se escriben a medida que se generan, acumulando a lo
+    sumo `tamano_buffer` líneas en memoria. Las plantillas de cada formato se arman una sola vez
+    por cantidad de columnas y se reutilizan para todas las filas. Solo se recuerdan los textos
+    escapados de las columnas que se repiten entre filas; los valores obtenidos de cada resultado
+    se arman con una plantilla por conjunto de mediciones cuyos nombres ya están escapados.
+    """
+
+    FORMATOS = ("texto", "html", "markdown")
+    EXTENSIONES = {"texto": ".txt", "html": ".html", "markdown": ".md"}
+
+    PLANTILLAS = {
+        "texto": {
+            "inicio": "REPORTE DEL LABORATORIO\nGenerado: {fecha}\n",
+            "seccion": "\n===== {titulo} =====\n",
+            "fila_inicio": "", "celda": "{}", "separador": " | ", "fila_fin": "\n",
+            "celda_encabezado": "{}", "regla": "-" * 40 + "\n",
+            "fin_seccion": "({cantidad} filas)\n",
+            "fin": ""
+        },
+        "html": {
+            "inicio": "<!DOCTYPE html>\n<html>\n<head><meta charset=\"utf-8\"><title>Reporte del laboratorio</title></head>\n"
+                      "<body>\n<h1>Reporte del laboratorio</h1>\n<p>Generado: {fecha}</p>\n",
+            "seccion": "<h2>{titulo}</h2>\n<table>\n",
+            "fila_inicio": "<tr>", "celda": "<td>{}</td>", "separador": "", "fila_fin": "</tr>\n",
+            "celda_encabezado": "<th>{}</th>", "regla": "",
+            "fin_seccion": "</table>\n<p>{cantidad} filas</p>\n",
+            "fin": "</body>\n</html>\n"
+        },
+        "markdown": {
+            "inicio": "# Reporte del laboratorio\n\nGenerado: {fecha}\n",
+            "seccion": "\n## {titulo}\n\n",
+            "fila_inicio": "| ", "celda": "{}", "separador": " | ", "fila_fin": " |\n",
+            "celda_encabezado": "{}", "regla": None,  # La regla de Markdown depende de la cantidad de columnas
+            "fin_seccion": "\n_{cantidad} filas_\n",
+            "fin": ""
+        }
+    }
+
+    SECCIONES = {
+        "reactivos": ("Inventario de reactivos", ["ID", "Nombre", "Categoría", "Inventario", "Unidad", "Mínimo", "Costo", "Caducidad"]),
+        "recetas": ("Recetas", ["ID", "Nombre", "Objetivo", "Reactivos", "Mediciones"]),
+        "experimentos": ("Experimentos", ["ID", "Receta", "Fecha", "Responsables", "Costo", "Resultado"]),
+        "resultados": ("Resultados", ["ID", "Experimento", "Receta", "Fecha", "Evaluación", "Valores obtenidos"]),
+        "estadisticas": ("Estadísticas", ["Indicador", "Valor"])
+    }
+
+    # Columnas cuyo texto suele ser distinto en cada fila: se escapan sin recordarlas
+    UNICAS = {"Nombre", "Objetivo", "Reactivos", "Mediciones"}
+    # Columnas que las filas ya entregan escapadas
+    ESCAPADAS = {"Valores obtenidos"}
+
+    def __init__(self, formato="texto", tamano_buffer=5000, max_escapados=100000):
+        """
+        Inicializa el generador.
+
+        :param formato: "texto", "html" o "markdown".
+        :param tamano_buffer: Cantidad de líneas acumuladas antes de escribirlas en el archivo.
+        :param max_escapados: Cantidad máxima de textos escapados que se recuerdan.
+        """
+        if formato not in self.FORMATOS:
+            raise ValueError(f"Formato de reporte desconocido: {formato}")
+        self.formato = formato
+        self.tamano_buffer = tamano_buffer
+        self.max_escapados = max_escapados
+        self.escapados = TextosEscapados(self.escapar)  # Los nombres de recetas, fechas y evaluaciones se repiten mucho
+        self.plantillas_valores = {}  # {tupla de mediciones: método `format` de "medición=valor, ..."}
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def plantilla(formato, nombre, columnas=0):
+        """
+        Obtiene la plantilla de un elemento del reporte, armándola solo la primera vez.
+
+        :param formato: "texto", "html" o "markdown".
+        :param nombre: "inicio", "seccion", "encabezado", "fila", "fin_seccion" o "fin".
+        :param columnas: Cantidad de columnas (para "encabezado" y "fila").
+        :return: Método `format` de la plantilla.
+        """
+        partes = GeneradorReporte.PLANTILLAS[formato]
+        if nombre in ("fila", "encabezado"):
+            celda = partes["celda"] if nombre == "fila" else partes["celda_encabezado"]
+            texto = partes["fila_inicio"] + partes["separador"].join([celda] * columnas) + partes["fila_fin"]
+            if nombre == "encabezado":
+                regla = partes["regla"]
+                if regla is None:
+                    regla = "|" + "---|" * columnas + "\n"
+                texto += regla
+            return texto.format
+        return partes[nombre].format
+
+    def escapar(self, valor):
+        """
+        Adapta un texto al formato del reporte (caracteres especiales y saltos de línea).
+
+        :param valor: Texto a escapar.
+        :return: Texto escapado.
+        """
+        if self.formato == "html":
+            return html.escape(valor)
+        valor = valor.replace("\n", " ")
+        if self.formato == "markdown":
+            valor = valor.replace("|", "\\|")
+        return valor
+
+    @staticmethod
+    def filas_reactivos(reactivos):
+        """
+        Genera una fila por reactivo del inventario.
+        """
+        for r in reactivos:
+            yield (r.id, r.nombre, r.categoria, r.inventario, r.unidad_medida, r.minimo, f"{r.costo:.2f}", r.fecha_caducidad)
+
+    @staticmethod
+    def filas_recetas(recetas):
+        """
+        Genera una fila por receta, con sus reactivos y mediciones resumidos.
+        """
+        for r in recetas:
+            reactivos = ", ".join(f"{item['reactivo'].nombre} {item['cantidad']} {item['unidad']}" for item in r.reactivos)
+            mediciones = ", ".join(f"{m.nombre} ({m.minimo} - {m.maximo})" for m in r.valores_a_medir)
+            yield (r.id, r.nombre, r.objetivo, reactivos, mediciones)
+
+    @staticmethod
+    def filas_experimentos(experimentos):
+        """
+        Genera una fila por experimento.
+        """
+        for e in experimentos:
+            resultado = e.resultado if isinstance(e.resultado, str) and e.resultado else "No registrado"
+            yield (e.id, e.receta.nombre, e.fecha, ", ".join(e.responsables), f"{e.costo:.2f}", resultado)
+
+    def filas_resultados(self, resultados):
+        """
+        Genera una fila por resultado, con sus valores obtenidos ya escapados.
+        """
+        plantillas = self.plantillas_valores
+        for r in resultados:
+            experimento = r.experimento
+            valores_obtenidos = r.valores_obtenidos
+            mediciones = tuple(valores_obtenidos)
+            plantilla = plantillas.get(mediciones)
+            if plantilla is None:
+                # Los números formateados no necesitan escaparse; solo los nombres de las mediciones
+                plantilla = plantillas[mediciones] = ", ".join(
+                    self.escapar(medicion).replace("{", "{{").replace("}", "}}") + "={:.2f}" for medicion in mediciones
+                ).format
+            yield (r.id, experimento.id, experimento.receta.nombre, experimento.fecha,
+                   "Dentro de parámetros" if r.valido else "Fuera de parámetros", plantilla(*valores_obtenidos.values()))
+
+    def escribir_seccion(self, f, nombre, filas):
+        """
+        Escribe una sección del reporte a medida que se generan sus filas.
+
+        :param f: Archivo de texto abierto para escritura.
+        :param nombre: Nombre de la sección (clave de `SECCIONES`).
+        :param filas: Iterable de tuplas con las columnas de la sección.
+        :return: Cantidad de filas escritas.
+        """
+        titulo, columnas = self.SECCIONES[nombre]
+        fila = self.plantilla(self.formato, "fila", len(columnas))
+        escapar = self.escapar
+        escapados = self.escapados
+
+        # Tuplas (posición, conversión) de las columnas a escapar: `escapar` si es única o el memo si se repite
+        conversiones = [
+            (j, escapar if columna in self.UNICAS else escapados.__getitem__)
+            for j, columna in enumerate(columnas) if columna not in self.ESCAPADAS
+        ]
+
+        f.write(self.plantilla(self.formato, "seccion")(titulo=escapar(titulo)))
+        f.write(self.plantilla(self.formato, "encabezado", len(columnas))(*map(escapar, columnas)))
+
+        buffer = []
+        cantidad = 0
+        for valores in filas:
+            valores = list(valores)
+            for j, convertir in conversiones:
+                valor = valores[j]
+                if valor.__class__ is str:
+                    valores[j] = convertir(valor)
+            buffer.append(fila(*valores))
+            if len(buffer) >= self.tamano_buffer:
+                f.writelines(buffer)
+                cantidad += len(buffer)
+                buffer.clear()
+                if len(escapados) > self.max_escapados:
+                    escapados.clear()
+        f.writelines(buffer)
+        cantidad += len(buffer)
+
+        f.write(self.plantilla(self.formato, "fin_seccion")(cantidad=cantidad))
+        return cantidad
+
+    def generar(self, ruta, reactivos, recetas, experimentos, resultados, estadisticas):
+        """
+        Escribe el reporte completo en un archivo.
+
+        :param ruta: Ruta del archivo de destino.
+        :param reactivos: Iterable de objetos Reactivo.
+        :param recetas: Iterable de objetos Receta.
+        :param experimentos: Iterable de objetos Experimento.
+        :param resultados: Iterable de objetos Resultado (puede ser un generador).
+        :param estadisticas: Iterable de tuplas (indicador, valor); si es un generador se recorre al final.
+        :return: Diccionario {sección: cantidad de filas}.
+        """
+        totales = {}
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(self.plantilla(self.formato, "inicio")(fecha=datetime.now().isoformat(timespec="seconds")))
+            totales["reactivos"] = self.escribir_seccion(f, "reactivos", self.filas_reactivos(reactivos))
+            totales["recetas"] = self.escribir_seccion(f, "recetas", self.filas_recetas(recetas))
+            totales["experimentos"] = self.escribir_seccion(f, "experimentos", self.filas_experimentos(experimentos))
+            totales["resultados"] = self.escribir_seccion(f, "resultados", self.filas_resultados(resultados))
+            totales["estadisticas"] = self.escribir_seccion(f, "estadisticas", estadisticas)
+            f.write(self.plantilla(self.formato, "fin")())
+        return totales
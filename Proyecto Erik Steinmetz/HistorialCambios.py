@@ -0,0 +1,206 @@
+import copy
+
+
+class Version:
+    """
+    Conjunto de cambios hechos por una edición: para cada entidad, los campos que cambiaron
+    con su valor anterior y su valor nuevo.
+    """
+
+    __slots__ = ("descripcion", "escenario", "cambios")
+
+    def __init__(self, descripcion, escenario, cambios):
+        """
+        :param descripcion: Descripción de la edición (ej. "Editar reactivo 'Etanol'").
+        :param escenario: Nombre de la simulación activa al hacer la edición, o None.
+        :param cambios: Lista de tuplas (entidad, {campo: valor anterior}, {campo: valor nuevo}).
+        """
+        self.descripcion = descripcion
+        self.escenario = escenario
+        self.cambios = cambios
+
+    def entidades(self):
+        """
+        Retorna tuplas (entidad, campos modificados) de la versión.
+        """
+        return [(entidad, set(antes)) for entidad, antes, _ in self.cambios]
+
+
+class HistorialCambios:
+    """
+    Historial de ediciones con deshacer, rehacer y simulaciones ("qué pasaría si").
+
+    Cada versión guarda solo los campos modificados de las entidades editadas; todo lo demás
+    se comparte con el estado actual de la aplicación. Deshacer o rehacer una versión cuesta
+    lo proporcional a sus cambios. Una simulación es una secuencia de versiones que se puede
+    descartar (se deshacen sus cambios y se guardan aparte) y volver a abrir más tarde.
+
+    Una versión solo se deshace (o rehace) si sus campos siguen teniendo los valores que dejó
+    (o que encontró): si algo los cambió después sin pasar por el historial (ej. el descuento de
+    inventario al realizar un experimento), aplicarla pisaría ese cambio y se rechaza.
+    """
+
+    def __init__(self, max_versiones=200):
+        """
+        Inicializa el historial vacío.
+
+        :param max_versiones: Cantidad máxima de versiones que se pueden deshacer.
+        """
+        self.max_versiones = max_versiones
+        self.deshacer_pila = []  # Versiones aplicadas, la última arriba
+        self.rehacer_pila = []  # Versiones deshechas, la última deshecha arriba
+        self.escenario = None  # Nombre de la simulación activa
+        self.escenarios = {}  # {nombre: lista de versiones} de las simulaciones descartadas
+
+    @staticmethod
+    def capturar(entidad):
+        """
+        Copia el estado de una entidad antes de editarla (listas y diccionarios se copian un nivel).
+
+        :param entidad: Objeto a capturar (ej. Reactivo o Experimento).
+        :return: Diccionario {campo: valor}.
+        """
+        return {campo: copy.copy(valor) if isinstance(valor, (list, dict)) else valor for campo, valor in vars(entidad).items()}
+
+    def registrar(self, descripcion, capturas):
+        """
+        Registra una edición comparando el estado capturado antes con el estado actual.
+
+        :param descripcion: Descripción de la edición.
+        :param capturas: Lista de tuplas (entidad, estado retornado por `capturar` antes de editarla).
+        :return: Versión registrada, o None si no hubo cambios.
+        """
+        cambios = []
+        for entidad, antes in capturas:
+            despues = self.capturar(entidad)
+            campos = [campo for campo in despues.keys() | antes.keys() if antes.get(campo) != despues.get(campo)]
+            if campos:
+                cambios.append((entidad, {c: antes.get(c) for c in campos}, {c: despues.get(c) for c in campos}))
+        if not cambios:
+            return None
+
+        version = Version(descripcion, self.escenario, cambios)
+        self.deshacer_pila.append(version)
+        self.rehacer_pila.clear()
+        if len(self.deshacer_pila) > self.max_versiones and self.deshacer_pila[0].escenario is None:
+            del self.deshacer_pila[0]
+        return version
+
+    @staticmethod
+    def conflictos(version, rehacer):
+        """
+        Busca los campos de una versión que cambiaron desde que se aplicó (o se deshizo).
+
+        :param version: Objeto Version.
+        :param rehacer: True para comparar con los valores anteriores (antes de rehacerla); False
+                        para comparar con los nuevos (antes de deshacerla).
+        :return: Lista de tuplas (entidad, campo) con valores distintos de los esperados.
+        """
+        return [
+            (entidad, campo)
+            for entidad, antes, despues in version.cambios
+            for campo, valor in (antes if rehacer else despues).items()
+            if getattr(entidad, campo, None) != valor
+        ]
+
+    def siguiente(self, rehacer):
+        """
+        Obtiene la versión que se desharía (o reharía) a continuación, sin aplicarla.
+
+        :param rehacer: True para la próxima versión a rehacer; False para la próxima a deshacer.
+        :return: Objeto Version, o None si no hay (o solo quedan versiones anteriores a la simulación activa).
+        """
+        if rehacer:
+            return self.rehacer_pila[-1] if self.rehacer_pila else None
+        if not self.deshacer_pila or (self.escenario is not None and self.deshacer_pila[-1].escenario != self.escenario):
+            return None
+        return self.deshacer_pila[-1]
+
+    @staticmethod
+    def aplicar(version, rehacer):
+        """
+        Aplica los valores anteriores (deshacer) o nuevos (rehacer) de una versión a sus entidades.
+        """
+        for entidad, antes, despues in version.cambios:
+            for campo, valor in (despues if rehacer else antes).items():
+                # Se asigna una copia para que las ediciones siguientes no modifiquen la versión guardada
+                setattr(entidad, campo, copy.copy(valor) if isinstance(valor, (list, dict)) else valor)
+
+    def deshacer(self):
+        """
+        Deshace la última versión.
+
+        :return: Versión deshecha, o None si no hay nada que deshacer (o solo quedan versiones anteriores
+                 a la simulación activa) o si sus campos cambiaron después (ver `conflictos`).
+        """
+        version = self.siguiente(rehacer=False)
+        if version is None or self.conflictos(version, rehacer=False):
+            return None
+        self.deshacer_pila.pop()
+        self.aplicar(version, rehacer=False)
+        self.rehacer_pila.append(version)
+        return version
+
+    def rehacer(self):
+        """
+        Vuelve a aplicar la última versión deshecha.
+
+        :return: Versión rehecha, o None si no hay nada que rehacer o si sus campos cambiaron después de deshacerla.
+        """
+        version = self.siguiente(rehacer=True)
+        if version is None or self.conflictos(version, rehacer=True):
+            return None
+        self.rehacer_pila.pop()
+        self.aplicar(version, rehacer=True)
+        self.deshacer_pila.append(version)
+        return version
+
+    def iniciar_escenario(self, nombre):
+        """
+        Inicia una simulación: las ediciones siguientes se agrupan bajo su nombre.
+
+        :param nombre: Nombre de la simulación.
+        :return: Lista de versiones reaplicadas si la simulación ya existía (se vuelve a abrir), o None si
+                 no se pudo reabrir porque los campos que edita cambiaron desde que se descartó.
+        """
+        guardadas = self.escenarios.get(nombre, [])
+        reaplicadas = []
+        for version in guardadas:
+            if self.conflictos(version, rehacer=True):
+                # Se vuelve al estado anterior y la simulación sigue guardada
+                for aplicada in reversed(reaplicadas):
+                    self.aplicar(aplicada, rehacer=False)
+                return None
+            self.aplicar(version, rehacer=True)
+            reaplicadas.append(version)
+
+        self.escenarios.pop(nombre, None)
+        self.escenario = nombre
+        self.rehacer_pila.clear()
+        self.deshacer_pila.extend(reaplicadas)
+        return reaplicadas
+
+    def terminar_escenario(self, conservar):
+        """
+        Termina la simulación activa.
+
+        :param conservar: True para mantener sus cambios como ediciones normales; False para descartarlos.
+        :return: Lista de versiones deshechas (vacía si se conservan).
+        """
+        nombre = self.escenario
+        deshechas = []
+        if conservar:
+            for version in self.deshacer_pila:
+                if version.escenario == nombre:
+                    version.escenario = None
+        else:
+            while self.deshacer_pila and self.deshacer_pila[-1].escenario == nombre:
+                version = self.deshacer_pila.pop()
+                self.aplicar(version, rehacer=False)
+                deshechas.append(version)
+            if deshechas:
+                # Se guardan en el orden en que se aplicaron, para poder volver a abrir la simulación
+                self.escenarios[nombre] = deshechas[::-1]
+        self.rehacer_pila = [version for version in self.rehacer_pila if version.escenario != nombre]
+        self.escenario = None
+        return deshechas
@@ -0,0 +1,150 @@
+import csv
+import json
+from itertools import islice
+
+import numpy as np
+
+from Resultado import Resultado
+
+
+class ImportadorLecturas:
+    """
+    Importa por lotes las lecturas reales de los instrumentos desde archivos CSV o JSON lines.
+
+    Cada fila corresponde a un resultado e incluye la columna `experimento_id` más el valor
+    final de cada medición (columna con el nombre de la medición) o las lecturas que usa su
+    fórmula. El archivo se lee por bloques, por lo que la memoria usada no depende de su tamaño.
+    """
+
+    def __init__(self, experimentos_por_id, formulas, tamano_lote=5000):
+        """
+        Inicializa el importador.
+
+        :param experimentos_por_id: Diccionario {id: Experimento}.
+        :param formulas: Objeto CompiladorFormulas usado para calcular las mediciones.
+        :param tamano_lote: Cantidad de filas procesadas a la vez.
+        """
+        self.experimentos_por_id = experimentos_por_id
+        self.formulas = formulas
+        self.tamano_lote = tamano_lote
+
+    def leer_filas(self, ruta):
+        """
+        Recorre las filas de un archivo CSV o JSON lines sin cargarlo completo.
+
+        :param ruta: Ruta del archivo (.csv, .jsonl o .ndjson).
+        :return: Generador de diccionarios {columna: valor}.
+        """
+        with open(ruta, "r", encoding="utf-8", newline="") as f:
+            if ruta.lower().endswith((".jsonl", ".ndjson")):
+                for linea in f:
+                    if linea.strip():
+                        yield json.loads(linea)
+            else:
+                yield from csv.DictReader(f)
+
+    @staticmethod
+    def convertir_columna(valores):
+        """
+        Convierte una columna de valores a números.
+
+        :param valores: Lista de valores (números o textos).
+        :return: Arreglo de floats, con NaN en los valores vacíos o no numéricos.
+        """
+        try:
+            return np.asarray(valores, dtype=float)
+        except (TypeError, ValueError):
+            arreglo = np.empty(len(valores))
+            for i, valor in enumerate(valores):
+                try:
+                    arreglo[i] = float(valor)
+                except (TypeError, ValueError):
+                    arreglo[i] = np.nan
+            return arreglo
+
+    def importar(self, ruta, registrar):
+        """
+        Importa todas las filas de un archivo y registra un resultado por cada fila válida.
+
+        :param ruta: Ruta del archivo.
+        :param registrar: Función que recibe cada Resultado creado (ej. `App.registrar_resultado`).
+        :return: Diccionario con el resumen {"leidas", "importadas", "rechazadas", "fuera_de_rango", "errores"}.
+        """
+        resumen = {"leidas": 0, "importadas": 0, "rechazadas": 0, "fuera_de_rango": 0, "errores": {}}
+        filas = self.leer_filas(ruta)
+        while True:
+            lote = list(islice(filas, self.tamano_lote))
+            if not lote:
+                break
+            resumen["leidas"] += len(lote)
+            self.procesar_lote(lote, registrar, resumen)
+        return resumen
+
+    def rechazar(self, resumen, motivo, cantidad=1):
+        """
+        Cuenta filas rechazadas agrupadas por motivo.
+
+        :param resumen: Diccionario de resumen que se actualiza.
+        :param motivo: Motivo del rechazo.
+        :param cantidad: Cantidad de filas rechazadas.
+        """
+        resumen["rechazadas"] += cantidad
+        resumen["errores"][motivo] = resumen["errores"].get(motivo, 0) + cantidad
+
+    def procesar_lote(self, lote, registrar, resumen):
+        """
+        Valida un lote de filas de forma vectorizada, agrupándolas por receta.
+
+        :param lote: Lista de filas {columna: valor}.
+        :param registrar: Función que recibe cada Resultado creado.
+        :param resumen: Diccionario de resumen que se actualiza.
+        """
+        # Agrupar las filas por receta, porque cada receta tiene sus propias mediciones
+        grupos = {}
+        for fila in lote:
+            try:
+                experimento = self.experimentos_por_id.get(int(fila.get("experimento_id")))
+            except (TypeError, ValueError):
+                experimento = None
+            if experimento is None:
+                self.rechazar(resumen, "experimento inexistente")
+                continue
+            grupos.setdefault(experimento.receta.id, []).append((experimento, fila))
+
+        for filas in grupos.values():
+            receta = filas[0][0].receta
+            columnas = {columna for _, fila in filas for columna in fila if columna != "experimento_id"}
+
+            lecturas = {}
+            for columna in columnas:
+                lecturas[columna] = self.convertir_columna([fila.get(columna) for _, fila in filas])
+
+            try:
+                valores, _ = self.formulas.evaluar_receta(receta, lecturas)
+            except ValueError as error:
+                self.rechazar(resumen, str(error), len(filas))
+                continue
+
+            # Una fila con lecturas faltantes o no numéricas en una medición no se importa
+            incompletas = np.zeros(len(filas), dtype=bool)
+            for arreglo in valores.values():
+                incompletas |= np.isnan(np.broadcast_to(arreglo, incompletas.shape))
+            if incompletas.any():
+                self.rechazar(resumen, "lecturas faltantes o no numéricas", int(incompletas.sum()))
+
+            valores_aceptables = {m.nombre: (m.minimo, m.maximo) for m in receta.valores_a_medir}
+            columnas_valores = {
+                nombre: np.broadcast_to(np.round(arreglo, 2), incompletas.shape).tolist()
+                for nombre, arreglo in valores.items()
+            }
+
+            for i, (experimento, _) in enumerate(filas):
+                if incompletas[i]:
+                    continue
+                valores_obtenidos = {nombre: columna[i] for nombre, columna in columnas_valores.items()}
+                # Se evalúa con los valores redondeados que se guardan, para que `valido == (fallos == 0)`
+                resultado = Resultado(experimento, valores_obtenidos, valores_aceptables)
+                registrar(resultado)
+                resumen["importadas"] += 1
+                if not resultado.valido:
+                    resumen["fuera_de_rango"] += 1
@@ -0,0 +1,137 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+class IndiceSecundario:
+    """
+    Índice de un atributo de los objetos de una colección.
+
+    Mantiene las claves ordenadas por cada valor del atributo (para filtros por igualdad)
+    y, si se indica, los pares (valor, clave) ordenados (para filtros por rango, como fechas).
+    """
+
+    def __init__(self, extraer, multiple=False, rango=False):
+        """
+        Inicializa un índice vacío.
+
+        :param extraer: Función que recibe un objeto y retorna el valor del atributo indexado.
+        :param multiple: True si `extraer` retorna una lista de valores (ej. responsables).
+        :param rango: True para mantener también los pares ordenados que permiten filtrar por rango.
+        """
+        self.extraer = extraer
+        self.multiple = multiple
+        self.permite_rango = rango
+        self.claves = []  # Todas las claves indexadas, ordenadas
+        self.por_valor = {}  # {valor: lista ordenada de claves}
+        self.entradas = []  # Lista ordenada de tuplas (valor, clave)
+        self.valores_por_clave = {}  # {clave: tupla de valores}, para eliminar o actualizar
+
+    def agregar(self, clave, objeto):
+        """
+        Agrega (o actualiza) un objeto en el índice.
+
+        :param clave: Identificador del objeto.
+        :param objeto: Objeto a indexar.
+        """
+        if clave in self.valores_por_clave:
+            self.eliminar(clave)
+
+        valores = self.extraer(objeto)
+        valores = tuple(dict.fromkeys(valores)) if self.multiple else (valores,)
+
+        insort(self.claves, clave)
+        for valor in valores:
+            insort(self.por_valor.setdefault(valor, []), clave)
+            if self.permite_rango and valor is not None:
+                insort(self.entradas, (valor, clave))
+        self.valores_por_clave[clave] = valores
+
+    def eliminar(self, clave):
+        """
+        Elimina un objeto del índice.
+
+        :param clave: Identificador del objeto.
+        """
+        valores = self.valores_por_clave.pop(clave, None)
+        if valores is None:
+            return
+
+        del self.claves[bisect_left(self.claves, clave)]
+        for valor in valores:
+            claves_valor = self.por_valor[valor]
+            del claves_valor[bisect_left(claves_valor, clave)]
+            if not claves_valor:
+                del self.por_valor[valor]
+            if self.permite_rango and valor is not None:
+                del self.entradas[bisect_left(self.entradas, (valor, clave))]
+
+    def limpiar(self):
+        """
+        Vacía el índice.
+        """
+        self.claves.clear()
+        self.por_valor.clear()
+        self.entradas.clear()
+        self.valores_por_clave.clear()
+
+    def estado(self):
+        """
+        Obtiene las estructuras internas del índice para guardarlas en un snapshot.
+
+        La función `extraer` no se incluye, ya que pertenece a quien crea el índice.
+
+        :return: Tupla (claves, por_valor, entradas, valores_por_clave).
+        """
+        return self.claves, self.por_valor, self.entradas, self.valores_por_clave
+
+    def restaurar(self, estado):
+        """
+        Reemplaza las estructuras internas del índice por las de un snapshot.
+
+        :param estado: Tupla retornada por `estado`.
+        """
+        self.claves, self.por_valor, self.entradas, self.valores_por_clave = estado
+
+    def claves_con_valor(self, valor):
+        """
+        Retorna las claves de los objetos que tienen un valor.
+
+        :param valor: Valor buscado.
+        :return: Lista ordenada de claves (no debe modificarse).
+        """
+        return self.por_valor.get(valor, [])
+
+    def rango(self, desde, hasta):
+        """
+        Calcula las posiciones de `entradas` cuyo valor está entre dos límites.
+
+        :param desde: Límite inferior (inclusive), o None para no limitar.
+        :param hasta: Límite superior (inclusive), o None para no limitar.
+        :return: Tupla (inicio, fin) de posiciones en `entradas`.
+        """
+        inicio = 0 if desde is None else bisect_left(self.entradas, desde, key=lambda e: e[0])
+        fin = len(self.entradas) if hasta is None else bisect_right(self.entradas, hasta, key=lambda e: e[0])
+        return inicio, fin
+
+    def tiene_valor(self, clave, valor):
+        """
+        Verifica si un objeto tiene un valor.
+
+        :param clave: Identificador del objeto.
+        :param valor: Valor buscado.
+        :return: True si el objeto tiene el valor.
+        """
+        return valor in self.valores_por_clave.get(clave, ())
+
+    def en_rango(self, clave, desde, hasta):
+        """
+        Verifica si alguno de los valores de un objeto está entre dos límites.
+
+        :param clave: Identificador del objeto.
+        :param desde: Límite inferior (inclusive), o None.
+        :param hasta: Límite superior (inclusive), o None.
+        :return: True si algún valor está en el rango.
+        """
+        for valor in self.valores_por_clave.get(clave, ()):
+            if valor is not None and (desde is None or desde <= valor) and (hasta is None or valor <= hasta):
+                return True
+        return False
@@ -0,0 +1,204 @@
+import heapq
+import unicodedata
+from bisect import bisect_left, insort
+
+
+class IndiceTexto:
+    """
+    Índice invertido de texto para buscar reactivos o recetas por coincidencia
+    exacta de palabras, por prefijo o aproximada (tolerante a errores de tipeo).
+    """
+
+    def __init__(self, max_expansion=64, similitud_minima=0.4):
+        """
+        Inicializa un índice vacío.
+
+        :param max_expansion: Máximo de palabras del vocabulario consideradas por cada prefijo o búsqueda aproximada.
+        :param similitud_minima: Similitud mínima de trigramas para aceptar una coincidencia aproximada.
+        """
+        self.max_expansion = max_expansion
+        self.similitud_minima = similitud_minima
+        self.publicaciones = {}  # {palabra: {clave: peso}}
+        self.palabras_por_clave = {}  # {clave: {palabra: peso}} para poder eliminar o actualizar
+        self.vocabulario = []  # Palabras ordenadas alfabéticamente para búsquedas por prefijo
+        self.trigramas = {}  # {trigrama: conjunto de palabras}
+
+    @staticmethod
+    def normalizar(texto):
+        """
+        Convierte un texto a minúsculas y sin acentos.
+
+        :param texto: Texto original.
+        :return: Texto normalizado.
+        """
+        texto = unicodedata.normalize("NFKD", str(texto).lower())
+        return "".join(c for c in texto if not unicodedata.combining(c))
+
+    @classmethod
+    def tokenizar(cls, texto):
+        """
+        Separa un texto en palabras normalizadas.
+
+        :param texto: Texto original.
+        :return: Lista de palabras.
+        """
+        texto = cls.normalizar(texto)
+        return "".join(c if c.isalnum() else " " for c in texto).split()
+
+    @staticmethod
+    def obtener_trigramas(palabra):
+        """
+        Calcula los trigramas de una palabra, con bordes para palabras cortas.
+
+        :param palabra: Palabra normalizada.
+        :return: Conjunto de trigramas.
+        """
+        palabra = f"  {palabra} "
+        return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+
+    def agregar(self, clave, campos):
+        """
+        Agrega (o reemplaza) un elemento en el índice.
+
+        :param clave: Identificador del elemento.
+        :param campos: Lista de tuplas (texto, peso) con los campos a indexar.
+        """
+        if clave in self.palabras_por_clave:
+            self.eliminar(clave)
+
+        palabras = {}
+        for texto, peso in campos:
+            for palabra in self.tokenizar(texto):
+                palabras[palabra] = max(palabras.get(palabra, 0), peso)
+
+        for palabra, peso in palabras.items():
+            publicacion = self.publicaciones.get(palabra)
+            if publicacion is None:
+                # Palabra nueva en el vocabulario
+                publicacion = self.publicaciones[palabra] = {}
+                insort(self.vocabulario, palabra)
+                for trigrama in self.obtener_trigramas(palabra):
+                    self.trigramas.setdefault(trigrama, set()).add(palabra)
+            publicacion[clave] = peso
+
+        self.palabras_por_clave[clave] = palabras
+
+    def eliminar(self, clave):
+        """
+        Elimina un elemento del índice.
+
+        :param clave: Identificador del elemento.
+        """
+        palabras = self.palabras_por_clave.pop(clave, None)
+        if not palabras:
+            return
+
+        for palabra in palabras:
+            publicacion = self.publicaciones[palabra]
+            publicacion.pop(clave, None)
+            if not publicacion:
+                # La palabra ya no aparece en ningún elemento
+                del self.publicaciones[palabra]
+                del self.vocabulario[bisect_left(self.vocabulario, palabra)]
+                for trigrama in self.obtener_trigramas(palabra):
+                    palabras_trigrama = self.trigramas[trigrama]
+                    palabras_trigrama.discard(palabra)
+                    if not palabras_trigrama:
+                        del self.trigramas[trigrama]
+
+    def limpiar(self):
+        """
+        Vacía el índice.
+        """
+        self.publicaciones.clear()
+        self.palabras_por_clave.clear()
+        self.vocabulario.clear()
+        self.trigramas.clear()
+
+    def estado(self):
+        """
+        Obtiene las estructuras internas del índice para guardarlas en un snapshot.
+
+        :return: Tupla (publicaciones, palabras_por_clave, vocabulario, trigramas).
+        """
+        return self.publicaciones, self.palabras_por_clave, self.vocabulario, self.trigramas
+
+    def restaurar(self, estado):
+        """
+        Reemplaza las estructuras internas del índice por las de un snapshot.
+
+        :param estado: Tupla retornada por `estado`.
+        """
+        self.publicaciones, self.palabras_por_clave, self.vocabulario, self.trigramas = estado
+
+    def palabras_con_prefijo(self, prefijo):
+        """
+        Busca las palabras del vocabulario que comienzan con un prefijo.
+
+        :param prefijo: Prefijo normalizado.
+        :return: Lista de palabras.
+        """
+        palabras = []
+        i = bisect_left(self.vocabulario, prefijo)
+        while i < len(self.vocabulario) and len(palabras) < self.max_expansion:
+            palabra = self.vocabulario[i]
+            if not palabra.startswith(prefijo):
+                break
+            palabras.append(palabra)
+            i += 1
+        return palabras
+
+    def palabras_similares(self, palabra):
+        """
+        Busca palabras del vocabulario parecidas a la dada según sus trigramas.
+
+        :param palabra: Palabra normalizada.
+        :return: Lista de tuplas (palabra, similitud) ordenada de mayor a menor similitud.
+        """
+        trigramas = self.obtener_trigramas(palabra)
+        coincidencias = {}
+        for trigrama in trigramas:
+            for candidata in self.trigramas.get(trigrama, ()):
+                coincidencias[candidata] = coincidencias.get(candidata, 0) + 1
+
+        similares = []
+        for candidata, comunes in coincidencias.items():
+            # Coeficiente de Jaccard aproximado sin recalcular los trigramas de la candidata
+            similitud = comunes / (len(trigramas) + len(candidata) + 1 - comunes)
+            if similitud >= self.similitud_minima:
+                similares.append((candidata, similitud))
+
+        return heapq.nlargest(self.max_expansion, similares, key=lambda x: x[1])
+
+    def buscar(self, consulta, limite=10):
+        """
+        Busca los elementos que mejor coinciden con una consulta.
+
+        Cada palabra de la consulta suma puntaje por coincidencia exacta, por prefijo
+        y, solo si no hubo ninguna de las anteriores, por similitud aproximada.
+
+        :param consulta: Texto ingresado por el usuario.
+        :param limite: Cantidad máxima de resultados.
+        :return: Lista de claves ordenadas por relevancia.
+        """
+        puntajes = {}
+        for palabra in self.tokenizar(consulta):
+            coincidencias = {}
+
+            for clave, peso in self.publicaciones.get(palabra, {}).items():
+                coincidencias[clave] = 3 * peso
+
+            for encontrada in self.palabras_con_prefijo(palabra):
+                for clave, peso in self.publicaciones[encontrada].items():
+                    if clave not in coincidencias:
+                        coincidencias[clave] = 2 * peso
+
+            if not coincidencias:
+                for encontrada, similitud in self.palabras_similares(palabra):
+                    for clave, peso in self.publicaciones[encontrada].items():
+                        coincidencias[clave] = max(coincidencias.get(clave, 0), similitud * peso)
+
+            for clave, puntaje in coincidencias.items():
+                puntajes[clave] = puntajes.get(clave, 0) + puntaje
+
+        return [clave for clave, _ in heapq.nlargest(limite, puntajes.items(), key=lambda x: x[1])]
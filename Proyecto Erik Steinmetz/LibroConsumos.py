@@ -0,0 +1,130 @@
+import heapq
+import json
+import os
+from datetime import datetime
+
+
+class LibroConsumos:
+    """
+    Registro de solo agregado de cada descuento de inventario, con la cantidad planificada
+    (la que indica la receta) y la realmente descontada.
+
+    Cada asiento se agrega al final de un archivo JSON lines en el momento en que ocurre.
+    En memoria solo se mantienen el desperdicio (real - planificado) acumulado por reactivo y
+    un top de los reactivos con más desperdicio, por lo que consultarlo cuesta O(k); los asientos
+    se leen del archivo cuando se necesitan.
+    """
+
+    def __init__(self, ruta="consumos.jsonl", max_top=10):
+        """
+        Inicializa el libro y acumula los asientos existentes.
+
+        :param ruta: Ruta del archivo del libro.
+        :param max_top: Cantidad de reactivos que se mantienen en el top de desperdicio.
+        """
+        self.ruta = ruta
+        self.max_top = max_top
+        self.desperdicio = {}  # {ID de reactivo: desperdicio acumulado}
+        self.top = []  # Lista de tuplas (desperdicio, ID de reactivo) ordenada de mayor a menor
+        self.cargar()
+
+    def cargar(self):
+        """
+        Recorre los asientos del archivo y recalcula los acumulados.
+        """
+        self.desperdicio.clear()
+        self.top.clear()
+        if not os.path.exists(self.ruta):
+            return
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                if linea.strip():
+                    self.aplicar(json.loads(linea))
+
+    def registrar(self, experimento_id, consumos, fecha=None):
+        """
+        Registra los descuentos de inventario de un experimento.
+
+        :param experimento_id: ID del experimento realizado.
+        :param consumos: Lista de tuplas (ID de reactivo, cantidad planificada, cantidad real).
+        :param fecha: Fecha y hora del descuento; si es None se usa la actual.
+        """
+        fecha = fecha or datetime.now().isoformat(timespec="seconds")
+        asientos = [
+            {"fecha": fecha, "experimento_id": experimento_id, "reactivo_id": reactivo_id,
+             "planificado": planificado, "real": real}
+            for reactivo_id, planificado, real in consumos
+        ]
+
+        # Se escriben todos los asientos del experimento juntos y se fuerza su escritura en disco
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(asiento, ensure_ascii=False) + "\n" for asiento in asientos))
+            f.flush()
+            os.fsync(f.fileno())
+
+        for asiento in asientos:
+            self.aplicar(asiento)
+
+    def aplicar(self, asiento):
+        """
+        Suma un asiento al desperdicio acumulado y actualiza el top.
+
+        :param asiento: Diccionario {fecha, experimento_id, reactivo_id, planificado, real}.
+        """
+        reactivo_id = asiento["reactivo_id"]
+        anterior = self.desperdicio.get(reactivo_id, 0)
+        actual = anterior + asiento["real"] - asiento["planificado"]
+        self.desperdicio[reactivo_id] = actual
+        self.actualizar_top(reactivo_id, anterior, actual)
+
+    def actualizar_top(self, reactivo_id, anterior, actual):
+        """
+        Actualiza el top de desperdicio después de cambiar el de un reactivo, en O(k).
+
+        Mientras el desperdicio solo aumente, ningún reactivo fuera del top puede superar al
+        último del top sin ser actualizado, por lo que basta con revisar el reactivo modificado.
+
+        :param reactivo_id: ID del reactivo modificado.
+        :param anterior: Desperdicio acumulado antes del asiento.
+        :param actual: Desperdicio acumulado después del asiento.
+        """
+        en_top = (anterior, reactivo_id) in self.top
+        if en_top:
+            self.top.remove((anterior, reactivo_id))
+            if actual < anterior and len(self.desperdicio) > self.max_top:
+                # Una disminución puede dejar entrar a otro reactivo: se recalcula el top completo
+                self.top = heapq.nlargest(self.max_top, ((d, r) for r, d in self.desperdicio.items()))
+                return
+
+        if len(self.top) < self.max_top or actual > self.top[-1][0]:
+            self.top.append((actual, reactivo_id))
+            self.top.sort(reverse=True)
+            del self.top[self.max_top:]
+
+    def consumos_por_dia(self, desde=None, hasta=None):
+        """
+        Recorre el archivo del libro y obtiene lo descontado realmente dentro de un rango de fechas.
+
+        :param desde: Fecha inicial "YYYY-MM-DD" (inclusive), o None.
+        :param hasta: Fecha final "YYYY-MM-DD" (inclusive), o None.
+        :return: Generador de tuplas (día "YYYY-MM-DD", ID de reactivo, cantidad real).
+        """
+        if not os.path.exists(self.ruta):
+            return
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                asiento = json.loads(linea)
+                dia = asiento["fecha"][:10]
+                if (desde is None or dia >= desde) and (hasta is None or dia <= hasta):
+                    yield dia, asiento["reactivo_id"], asiento["real"]
+
+    def mayor_desperdicio(self, cantidad=3):
+        """
+        Obtiene los reactivos con mayor desperdicio acumulado.
+
+        :param cantidad: Cantidad de reactivos (como máximo `max_top`).
+        :return: Lista de tuplas (ID de reactivo, desperdicio) de mayor a menor.
+        """
+        return [(reactivo_id, desperdicio) for desperdicio, reactivo_id in self.top[:cantidad]]
@@ -0,0 +1,221 @@
+import cProfile
+import io
+import json
+import pstats
+import random
+import re
+import time
+from functools import wraps
+
+
+class Cronometro:
+    """
+    Mide la duración de un bloque de código y la registra en las métricas al terminar.
+    """
+
+    __slots__ = ("metricas", "nombre", "elementos", "inicio")
+
+    def __init__(self, metricas, nombre):
+        """
+        Inicializa el cronómetro.
+
+        :param metricas: Objeto `Metricas` donde se registrará la medición.
+        :param nombre: Nombre de la operación medida.
+        """
+        self.metricas = metricas
+        self.nombre = nombre
+        self.elementos = 0  # Cantidad de elementos procesados, se puede asignar dentro del bloque
+        self.inicio = 0.0
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.metricas.registrar(self.nombre, time.perf_counter() - self.inicio, self.elementos)
+        return False
+
+
+class Metricas:
+    """
+    Registra cantidad de llamadas, latencias y elementos procesados por cada operación de la aplicación.
+    """
+
+    CUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, max_muestras=2048):
+        """
+        Inicializa el registro de métricas.
+
+        :param max_muestras: Cantidad máxima de latencias guardadas por operación para calcular percentiles.
+        """
+        self.max_muestras = max_muestras
+        self.aleatorio = random.Random()  # Generador propio: el muestreo no altera ni depende de la secuencia global
+        self.operaciones = {}  # {operación: {"llamadas", "total", "maximo", "elementos", "muestras"}}
+        self.operacion_a_perfilar = None  # Operación cuya próxima llamada se ejecutará con cProfile
+        self.perfil = None  # Texto con el resumen del último perfil capturado
+
+    def registrar(self, nombre, duracion, elementos=0):
+        """
+        Registra una llamada a una operación.
+
+        :param nombre: Nombre de la operación.
+        :param duracion: Duración de la llamada en segundos.
+        :param elementos: Cantidad de elementos procesados en la llamada.
+        """
+        operacion = self.operaciones.get(nombre)
+        if operacion is None:
+            operacion = {"llamadas": 0, "total": 0.0, "maximo": 0.0, "elementos": 0, "muestras": []}
+            self.operaciones[nombre] = operacion
+
+        operacion["llamadas"] += 1
+        operacion["total"] += duracion
+        operacion["elementos"] += elementos
+        if duracion > operacion["maximo"]:
+            operacion["maximo"] = duracion
+
+        # Muestreo de reservorio: la memoria por operación queda acotada sin sesgar los percentiles
+        muestras = operacion["muestras"]
+        if len(muestras) < self.max_muestras:
+            muestras.append(duracion)
+        else:
+            posicion = self.aleatorio.randrange(operacion["llamadas"])
+            if posicion < self.max_muestras:
+                muestras[posicion] = duracion
+
+    def medir(self, nombre):
+        """
+        Crea un cronómetro para medir un bloque con `with`.
+
+        :param nombre: Nombre de la operación.
+        :return: Objeto `Cronometro`.
+        """
+        return Cronometro(self, nombre)
+
+    def perfilar_siguiente(self, nombre):
+        """
+        Activa la captura con cProfile para la próxima llamada de una operación.
+
+        :param nombre: Nombre de la operación a perfilar.
+        """
+        self.operacion_a_perfilar = nombre
+
+    @staticmethod
+    def ruta_perfil(nombre):
+        """
+        Calcula el archivo donde se guarda el perfil de una operación.
+
+        :param nombre: Nombre de la operación (puede venir del usuario).
+        :return: Nombre de archivo en la carpeta actual, con los caracteres que no son letras, dígitos, "-" o "_" reemplazados.
+        """
+        return f"perfil_{re.sub(r'[^A-Za-z0-9_-]', '_', nombre)}.prof"
+
+    def ejecutar_perfilado(self, funcion, *args, **kwargs):
+        """
+        Ejecuta una función bajo cProfile y guarda el resumen de las funciones más costosas.
+
+        :param funcion: Función a ejecutar.
+        :return: Lo que retorne la función.
+        """
+        nombre = self.operacion_a_perfilar
+        self.operacion_a_perfilar = None  # La captura es de una sola llamada
+
+        perfilador = cProfile.Profile()
+        try:
+            return perfilador.runcall(funcion, *args, **kwargs)
+        finally:
+            perfilador.dump_stats(self.ruta_perfil(nombre))
+            salida = io.StringIO()
+            pstats.Stats(perfilador, stream=salida).sort_stats("cumulative").print_stats(20)
+            self.perfil = salida.getvalue()
+
+    def resumen(self):
+        """
+        Calcula el resumen de cada operación registrada.
+
+        :return: Diccionario {operación: {llamadas, total, promedio, maximo, elementos, p50, p90, p99}}.
+        """
+        resumen = {}
+        for nombre, operacion in self.operaciones.items():
+            muestras = sorted(operacion["muestras"])
+            datos = {
+                "llamadas": operacion["llamadas"],
+                "total": operacion["total"],
+                "promedio": operacion["total"] / operacion["llamadas"],
+                "maximo": operacion["maximo"],
+                "elementos": operacion["elementos"]
+            }
+            for cuantil in self.CUANTILES:
+                indice = min(len(muestras) - 1, int(cuantil * len(muestras)))
+                datos[f"p{int(cuantil * 100)}"] = muestras[indice]
+            resumen[nombre] = datos
+        return resumen
+
+    def exportar_json(self, ruta):
+        """
+        Exporta el resumen de métricas a un archivo JSON.
+
+        :param ruta: Ruta del archivo de salida.
+        """
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.resumen(), f, indent=4, ensure_ascii=False)
+
+    def exportar_prometheus(self, ruta):
+        """
+        Exporta el resumen de métricas en formato de texto de Prometheus.
+
+        :param ruta: Ruta del archivo de salida.
+        """
+        resumen = self.resumen()
+        lineas = [
+            "# HELP laboratorio_operacion_llamadas_total Cantidad de llamadas por operación.",
+            "# TYPE laboratorio_operacion_llamadas_total counter"
+        ]
+        for nombre, datos in resumen.items():
+            lineas.append(f'laboratorio_operacion_llamadas_total{{operacion="{nombre}"}} {datos["llamadas"]}')
+
+        lineas.append("# HELP laboratorio_operacion_elementos_total Elementos procesados por operación.")
+        lineas.append("# TYPE laboratorio_operacion_elementos_total counter")
+        for nombre, datos in resumen.items():
+            lineas.append(f'laboratorio_operacion_elementos_total{{operacion="{nombre}"}} {datos["elementos"]}')
+
+        lineas.append("# HELP laboratorio_operacion_segundos Latencia por operación en segundos.")
+        lineas.append("# TYPE laboratorio_operacion_segundos summary")
+        for nombre, datos in resumen.items():
+            for cuantil in self.CUANTILES:
+                valor = datos[f"p{int(cuantil * 100)}"]
+                lineas.append(f'laboratorio_operacion_segundos{{operacion="{nombre}",quantile="{cuantil}"}} {valor:.9f}')
+            lineas.append(f'laboratorio_operacion_segundos_sum{{operacion="{nombre}"}} {datos["total"]:.9f}')
+            lineas.append(f'laboratorio_operacion_segundos_count{{operacion="{nombre}"}} {datos["llamadas"]}')
+
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write("\n".join(lineas) + "\n")
+
+
+def instrumentar(nombre, elementos=None):
+    """
+    Decorador para métodos de `App` que registra cada llamada en `self.metricas`.
+
+    :param nombre: Nombre de la operación.
+    :param elementos: Función opcional que recibe la app y lo que retornó el método, y retorna la cantidad
+                      de elementos procesados en la llamada (si el método falla se registran 0).
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            metricas = self.metricas
+            inicio = time.perf_counter()
+            procesados = 0
+            try:
+                if metricas.operacion_a_perfilar == nombre:
+                    retorno = metricas.ejecutar_perfilado(metodo, self, *args, **kwargs)
+                else:
+                    retorno = metodo(self, *args, **kwargs)
+                if elementos:
+                    procesados = elementos(self, retorno)
+                return retorno
+            finally:
+                duracion = time.perf_counter() - inicio
+                metricas.registrar(nombre, duracion, procesados)
+        return envoltura
+    return decorador
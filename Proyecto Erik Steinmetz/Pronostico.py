@@ -0,0 +1,113 @@
+import numpy as np
+
+
+class PronosticoAgotamiento:
+    """
+    Pronóstico de la fecha de agotamiento de todos los reactivos a la vez.
+
+    El consumo de cada reactivo se agrupa por semanas y se suaviza exponencialmente
+    (las semanas recientes pesan más) para estimar una tasa diaria. A partir de esa tasa y
+    de los experimentos planificados se calcula cuándo el inventario llega a cero. Todas las
+    operaciones son vectoriales sobre el catálogo completo.
+    """
+
+    def __init__(self, semanas=12, suavizado=0.3):
+        """
+        Inicializa el modelo.
+
+        :param semanas: Cantidad de semanas de historial usadas para estimar la tasa.
+        :param suavizado: Factor de suavizado exponencial (entre 0 y 1; mayor da más peso a lo reciente).
+        """
+        self.semanas = semanas
+        self.suavizado = suavizado
+
+    def tasas(self, cantidad_reactivos, posiciones, dias, cantidades):
+        """
+        Estima la tasa de consumo diaria de cada reactivo.
+
+        :param cantidad_reactivos: Tamaño del catálogo.
+        :param posiciones: Arreglo con la posición en el catálogo del reactivo de cada consumo.
+        :param dias: Arreglo con los días transcurridos desde cada consumo (0 = hoy).
+        :param cantidades: Arreglo con la cantidad de cada consumo.
+        :return: Arreglo con la tasa diaria de cada reactivo.
+        """
+        semanas = np.asarray(dias, dtype=np.int64) // 7  # 0 = última semana
+        dentro = (semanas >= 0) & (semanas < self.semanas)
+
+        # Matriz reactivo x semana con el consumo total de cada semana
+        consumo = np.bincount(
+            np.asarray(posiciones, dtype=np.int64)[dentro] * self.semanas + semanas[dentro],
+            weights=np.asarray(cantidades, dtype=float)[dentro],
+            minlength=cantidad_reactivos * self.semanas
+        ).reshape(cantidad_reactivos, self.semanas)
+
+        pesos = self.suavizado * (1 - self.suavizado) ** np.arange(self.semanas)
+        return consumo @ pesos / pesos.sum() / 7
+
+    @staticmethod
+    def dias_hasta_agotamiento(inventario, tasas, posiciones, dias, cantidades):
+        """
+        Calcula en cuántos días se agota cada reactivo.
+
+        El inventario disminuye de forma continua según la tasa y de golpe en cada
+        experimento planificado; se busca el primer momento en que llega a cero.
+
+        :param inventario: Arreglo con el inventario actual de cada reactivo.
+        :param tasas: Arreglo con la tasa de consumo diaria de cada reactivo.
+        :param posiciones: Arreglo con la posición en el catálogo del reactivo de cada consumo planificado.
+        :param dias: Arreglo con los días que faltan para cada consumo planificado.
+        :param cantidades: Arreglo con la cantidad de cada consumo planificado.
+        :return: Arreglo con los días hasta el agotamiento (inf si no se agota).
+        """
+        inventario = np.asarray(inventario, dtype=float)
+        tasas = np.asarray(tasas, dtype=float)
+        posiciones = np.asarray(posiciones, dtype=np.int64)
+        dias = np.asarray(dias, dtype=float)
+        cantidades = np.asarray(cantidades, dtype=float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Sin consumos planificados: el inventario se acaba solo por la tasa
+            resultado = np.where(tasas > 0, inventario / tasas, np.inf)
+
+            if len(posiciones):
+                orden = np.lexsort((dias, posiciones))
+                posiciones, dias, cantidades = posiciones[orden], dias[orden], cantidades[orden]
+
+                # Consumo planificado acumulado dentro de cada reactivo
+                acumulado = np.cumsum(cantidades)
+                primero = np.r_[True, posiciones[1:] != posiciones[:-1]]
+                inicio_grupo = np.maximum.accumulate(np.where(primero, np.arange(len(posiciones)), 0))
+                acumulado -= (acumulado - cantidades)[inicio_grupo]
+                anterior = acumulado - cantidades
+                dia_anterior = np.where(primero, 0, np.r_[0, dias[:-1]])
+
+                stock = inventario[posiciones]
+                tasa = tasas[posiciones]
+                antes = stock - tasa * dias - anterior  # Inventario justo antes del consumo
+                despues = antes - cantidades  # Inventario justo después del consumo
+
+                # Si se agotó antes del consumo, fue por la tasa entre el consumo anterior y este
+                cruce_tasa = np.maximum(np.where(tasa > 0, (stock - anterior) / tasa, np.inf), dia_anterior)
+                candidatos = np.where(antes <= 0, cruce_tasa, np.where(despues <= 0, dias, np.inf))
+
+                # Después del último consumo planificado solo queda la tasa
+                ultimo = np.r_[posiciones[1:] != posiciones[:-1], True]
+                restante = stock[ultimo] - acumulado[ultimo]
+                final = np.where(tasa[ultimo] > 0, restante / tasa[ultimo], np.inf)
+                resultado[posiciones[ultimo]] = np.maximum(final, dias[ultimo])
+
+                np.minimum.at(resultado, posiciones, candidatos)
+
+        return np.where(inventario <= 0, 0.0, resultado)
+
+    def pronosticar(self, inventario, historial, planificados):
+        """
+        Calcula la tasa de consumo y los días hasta el agotamiento de todo el catálogo.
+
+        :param inventario: Arreglo con el inventario actual de cada reactivo.
+        :param historial: Tupla (posiciones, días transcurridos, cantidades) de los consumos pasados.
+        :param planificados: Tupla (posiciones, días que faltan, cantidades) de los consumos planificados.
+        :return: Tupla (tasas diarias, días hasta el agotamiento).
+        """
+        tasas = self.tasas(len(inventario), *historial)
+        return tasas, self.dias_hasta_agotamiento(inventario, tasas, *planificados)
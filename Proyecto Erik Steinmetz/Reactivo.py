@@ -33,21 +33,22 @@ class Reactivo:
         """
         Devuelve una representación en string del reactivo.
         """
-        info = (f"ID: {self.id}\n"
-                f"Nombre: {self.nombre}\n"
-                f"Descripción: {self.descripcion}\n"
-                f"Costo: ${self.costo:.2f}\n"
-                f"Categoría: {self.categoria}\n"
-                f"Inventario Disponible: {self.inventario} {self.unidad_medida}\n"
-                f"Fecha de Caducidad: {self.fecha_caducidad}\n"
-                f"Mínimo Sugerido: {self.minimo} {self.unidad_medida}\n"
-                "Conversiones Posibles:\n")
+        lineas = [
+            f"ID: {self.id}",
+            f"Nombre: {self.nombre}",
+            f"Descripción: {self.descripcion}",
+            f"Costo: ${self.costo:.2f}",
+            f"Categoría: {self.categoria}",
+            f"Inventario Disponible: {self.inventario} {self.unidad_medida}",
+            f"Fecha de Caducidad: {self.fecha_caducidad}",
+            f"Mínimo Sugerido: {self.minimo} {self.unidad_medida}",
+            "Conversiones Posibles:"
+        ]
 
-        # Verifica si hay conversiones registradas y las agrega al string
+        # Verifica si hay conversiones registradas y las agrega a las líneas
         if self.conversiones:
-            for conversion in self.conversiones:
-                info += f"- {conversion.unidad} (Factor: {conversion.factor})\n"
+            lineas.extend(f"- {conversion.unidad} (Factor: {conversion.factor})" for conversion in self.conversiones)
         else:
-            info += "No tiene conversiones registradas.\n"
+            lineas.append("No tiene conversiones registradas.")
 
-        return info
\ No newline at end of file
+        return "\n".join(lineas) + "\n"
\ No newline at end of file
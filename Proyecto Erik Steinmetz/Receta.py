@@ -25,25 +25,18 @@ class Receta:
         """
         Retorna una cadena con la información completa de la receta.
         """
-        receta_str = f"\nReceta: {self.nombre} (ID: {self.id})\n"
-        receta_str += f"Objetivo: {self.objetivo}\n\n"
+        lineas = [f"\nReceta: {self.nombre} (ID: {self.id})", f"Objetivo: {self.objetivo}\n"]
 
         # Lista de reactivos
-        receta_str += "Reactivos Utilizados:\n"
-        for item in self.reactivos:
-            reactivo = item["reactivo"]
-            cantidad = item["cantidad"]
-            unidad = item["unidad"]
-            receta_str += f"- {reactivo.nombre}: {cantidad} {unidad}\n"
+        lineas.append("Reactivos Utilizados:")
+        lineas.extend(f"- {item['reactivo'].nombre}: {item['cantidad']} {item['unidad']}" for item in self.reactivos)
 
         # Procedimiento
-        receta_str += "\nProcedimiento:\n"
-        for i, paso in enumerate(self.procedimiento, start=1):
-            receta_str += f"  {i}. {paso}\n"
+        lineas.append("\nProcedimiento:")
+        lineas.extend(f"  {i}. {paso}" for i, paso in enumerate(self.procedimiento, start=1))
 
         # Valores a medir
-        receta_str += "\nValores a Medir:\n"
-        for medicion in self.valores_a_medir:
-            receta_str += f"- {medicion.nombre}: {medicion.formula} ({medicion.minimo} - {medicion.maximo})\n"
+        lineas.append("\nValores a Medir:")
+        lineas.extend(f"- {m.nombre}: {m.formula} ({m.minimo} - {m.maximo})" for m in self.valores_a_medir)
 
-        return receta_str
\ No newline at end of file
+        return "\n".join(lineas) + "\n"
\ No newline at end of file
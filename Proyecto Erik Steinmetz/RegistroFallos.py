@@ -0,0 +1,88 @@
+import json
+import os
+from datetime import datetime
+
+
+class RegistroFallos:
+    """
+    Registro de solo agregado de los intentos de crear o realizar un experimento que fueron
+    rechazados (por falta de inventario o por un reactivo caducado).
+
+    Cada evento se agrega a un archivo JSON lines en el momento en que ocurre. En memoria solo
+    se mantienen contadores por receta, por reactivo y por motivo, que se consultan en O(1).
+    """
+
+    FALTA_INVENTARIO = "falta de inventario"
+    CADUCADO = "reactivo caducado"
+
+    def __init__(self, ruta="fallos.jsonl"):
+        """
+        Inicializa el registro y cuenta los eventos existentes.
+
+        :param ruta: Ruta del archivo del registro.
+        """
+        self.ruta = ruta
+        self.total = 0
+        self.por_receta = {}  # {ID de receta: cantidad de fallos}
+        self.por_reactivo = {}  # {ID de reactivo: cantidad de fallos}
+        self.por_motivo = {}  # {motivo: cantidad de fallos}
+        self.cargar()
+
+    def cargar(self):
+        """
+        Recorre los eventos del archivo y recalcula los contadores.
+        """
+        self.total = 0
+        self.por_receta.clear()
+        self.por_reactivo.clear()
+        self.por_motivo.clear()
+        if not os.path.exists(self.ruta):
+            return
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                if linea.strip():
+                    self.aplicar(json.loads(linea))
+
+    def registrar(self, etapa, receta_id, reactivo_id, motivo, disponible=None, requerido=None, experimento_id=None):
+        """
+        Registra un intento rechazado.
+
+        :param etapa: "crear" o "realizar".
+        :param receta_id: ID de la receta del experimento.
+        :param reactivo_id: ID del reactivo que impidió el experimento.
+        :param motivo: `FALTA_INVENTARIO` o `CADUCADO`.
+        :param disponible: Inventario disponible del reactivo en ese momento.
+        :param requerido: Cantidad requerida por la receta.
+        :param experimento_id: ID del experimento (None si el intento fue al crearlo).
+        """
+        evento = {
+            "fecha": datetime.now().isoformat(timespec="seconds"), "etapa": etapa, "receta_id": receta_id,
+            "experimento_id": experimento_id, "reactivo_id": reactivo_id, "motivo": motivo,
+            "disponible": disponible, "requerido": requerido
+        }
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+        self.aplicar(evento)
+
+    def aplicar(self, evento):
+        """
+        Suma un evento a los contadores.
+
+        :param evento: Diccionario {fecha, etapa, receta_id, experimento_id, reactivo_id, motivo, disponible, requerido}.
+        """
+        self.total += 1
+        self.por_receta[evento["receta_id"]] = self.por_receta.get(evento["receta_id"], 0) + 1
+        self.por_reactivo[evento["reactivo_id"]] = self.por_reactivo.get(evento["reactivo_id"], 0) + 1
+        self.por_motivo[evento["motivo"]] = self.por_motivo.get(evento["motivo"], 0) + 1
+
+    def fallos_de_receta(self, receta_id):
+        """
+        Retorna la cantidad de intentos rechazados de una receta.
+        """
+        return self.por_receta.get(receta_id, 0)
+
+    def fallos_de_reactivo(self, reactivo_id):
+        """
+        Retorna la cantidad de intentos rechazados por un reactivo.
+        """
+        return self.por_reactivo.get(reactivo_id, 0)
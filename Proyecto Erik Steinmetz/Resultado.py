@@ -3,48 +3,68 @@ class Resultado:
     Representa el resultado de un experimento de laboratorio.
     """
 
-    def __init__(self, experimento, valores_obtenidos, valores_aceptables):
+    def __init__(self, experimento, valores_obtenidos, valores_aceptables, id=None):
         """
         Inicializa el resultado del experimento.
 
         :param experimento: Objeto del experimento asociado.
         :param valores_obtenidos: Diccionario con valores medidos en el experimento.
         :param valores_aceptables: Diccionario con los rangos aceptables para cada medición.
+        :param id: Identificador único del resultado (lo asigna la aplicación al registrarlo).
         """
+        self.id = id
         self.experimento = experimento  # Referencia al experimento asociado
         self.valores_obtenidos = valores_obtenidos  # {medición: valor obtenido}
         self.valores_aceptables = valores_aceptables  # {medición: (mínimo, máximo)}
-        self.valido = self.evaluar_resultado()  # Evaluación automática al crear el objeto
+        self.fallos = self.evaluar_mediciones()  # Máscara de bits de las mediciones fuera de rango
+        self.valido = self.fallos == 0  # Evaluación automática al crear el objeto
 
-    def evaluar_resultado(self):
+    def evaluar_mediciones(self):
         """
-        Verifica si los valores obtenidos están dentro de los rangos aceptables.
+        Evalúa todas las mediciones contra sus rangos aceptables.
 
-        :return: True si todos los valores están dentro del rango, False en caso contrario.
+        :return: Entero cuyo bit j está encendido si la medición j (en el orden de `valores_obtenidos`) está fuera de rango.
         """
-        for medicion, valor in self.valores_obtenidos.items():
+        mascara = 0
+        for j, (medicion, valor) in enumerate(self.valores_obtenidos.items()):
             min_aceptable, max_aceptable = self.valores_aceptables.get(medicion, (None, None))
             if min_aceptable is not None and max_aceptable is not None:
                 if not (min_aceptable <= valor <= max_aceptable):
-                    return False  # Se encuentra fuera de los parámetros aceptables
-        return True
+                    mascara |= 1 << j  # Se encuentra fuera de los parámetros aceptables
+        return mascara
+
+    def evaluar_resultado(self):
+        """
+        Verifica si los valores obtenidos están dentro de los rangos aceptables.
+
+        :return: True si todos los valores están dentro del rango, False en caso contrario.
+        """
+        return self.evaluar_mediciones() == 0
+
+    def mediciones_fuera(self):
+        """
+        Retorna los nombres de las mediciones fuera de rango.
+        """
+        return [medicion for j, medicion in enumerate(self.valores_obtenidos) if self.fallos >> j & 1]
 
     def __str__(self):
         """
         Devuelve una representación en cadena del resultado del experimento.
         """
-        resultado_str = f"\n===== RESULTADO DEL EXPERIMENTO {self.experimento.id} =====\n"
-        resultado_str += f"Receta: {self.experimento.receta.nombre}\n"
-        resultado_str += f"Fecha: {self.experimento.fecha}\n"
-        resultado_str += f"Responsables: {', '.join(self.experimento.responsables)}\n"
-        resultado_str += f"Costo: ${self.experimento.costo:.2f}\n"
-        resultado_str += f"Evaluación: {'Dentro de parámetros' if self.valido else 'Fuera de parámetros'}\n"
+        lineas = [
+            f"\n===== RESULTADO DEL EXPERIMENTO {self.experimento.id} =====",
+            f"Receta: {self.experimento.receta.nombre}",
+            f"Fecha: {self.experimento.fecha}",
+            f"Responsables: {', '.join(self.experimento.responsables)}",
+            f"Costo: ${self.experimento.costo:.2f}",
+            f"Evaluación: {'Dentro de parámetros' if self.valido else 'Fuera de parámetros'}",
+            "\nValores obtenidos:"
+        ]
 
         # Detalles de los valores obtenidos y su comparación con los valores aceptables
-        resultado_str += "\nValores obtenidos:\n"
-        for medicion, valor in self.valores_obtenidos.items():
+        for j, (medicion, valor) in enumerate(self.valores_obtenidos.items()):
             min_aceptable, max_aceptable = self.valores_aceptables[medicion]
-            dentro_de_rango = "Sí" if min_aceptable <= valor <= max_aceptable else "No"
-            resultado_str += f"  - {medicion}: {valor:.2f} (Aceptable: {min_aceptable} - {max_aceptable}) [{dentro_de_rango}]\n"
+            dentro_de_rango = "No" if self.fallos >> j & 1 else "Sí"
+            lineas.append(f"  - {medicion}: {valor:.2f} (Aceptable: {min_aceptable} - {max_aceptable}) [{dentro_de_rango}]")
 
-        return resultado_str
+        return "\n".join(lineas) + "\n"
@@ -0,0 +1,234 @@
+import gzip
+import json
+import os
+import pickle
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa el módulo json
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack es opcional; sin él no se ofrece MessagePack
+    msgpack = None
+
+
+class Serializador:
+    """
+    Formato de los archivos de datos (listas y diccionarios de tipos básicos).
+
+    Cada formato sabe convertir los datos a bytes y de vuelta; guardar y cargar agregan la
+    escritura atómica y la compresión gzip opcional (si la ruta termina en ".gz").
+    """
+
+    nombre = ""
+    descripcion = ""
+    extension = ""
+    autodetectar = True  # False si un archivo no debe leerse con este formato solo por su extensión
+
+    @classmethod
+    def disponible(cls):
+        """
+        Indica si las bibliotecas que necesita el formato están instaladas.
+        """
+        return True
+
+    def codificar(self, datos):
+        """
+        Convierte los datos en bytes.
+        """
+        raise NotImplementedError
+
+    def decodificar(self, contenido):
+        """
+        Convierte los bytes de un archivo en datos.
+        """
+        raise NotImplementedError
+
+    def guardar(self, ruta, datos):
+        """
+        Escribe los datos en un archivo de forma atómica.
+
+        :param ruta: Ruta del archivo; si termina en ".gz" se comprime.
+        :param datos: Datos a guardar.
+        :return: Cantidad de bytes escritos.
+        """
+        contenido = self.codificar(datos)
+        abrir = gzip.open if ruta.endswith(".gz") else open
+        with abrir(ruta + ".tmp", "wb") as f:
+            f.write(contenido)
+        os.replace(ruta + ".tmp", ruta)
+        return len(contenido)
+
+    def cargar(self, ruta):
+        """
+        Lee los datos de un archivo.
+
+        :param ruta: Ruta del archivo; si termina en ".gz" se descomprime.
+        :return: Datos leídos.
+        """
+        abrir = gzip.open if ruta.endswith(".gz") else open
+        with abrir(ruta, "rb") as f:
+            return self.decodificar(f.read())
+
+
+class JsonLegible(Serializador):
+    """
+    JSON con sangría, fácil de leer y editar a mano (el formato original de la aplicación).
+    """
+
+    nombre = "json"
+    descripcion = "JSON legible (con sangría)"
+    extension = ".json"
+
+    def codificar(self, datos):
+        return json.dumps(datos, indent=4, ensure_ascii=False).encode("utf-8")
+
+    def decodificar(self, contenido):
+        # Cualquier variante de JSON se lee con el decodificador más rápido disponible
+        if orjson is not None:
+            return orjson.loads(contenido)
+        return json.loads(contenido)
+
+
+class JsonCompacto(JsonLegible):
+    """
+    JSON sin espacios, generado con el módulo json de la biblioteca estándar.
+    """
+
+    nombre = "json_compacto"
+    descripcion = "JSON compacto"
+
+    def codificar(self, datos):
+        return json.dumps(datos, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class JsonRapido(JsonLegible):
+    """
+    JSON compacto generado con orjson, un codificador escrito en Rust.
+    """
+
+    nombre = "orjson"
+    descripcion = "JSON compacto acelerado (orjson)"
+
+    @classmethod
+    def disponible(cls):
+        return orjson is not None
+
+    def codificar(self, datos):
+        # Los consumos reales usan IDs enteros como claves
+        return orjson.dumps(datos, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class MessagePack(Serializador):
+    """
+    MessagePack, un formato binario compacto equivalente a JSON.
+    """
+
+    nombre = "msgpack"
+    descripcion = "MessagePack (binario)"
+    extension = ".msgpack"
+
+    @classmethod
+    def disponible(cls):
+        return msgpack is not None
+
+    def codificar(self, datos):
+        return msgpack.packb(datos, use_bin_type=True)
+
+    def decodificar(self, contenido):
+        return msgpack.unpackb(contenido, raw=False, strict_map_key=False)
+
+
+class Pickle5(Serializador):
+    """
+    Pickle con el protocolo 5. Es el más rápido de leer, pero solo debe usarse con archivos propios.
+    """
+
+    nombre = "pickle"
+    descripcion = "Pickle protocolo 5 (binario, solo archivos propios)"
+    extension = ".pkl"
+    autodetectar = False  # Leer un pickle ajeno puede ejecutar código: solo se usa si el formato quedó registrado
+
+    def codificar(self, datos):
+        return pickle.dumps(datos, protocol=5)
+
+    def decodificar(self, contenido):
+        return pickle.loads(contenido)
+
+
+SERIALIZADORES = {s.nombre: s for s in (JsonLegible, JsonCompacto, JsonRapido, MessagePack, Pickle5)}
+
+
+def disponibles():
+    """
+    Retorna las clases de los formatos que se pueden usar con las bibliotecas instaladas.
+    """
+    return [serializador for serializador in SERIALIZADORES.values() if serializador.disponible()]
+
+
+def elegir_serializador(nombre):
+    """
+    Crea el serializador de un formato, o el de JSON legible si el formato no está disponible.
+
+    :param nombre: Nombre del formato (ej. "msgpack").
+    :return: Objeto Serializador.
+    """
+    serializador = SERIALIZADORES.get(nombre)
+    if serializador is None or not serializador.disponible():
+        print(f"Aviso: el formato '{nombre}' no está disponible, se usará JSON.")
+        serializador = JsonLegible
+    return serializador()
+
+
+def serializador_registrado(nombre):
+    """
+    Crea el serializador de un formato registrado junto con los datos (ej. en un manifiesto).
+
+    :param nombre: Nombre del formato, o None si no se registró.
+    :return: Objeto Serializador, o None si el formato no existe o no está disponible.
+    """
+    serializador = SERIALIZADORES.get(nombre)
+    if serializador is None or not serializador.disponible():
+        return None
+    return serializador()
+
+
+def serializador_de_ruta(ruta):
+    """
+    Crea el serializador que lee un archivo según su extensión (sin contar ".gz").
+
+    Los formatos que no se autodetectan (Pickle) no se eligen por la extensión.
+
+    :param ruta: Ruta del archivo.
+    :return: Objeto Serializador, o None si la extensión no corresponde a ningún formato disponible.
+    """
+    base = ruta[:-3] if ruta.endswith(".gz") else ruta
+    for serializador in disponibles():
+        if serializador.autodetectar and base.endswith(serializador.extension):
+            return serializador()
+    return None
+
+
+def buscar_archivo(base, formato=None):
+    """
+    Busca el archivo de datos con un nombre base.
+
+    Si se indica el formato con que se guardaron los datos se usa ese; si no, o si no hay un
+    archivo en ese formato, se elige el más reciente de los formatos que se autodetectan.
+
+    :param base: Ruta sin extensión (ej. "reactivos").
+    :param formato: Nombre del formato registrado al guardar, o None.
+    :return: Tupla (ruta, Serializador), o (None, None) si no existe.
+    """
+    registrado = serializador_registrado(formato)
+    if registrado is not None and os.path.exists(base + registrado.extension):
+        return base + registrado.extension, registrado
+
+    extensiones = dict.fromkeys(s.extension for s in disponibles() if s.autodetectar)
+    existentes = [base + extension for extension in extensiones if os.path.exists(base + extension)]
+    if not existentes:
+        return None, None
+    ruta = max(existentes, key=os.path.getmtime)
+    return ruta, serializador_de_ruta(ruta)
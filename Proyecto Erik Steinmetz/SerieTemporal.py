@@ -0,0 +1,215 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+
+
+class SerieTemporal:
+    """
+    Agregados por día de una colección con fecha (experimentos o resultados).
+
+    Cada elemento suma sus métricas a la cubeta de su día, tanto en el total como en los
+    grupos de cada dimensión (ej. investigador, receta o reactivo). Los días con datos se
+    mantienen ordenados, por lo que una consulta por rango cuesta O(log n + cubetas) y no
+    recorre los elementos. Las semanas y meses se obtienen sumando las cubetas diarias.
+    """
+
+    PERIODOS = ("dia", "semana", "mes")
+
+    def __init__(self):
+        """
+        Inicializa la serie vacía.
+        """
+        self.dias = []  # Días con datos ("YYYY-MM-DD"), ordenados
+        self.cubetas = {}  # {día: {"elementos": n, "total": {métrica: valor}, dimensión: {grupo: {métrica: valor}}}}
+        self.aportes = {}  # {clave: (día, métricas, grupos)} para poder restar un elemento
+
+    @staticmethod
+    def sumar(destino, metricas, signo=1):
+        """
+        Suma (o resta) métricas en un diccionario.
+
+        :param destino: Diccionario {métrica: valor} que se actualiza.
+        :param metricas: Diccionario {métrica: valor} a sumar.
+        :param signo: 1 para sumar, -1 para restar.
+        """
+        for metrica, valor in metricas.items():
+            destino[metrica] = destino.get(metrica, 0) + signo * valor
+
+    def agregar(self, clave, fecha, metricas, grupos=None):
+        """
+        Agrega (o actualiza) el aporte de un elemento.
+
+        :param clave: Identificador del elemento.
+        :param fecha: Fecha "YYYY-MM-DD" del elemento; si no es válida el elemento no se agrega.
+        :param metricas: Diccionario {métrica: valor} del elemento.
+        :param grupos: Diccionario {dimensión: {grupo: {métrica: valor}}} con el desglose del elemento.
+        """
+        if clave in self.aportes:
+            self.eliminar(clave)
+
+        dia = str(fecha)[:10]
+        try:
+            date.fromisoformat(dia)
+        except ValueError:
+            return
+
+        grupos = grupos or {}
+        cubeta = self.cubetas.get(dia)
+        if cubeta is None:
+            cubeta = self.cubetas[dia] = {"elementos": 0, "total": {}}
+            insort(self.dias, dia)
+
+        cubeta["elementos"] += 1
+        self.sumar(cubeta["total"], metricas)
+        for dimension, valores in grupos.items():
+            por_grupo = cubeta.setdefault(dimension, {})
+            for grupo, metricas_grupo in valores.items():
+                self.sumar(por_grupo.setdefault(grupo, {}), metricas_grupo)
+        self.aportes[clave] = (dia, metricas, grupos)
+
+    def eliminar(self, clave):
+        """
+        Resta el aporte de un elemento.
+
+        :param clave: Identificador del elemento.
+        """
+        aporte = self.aportes.pop(clave, None)
+        if aporte is None:
+            return
+
+        dia, metricas, grupos = aporte
+        cubeta = self.cubetas[dia]
+        cubeta["elementos"] -= 1
+        self.sumar(cubeta["total"], metricas, -1)
+        for dimension, valores in grupos.items():
+            for grupo, metricas_grupo in valores.items():
+                self.sumar(cubeta[dimension][grupo], metricas_grupo, -1)
+
+        # Sin elementos en el día, la cubeta se descarta
+        if cubeta["elementos"] == 0:
+            del self.cubetas[dia]
+            del self.dias[bisect_left(self.dias, dia)]
+
+    def limpiar(self):
+        """
+        Vacía la serie.
+        """
+        self.dias.clear()
+        self.cubetas.clear()
+        self.aportes.clear()
+
+    def estado(self):
+        """
+        Obtiene las estructuras internas de la serie para guardarlas en un snapshot.
+
+        :return: Tupla (dias, cubetas, aportes).
+        """
+        return self.dias, self.cubetas, self.aportes
+
+    def restaurar(self, estado):
+        """
+        Reemplaza las estructuras internas de la serie por las de un snapshot.
+
+        :param estado: Tupla retornada por `estado`.
+        """
+        self.dias, self.cubetas, self.aportes = estado
+
+    @staticmethod
+    def periodo_de(dia, periodo):
+        """
+        Calcula la etiqueta del período al que pertenece un día.
+
+        :param dia: Día "YYYY-MM-DD".
+        :param periodo: "dia", "semana" (ISO) o "mes".
+        :return: Etiqueta del período (ej. "2024-03-10", "2024-S10" o "2024-03").
+        """
+        if periodo == "mes":
+            return dia[:7]
+        if periodo == "semana":
+            anio, semana, _ = date.fromisoformat(dia).isocalendar()
+            return f"{anio}-S{semana:02d}"
+        return dia
+
+    def serie(self, periodo="mes", desde=None, hasta=None, dimension=None, grupo=None):
+        """
+        Suma las métricas por período dentro de un rango de fechas.
+
+        :param periodo: "dia", "semana" o "mes".
+        :param desde: Fecha inicial "YYYY-MM-DD" (inclusive), o None.
+        :param hasta: Fecha final "YYYY-MM-DD" (inclusive), o None.
+        :param dimension: Dimensión del desglose (ej. "investigador"), o None para el total.
+        :param grupo: Grupo de la dimensión (ej. "Ana"); obligatorio si se indica `dimension`.
+        :return: Lista ordenada de tuplas (período, {métrica: valor}).
+        """
+        inicio = 0 if desde is None else bisect_left(self.dias, desde)
+        fin = len(self.dias) if hasta is None else bisect_right(self.dias, hasta)
+
+        serie = []
+        for dia in self.dias[inicio:fin]:
+            cubeta = self.cubetas[dia]
+            metricas = cubeta["total"] if dimension is None else cubeta.get(dimension, {}).get(grupo)
+            if not metricas or not any(metricas.values()):
+                continue
+            etiqueta = self.periodo_de(dia, periodo)
+            if not serie or serie[-1][0] != etiqueta:
+                serie.append((etiqueta, {}))
+            self.sumar(serie[-1][1], metricas)
+        return serie
+
+    def desglose(self, dimension, desde=None, hasta=None):
+        """
+        Suma las métricas de cada grupo de una dimensión dentro de un rango de fechas.
+
+        :param dimension: Dimensión del desglose (ej. "receta").
+        :param desde: Fecha inicial "YYYY-MM-DD" (inclusive), o None.
+        :param hasta: Fecha final "YYYY-MM-DD" (inclusive), o None.
+        :return: Diccionario {grupo: {métrica: valor}}.
+        """
+        inicio = 0 if desde is None else bisect_left(self.dias, desde)
+        fin = len(self.dias) if hasta is None else bisect_right(self.dias, hasta)
+
+        desglose = {}
+        for dia in self.dias[inicio:fin]:
+            for grupo, metricas in self.cubetas[dia].get(dimension, {}).items():
+                self.sumar(desglose.setdefault(grupo, {}), metricas)
+        return desglose
+
+    def valores_por_dia(self, dimension, metrica, desde=None, hasta=None):
+        """
+        Recorre el valor de una métrica para cada grupo y día dentro de un rango de fechas.
+
+        :param dimension: Dimensión del desglose (ej. "reactivo").
+        :param metrica: Métrica a obtener (ej. "consumo").
+        :param desde: Fecha inicial "YYYY-MM-DD" (inclusive), o None.
+        :param hasta: Fecha final "YYYY-MM-DD" (inclusive), o None.
+        :return: Generador de tuplas (día, grupo, valor) con valor distinto de cero.
+        """
+        inicio = 0 if desde is None else bisect_left(self.dias, desde)
+        fin = len(self.dias) if hasta is None else bisect_right(self.dias, hasta)
+        for dia in self.dias[inicio:fin]:
+            for grupo, metricas in self.cubetas[dia].get(dimension, {}).items():
+                if metricas.get(metrica):
+                    yield dia, grupo, metricas[metrica]
+
+    @staticmethod
+    def ventana_movil(serie, tamano, metrica, denominador=None):
+        """
+        Calcula una ventana móvil sobre una serie por períodos.
+
+        :param serie: Lista de tuplas (período, {métrica: valor}) retornada por `serie`.
+        :param tamano: Cantidad de períodos de la ventana.
+        :param metrica: Métrica a acumular.
+        :param denominador: Métrica por la que se divide la suma (ej. para tasas), o None para promediar.
+        :return: Lista de tuplas (período, valor de la ventana que termina en ese período).
+        """
+        resultado = []
+        suma = 0
+        suma_denominador = 0
+        for i, (etiqueta, metricas) in enumerate(serie):
+            suma += metricas.get(metrica, 0)
+            suma_denominador += metricas.get(denominador, 0) if denominador else 1
+            if i >= tamano:
+                anteriores = serie[i - tamano][1]
+                suma -= anteriores.get(metrica, 0)
+                suma_denominador -= anteriores.get(denominador, 0) if denominador else 1
+            resultado.append((etiqueta, suma / suma_denominador if suma_denominador else 0))
+        return resultado
@@ -0,0 +1,84 @@
+import gc
+import hashlib
+import os
+import pickle
+import struct
+
+
+class Snapshot:
+    """
+    Formato binario versionado para guardar y cargar el estado completo del laboratorio.
+
+    El archivo tiene una cabecera fija (firma, versión, largo y SHA-256 del contenido)
+    seguida del estado serializado con pickle, que conserva las referencias entre objetos
+    (una receta apunta a los mismos reactivos de la colección) sin tener que resolverlas al cargar.
+
+    La versión se incrementa con cada cambio en el contenido del estado o en los atributos de
+    los objetos guardados, y quien carga el snapshot migra las versiones anteriores:
+
+    1. Estado sin versionar: según la versión de la aplicación que lo guardó puede o no traer
+       las series por período, las tasas de fallo, el consumo real de los experimentos y la
+       máscara de fallos de los resultados; todo eso se reconstruye.
+    2. Estado completo con series por período y tasas de fallo.
+    3. Agrega la marca de sincronización compartida con el JSON y los datos guardados por mes.
+    """
+
+    FIRMA = b"LABSNAP\x00"
+    VERSION = 3
+    VERSION_MINIMA = 1  # Las versiones anteriores se rechazan en lugar de migrarse
+    CABECERA = struct.Struct("<8sHQ32s")  # Firma, versión, largo del contenido, SHA-256
+
+    @classmethod
+    def guardar(cls, estado, ruta):
+        """
+        Escribe un snapshot de forma atómica (primero en un archivo temporal).
+
+        :param estado: Diccionario con el estado a guardar.
+        :param ruta: Ruta del archivo.
+        :return: Cantidad de bytes escritos.
+        """
+        contenido = pickle.dumps(estado, protocol=pickle.HIGHEST_PROTOCOL)
+        cabecera = cls.CABECERA.pack(cls.FIRMA, cls.VERSION, len(contenido), hashlib.sha256(contenido).digest())
+
+        temporal = f"{ruta}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(cabecera)
+            f.write(contenido)
+        os.replace(temporal, ruta)  # Un snapshot a medio escribir nunca reemplaza al anterior
+        return len(cabecera) + len(contenido)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """
+        Lee un snapshot y verifica su integridad.
+
+        :param ruta: Ruta del archivo.
+        :return: Tupla (diccionario con el estado guardado, versión con que se guardó).
+        :raises ValueError: Si el archivo no es un snapshot, su versión no es compatible o está dañado.
+        """
+        with open(ruta, "rb") as f:
+            cabecera = f.read(cls.CABECERA.size)
+            if len(cabecera) < cls.CABECERA.size:
+                raise ValueError("El archivo no es un snapshot del laboratorio.")
+
+            firma, version, largo, suma = cls.CABECERA.unpack(cabecera)
+            if firma != cls.FIRMA:
+                raise ValueError("El archivo no es un snapshot del laboratorio.")
+            if not cls.VERSION_MINIMA <= version <= cls.VERSION:
+                raise ValueError(
+                    f"La versión {version} del snapshot no es compatible (entre {cls.VERSION_MINIMA} y {cls.VERSION})."
+                )
+
+            contenido = f.read(largo)
+
+        if len(contenido) != largo or hashlib.sha256(contenido).digest() != suma:
+            raise ValueError("El snapshot está incompleto o dañado.")
+
+        # El recolector de basura revisaría una y otra vez los objetos recién creados; se pausa durante la carga
+        activo = gc.isenabled()
+        gc.disable()
+        try:
+            return pickle.loads(contenido), version
+        finally:
+            if activo:
+                gc.enable()
@@ -0,0 +1,129 @@
+import heapq
+
+
+class TasasFallo:
+    """
+    Tasas de fallo por receta y por medición, mantenidas de forma incremental.
+
+    Cada resultado aporta su receta, los nombres de sus mediciones y la máscara de bits de las
+    que quedaron fuera de rango (el bit j corresponde a la medición j). Los contadores se
+    actualizan al agregar o quitar un resultado, por lo que consultar las tasas o el ranking
+    de mediciones cuesta lo proporcional a la cantidad de pares (receta, medición) y no a la
+    cantidad de resultados.
+    """
+
+    def __init__(self):
+        """
+        Inicializa los contadores vacíos.
+        """
+        self.aportes = {}  # {clave: (ID de receta, nombres de las mediciones, máscara)} para poder restar un resultado
+        self.por_receta = {}  # {ID de receta: [resultados, resultados con fallos]}
+        self.por_medicion = {}  # {(ID de receta, medición): [evaluaciones, fuera de rango, única causa del fallo]}
+        self.nombres = {}  # Tuplas de nombres compartidas por los resultados con las mismas mediciones
+
+    def agregar(self, clave, receta, mediciones, mascara):
+        """
+        Agrega (o actualiza) el aporte de un resultado.
+
+        :param clave: ID del resultado.
+        :param receta: ID de la receta del experimento.
+        :param mediciones: Tupla con los nombres de las mediciones, en el orden de los bits de la máscara.
+        :param mascara: Entero con un bit encendido por cada medición fuera de rango.
+        """
+        if clave in self.aportes:
+            self.eliminar(clave)
+        mediciones = self.nombres.setdefault(mediciones, mediciones)
+        self.aportes[clave] = (receta, mediciones, mascara)
+        self.contar(receta, mediciones, mascara, 1)
+
+    def eliminar(self, clave):
+        """
+        Resta el aporte de un resultado.
+
+        :param clave: ID del resultado.
+        """
+        aporte = self.aportes.pop(clave, None)
+        if aporte is not None:
+            self.contar(*aporte, -1)
+
+    def contar(self, receta, mediciones, mascara, signo):
+        """
+        Suma (o resta) un resultado en los contadores de su receta y de sus mediciones.
+
+        :param signo: 1 para sumar, -1 para restar.
+        """
+        conteo = self.por_receta.get(receta)
+        if conteo is None:
+            conteo = self.por_receta[receta] = [0, 0]
+        conteo[0] += signo
+        if mascara:
+            conteo[1] += signo
+
+        unica = mascara & (mascara - 1) == 0  # Un solo bit encendido: esa medición explica el fallo
+        for j, medicion in enumerate(mediciones):
+            conteo = self.por_medicion.get((receta, medicion))
+            if conteo is None:
+                conteo = self.por_medicion[(receta, medicion)] = [0, 0, 0]
+            conteo[0] += signo
+            if mascara >> j & 1:
+                conteo[1] += signo
+                if unica:
+                    conteo[2] += signo
+
+    def limpiar(self):
+        """
+        Vacía los contadores.
+        """
+        self.aportes.clear()
+        self.por_receta.clear()
+        self.por_medicion.clear()
+        self.nombres.clear()
+
+    def estado(self):
+        """
+        Obtiene las estructuras internas para guardarlas en un snapshot.
+
+        :return: Tupla (aportes, por_receta, por_medicion, nombres).
+        """
+        return self.aportes, self.por_receta, self.por_medicion, self.nombres
+
+    def restaurar(self, estado):
+        """
+        Reemplaza las estructuras internas por las de un snapshot.
+
+        :param estado: Tupla retornada por `estado`.
+        """
+        self.aportes, self.por_receta, self.por_medicion, self.nombres = estado
+
+    def tasas_por_receta(self):
+        """
+        Retorna los resultados y los resultados con fallos de cada receta.
+
+        :return: Diccionario {ID de receta: (resultados, con fallos)}.
+        """
+        return {receta: tuple(conteo) for receta, conteo in self.por_receta.items() if conteo[0]}
+
+    def ranking(self, cantidad=10, por_receta=False):
+        """
+        Ordena las mediciones por la cantidad de veces que quedaron fuera de rango.
+
+        :param cantidad: Cantidad de mediciones a retornar.
+        :param por_receta: True para separar cada medición por receta; False para sumar todas las recetas.
+        :return: Lista de tuplas (clave, evaluaciones, fuera de rango, única causa del fallo) de mayor a menor,
+                 donde la clave es el nombre de la medición o la tupla (ID de receta, medición).
+        """
+        if por_receta:
+            totales = self.por_medicion
+        else:
+            totales = {}
+            for (_, medicion), conteo in self.por_medicion.items():
+                total = totales.get(medicion)
+                if total is None:
+                    totales[medicion] = list(conteo)
+                else:
+                    total[0] += conteo[0]
+                    total[1] += conteo[1]
+                    total[2] += conteo[2]
+
+        filas = ((clave, *conteo) for clave, conteo in totales.items() if conteo[1])
+        return heapq.nlargest(cantidad, filas, key=lambda fila: (fila[2], fila[3]))
@@ -0,0 +1,296 @@
+import json
+import os
+import re
+from datetime import datetime
+
+
+class Esquema:
+    """
+    Esquema de un tipo de registro (diccionario) leído de un archivo o de la API.
+
+    Cada campo se describe con un tipo ("entero", "numero", "texto", "booleano", "lista",
+    "diccionario", "texto_o_nulo" o "cualquiera"), opcionalmente con un mínimo (tupla
+    (tipo, mínimo)), o como lista de elementos de un tipo o de otro esquema ([tipo] o [Esquema]).
+    Las reglas son expresiones sobre el registro `r` que relacionan varios campos.
+
+    El esquema se compila una sola vez a una única expresión de Python que responde si un
+    registro es válido; los mensajes de error se calculan solo para los registros que no lo son.
+    """
+
+    TIPOS = {
+        "entero": "type({v}) is int",
+        "numero": "type({v}) in (int, float)",
+        "texto": "type({v}) is str",
+        "booleano": "type({v}) is bool",
+        "lista": "type({v}) is list",
+        "diccionario": "type({v}) is dict",
+        "texto_o_nulo": "({v} is None or type({v}) is str)",
+        "cualquiera": "True"
+    }
+
+    def __init__(self, nombre, campos, opcionales=(), reglas=()):
+        """
+        Inicializa y compila el esquema.
+
+        :param nombre: Nombre del tipo de registro (ej. "reactivo").
+        :param campos: Diccionario {campo: descripción del campo}.
+        :param opcionales: Campos que pueden faltar.
+        :param reglas: Lista de tuplas (mensaje, expresión sobre `r`) que se verifican si los campos son válidos.
+        """
+        self.nombre = nombre
+        self.campos = campos
+        self.opcionales = set(opcionales)
+        self.reglas = list(reglas)
+        self.es_valido = self.compilar()
+
+    def compilar(self):
+        """
+        Genera y compila la función que verifica un registro completo.
+
+        :return: Función que recibe un registro y retorna True si es válido.
+        """
+        entorno = {"__builtins__": {"type": type, "int": int, "float": float, "str": str, "bool": bool,
+                                    "list": list, "dict": dict, "all": all}}
+        condiciones = ["type(r) is dict"]
+        for campo, descripcion in self.campos.items():
+            valor = f"r[{campo!r}]"
+            condicion = self.condicion(descripcion, valor, entorno)
+            if campo in self.opcionales:
+                condiciones.append(f"({campo!r} not in r or {condicion})")
+            else:
+                condiciones.append(f"{campo!r} in r and {condicion}")
+        condiciones += [f"({expresion})" for _, expresion in self.reglas]
+
+        codigo = compile(f"lambda r: {' and '.join(condiciones)}", f"<esquema {self.nombre}>", "eval")
+        return eval(codigo, entorno)
+
+    def condicion(self, descripcion, valor, entorno):
+        """
+        Traduce la descripción de un campo a una condición de Python sobre `valor`.
+
+        :param descripcion: Descripción del campo.
+        :param valor: Expresión de Python con el valor del campo.
+        :param entorno: Diccionario donde se agregan las funciones de los esquemas anidados.
+        :return: Texto de la condición.
+        """
+        if isinstance(descripcion, list):
+            elemento = descripcion[0]
+            if isinstance(elemento, Esquema):
+                entorno[f"_{elemento.nombre}"] = elemento.es_valido
+                interna = f"_{elemento.nombre}(x)"
+            else:
+                interna = self.condicion(elemento, "x", entorno)
+            return f"(type({valor}) is list and all({interna} for x in {valor}))"
+        if isinstance(descripcion, tuple):
+            tipo, minimo = descripcion
+            return f"({self.TIPOS[tipo].format(v=valor)} and {valor} >= {minimo!r})"
+        return self.TIPOS[descripcion].format(v=valor)
+
+    def errores(self, registro, prefijo=""):
+        """
+        Describe los problemas de un registro inválido.
+
+        :param registro: Registro a revisar.
+        :param prefijo: Ruta del registro dentro de otro (para esquemas anidados).
+        :return: Lista de mensajes; vacía si el registro es válido.
+        """
+        if not isinstance(registro, dict):
+            return [f"{prefijo or self.nombre}: se esperaba un objeto"]
+
+        errores = []
+        for campo, descripcion in self.campos.items():
+            ruta = f"{prefijo}{campo}"
+            if campo not in registro:
+                if campo not in self.opcionales:
+                    errores.append(f"{ruta}: falta el campo")
+                continue
+            errores += self.errores_de_valor(descripcion, registro[campo], ruta)
+
+        if not errores:
+            entorno = {"__builtins__": {}, "r": registro}
+            for mensaje, expresion in self.reglas:
+                if not eval(expresion, entorno):
+                    errores.append(f"{prefijo or self.nombre}: {mensaje}")
+        return errores
+
+    def errores_de_valor(self, descripcion, valor, ruta):
+        """
+        Describe los problemas del valor de un campo.
+
+        :param descripcion: Descripción del campo.
+        :param valor: Valor del campo.
+        :param ruta: Nombre del campo para los mensajes.
+        :return: Lista de mensajes.
+        """
+        if isinstance(descripcion, list):
+            if type(valor) is not list:
+                return [f"{ruta}: se esperaba lista"]
+            errores = []
+            for posicion, elemento in enumerate(valor):
+                if isinstance(descripcion[0], Esquema):
+                    errores += descripcion[0].errores(elemento, f"{ruta}[{posicion}].")
+                else:
+                    errores += self.errores_de_valor(descripcion[0], elemento, f"{ruta}[{posicion}]")
+            return errores
+
+        tipo, minimo = descripcion if isinstance(descripcion, tuple) else (descripcion, None)
+        if not eval(self.TIPOS[tipo].format(v="v"), {"v": valor}):
+            return [f"{ruta}: se esperaba {tipo}"]
+        if minimo is not None and valor < minimo:
+            return [f"{ruta}: debe ser al menos {minimo}"]
+        return []
+
+
+# Esquemas de los archivos JSON de la aplicación (ver `reactivo_a_dict` y los demás en App)
+CONVERSION = Esquema("conversion", {"unidad": "texto", "factor": "numero"}, reglas=[
+    ("el factor debe ser mayor que 0", "r['factor'] > 0")
+])
+MEDICION = Esquema("medicion", {"nombre": "texto", "formula": "texto", "minimo": "numero", "maximo": "numero"}, reglas=[
+    ("el mínimo no puede ser mayor que el máximo", "r['minimo'] <= r['maximo']")
+])
+REACTIVO = Esquema("reactivo", {
+    "id": ("entero", 1), "nombre": "texto", "descripcion": "texto", "costo": ("numero", 0), "categoria": "texto",
+    "inventario_disponible": "numero", "unidad_medida": "texto", "fecha_caducidad": "texto_o_nulo",
+    "minimo_sugerido": ("numero", 0), "conversiones": [CONVERSION]
+})
+REACTIVO_RECETA = Esquema("reactivo_receta", {"reactivo_id": "entero", "cantidad": ("numero", 0), "unidad": "texto"})
+RECETA = Esquema("receta", {
+    "id": ("entero", 1), "nombre": "texto", "objetivo": "texto", "procedimiento": ["texto"],
+    "reactivos_utilizados": [REACTIVO_RECETA], "valores_a_medir": [MEDICION]
+})
+EXPERIMENTO = Esquema("experimento", {
+    "id": ("entero", 1), "receta_id": "entero", "personas_responsables": ["texto"], "fecha": "texto",
+    "costo_asociado": ("numero", 0), "resultado": "texto_o_nulo", "consumo_real": "diccionario"
+}, opcionales=["consumo_real"])
+RESULTADO = Esquema("resultado", {
+    "id": ("entero", 1), "experimento_id": "entero", "valores_obtenidos": "diccionario",
+    "valores_aceptables": "diccionario", "valido": "booleano"
+}, opcionales=["id"])
+
+# Esquemas de los datos de la API, que usan otros nombres para algunos campos
+REACTIVO_API = Esquema("reactivo_api", dict(
+    {campo: descripcion for campo, descripcion in REACTIVO.campos.items() if campo != "conversiones"},
+    conversiones_posibles=[CONVERSION]
+))
+REACTIVO_RECETA_API = Esquema("reactivo_receta_api", {
+    "reactivo_id": "entero", "cantidad_necesaria": ("numero", 0), "unidad_medida": "texto"
+})
+RECETA_API = Esquema("receta_api", dict(RECETA.campos, reactivos_utilizados=[REACTIVO_RECETA_API]))
+EXPERIMENTO_API = Esquema("experimento_api", {
+    "id": ("entero", 1), "receta_id": "entero", "personas_responsables": ["texto"], "fecha": "texto",
+    "resultado": "cualquiera"
+}, opcionales=["resultado"])
+
+
+class ValidadorCarga:
+    """
+    Valida por lotes los registros que se cargan, sin detener la carga por un registro mal formado.
+
+    Los registros válidos siguen su camino; los inválidos se descartan y, si se pide, se agregan
+    con sus errores a un archivo de cuarentena (JSON lines) para poder revisarlos y corregirlos.
+    Se mantienen contadores por tipo de registro y por tipo de error para el resumen.
+    """
+
+    ESQUEMAS = {
+        "reactivo": REACTIVO, "receta": RECETA, "experimento": EXPERIMENTO, "resultado": RESULTADO,
+        "reactivo_api": REACTIVO_API, "receta_api": RECETA_API, "experimento_api": EXPERIMENTO_API
+    }
+
+    def __init__(self, ruta_cuarentena="cuarentena.jsonl", cuarentena=True, max_ejemplos=20):
+        """
+        Inicializa el validador.
+
+        :param ruta_cuarentena: Ruta del archivo de cuarentena.
+        :param cuarentena: Si es False, los registros inválidos solo se descartan.
+        :param max_ejemplos: Cantidad de rechazos recientes que se conservan para mostrarlos.
+        """
+        self.ruta_cuarentena = ruta_cuarentena
+        self.cuarentena = cuarentena
+        self.max_ejemplos = max_ejemplos
+        self.validados = 0
+        self.rechazados = {}  # {tipo de registro: cantidad}
+        self.por_error = {}  # {mensaje sin posiciones: cantidad}
+        self.ejemplos = []  # Lista de tuplas (tipo, origen, id, errores) de los últimos rechazos
+
+    def validar_lote(self, tipo, registros, origen=""):
+        """
+        Separa los registros válidos de un lote.
+
+        :param tipo: Nombre del esquema (ej. "reactivo" o "receta_api").
+        :param registros: Lista de registros.
+        :param origen: Archivo o fuente de los registros, para la cuarentena.
+        :return: Lista de registros válidos, en el mismo orden.
+        """
+        es_valido = self.ESQUEMAS[tipo].es_valido
+        self.validados += len(registros)
+        validos = [registro for registro in registros if es_valido(registro)]
+        if len(validos) == len(registros):
+            return validos
+
+        # Hay registros inválidos: se describen solo esos
+        rechazos = []
+        for posicion, registro in enumerate(registros):
+            if not es_valido(registro):
+                rechazos.append((posicion, registro, self.ESQUEMAS[tipo].errores(registro)))
+        self.rechazar(tipo, origen, rechazos)
+        return validos
+
+    def rechazar(self, tipo, origen, rechazos):
+        """
+        Contabiliza los registros rechazados y los agrega a la cuarentena.
+
+        :param tipo: Nombre del esquema.
+        :param origen: Archivo o fuente de los registros.
+        :param rechazos: Lista de tuplas (posición, registro, errores).
+        """
+        self.rechazados[tipo] = self.rechazados.get(tipo, 0) + len(rechazos)
+        for _, registro, errores in rechazos:
+            for error in errores:
+                # Los errores se agrupan sin la posición de los elementos de las listas
+                general = re.sub(r"\[\d+\]", "[*]", error)
+                self.por_error[general] = self.por_error.get(general, 0) + 1
+            identificador = registro.get("id") if isinstance(registro, dict) else None
+            self.ejemplos.append((tipo, origen, identificador, errores))
+        del self.ejemplos[:-self.max_ejemplos]
+
+        if self.cuarentena:
+            fecha = datetime.now().isoformat(timespec="seconds")
+            with open(self.ruta_cuarentena, "a", encoding="utf-8") as f:
+                for posicion, registro, errores in rechazos:
+                    f.write(json.dumps({
+                        "fecha": fecha, "tipo": tipo, "origen": origen, "posicion": posicion,
+                        "errores": errores, "registro": registro
+                    }, ensure_ascii=False, default=str) + "\n")
+
+    def total_rechazados(self):
+        """
+        Retorna la cantidad total de registros rechazados.
+        """
+        return sum(self.rechazados.values())
+
+    def resumen(self, cantidad=10):
+        """
+        Describe los problemas encontrados en las cargas.
+
+        :param cantidad: Cantidad de tipos de error que se muestran.
+        :return: Texto del resumen, o cadena vacía si no hubo rechazos.
+        """
+        if not self.rechazados:
+            return ""
+        lineas = [f"Se descartaron {self.total_rechazados()} de {self.validados} registros con errores:"]
+        lineas += [f"  {tipo}: {rechazados}" for tipo, rechazados in self.rechazados.items()]
+        lineas.append("Errores más frecuentes:")
+        frecuentes = sorted(self.por_error.items(), key=lambda x: x[1], reverse=True)[:cantidad]
+        lineas += [f"  {error} ({veces})" for error, veces in frecuentes]
+        if self.cuarentena and os.path.exists(self.ruta_cuarentena):
+            lineas.append(f"Los registros descartados se guardaron en '{self.ruta_cuarentena}'.")
+        return "\n".join(lineas)
+
+    def reiniciar(self):
+        """
+        Reinicia los contadores (el archivo de cuarentena se conserva).
+        """
+        self.validados = 0
+        self.rechazados.clear()
+        self.por_error.clear()
+        self.ejemplos.clear()
@@ -0,0 +1,127 @@
+from bisect import bisect_right
+
+
+class VistaPaginada:
+    """
+    Vista de una colección por páginas, con filtros resueltos mediante índices secundarios.
+
+    La paginación usa cursores (la clave del último elemento mostrado) en lugar de
+    posiciones, por lo que obtener una página no depende del tamaño de la colección.
+    """
+
+    def __init__(self, por_id, indices, orden, tamano_pagina=10):
+        """
+        Inicializa la vista.
+
+        :param por_id: Diccionario {id: objeto} de la colección.
+        :param indices: Diccionario {nombre del filtro: IndiceSecundario}.
+        :param orden: Nombre del índice cuyas claves definen el orden sin filtros.
+        :param tamano_pagina: Cantidad de elementos por página.
+        """
+        self.por_id = por_id
+        self.indices = indices
+        self.orden = orden
+        self.tamano_pagina = tamano_pagina
+        self.filtros = {}  # {nombre: valor} para igualdad
+        self.rangos = {}  # {nombre: (desde, hasta)} para rangos
+
+    def filtrar(self, nombre, valor):
+        """
+        Agrega un filtro por igualdad.
+
+        :param nombre: Nombre del índice a filtrar.
+        :param valor: Valor que deben tener los elementos.
+        """
+        self.filtros[nombre] = valor
+
+    def filtrar_rango(self, nombre, desde, hasta):
+        """
+        Agrega un filtro por rango.
+
+        :param nombre: Nombre del índice a filtrar.
+        :param desde: Límite inferior (inclusive), o None.
+        :param hasta: Límite superior (inclusive), o None.
+        """
+        self.rangos[nombre] = (desde, hasta)
+
+    def limpiar_filtros(self):
+        """
+        Elimina todos los filtros.
+        """
+        self.filtros.clear()
+        self.rangos.clear()
+
+    def descripcion_filtros(self):
+        """
+        Describe los filtros activos.
+
+        :return: Texto con los filtros, o cadena vacía si no hay.
+        """
+        partes = [f"{nombre} = {valor}" for nombre, valor in self.filtros.items()]
+        partes += [f"{nombre} entre {desde or '...'} y {hasta or '...'}" for nombre, (desde, hasta) in self.rangos.items()]
+        return ", ".join(partes)
+
+    def cumple_filtros(self, clave, excepto=None):
+        """
+        Verifica si un elemento cumple todos los filtros activos.
+
+        :param clave: Identificador del elemento.
+        :param excepto: Nombre del filtro que ya se garantiza por el recorrido.
+        :return: True si cumple todos los filtros.
+        """
+        for nombre, valor in self.filtros.items():
+            if nombre != excepto and not self.indices[nombre].tiene_valor(clave, valor):
+                return False
+        for nombre, (desde, hasta) in self.rangos.items():
+            if nombre != excepto and not self.indices[nombre].en_rango(clave, desde, hasta):
+                return False
+        return True
+
+    def elegir_recorrido(self):
+        """
+        Elige la secuencia ordenada más corta que contiene a todos los elementos filtrados.
+
+        :return: Tupla (secuencia, inicio, fin, filtro usado, True si la secuencia es de tuplas (valor, clave)).
+        """
+        mejor = (self.indices[self.orden].claves, 0, len(self.indices[self.orden].claves), None, False)
+
+        for nombre, valor in self.filtros.items():
+            claves = self.indices[nombre].claves_con_valor(valor)
+            if len(claves) < mejor[2] - mejor[1]:
+                mejor = (claves, 0, len(claves), nombre, False)
+
+        for nombre, (desde, hasta) in self.rangos.items():
+            indice = self.indices[nombre]
+            inicio, fin = indice.rango(desde, hasta)
+            if fin - inicio < mejor[2] - mejor[1]:
+                mejor = (indice.entradas, inicio, fin, nombre, True)
+
+        return mejor
+
+    def pagina(self, cursor=None):
+        """
+        Obtiene una página de elementos que cumplen los filtros.
+
+        :param cursor: Cursor retornado por la página anterior, o None para la primera página.
+        :return: Tupla (lista de objetos, cursor de la página siguiente o None si no hay más).
+        """
+        secuencia, inicio, fin, usado, con_valor = self.elegir_recorrido()
+        if cursor is not None:
+            # Si cambió el recorrido (ej. por nuevos filtros) el cursor anterior no aplica
+            if isinstance(cursor, tuple) != con_valor:
+                cursor = None
+            else:
+                inicio = max(inicio, bisect_right(secuencia, cursor, inicio, fin))
+
+        elementos = []
+        ultimo = None
+        posicion = inicio
+        while posicion < fin and len(elementos) < self.tamano_pagina:
+            ultimo = secuencia[posicion]
+            clave = ultimo[1] if con_valor else ultimo
+            if clave in self.por_id and self.cumple_filtros(clave, usado):
+                elementos.append(self.por_id[clave])
+            posicion += 1
+
+        siguiente = ultimo if posicion < fin else None
+        return elementos, siguiente
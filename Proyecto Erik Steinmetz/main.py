@@ -4,4 +4,5 @@ def main():
     app = App()
     app.mostrar_menu_inicial()
 
-main()
\ No newline at end of file
+if __name__ == "__main__":  # Los procesos trabajadores de la cola importan este módulo sin ejecutar el menú
+    main()
\ No newline at end of file
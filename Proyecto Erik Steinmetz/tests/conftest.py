@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# Los módulos del proyecto están en la carpeta superior y se importan por su nombre
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from Benchmarks import generar_laboratorio
+
+
+@pytest.fixture
+def carpeta(tmp_path, monkeypatch):
+    """
+    Ejecuta la prueba en una carpeta temporal, ya que la aplicación crea sus archivos en la carpeta actual.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def laboratorio(carpeta, capsys):
+    """
+    Aplicación con pocos datos sintéticos, creada en la carpeta temporal.
+    """
+    app = generar_laboratorio(reactivos=30, recetas=8, experimentos=120, resultados_por_experimento=2)
+    capsys.readouterr()  # Descartar lo impreso al generar
+    return app
@@ -0,0 +1,122 @@
+import pytest
+
+from ColaExperimentos import ColaExperimentos
+from RegistroFallos import RegistroFallos
+
+FECHA = "2000-01-01"  # Fecha de referencia anterior a todas las caducidades de los datos de prueba
+
+
+@pytest.fixture
+def cola(laboratorio):
+    """
+    Cola en la carpeta temporal con el inventario de la aplicación.
+    """
+    cola = ColaExperimentos("cola.sqlite", max_intentos=2)
+    cola.sincronizar_inventario(laboratorio.reactivos)
+    return cola
+
+
+def inventario(cola, reactivo_id):
+    conexion = cola.conectar()
+    cantidad = conexion.execute("SELECT cantidad FROM inventario WHERE reactivo_id = ?", (reactivo_id,)).fetchone()[0]
+    conexion.close()
+    return cantidad
+
+
+def test_encolar_ignora_trabajos_activos(laboratorio, cola):
+    experimentos = laboratorio.experimentos[:5]
+    assert cola.encolar(experimentos, FECHA) == 5
+    assert cola.encolar(experimentos[:3], FECHA) == 0
+    assert cola.resumen() == {ColaExperimentos.PENDIENTE: 5}
+
+
+def test_reclamar_no_repite_trabajos(laboratorio, cola):
+    cola.encolar(laboratorio.experimentos[:5], FECHA)
+    conexion = cola.conectar()
+    primero = cola.reclamar(conexion, "t1", 3)
+    segundo = cola.reclamar(conexion, "t2", 3)
+    conexion.close()
+
+    assert len(primero) == 3 and len(segundo) == 2
+    assert not {id for id, _ in primero} & {id for id, _ in segundo}
+    assert cola.resumen() == {ColaExperimentos.EN_CURSO: 5}
+
+    # Un trabajador que termina abruptamente deja sus trabajos en curso: vuelven a la cola
+    assert cola.recuperar_abandonados() == 5
+    assert cola.resumen() == {ColaExperimentos.PENDIENTE: 5}
+
+
+def test_completar_descuenta_el_inventario(laboratorio, cola):
+    experimento = laboratorio.experimentos[0]
+    cola.encolar([experimento], FECHA)
+    antes = {item["reactivo"].id: inventario(cola, item["reactivo"].id) for item in experimento.receta.reactivos}
+
+    conexion = cola.conectar()
+    lote = cola.reclamar(conexion, "t1", 10)
+    simulados = [(id, datos, cola.simular(datos)) for id, datos in lote]
+    assert cola.completar(conexion, "t1", simulados) == (1, 0)
+    conexion.close()
+
+    consumos = simulados[0][2][0]
+    descontado = {}
+    for reactivo_id, planificado, real in consumos:
+        assert real > planificado
+        descontado[reactivo_id] = descontado.get(reactivo_id, 0) + real
+    for reactivo_id, cantidad in antes.items():
+        assert inventario(cola, reactivo_id) == pytest.approx(cantidad - descontado[reactivo_id])
+
+    [(id_trabajo, id_experimento, _, estado, resultado)] = cola.terminados_sin_aplicar()
+    assert (id_experimento, estado) == (experimento.id, ColaExperimentos.HECHO)
+    assert set(resultado["valores_obtenidos"]) == {m.nombre for m in experimento.receta.valores_a_medir}
+
+    # Mientras no se incorpore no se puede volver a encolar; después sí (la aplicación lo impide por sus resultados)
+    assert cola.encolar([experimento], FECHA) == 0
+    cola.marcar_aplicados([id_trabajo])
+    assert cola.terminados_sin_aplicar() == []
+    assert cola.encolar([experimento], FECHA) == 1
+
+
+def test_completar_rechaza_sin_inventario(laboratorio, cola):
+    experimento = laboratorio.experimentos[0]
+    faltante = experimento.receta.reactivos[0]["reactivo"]
+    faltante.inventario = 0
+    cola.sincronizar_inventario(laboratorio.reactivos)
+    cola.encolar([experimento], FECHA)
+
+    conexion = cola.conectar()
+    lote = cola.reclamar(conexion, "t1", 10)
+    assert cola.completar(conexion, "t1", [(id, datos, cola.simular(datos)) for id, datos in lote]) == (0, 1)
+    conexion.close()
+
+    [(_, _, _, estado, resultado)] = cola.terminados_sin_aplicar()
+    assert estado == ColaExperimentos.RECHAZADO
+    assert resultado["reactivo_id"] == faltante.id
+    assert resultado["motivo"] == RegistroFallos.FALTA_INVENTARIO
+    assert inventario(cola, experimento.receta.reactivos[-1]["reactivo"].id) == experimento.receta.reactivos[-1]["reactivo"].inventario
+
+
+def test_completar_rechaza_reactivo_caducado(laboratorio, cola):
+    experimento = laboratorio.experimentos[0]
+    cola.encolar([experimento], "2100-01-01")
+
+    conexion = cola.conectar()
+    lote = cola.reclamar(conexion, "t1", 10)
+    assert cola.completar(conexion, "t1", [(id, datos, cola.simular(datos)) for id, datos in lote]) == (0, 1)
+    conexion.close()
+
+    [(_, _, _, _, resultado)] = cola.terminados_sin_aplicar()
+    assert resultado["motivo"] == RegistroFallos.CADUCADO
+
+
+def test_fallar_reintenta_hasta_el_maximo(laboratorio, cola):
+    cola.encolar(laboratorio.experimentos[:1], FECHA)
+    conexion = cola.conectar()
+    for _ in range(cola.max_intentos):
+        [(id, _)] = cola.reclamar(conexion, "t1", 1)
+        cola.fallar(conexion, [id], "error de prueba")
+    assert cola.reclamar(conexion, "t1", 1) == []
+    conexion.close()
+
+    assert cola.resumen() == {ColaExperimentos.FALLIDO: 1}
+    [(_, _, estado, intentos, error)] = cola.con_error()
+    assert (estado, intentos, error) == (ColaExperimentos.FALLIDO, 2, "error de prueba")
@@ -0,0 +1,99 @@
+import statistics
+
+import pytest
+
+from ControlEstadistico import ControlEstadistico
+from Experimento import Experimento
+from Medicion import Medicion
+from Receta import Receta
+from Resultado import Resultado
+
+
+@pytest.fixture
+def receta():
+    # Rango 6 a 8: centro 7 y sigma 1/3
+    return Receta(1, "Neutralización", "Obtener una sal", [], ["Mezclar"], [Medicion("ph", "ph", 6, 8)])
+
+
+def resultados(receta, valores):
+    """
+    Crea un resultado por valor de pH, en días sucesivos.
+    """
+    lista = []
+    for i, valor in enumerate(valores, start=1):
+        experimento = Experimento(i, receta, ["Ana"], f"2024-01-{i:02d}")
+        lista.append(Resultado(experimento, {"ph": valor}, {"ph": (6, 8)}, i))
+    return lista
+
+
+def test_limites_desde_el_rango():
+    assert ControlEstadistico.limites(Medicion("ph", "ph", 6, 8)) == pytest.approx((7, 1 / 3))
+    assert ControlEstadistico.limites(Medicion("ph", "ph", 8, 8)) is None
+    assert ControlEstadistico.limites(Medicion("ph", "ph", None, 8)) is None
+
+
+def test_media_y_varianza_incrementales(receta):
+    valores = [7.1, 6.9, 7.3, 6.8, 7.0, 7.2]
+    control = ControlEstadistico()
+    for resultado in resultados(receta, valores):
+        control.observar(resultado)
+
+    estado = control.estados[(1, "ph")]
+    assert estado.n == len(valores)
+    assert estado.media == pytest.approx(statistics.mean(valores))
+    assert estado.varianza == pytest.approx(statistics.variance(valores))
+    assert estado.desviacion == pytest.approx(statistics.stdev(valores))
+
+
+def test_sin_alertas_en_el_centro(receta):
+    control = ControlEstadistico()
+    for resultado in resultados(receta, [7.0] * 30):
+        assert control.observar(resultado) == []
+    assert control.total_alertas == 0
+
+
+def test_ewma_alerta_al_cruzar_una_sola_vez(receta):
+    control = ControlEstadistico()
+    alertas = []
+    # Deriva sostenida dentro del rango aceptable: ningún valor queda fuera de 6 a 8
+    for resultado in resultados(receta, [7.0] * 5 + [7.8] * 20):
+        alertas += control.observar(resultado)
+
+    ewma = [a for a in alertas if a["tipo"] == ControlEstadistico.EWMA]
+    assert len(ewma) == 1
+    assert ewma[0]["direccion"] == "alto"
+    assert ewma[0]["valor"] > ewma[0]["limite"]
+
+
+def test_cusum_alerta_y_se_reinicia(receta):
+    control = ControlEstadistico()
+    alertas = []
+    for resultado in resultados(receta, [6.5] * 10):
+        alertas += control.observar(resultado)
+
+    # Cada valor suma 1.5σ - k = 1σ hacia abajo: se supera el umbral de 5σ al sexto valor
+    cusum = [a for a in alertas if a["tipo"] == ControlEstadistico.CUSUM]
+    assert [a["resultado"] for a in cusum] == [6]
+    assert cusum[0]["direccion"] == "bajo"
+    assert control.estados[(1, "ph")].cusum_bajo == pytest.approx(4.0)
+
+
+def test_recalcular_ordena_por_fecha(receta):
+    lista = resultados(receta, [7.0] * 5 + [7.8] * 20)
+    control = ControlEstadistico()
+    for resultado in lista:
+        control.observar(resultado)
+
+    otro = ControlEstadistico()
+    otro.observar(lista[0])  # Lo observado antes se descarta
+    assert otro.recalcular(reversed(lista)) == control.total_alertas > 0
+    assert otro.estados[(1, "ph")].n == len(lista)
+    assert otro.estados[(1, "ph")].ewma == pytest.approx(control.estados[(1, "ph")].ewma)
+
+
+def test_mas_desviadas(receta):
+    otra = Receta(2, "Titulación", "Medir concentración", [], ["Titular"], [Medicion("ph", "ph", 6, 8)])
+    control = ControlEstadistico()
+    for resultado in resultados(receta, [7.0] * 5) + resultados(otra, [7.6] * 5):
+        control.observar(resultado)
+    assert [clave for clave, _ in control.mas_desviadas(2)] == [(2, "ph"), (1, "ph")]
@@ -0,0 +1,65 @@
+from Dependencias import Dependencias
+
+
+def verificar_consistencia(app):
+    """
+    Verifica que las listas, los diccionarios por ID y los índices de dependencias coincidan.
+    """
+    assert len(app.recetas) == len(app.recetas_por_id)
+    assert len(app.experimentos) == len(app.experimentos_por_id)
+    assert len(app.resultados) == len(app.resultados_por_id)
+    for resultado in app.resultados:
+        assert app.experimentos_por_id.get(resultado.experimento.id) is resultado.experimento
+    for experimento in app.experimentos:
+        assert app.recetas_por_id.get(experimento.receta.id) is experimento.receta
+    for receta in app.recetas:
+        for item in receta.reactivos:
+            assert app.reactivos_por_id.get(item["reactivo"].id) is item["reactivo"]
+
+
+def test_cascada_de_reactivo(laboratorio):
+    app = laboratorio
+    reactivo = app.recetas[0].reactivos[0]["reactivo"]
+    dependientes = app.dependencias.dependientes_de_reactivo(reactivo.id)
+    assert dependientes["recetas"] and dependientes["experimentos"] and dependientes["resultados"]
+
+    antes = len(app.resultados)
+    app.eliminar_dependientes(dependientes)
+    app.quitar_reactivo(reactivo)
+
+    assert reactivo.id not in app.reactivos_por_id
+    assert not app.dependencias.recetas_de_reactivo(reactivo.id)
+    assert len(app.resultados) == antes - len(set(dependientes["resultados"]))
+    for id_experimento in dependientes["experimentos"]:
+        assert id_experimento not in app.experimentos_por_id
+        assert not app.dependencias.resultados_de_experimento(id_experimento)
+    verificar_consistencia(app)
+
+
+def test_cascada_incluye_resultados_archivados(laboratorio, capsys):
+    app = laboratorio
+    app.archivar_resultados("2099-12-31")
+    capsys.readouterr()
+    assert not app.resultados and len(app.archivo_resultados)
+
+    experimento = app.experimentos[0]
+    dependientes = app.dependencias.dependientes_de_experimento(experimento.id)
+    assert Dependencias.describir(dependientes)
+    assert app.dependencias.tiene_resultados(experimento.id)
+
+    # Los mismos pasos que `App.eliminar_experimento` al elegir la cascada
+    app.eliminar_dependientes(dependientes)
+    app.quitar_archivados([experimento.id])
+    app.quitar_experimento(experimento)
+
+    # Los resultados archivados quedan marcados como borrados y no cuentan en las estadísticas
+    assert not app.dependencias.archivados_de_experimento(experimento.id)
+    for id_resultado in dependientes["archivados"]:
+        assert id_resultado not in app.tasas_fallo.aportes
+    verificar_consistencia(app)
+
+
+def test_experimento_sin_dependientes(laboratorio):
+    app = laboratorio
+    dependientes = app.dependencias.dependientes_de_experimento(10 ** 9)
+    assert Dependencias.describir(dependientes) == ""
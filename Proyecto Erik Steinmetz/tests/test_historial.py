@@ -0,0 +1,128 @@
+import pytest
+
+from HistorialCambios import HistorialCambios
+
+
+@pytest.fixture
+def reactivo(laboratorio):
+    return laboratorio.reactivos[0]
+
+
+def editar(historial, entidad, descripcion="Editar", **campos):
+    """
+    Edita campos de una entidad registrando la versión, como los menús de edición.
+    """
+    antes = historial.capturar(entidad)
+    for campo, valor in campos.items():
+        setattr(entidad, campo, valor)
+    return historial.registrar(descripcion, [(entidad, antes)])
+
+
+def test_deshacer_y_rehacer(reactivo):
+    historial = HistorialCambios()
+    inventario, costo = reactivo.inventario, reactivo.costo
+    editar(historial, reactivo, inventario=200.0)
+    editar(historial, reactivo, costo=99.0)
+
+    assert historial.deshacer() is not None
+    assert (reactivo.inventario, reactivo.costo) == (200.0, costo)
+    assert historial.deshacer() is not None
+    assert (reactivo.inventario, reactivo.costo) == (inventario, costo)
+    assert historial.deshacer() is None
+
+    assert historial.rehacer() is not None
+    assert reactivo.inventario == 200.0
+    assert historial.rehacer() is not None
+    assert reactivo.costo == 99.0
+    assert historial.rehacer() is None
+
+
+def test_edicion_sin_cambios_no_registra_version(reactivo):
+    historial = HistorialCambios()
+    assert editar(historial, reactivo, nombre=reactivo.nombre) is None
+    assert historial.siguiente(rehacer=False) is None
+
+
+def test_nueva_edicion_descarta_rehacer(reactivo):
+    historial = HistorialCambios()
+    editar(historial, reactivo, inventario=200.0)
+    historial.deshacer()
+    editar(historial, reactivo, costo=1.0)
+    assert historial.rehacer() is None
+
+
+def test_listas_no_se_comparten_con_la_version(reactivo):
+    historial = HistorialCambios()
+    conversiones = list(reactivo.conversiones)
+    version = editar(historial, reactivo, conversiones=conversiones[:1])
+    _, antes, despues = version.cambios[0]
+    assert reactivo.conversiones is not despues["conversiones"]
+
+    # Modificar la lista restaurada no debe alterar la versión guardada
+    historial.deshacer()
+    assert reactivo.conversiones == conversiones and reactivo.conversiones is not antes["conversiones"]
+    reactivo.conversiones.append(conversiones[0])
+    assert antes["conversiones"] == conversiones
+
+
+def test_deshacer_rechaza_cambios_posteriores(reactivo):
+    historial = HistorialCambios()
+    editar(historial, reactivo, inventario=200.0)
+    reactivo.inventario -= 50  # Descuento al realizar un experimento, fuera del historial
+
+    version = historial.siguiente(rehacer=False)
+    assert [(entidad, campo) for entidad, campo in historial.conflictos(version, rehacer=False)] == [(reactivo, "inventario")]
+    assert historial.deshacer() is None
+    assert reactivo.inventario == 150.0
+    assert historial.siguiente(rehacer=False) is version  # La versión sigue disponible
+
+
+def test_rehacer_rechaza_cambios_posteriores(reactivo):
+    historial = HistorialCambios()
+    editar(historial, reactivo, inventario=200.0)
+    historial.deshacer()
+    reactivo.inventario += 10
+    assert historial.rehacer() is None
+    assert reactivo.inventario != 200.0
+
+
+def test_simulacion_descartada_y_reabierta(reactivo):
+    historial = HistorialCambios()
+    inventario = reactivo.inventario
+    editar(historial, reactivo, costo=5.0)
+    costo = reactivo.costo
+
+    assert historial.iniciar_escenario("compra") == []
+    editar(historial, reactivo, inventario=inventario + 1000)
+    assert len(historial.terminar_escenario(conservar=False)) == 1
+    assert (reactivo.inventario, reactivo.costo) == (inventario, costo)
+
+    # Reabrir la simulación vuelve a aplicar sus versiones
+    assert len(historial.iniciar_escenario("compra")) == 1
+    assert reactivo.inventario == inventario + 1000
+    historial.terminar_escenario(conservar=True)
+    assert historial.escenario is None
+    assert historial.deshacer() is not None
+    assert reactivo.inventario == inventario
+
+
+def test_simulacion_no_se_reabre_con_conflictos(reactivo):
+    historial = HistorialCambios()
+    inventario = reactivo.inventario
+    historial.iniciar_escenario("compra")
+    editar(historial, reactivo, inventario=inventario + 1000, costo=1.0)
+    historial.terminar_escenario(conservar=False)
+
+    reactivo.costo = 2.0
+    assert historial.iniciar_escenario("compra") is None
+    assert (reactivo.inventario, reactivo.costo) == (inventario, 2.0)
+    assert historial.escenario is None
+    assert "compra" in historial.escenarios
+
+
+def test_deshacer_no_sale_de_la_simulacion(reactivo):
+    historial = HistorialCambios()
+    editar(historial, reactivo, costo=5.0)
+    historial.iniciar_escenario("prueba")
+    assert historial.deshacer() is None
+    assert reactivo.costo == 5.0
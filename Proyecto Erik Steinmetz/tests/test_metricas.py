@@ -0,0 +1,90 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import Metricas as modulo_metricas
+from App import App
+from Metricas import Metricas, instrumentar
+
+
+class Servicio:
+    """
+    Objeto mínimo con el atributo `metricas` que usa el decorador, como `App`.
+    """
+
+    def __init__(self):
+        self.metricas = Metricas()
+
+    @instrumentar("sumar_uno", elementos=lambda servicio, retorno: len(retorno))
+    def sumar(self, valores):
+        return [valor + 1 for valor in valores]
+
+    @instrumentar("fallar")
+    def fallar(self):
+        raise ValueError("Falla a propósito")
+
+
+def fijar_reloj(monkeypatch, *instantes):
+    """
+    Reemplaza el reloj del módulo de métricas por uno que retorna los instantes indicados, en orden.
+    """
+    valores = iter(instantes)
+    monkeypatch.setattr(modulo_metricas, "time", SimpleNamespace(perf_counter=lambda: next(valores)))
+
+
+def test_registra_llamadas_y_tiempo_con_su_nombre(monkeypatch):
+    servicio = Servicio()
+    fijar_reloj(monkeypatch, 10.0, 10.25, 20.0, 20.5)
+
+    assert servicio.sumar([1, 2, 3]) == [2, 3, 4]
+    servicio.sumar([4])
+
+    # Se registra con el nombre del decorador, no con el del método
+    assert list(servicio.metricas.operaciones) == ["sumar_uno"]
+    operacion = servicio.metricas.operaciones["sumar_uno"]
+    assert operacion["llamadas"] == 2
+    assert operacion["total"] == pytest.approx(0.75)
+    assert operacion["maximo"] == pytest.approx(0.5)
+    assert operacion["elementos"] == 4
+    assert operacion["muestras"] == pytest.approx([0.25, 0.5])
+    assert Servicio.sumar.__name__ == "sumar"
+
+
+def test_registra_la_llamada_aunque_falle(monkeypatch):
+    servicio = Servicio()
+    fijar_reloj(monkeypatch, 1.0, 3.0)
+
+    with pytest.raises(ValueError):
+        servicio.fallar()
+
+    operacion = servicio.metricas.operaciones["fallar"]
+    assert operacion["llamadas"] == 1
+    assert operacion["total"] == pytest.approx(2.0)
+    assert operacion["elementos"] == 0
+
+
+def test_perfila_solo_la_siguiente_llamada(carpeta):
+    servicio = Servicio()
+    servicio.metricas.perfilar_siguiente("sumar_uno")
+
+    servicio.sumar([1])
+    assert "sumar" in servicio.metricas.perfil
+    assert os.path.exists(Metricas.ruta_perfil("sumar_uno"))
+    assert servicio.metricas.operacion_a_perfilar is None
+
+    servicio.sumar([2])
+    assert servicio.metricas.operaciones["sumar_uno"]["llamadas"] == 2
+
+
+def test_metodo_instrumentado_de_la_app(laboratorio, capsys):
+    assert "guardar_datos_particionados" not in laboratorio.metricas.operaciones
+
+    escritos = laboratorio.guardar_datos_particionados()
+    capsys.readouterr()
+
+    operacion = laboratorio.metricas.operaciones["guardar_datos_particionados"]
+    assert operacion["llamadas"] == 1
+    assert operacion["total"] > 0
+    assert operacion["elementos"] == escritos == len(laboratorio.experimentos) + len(laboratorio.resultados)
+    assert App.guardar_datos_particionados.__name__ == "guardar_datos_particionados"
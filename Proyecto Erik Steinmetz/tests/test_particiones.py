@@ -0,0 +1,135 @@
+import os
+import re
+
+from App import App
+from Serializador import serializador_registrado
+
+
+def resumen(app):
+    """
+    Obtiene los datos comparables de los experimentos y resultados en memoria.
+    """
+    experimentos = sorted((e.id, e.receta.id, e.fecha, e.costo) for e in app.experimentos)
+    resultados = sorted((r.id, r.experimento.id, tuple(r.valores_obtenidos.items()), r.valido) for r in app.resultados)
+    return experimentos, resultados
+
+
+def particiones_reescritas(salida):
+    """
+    Obtiene la cantidad de particiones reescritas que informa `guardar_datos_particionados`.
+    """
+    return int(re.search(r"\((\d+) particiones reescritas\)", salida).group(1))
+
+
+def cargar_diferido(capsys):
+    """
+    Carga los datos desde el JSON sin materializar los experimentos y resultados, como desde el menú inicial.
+    """
+    app = App()
+    app.cargar_datos_json(diferido=True)
+    app.origen_datos = "json"
+    capsys.readouterr()
+    return app
+
+
+def test_guardar_y_cargar_todo(laboratorio, capsys):
+    laboratorio.guardar_datos_particionados()
+
+    app = App()
+    assert app.cargar_datos_particionados()
+    capsys.readouterr()
+    assert resumen(app) == resumen(laboratorio)
+    assert app.almacen.completo()
+
+
+def test_cargar_un_rango_de_meses(laboratorio, capsys):
+    laboratorio.guardar_datos_particionados()
+
+    app = App()
+    assert app.cargar_datos_particionados("2024-01", "2024-03")
+    capsys.readouterr()
+    assert app.experimentos
+    assert all("2024-01" <= e.fecha[:7] <= "2024-03" for e in app.experimentos)
+    assert not app.almacen.completo()
+
+
+def test_reescribir_una_particion(laboratorio, capsys):
+    laboratorio.guardar_datos_particionados()
+
+    app = App()
+    app.cargar_datos_particionados()
+    app.origen_datos = "particiones"  # Como al cargar desde el menú inicial
+    experimento = app.experimentos[0]
+    mes = app.almacen.particion(experimento.fecha)
+    for resultado in [r for r in app.resultados if r.experimento is experimento]:
+        app.quitar_resultado(resultado)
+    app.quitar_experimento(experimento)
+    capsys.readouterr()
+    app.guardar_datos_particionados()
+    assert "(2 particiones reescritas)" in capsys.readouterr().out  # El mes del experimento en ambas colecciones
+
+    # Solo se reescribe la partición modificada y el manifiesto apunta a archivos existentes
+    assert mes in app.almacen.manifiesto["particiones"]["experimentos"]
+    for coleccion in app.almacen.COLECCIONES:
+        for datos in app.almacen.manifiesto["particiones"][coleccion].values():
+            assert os.path.exists(os.path.join(app.almacen.carpeta, datos["archivo"]))
+
+    otra = App()
+    otra.cargar_datos_particionados()
+    capsys.readouterr()
+    assert experimento.id not in otra.experimentos_por_id
+    assert resumen(otra) == resumen(app)
+
+
+def test_formato_elegido_se_conserva(laboratorio, capsys):
+    # Como al elegir el formato en el menú: las particiones se escriben como JSON legible
+    laboratorio.serializador = serializador_registrado("json")
+    laboratorio.almacen.serializador = laboratorio.serializador
+    laboratorio.formato_elegido = True
+    laboratorio.guardar_datos_particionados()
+
+    app = App()
+    app.cargar_datos_particionados()
+    capsys.readouterr()
+    assert app.almacen.serializador.nombre == "json"
+    assert app.serializador.nombre == "json"
+    assert resumen(app) == resumen(laboratorio)
+
+
+def test_repartir_completo_solo_la_primera_vez(laboratorio, capsys):
+    laboratorio.origen_datos = "api"
+    laboratorio.guardar_al_salir()
+    total = sum(map(len, laboratorio.almacen.manifiesto["particiones"].values()))
+    assert particiones_reescritas(capsys.readouterr().out) == total
+
+    # Sin cambios, salir no materializa los datos diferidos ni reescribe el snapshot o las particiones
+    app = cargar_diferido(capsys)
+    app.guardar_al_salir()
+    salida = capsys.readouterr().out
+    assert "Se materializaron" not in salida
+    assert "El snapshot no cambió" in salida
+    assert particiones_reescritas(salida) == 0
+    assert app.pendiente("experimentos") and app.pendiente("resultados")
+
+
+def test_mover_un_experimento_reescribe_sus_meses(laboratorio, capsys):
+    laboratorio.origen_datos = "api"
+    laboratorio.guardar_al_salir()
+
+    app = cargar_diferido(capsys)
+    app.asegurar("experimentos", "resultados")
+    experimento = next(e for e in app.experimentos if app.indices_resultados["experimento"].claves_con_valor(e.id))
+    antes = app.historial.capturar(experimento)
+    experimento.fecha = "2019-06-15"  # Mes sin otros experimentos
+    app.indexar_experimento(experimento)
+    app.registrar_edicion(f"Editar experimento {experimento.id}", [(experimento, antes)])
+    capsys.readouterr()
+
+    app.guardar_al_salir()
+    # El mes del que sale y el mes al que llega, en ambas colecciones
+    assert particiones_reescritas(capsys.readouterr().out) == 4
+
+    otra = App()
+    otra.cargar_datos_particionados()
+    capsys.readouterr()
+    assert resumen(otra) == resumen(app)
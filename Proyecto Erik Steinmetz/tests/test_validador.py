@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from App import App
+from ValidadorCarga import ValidadorCarga, Esquema
+
+
+@pytest.fixture
+def registros(laboratorio):
+    """
+    Diccionarios válidos de cada tipo, tal como los guarda la aplicación.
+    """
+    return {
+        "reactivo": App.reactivo_a_dict(laboratorio.reactivos[0]),
+        "receta": App.receta_a_dict(laboratorio.recetas[0]),
+        "experimento": App.experimento_a_dict(laboratorio.experimentos[0]),
+        "resultado": App.resultado_a_dict(laboratorio.resultados[0])
+    }
+
+
+@pytest.mark.parametrize("tipo", ["reactivo", "receta", "experimento", "resultado"])
+def test_registros_de_la_aplicacion_son_validos(registros, tipo):
+    assert ValidadorCarga.ESQUEMAS[tipo].es_valido(registros[tipo])
+    assert ValidadorCarga.ESQUEMAS[tipo].errores(registros[tipo]) == []
+
+
+def test_reactivo_sin_fecha_de_caducidad(registros):
+    reactivo = dict(registros["reactivo"], fecha_caducidad=None)
+    assert ValidadorCarga.ESQUEMAS["reactivo"].es_valido(reactivo)
+    assert ValidadorCarga.ESQUEMAS["reactivo_api"].es_valido(dict(reactivo, conversiones_posibles=reactivo.pop("conversiones")))
+
+
+@pytest.mark.parametrize("cambios, error", [
+    ({"id": 0}, "id: debe ser al menos 1"),
+    ({"costo": "barato"}, "costo: se esperaba numero"),
+    ({"conversiones": [{"unidad": "kg", "factor": 0}]}, "conversiones[0].: el factor debe ser mayor que 0"),
+])
+def test_errores_de_reactivo(registros, cambios, error):
+    reactivo = dict(registros["reactivo"], **cambios)
+    esquema = ValidadorCarga.ESQUEMAS["reactivo"]
+    assert not esquema.es_valido(reactivo)
+    assert any(error in mensaje for mensaje in esquema.errores(reactivo))
+
+
+def test_campo_faltante_y_opcional(registros):
+    experimento = dict(registros["experimento"])
+    del experimento["consumo_real"]
+    assert ValidadorCarga.ESQUEMAS["experimento"].es_valido(experimento)
+    del experimento["fecha"]
+    assert not ValidadorCarga.ESQUEMAS["experimento"].es_valido(experimento)
+
+
+def test_regla_entre_campos():
+    esquema = Esquema("rango", {"minimo": "numero", "maximo": "numero"}, reglas=[
+        ("el mínimo no puede ser mayor que el máximo", "r['minimo'] <= r['maximo']")
+    ])
+    assert esquema.es_valido({"minimo": 1, "maximo": 2})
+    assert not esquema.es_valido({"minimo": 3, "maximo": 2})
+    assert not esquema.es_valido({"minimo": True, "maximo": 2})  # Un booleano no es un número
+
+
+def test_lote_con_cuarentena(registros, carpeta):
+    validador = ValidadorCarga("cuarentena.jsonl")
+    invalido = dict(registros["receta"], nombre=None)
+    validos = validador.validar_lote("receta", [registros["receta"], invalido, "no es un registro"], "recetas.json")
+
+    assert validos == [registros["receta"]]
+    assert validador.rechazados == {"receta": 2}
+    assert validador.total_rechazados() == 2
+    with open(carpeta / "cuarentena.jsonl", encoding="utf-8") as f:
+        cuarentena = [json.loads(linea) for linea in f]
+    assert [c["posicion"] for c in cuarentena] == [1, 2]
+    assert cuarentena[0]["origen"] == "recetas.json"
+    assert "nombre: se esperaba texto" in cuarentena[0]["errores"]